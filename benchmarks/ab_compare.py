@@ -0,0 +1,301 @@
+"""
+Compare the speed and the results of two Frescox builds on a corpus of
+reference inputs before rolling a new binary out to production.  Each side is
+either built here from a Frescox revision and a set of Meson options or is an
+existing installation.
+
+Each input is run the given number of times with both builds in alternation
+so that drifts in machine load affect both equally.  For each input, the ratio
+of the mean wall time of B to that of A is reported with a 95% bootstrap
+confidence interval.  The largest relative difference between the observables
+of the two builds is also reported.  By default, the observables are all
+numbers written to the main output except those on lines that report timing.
+
+The script exits with a nonzero status if the observables of any input differ
+by more than the tolerance or if the corpus as a whole is slower with B by
+more than the allowed slowdown with 95% confidence.
+
+    python ab_compare.py --corpus inputs/ --b-revision <sha> \\
+        --b-option use_lapack=enabled --repeats 10
+"""
+
+import os
+import re
+import sys
+import shutil
+import argparse
+import tempfile
+import importlib
+
+import numpy as np
+import subprocess as sbp
+
+from pathlib import Path
+
+# ----- HARDCODED VALUES
+REPO_PATH = Path(__file__).resolve().parents[1]
+MESON_PATH = REPO_PATH.joinpath("bfrescoxpro_pypkg", "meson")
+WRAP_FILE = REPO_PATH.joinpath("meson", "frescox.wrap")
+PACKAGEFILES_PATH = REPO_PATH.joinpath("meson", "packagefiles")
+
+N_BOOTSTRAP = 2000
+CONFIDENCE = 0.95
+
+# Lines of Frescox output whose numbers change from run to run
+TIMING = re.compile(r"time|cpu|date|elapsed|seconds", re.IGNORECASE)
+NUMBER = re.compile(r"[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eEdD][-+]?\d+)?")
+
+
+def build(label, revision, options, workspace):
+    """
+    Build Frescox with the build system of this repository from the given
+    revision and Meson options.
+
+    :return: Path to the installation folder that contains the ``bin`` and
+        ``build`` folders
+    """
+    root = workspace.joinpath(label)
+    subprojects = root.joinpath("subprojects")
+    subprojects.mkdir(parents=True)
+    for name in ["meson.build", "meson.options", "LICENSE"]:
+        shutil.copy(MESON_PATH.joinpath(name).resolve(), root.joinpath(name))
+    subprojects.joinpath("packagefiles").symlink_to(PACKAGEFILES_PATH)
+
+    with open(WRAP_FILE, "r") as fptr:
+        wrap = fptr.read()
+    if revision is not None:
+        wrap = re.sub(r"(?m)^revision\s*=.*$", f"revision = {revision}", wrap)
+    with open(subprojects.joinpath("frescox.wrap"), "w") as fptr:
+        fptr.write(wrap)
+
+    prefix = root.joinpath("install")
+    builddir = root.joinpath("builddir")
+    cmds = [
+        ["meson", "setup", "--buildtype=release", str(builddir), str(root),
+         f"-Dprefix={prefix}", "--warnlevel", "0"] +
+        [f"-D{option}" for option in options],
+        ["meson", "compile", "-j", "1", "-C", str(builddir)],
+        ["meson", "install", "--quiet", "-C", str(builddir)]
+    ]
+    for cmd in cmds:
+        sbp.run(cmd, stdin=sbp.DEVNULL, check=True)
+
+    return prefix
+
+
+def default_observable(filename):
+    """
+    :return: All numbers written to the results file except those on lines
+        that report timing
+    """
+    values = []
+    with open(filename, "r", errors="replace") as fptr:
+        for line in fptr:
+            if not TIMING.search(line):
+                values.extend(float(each.replace("d", "e").replace("D", "e"))
+                              for each in NUMBER.findall(line))
+    return np.array(values)
+
+
+def load_observable(spec):
+    """
+    :param spec: ``module:function`` of a function that is called with the
+        filename of a simulation's results and that returns a 1D array
+    """
+    if spec is None:
+        return default_observable
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def difference(a, b):
+    """
+    :return: Largest absolute difference relative to the largest magnitude of
+        the observable of A or infinity if the observables differ in shape
+    """
+    a = np.asarray(a, dtype=float).ravel()
+    b = np.asarray(b, dtype=float).ravel()
+    if a.shape != b.shape:
+        return np.inf
+    elif len(a) == 0:
+        return 0.0
+    scale = max(np.max(np.abs(a)), np.finfo(float).tiny)
+    return float(np.max(np.abs(a - b)) / scale)
+
+
+def ratio_interval(rng, times_a, times_b):
+    """
+    :return: ``(ratio, low, high)`` ratio of the mean wall time of B to that
+        of A and its bootstrap confidence interval
+    """
+    n_a, n_b = len(times_a), len(times_b)
+    samples_a = rng.choice(times_a, (N_BOOTSTRAP, n_a)).mean(axis=1)
+    samples_b = rng.choice(times_b, (N_BOOTSTRAP, n_b)).mean(axis=1)
+    ratios = samples_b / samples_a
+    tail = 50.0 * (1.0 - CONFIDENCE)
+    low, high = np.percentile(ratios, [tail, 100.0 - tail])
+    return np.mean(times_b) / np.mean(times_a), low, high
+
+
+def overall_interval(rng, times):
+    """
+    :param times: ``list`` of ``(times_a, times_b)`` of each input
+    :return: ``(ratio, low, high)`` geometric mean over all inputs of the ratio
+        of mean wall times and its bootstrap confidence interval
+    """
+    samples = np.zeros(N_BOOTSTRAP)
+    for times_a, times_b in times:
+        samples_a = rng.choice(times_a, (N_BOOTSTRAP, len(times_a)))
+        samples_b = rng.choice(times_b, (N_BOOTSTRAP, len(times_b)))
+        samples += np.log(samples_b.mean(axis=1) / samples_a.mean(axis=1))
+    samples = np.exp(samples / len(times))
+    ratio = np.exp(np.mean([np.log(np.mean(b) / np.mean(a))
+                            for a, b in times]))
+    tail = 50.0 * (1.0 - CONFIDENCE)
+    low, high = np.percentile(samples, [tail, 100.0 - tail])
+    return ratio, low, high
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare speed and results of two Frescox builds"
+    )
+    parser.add_argument("--package", default="bfrescoxpro",
+                        choices=["bfrescox", "bfrescoxpro"],
+                        help="Package with which to run simulations")
+    parser.add_argument("--corpus", required=True,
+                        help="Folder of reference Frescox namelist inputs "
+                             "(*.in)")
+    for side in ["a", "b"]:
+        label = side.upper()
+        parser.add_argument(f"--{side}-revision", default=None,
+                            help=f"Frescox revision of {label}; default is "
+                                 "the revision pinned in meson/frescox.wrap")
+        parser.add_argument(f"--{side}-option", action="append", default=[],
+                            metavar="NAME=VALUE",
+                            help=f"Meson option of {label} (repeatable)")
+        parser.add_argument(f"--{side}-prefix", default=None,
+                            help=f"Existing installation folder to use as "
+                                 f"{label} instead of building it")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Number of timed runs per input and build")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Number of untimed runs per input and build")
+    parser.add_argument("--tolerance", type=float, default=1.0e-6,
+                        help="Largest acceptable relative difference of "
+                             "observables")
+    parser.add_argument("--max-slowdown", type=float, default=0.05,
+                        help="Largest acceptable fractional slowdown of B "
+                             "over the corpus")
+    parser.add_argument("--observable", default=None,
+                        metavar="MODULE:FUNCTION",
+                        help="Function that returns the observables of a "
+                             "results file; default is all non-timing "
+                             "numbers")
+    parser.add_argument("--mpi-processes", type=int, default=1,
+                        help="Number of MPI processes for MPI builds")
+    parser.add_argument("--workspace", default=None,
+                        help="Folder for builds and results; default is a "
+                             "temporary folder")
+    args = parser.parse_args()
+
+    pkg = importlib.import_module(args.package)
+    private = importlib.import_module(
+        f"{pkg.__name__}._run_frescox_simulation"
+    )
+    load_build_information = importlib.import_module(
+        f"{pkg.__name__}._load_build_information"
+    ).load_build_information
+    observable = load_observable(args.observable)
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+    inputs = sorted(Path(args.corpus).glob("*.in"))
+    if not inputs:
+        print(f"No *.in inputs in {args.corpus}")
+        sys.exit(2)
+    configurations = [pkg.Configuration.from_NML(fname) for fname in inputs]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = Path(args.workspace or tmp).resolve()
+        workspace.mkdir(parents=True, exist_ok=True)
+
+        runners = {}
+        for side in ["a", "b"]:
+            prefix = getattr(args, f"{side}_prefix")
+            if prefix is None:
+                prefix = build(side, getattr(args, f"{side}_revision"),
+                               getattr(args, f"{side}_option"), workspace)
+            frescox = load_build_information(Path(prefix).resolve())
+            if not frescox:
+                raise RuntimeError(f"No valid Frescox installation in {prefix}")
+            mpi_setup = None
+            if frescox[pkg.FRESCOX_MPI_SUPPORT]:
+                mpi_setup = {private.MPI_N_PROCESSES: args.mpi_processes}
+            runners[side] = private.Runner(frescox, mpi_setup)
+
+        # Frescox writes auxiliary files to its working directory
+        cwd = Path.cwd()
+        os.chdir(workspace)
+        rng = np.random.default_rng(1)
+        rows = []
+        times = []
+        try:
+            for fname, config in zip(inputs, configurations):
+                outputs = {}
+                elapsed = {"a": [], "b": []}
+                for k in range(args.warmup + args.repeats):
+                    for side in ["a", "b"]:
+                        outputs[side] = workspace.joinpath(
+                            "runs", side, fname.stem, "frescox.out"
+                        )
+                        outputs[side].parent.mkdir(parents=True,
+                                                   exist_ok=True)
+                        statistics = runners[side].run(config, outputs[side],
+                                                       overwrite=True)
+                        if k >= args.warmup:
+                            elapsed[side].append(statistics.wall_time)
+                diff = difference(observable(outputs["a"]),
+                                  observable(outputs["b"]))
+                ratio = ratio_interval(rng, elapsed["a"], elapsed["b"])
+                rows.append((fname.stem, np.mean(elapsed["a"]),
+                             np.mean(elapsed["b"])) + ratio + (diff,))
+                times.append((elapsed["a"], elapsed["b"]))
+        finally:
+            os.chdir(cwd)
+            for runner in runners.values():
+                runner.close()
+
+    width = max(12, max(len(row[0]) for row in rows))
+    print()
+    print(f"{'Input':<{width}s} {'A (s)':>10s} {'B (s)':>10s} "
+          f"{'B/A':>7s} {'95% CI':>17s} {'Rel. Diff':>10s}")
+    print("-" * (width + 60))
+    n_different = 0
+    for name, t_a, t_b, ratio, low, high, diff in rows:
+        mark = ""
+        if diff > args.tolerance:
+            mark = " *"
+            n_different += 1
+        print(f"{name:<{width}s} {t_a:10.3f} {t_b:10.3f} {ratio:7.3f} "
+              f"[{low:6.3f}, {high:6.3f}] {diff:10.2e}{mark}")
+    ratio, low, high = overall_interval(rng, times)
+    print("-" * (width + 60))
+    print(f"{'Geometric mean':<{width}s} {'':>10s} {'':>10s} {ratio:7.3f} "
+          f"[{low:6.3f}, {high:6.3f}]")
+    print()
+
+    slower = low > 1.0 + args.max_slowdown
+    if n_different > 0:
+        msg = "* {} input(s) differ by more than relative tolerance {:.2e}"
+        print(msg.format(n_different, args.tolerance))
+    if slower:
+        msg = "B is slower than A by more than {:.1f}% with {:.0f}% confidence"
+        print(msg.format(100.0 * args.max_slowdown, 100.0 * CONFIDENCE))
+    print("FAIL" if (n_different > 0) or slower else "PASS")
+    print()
+
+    sys.exit(1 if (n_different > 0) or slower else 0)
+
+
+if __name__ == "__main__":
+    main()
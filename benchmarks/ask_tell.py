@@ -0,0 +1,122 @@
+"""
+Measure how well workers are kept busy when simulations with very different
+run times are evaluated in synchronous generations with run_batch() compared to
+asynchronously with an Evaluator that starts a new simulation as soon as any
+simulation completes.
+
+Run times are made heterogeneous by drawing the number of partial waves of
+each simulation at random.  Utilization is the total run time of all
+simulations divided by the number of workers times the elapsed wall time.
+
+    python ask_tell.py --package bfrescox --workers 4 --points 64
+"""
+
+import copy
+import time
+import argparse
+import tempfile
+import importlib
+
+import numpy as np
+
+from pathlib import Path
+
+# ----- HARDCODED VALUES
+CONTENTS = """Ask/tell benchmark
+NAMELIST
+ &FRESCO hcm=0.05 rmatch=40.0 jtmax=40.0 thmin=0.0 thmax=180.0 thinc=1.0
+    elab(1)=30.0 /
+ &PARTITION namep='p' massp=1 zp=1 namet='Ni78' masst=78 zt=28 nex=1 /
+ &STATES jp=0.5 bandp=1 ep=0.0 cpot=1 jt=0.0 bandt=1 et=0.0 /
+ &partition /
+ &POT kp=1 ap=1 at=78 rc=1.2 /
+ &POT kp=1 type=1 p1=45.0 p2=1.2 p3=0.65 p4=10.0 p5=1.2 p6=0.65 /
+ &pot /
+ &overlap /
+ &coupling /
+"""
+PARAMETERS = ["fresco.jtmax"]
+
+
+def generations(pkg, config, thetas, path, n_workers, setup):
+    """
+    :return: ``(elapsed, busy)`` wall time in seconds of running one
+        generation of ``n_workers`` simulations at a time and the total run
+        time of all simulations
+    """
+    busy = 0.0
+    start = time.perf_counter()
+    for first in range(0, len(thetas), n_workers):
+        configurations = []
+        filenames = []
+        for i in range(first, min(first + n_workers, len(thetas))):
+            each = copy.deepcopy(config)
+            for name, value in zip(PARAMETERS, thetas[i]):
+                each[name] = float(value)
+            configurations.append(each)
+            filenames.append(path.joinpath(f"point_{i:06d}", "frescox.out"))
+        for result in pkg.run_batch(configurations, filenames,
+                                    n_workers=n_workers, **setup):
+            busy += result.wall_time
+    return time.perf_counter() - start, busy
+
+
+def asynchronous(pkg, config, thetas, path, n_workers, setup):
+    """
+    :return: ``(elapsed, busy)`` wall time in seconds of evaluating all points
+        with an evaluator and the total run time of all simulations
+    """
+    busy = 0.0
+    start = time.perf_counter()
+    with pkg.create_evaluator(config, PARAMETERS, path, n_workers=n_workers,
+                              **setup) as evaluator:
+        for theta in thetas:
+            evaluator.submit(theta)
+            for evaluation in evaluator.ready():
+                busy += evaluation.wall_time
+        while evaluator.n_in_flight > 0:
+            for evaluation in evaluator.ready(block=True):
+                busy += evaluation.wall_time
+    for evaluation in evaluator.ready():
+        busy += evaluation.wall_time
+    return time.perf_counter() - start, busy
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark asynchronous evaluation of simulations"
+    )
+    parser.add_argument("--package", default="bfrescox",
+                        choices=["bfrescox", "bfrescoxpro"],
+                        help="Package whose Evaluator is benchmarked")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of simulations to run concurrently")
+    parser.add_argument("--points", type=int, default=64,
+                        help="Number of simulations per method")
+    parser.add_argument("--jtmax", type=float, nargs=2, default=[10.0, 400.0],
+                        help="Range of the number of partial waves")
+    args = parser.parse_args()
+
+    pkg = importlib.import_module(args.package)
+    setup = {}
+    if pkg.__name__ == "bfrescoxpro":
+        if pkg.information()[pkg.FRESCOX_MPI_SUPPORT]:
+            setup["mpi_setup"] = {pkg.MPI_N_PROCESSES: 1}
+
+    rng = np.random.default_rng(1)
+    thetas = rng.uniform(args.jtmax[0], args.jtmax[1], (args.points, 1))
+    config = pkg.Configuration.from_NML_string(CONTENTS)
+
+    print(f"{'Method':<14}{'Wall time (s)':>16}{'Utilization':>14}")
+    print("-" * 44)
+    for name, method in [("generations", generations),
+                         ("asynchronous", asynchronous)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            elapsed, busy = method(pkg, config, thetas, Path(tmp),
+                                   args.workers, setup)
+        utilization = busy / (args.workers * elapsed)
+        print(f"{name:<14}{elapsed:>16.2f}{100.0 * utilization:>13.1f}%")
+
+
+if __name__ == "__main__":
+    main()
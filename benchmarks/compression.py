@@ -0,0 +1,99 @@
+"""
+Measure the compression ratio and throughput of the methods and levels that
+run_simulation() can use to compress results on a set of existing, uncompressed
+Frescox output files.
+
+Compression is performed with the same external programs and command lines used
+when running simulations so that results represent production use.  The
+decompression throughput of open_output() is also measured to account for the
+cost of loading compressed results.
+
+    python compression.py --package bfrescox /path/to/results/*.out
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import importlib
+
+import subprocess as sbp
+
+from pathlib import Path
+
+# ----- HARDCODED VALUES
+LEVELS = {
+    "gzip": [1, 3, 6, 9],
+    "zstd": [1, 3, 6, 9, 12, 19]
+}
+MB = 1024.0 * 1024.0
+
+
+def benchmark(pkg, filenames, method, level):
+    compressor_command = importlib.import_module(
+        f"{pkg.__name__}._run_frescox_simulation"
+    ).compressor_command
+    cmd = compressor_command(method, level)
+
+    size_in = 0
+    size_out = 0
+    t_compress = 0.0
+    t_decompress = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        fname_zip = Path(tmp).joinpath("output")
+        for fname in filenames:
+            size_in += fname.stat().st_size
+
+            start = time.perf_counter()
+            with open(fname, "rb") as fptr_in:
+                with open(fname_zip, "wb") as fptr_out:
+                    sbp.run(cmd, stdin=fptr_in, stdout=fptr_out, check=True)
+            t_compress += time.perf_counter() - start
+            size_out += fname_zip.stat().st_size
+
+            start = time.perf_counter()
+            with pkg.open_output(fname_zip) as fptr:
+                for _ in fptr:
+                    pass
+            t_decompress += time.perf_counter() - start
+
+    return (size_in / size_out,
+            size_in / MB / t_compress,
+            size_in / MB / t_decompress)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark compression of Frescox outputs"
+    )
+    parser.add_argument("--package", default="bfrescox",
+                        choices=["bfrescox", "bfrescoxpro"],
+                        help="Package whose compression setup is benchmarked")
+    parser.add_argument("--methods", nargs="+", default=list(LEVELS),
+                        choices=list(LEVELS),
+                        help="Compression methods to benchmark")
+    parser.add_argument("filenames", nargs="+", type=Path,
+                        help="Uncompressed Frescox output files")
+    args = parser.parse_args()
+
+    pkg = importlib.import_module(args.package)
+
+    total = sum(fname.stat().st_size for fname in args.filenames)
+    print(f"{len(args.filenames)} file(s) totaling {total / MB:.2f} MB")
+    print()
+    print(f"{'Method':<8}{'Level':>6}{'Ratio':>10}"
+          f"{'Compress':>14}{'Decompress':>14}")
+    print(f"{'':<8}{'':>6}{'':>10}{'(MB/s)':>14}{'(MB/s)':>14}")
+    print("-" * 52)
+    for method in args.methods:
+        for level in LEVELS[method]:
+            ratio, rate_c, rate_d = benchmark(pkg, args.filenames,
+                                              method, level)
+            print(f"{method:<8}{level:>6}{ratio:>10.2f}"
+                  f"{rate_c:>14.1f}{rate_d:>14.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
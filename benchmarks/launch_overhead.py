@@ -0,0 +1,141 @@
+"""
+Measure the per-launch overhead of starting Frescox simulations through
+run_simulation() and through a prepared Runner relative to starting the same
+program directly.
+
+To isolate the cost of launching from the cost of simulating, the Frescox
+executable of the package's installation is replaced by a program that exits
+immediately (/bin/true by default).  The input and output files are still
+written for every launch so that all Python-side work is included.
+
+    python launch_overhead.py --package bfrescox --launches 2000
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import importlib
+
+import subprocess as sbp
+
+from pathlib import Path
+
+# ----- HARDCODED VALUES
+CONTENTS = """Launch overhead benchmark
+NAMELIST
+ &FRESCO hcm=0.1 rmatch=20.0 jtmax=10.0 thmin=0.0 thmax=180.0 thinc=5.0
+    elab(1)=30.0 /
+ &PARTITION namep='p' massp=1 zp=1 namet='Ni78' masst=78 zt=28 nex=1 /
+ &STATES jp=0.5 bandp=1 ep=0.0 cpot=1 jt=0.0 bandt=1 et=0.0 /
+ &partition /
+ &POT kp=1 ap=1 at=78 rc=1.2 /
+ &pot /
+ &overlap /
+ &coupling /
+"""
+US = 1.0e6
+
+
+def time_launches(launch, path, n_launches, n_repeats):
+    """
+    :return: Smallest mean wall time in seconds over all repeats of launching
+        into the given folder.  As with timeit, the minimum is least affected
+        by other activity on the machine.
+    """
+    fnames = [path.joinpath(f"{i}.out") for i in range(n_launches)]
+    best = None
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        for fname in fnames:
+            launch(fname)
+        t_mean = (time.perf_counter() - start) / n_launches
+        best = t_mean if best is None else min(best, t_mean)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the overhead of launching Frescox"
+    )
+    parser.add_argument("--package", default="bfrescox",
+                        choices=["bfrescox", "bfrescoxpro"],
+                        help="Package whose launch path is benchmarked")
+    parser.add_argument("--launches", type=int, default=1000,
+                        help="Number of launches per method")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Number of times to repeat all launches")
+    parser.add_argument("--executable", default="/bin/true",
+                        help="Program that stands in for Frescox")
+    args = parser.parse_args()
+
+    pkg = importlib.import_module(args.package)
+    private = importlib.import_module(
+        f"{pkg.__name__}._run_frescox_simulation"
+    )
+
+    frescox = pkg.information()
+    frescox[pkg.FRESCOX_EXE] = str(Path(args.executable).resolve())
+    mpi_setup = None
+    if frescox[pkg.FRESCOX_MPI_SUPPORT]:
+        mpi_setup = {private.MPI_N_PROCESSES: 1}
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    config = pkg.Configuration.from_NML_string(CONTENTS)
+
+    # Launches through the package overwrite a single input in each folder
+    def run_simulation(fname):
+        private.run_frescox_simulation(frescox, config, mpi_setup, fname,
+                                       overwrite=True)
+
+    runner = private.Runner(frescox, mpi_setup)
+
+    def run_prepared(fname):
+        runner.run(config, fname, overwrite=True)
+
+    cmd = runner.command
+    env = dict(os.environ)
+
+    def run_subprocess(fname):
+        with open(fname, "wb") as fptr:
+            sbp.run(cmd, stdin=sbp.DEVNULL, stdout=fptr, check=True)
+
+    def run_spawn(fname):
+        fd = os.open(fname, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        try:
+            pid = os.posix_spawn(cmd[0], cmd, env,
+                                 file_actions=[(os.POSIX_SPAWN_DUP2, fd, 1)])
+        finally:
+            os.close(fd)
+        os.waitpid(pid, 0)
+
+    methods = [
+        ("os.posix_spawn (floor)", run_spawn),
+        ("subprocess.run", run_subprocess),
+        ("Runner.run", run_prepared),
+        ("run_frescox_simulation", run_simulation)
+    ]
+
+    print()
+    print(f"Stand-in executable - {cmd[0] if mpi_setup is None else cmd}")
+    print(f"Launches per method - {args.launches}")
+    print()
+    print(f"{'Method':<24s} {'us/launch':>10s} {'Overhead (us)':>14s}")
+    print("-" * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        floor = None
+        for name, launch in methods:
+            path = Path(tmp).joinpath(name.split()[0])
+            path.mkdir()
+            # Warm up caches
+            time_launches(launch, path, min(10, args.launches), 1)
+            t_mean = time_launches(launch, path, args.launches, args.repeats)
+            if floor is None:
+                floor = t_mean
+            print(f"{name:<24s} {t_mean * US:10.1f} "
+                  f"{(t_mean - floor) * US:14.1f}")
+    print()
+    runner.close()
+
+
+if __name__ == "__main__":
+    main()
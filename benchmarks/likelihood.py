@@ -0,0 +1,102 @@
+"""
+Measure the cost of comparing a batch of simulated angular distributions to
+experimental data with Likelihood.evaluate() and evaluate_stacked() relative
+to a Python loop that interpolates each simulation onto the measured angles
+with np.interp.
+
+Simulated distributions are random so that no Frescox runs are needed.  The
+data sets mimic a calibration against angular distributions measured at
+several energies with each simulation computed on the same angular grid.
+
+    python likelihood.py --package bfrescox --runs 10000
+"""
+
+import time
+import argparse
+import importlib
+
+import numpy as np
+
+# ----- HARDCODED VALUES
+MS = 1.0e3
+
+
+def loop(models, datasets):
+    """
+    :return: Chi-square of each simulation computed one at a time
+    """
+    chi_square = np.zeros(len(models))
+    for i, model in enumerate(models):
+        for (grid, values), (x, y, dy) in zip(model, datasets):
+            residuals = (np.interp(x, grid, values) - y) / dy
+            chi_square[i] += np.sum(residuals**2)
+    return chi_square
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark batch likelihood evaluation"
+    )
+    parser.add_argument("--package", default="bfrescox",
+                        choices=["bfrescox", "bfrescoxpro"],
+                        help="Package whose Likelihood is benchmarked")
+    parser.add_argument("--runs", type=int, default=10000,
+                        help="Number of simulations in the batch")
+    parser.add_argument("--datasets", type=int, default=4,
+                        help="Number of angular distributions")
+    parser.add_argument("--points", type=int, default=40,
+                        help="Number of measured angles per distribution")
+    parser.add_argument("--thinc", type=float, default=1.0,
+                        help="Angular step in degrees of simulated results")
+    args = parser.parse_args()
+
+    pkg = importlib.import_module(args.package)
+    rng = np.random.default_rng(1)
+
+    grid = np.arange(0.0, 180.0 + 0.5 * args.thinc, args.thinc)
+    raw = []
+    for _ in range(args.datasets):
+        x = np.sort(rng.uniform(5.0, 175.0, args.points))
+        y = rng.uniform(1.0, 100.0, args.points)
+        raw.append((x, y, 0.1 * y))
+    likelihood = pkg.Likelihood([pkg.DataSet(*each) for each in raw])
+    models = [[(grid, rng.uniform(1.0, 100.0, len(grid)))
+               for _ in range(args.datasets)]
+              for _ in range(args.runs)]
+    stacked = [(grid, np.array([model[k][1] for model in models]))
+               for k in range(args.datasets)]
+
+    start = time.perf_counter()
+    expected = loop(models, raw)
+    t_loop = time.perf_counter() - start
+
+    # The first evaluation builds and caches the interpolation matrices
+    start = time.perf_counter()
+    likelihood.evaluate(models)
+    t_first = time.perf_counter() - start
+    start = time.perf_counter()
+    result = likelihood.evaluate(models)
+    t_cached = time.perf_counter() - start
+    assert np.allclose(expected, result.chi_square)
+    start = time.perf_counter()
+    result = likelihood.evaluate_stacked(stacked)
+    t_stacked = time.perf_counter() - start
+    assert np.allclose(expected, result.chi_square)
+
+    print()
+    print(f"Simulations         - {args.runs}")
+    print(f"Data sets x points  - {args.datasets} x {args.points}")
+    print(f"Model grid points   - {len(grid)}")
+    print()
+    print(f"{'Method':<28s} {'Time (ms)':>10s} {'Speedup':>8s}")
+    print("-" * 48)
+    for name, elapsed in [("Loop with np.interp", t_loop),
+                          ("Likelihood.evaluate", t_first),
+                          ("Likelihood.evaluate (cached)", t_cached),
+                          ("Likelihood.evaluate_stacked", t_stacked)]:
+        print(f"{name:<28s} {elapsed * MS:10.1f} {t_loop / elapsed:8.2f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
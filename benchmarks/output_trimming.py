@@ -0,0 +1,133 @@
+"""
+Measure how much less Frescox writes, and how much faster its results are
+written and read, when the print controls of each input are set so that only
+the results needed by the caller are written.
+
+Each Frescox namelist input is run repeatedly both with its print controls as
+given and with those set for the requested outputs.  Every run is made in its
+own folder so that the auxiliary files (fort.*) that Frescox writes are also
+measured.  Reading is timed as one pass over the main output file, which is
+the least that any parser must do.
+
+    python output_trimming.py --package bfrescox \\
+        --outputs cross_sections angular_distributions -- inputs/*.in
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import importlib
+
+import numpy as np
+
+from pathlib import Path
+
+# ----- HARDCODED VALUES
+KB = 1024.0
+MODES = ("as given", "trimmed")
+
+
+def read_time(fname):
+    """
+    :return: Wall time in seconds to read the file line by line
+    """
+    start = time.perf_counter()
+    with open(fname, "r", errors="replace") as fptr:
+        for _ in fptr:
+            pass
+    return time.perf_counter() - start
+
+
+def benchmark(runner, config, path, n_repeats):
+    """
+    :return: ``(output, auxiliary, run, read)`` means over all repeats of the
+        size in bytes of the main output, the total size in bytes of the
+        auxiliary files, the wall time of the simulation, and the time to
+        read the main output
+    """
+    measurements = []
+    for i in range(n_repeats):
+        folder = path.joinpath(f"repeat_{i}")
+        folder.mkdir()
+        fname = folder.joinpath("frescox.out")
+        statistics = runner.run(config, fname)
+        auxiliary = sum(each.stat().st_size
+                        for each in folder.glob("fort.*"))
+        measurements.append((fname.stat().st_size, auxiliary,
+                             statistics.wall_time, read_time(fname)))
+    return np.mean(measurements, axis=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Frescox output reduction by print controls"
+    )
+    parser.add_argument("--package", default="bfrescox",
+                        choices=["bfrescox", "bfrescoxpro"],
+                        help="Package with which to run simulations")
+    parser.add_argument("--outputs", nargs="+", default=["cross_sections"],
+                        help="Results that the caller needs")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Number of runs per input and mode")
+    parser.add_argument("filenames", nargs="+", type=Path,
+                        help="Frescox namelist inputs")
+    args = parser.parse_args()
+
+    pkg = importlib.import_module(args.package)
+    private = importlib.import_module(
+        f"{pkg.__name__}._run_frescox_simulation"
+    )
+    for output in args.outputs:
+        if output not in pkg.OUTPUTS:
+            print(f"Unknown output {output}; choose from {pkg.OUTPUTS}")
+            return 2
+
+    frescox = pkg.information()
+    mpi_setup = None
+    if frescox[pkg.FRESCOX_MPI_SUPPORT]:
+        mpi_setup = {private.MPI_N_PROCESSES: 1}
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    runners = {
+        MODES[0]: private.Runner(frescox, mpi_setup, isolated=True),
+        MODES[1]: private.Runner(frescox, mpi_setup, isolated=True,
+                                 outputs=args.outputs)
+    }
+
+    print(f"Outputs: {', '.join(args.outputs)}")
+    print()
+    print(f"{'Input':<20}{'Mode':>10}{'Output':>12}{'Aux.':>12}"
+          f"{'Run':>10}{'Read':>10}")
+    print(f"{'':<20}{'':>10}{'(KiB)':>12}{'(KiB)':>12}"
+          f"{'(s)':>10}{'(ms)':>10}")
+    print("-" * 74)
+    totals = {mode: np.zeros(4) for mode in MODES}
+    with tempfile.TemporaryDirectory() as tmp:
+        for k, fname in enumerate(args.filenames):
+            config = pkg.Configuration.from_NML(fname)
+            for mode in MODES:
+                path = Path(tmp).joinpath(f"{k}", mode.replace(" ", "_"))
+                path.mkdir(parents=True)
+                result = benchmark(runners[mode], config, path, args.repeats)
+                totals[mode] += result
+                output, auxiliary, run, read = result
+                print(f"{fname.stem[:19]:<20}{mode:>10}"
+                      f"{output / KB:>12.1f}{auxiliary / KB:>12.1f}"
+                      f"{run:>10.3f}{1000.0 * read:>10.2f}")
+
+    print("-" * 74)
+    given, trimmed = totals[MODES[0]], totals[MODES[1]]
+    labels = ["Output size", "Auxiliary size", "Run time", "Read time"]
+    for label, before, after in zip(labels, given, trimmed):
+        reduction = 0.0 if before == 0.0 else 100.0 * (1.0 - after / before)
+        print(f"{label:<20}{reduction:>9.1f}% less when trimmed")
+
+    for runner in runners.values():
+        runner.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,7 +31,7 @@ EXE_NAMES = ["frescox"]
 
 # Package metadata
 PYTHON_REQUIRES = ">=3.9"
-CODE_REQUIRES = []
+CODE_REQUIRES = ["numpy"]
 TEST_REQUIRES = []
 INSTALL_REQUIRES = CODE_REQUIRES + TEST_REQUIRES
 
@@ -41,6 +41,13 @@ PACKAGE_DATA = {
         ["build/build_info.csv"]
 }
 
+ENTRY_POINTS = {
+    "console_scripts": [
+        "bfrescox = bfrescox.cli:main",
+        "bfrescox-worker = bfrescox.worker:main"
+    ]
+}
+
 PROJECT_URLS = {
     "Source": "https://github.com/bandframework/Bfrescox",
     "Documentation": "http://Bfrescox.readthedocs.io",
@@ -134,6 +141,7 @@ setup(
     cmdclass=cmdclass,
     python_requires=PYTHON_REQUIRES,
     install_requires=INSTALL_REQUIRES,
+    entry_points=ENTRY_POINTS,
     classifiers=[
         "Natural Language :: English",
         "Development Status :: 3 - Alpha",
@@ -0,0 +1 @@
+../../../common/Evaluator.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../common/Monitor.py
\ No newline at end of file
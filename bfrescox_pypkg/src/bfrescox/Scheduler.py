@@ -0,0 +1 @@
+../../../common/Scheduler.py
\ No newline at end of file
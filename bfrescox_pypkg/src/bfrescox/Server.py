@@ -0,0 +1 @@
+../../../common/Server.py
\ No newline at end of file
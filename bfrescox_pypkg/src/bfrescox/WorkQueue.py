@@ -0,0 +1 @@
+../../../common/WorkQueue.py
\ No newline at end of file
@@ -8,17 +8,77 @@ to access results.
 from importlib.metadata import version
 
 from ._run_frescox_simulation import (
-    FRESCOX_EXE,
+    FRESCOX_EXE, FRESCOX_LIBRARY_PATH,
     FRESCOX_MPI_SUPPORT, FRESCOX_OPENMP_SUPPORT,
     FRESCOX_LAPACK_SUPPORT,
-    FRESCOX_COREX_SUPPORT
+    FRESCOX_COREX_SUPPORT,
+    COMPRESSION_GZIP, COMPRESSION_ZSTD,
+    LIMIT_STACK, LIMIT_ADDRESS_SPACE,
+    RunStatistics, Runner
 )
 
 from .information import information
+from .stage_installation import stage_installation, STAGE_PATH_ENV
 from .print_information import print_information
 from .run_simulation import run_simulation
+from .run_batch import run_batch
+from .create_runner import create_runner
+from .create_evaluator import create_evaluator
+from .create_pipeline import create_pipeline
+from .create_server import create_server
+from .jacobian import jacobian
+from .find_converged_settings import find_converged_settings
+from .sweep_energies import sweep_energies
+from .reuse_intermediates import reuse_intermediates
+from .screen_fidelities import screen_fidelities
+from .open_output import open_output
 
-from .Configuration import Configuration
+from .Configuration import (
+    Configuration,
+    OUTPUTS,
+    OUTPUT_CROSS_SECTIONS, OUTPUT_ANGULAR_DISTRIBUTIONS,
+    OUTPUT_ELASTIC_S_MATRIX, OUTPUT_CHANNELS, OUTPUT_COUPLINGS,
+    OUTPUT_WAVEFUNCTIONS, OUTPUT_AMPLITUDES, OUTPUT_POTENTIALS
+)
+from .RunIndex import (
+    RunIndex, RunRecord,
+    RUN_INDEX_ENV,
+    RUN_SUCCEEDED, RUN_FAILED, RUN_ABORTED, RUN_UNKNOWN
+)
+from .WorkQueue import WorkQueue, run_worker
+from .Server import (
+    Server, ServerStatistics, run_via_server, default_socket_path,
+    SERVER_SOCKET_ENV
+)
+from .Scheduler import Scheduler, CostModel
+from .CpuLayout import CpuLayout, CpuSlot
+from .Monitor import (
+    Monitor, ProgressEvent, RunAborted,
+    PROGRESS_ENERGY, PROGRESS_PARTIAL_WAVE, PROGRESS_ITERATION,
+    DEFAULT_PROGRESS_PATTERNS
+)
+from ._batch import BatchResult
+from ._jacobian import (
+    Jacobian,
+    FINITE_DIFFERENCE_FORWARD, FINITE_DIFFERENCE_CENTRAL
+)
+from ._convergence import ConvergenceResult, ConvergenceTrial
+from ._energy_sweep import EnergySweep, ENERGY_PARAMETER
+from ._intermediates import (
+    SharedFile, ReuseReport, shared_groups,
+    CHECK_FOLDER
+)
+from ._screening import (
+    ScreeningResult,
+    LOW_FIDELITY_FOLDER, HIGH_FIDELITY_FOLDER
+)
+from .Likelihood import DataSet, Likelihood, LikelihoodEvaluation
+from .Ensemble import Ensemble
+from .Evaluator import Evaluator, Evaluation
+from .Pipeline import (
+    Pipeline, PipelineResult, PipelineStatistics, StageStatistics,
+    STAGE_LAUNCH, STAGE_PARSE, STAGE_REDUCE
+)
 
 # ----- Python unittest-based test framework
 # Used for automatic test discovery
@@ -0,0 +1 @@
+../../../common/batch.py
\ No newline at end of file
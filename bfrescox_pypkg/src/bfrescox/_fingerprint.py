@@ -0,0 +1 @@
+../../../common/fingerprint.py
\ No newline at end of file
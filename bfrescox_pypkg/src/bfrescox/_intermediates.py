@@ -0,0 +1 @@
+../../../common/intermediates.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../common/screening.py
\ No newline at end of file
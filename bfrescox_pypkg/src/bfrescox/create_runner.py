@@ -0,0 +1,62 @@
+from .run_simulation import _select_installation
+from ._run_frescox_simulation import Runner
+
+
+def create_runner(external=None, compression=None, compression_level=None,
+                  index=None, limits=None, monitor=None, layout=None,
+                  isolated=False, outputs=None):
+    """
+    Prepare a :py:class:`Runner` that runs many |frescox| simulations with the
+    same setup as if by :py:func:`run_simulation` but with all checks done
+    once up front.  This is useful when many short simulations are run and
+    the cost of starting each simulation matters.
+
+    .. code-block:: python
+
+        with bfrescox.create_runner() as runner:
+            for config, filename in zip(configurations, filenames):
+                runner.run(config, filename)
+
+    :param external: (|bfrescox| only) **EXPERT USERS ONLY**
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all runs.  If ``None``, then runs are recorded in
+        the index named by the ``BFRESCOX_RUN_INDEX`` environment variable if
+        it is set when the runner is created.
+    :param limits: ``dict`` that maps ``LIMIT_STACK`` and/or
+        ``LIMIT_ADDRESS_SPACE`` to the limit in bytes, or ``None`` for no
+        limit, to apply to each |frescox| process; ``None`` to use the limits
+        of this process
+    :param monitor: :py:class:`Monitor` that watches the output of each
+        simulation as it is written and that can stop it early; ``None`` for
+        no monitoring
+    :param layout: :py:class:`CpuLayout` whose slots partition the CPUs of
+        the node among concurrent simulations so that each runs restricted to
+        its own CPUs with a matching number of OpenMP threads; ``None`` to let
+        the operating system place all simulations
+    :param isolated: If True, then each simulation runs in the folder of its
+        results file so that the auxiliary files that |frescox| writes are
+        kept with its results.  Otherwise, simulations run in the current
+        working directory.  Set to True if the runner is used by several
+        threads at once so that concurrent simulations do not overwrite each
+        other's auxiliary files.
+    :param outputs: Names of the only results that |frescox| should write
+        (|eg| ``OUTPUT_CROSS_SECTIONS``).  The print controls of each input
+        file are set as by :py:meth:`Configuration.with_outputs` so that less
+        text is formatted, written, and later read.  ``None`` to use the print
+        controls of the configuration as given.
+    :return: :py:class:`Runner`
+    """
+    # Assume for now that external installations will not be using MPI
+    NO_MPI_PLEASE = None
+
+    return Runner(_select_installation(external), NO_MPI_PLEASE,
+                  compression=compression,
+                  compression_level=compression_level,
+                  index=index, limits=limits,
+                  monitor=monitor, layout=layout,
+                  isolated=isolated, outputs=outputs)
@@ -0,0 +1,50 @@
+from .create_runner import create_runner
+from .Server import Server
+
+
+def create_server(path=None, n_workers=1, external=None, compression=None,
+                  compression_level=None, index=None, monitor=None,
+                  layout=None, outputs=None):
+    """
+    Prepare and start a :py:class:`Server` that runs |frescox| simulations
+    requested by clients on this node with :py:func:`run_via_server`.  The
+    setup is checked once for all simulations by a single
+    :py:class:`Runner`.  Each simulation runs in the folder of its results so
+    that concurrent simulations do not overwrite each other's auxiliary
+    files.
+
+    :param path: Filename including path of the socket on which to listen;
+        ``None`` to use :py:func:`default_socket_path`
+    :param n_workers: Number of simulations to run concurrently
+    :param external: (|bfrescox| only) **EXPERT USERS ONLY**
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all simulations
+    :param monitor: :py:class:`Monitor` that watches the output of each
+        simulation as it is written and that can stop it early; ``None`` for
+        no monitoring
+    :param layout: :py:class:`CpuLayout` whose slots partition the CPUs of
+        the node among concurrent simulations so that each runs restricted to
+        its own CPUs with a matching number of OpenMP threads; ``None`` to let
+        the operating system place all simulations
+    :param outputs: Names of the only results that |frescox| should write.
+        See :py:func:`create_runner`.
+    :return: :py:class:`Server`
+    """
+    runner = create_runner(external=external,
+                           compression=compression,
+                           compression_level=compression_level,
+                           index=index,
+                           monitor=monitor,
+                           layout=layout,
+                           outputs=outputs,
+                           isolated=True)
+    try:
+        return Server(runner, path=path, n_workers=n_workers)
+    except Exception:
+        runner.close()
+        raise
@@ -0,0 +1,65 @@
+import functools
+
+from .run_batch import run_batch
+from ._convergence import converge_settings
+
+
+def find_converged_settings(configuration, settings, observable, path,
+                            tolerance, n_workers=1, overwrite=False,
+                            external=None, compression=None,
+                            compression_level=None, index=None):
+    """
+    Find the cheapest numerical settings (|eg| step size, matching radius,
+    maximum partial wave, or number of coupled channels) for which an
+    observable of a representative simulation agrees with that of the most
+    refined settings to within a relative tolerance.
+
+    Each setting is first varied on its own with all others most refined.
+    These simulations are run concurrently as a single :py:func:`run_batch`.
+    The cheapest value of each setting that is individually within tolerance
+    is selected and the combination is confirmed by running it.  If the
+    combined error is too large, then the setting with the largest individual
+    error is refined until the combination converges.
+
+    The converged settings can be applied to every configuration in a sweep
+    with :py:meth:`ConvergenceResult.apply` and saved for later use with
+    :py:meth:`ConvergenceResult.save`.  Use
+    :py:meth:`ConvergenceResult.print_report` to review the error and cost of
+    all simulations run.  Wall times are most representative with
+    ``n_workers=1``.
+
+    :param configuration: :py:class:`Configuration` object of a representative
+        simulation
+    :param settings: ``dict`` that maps the name of each numerical parameter
+        (|eg| ``fresco.hcm``) to a sequence of its candidate values ordered
+        from cheapest to most refined
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns ``(grid, values)`` 1D arrays.
+        Use :py:func:`open_output` to read compressed results.
+    :param path: Path to folder in which to write the results of all
+        simulations
+    :param tolerance: Largest acceptable relative error of the observable,
+        which is the largest absolute difference scaled by the largest
+        magnitude of the reference observable
+    :param n_workers: Number of simulations to run concurrently
+    :param overwrite: If False, then an error is raised if any of the
+        simulation input or output files exist
+    :param external: (|bfrescox| only) **EXPERT USERS ONLY**
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all simulations
+    :return: :py:class:`ConvergenceResult`
+    """
+    run = functools.partial(run_batch,
+                            n_workers=n_workers,
+                            overwrite=overwrite,
+                            external=external,
+                            compression=compression,
+                            compression_level=compression_level,
+                            index=index)
+    return converge_settings(run, configuration, settings, observable, path,
+                             tolerance)
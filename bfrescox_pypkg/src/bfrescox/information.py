@@ -1,6 +1,7 @@
 from pathlib import Path
 
 from ._load_build_information import load_build_information
+from .stage_installation import staged_information
 
 
 def information():
@@ -11,6 +12,10 @@ def information():
     and inadvertently using a different executable if, for example, the ``PATH``
     variable is mismanaged.
 
+    If the ``BFRESCOX_STAGE_PATH`` environment variable is set, then the
+    installation is first staged to that node-local folder with
+    :py:func:`stage_installation` and the staged copy is returned.
+
     .. note::
         **EXPERT USERS ONLY** An empty ``dict`` indicates a hollow |bfrescox|
         installation
@@ -18,4 +23,6 @@ def information():
     :return: ``dict`` that contains information regarding the |frescox|
         executable used by the package.
     """
-    return load_build_information(Path(__file__).resolve().parent)
+    return staged_information(
+        load_build_information(Path(__file__).resolve().parent)
+    )
@@ -0,0 +1,70 @@
+import functools
+
+from .create_runner import create_runner
+from ._intermediates import reuse_intermediates as _reuse_intermediates
+
+
+def reuse_intermediates(configurations, filenames, shared, observable=None,
+                        n_checks=1, tolerance=1.0e-6, n_workers=1,
+                        overwrite=False, external=None, compression=None,
+                        compression_level=None, index=None):
+    """
+    Run a batch of |frescox| simulations as if by :py:func:`run_batch` but
+    with expensive intermediates (|eg| bound-state form factors) computed
+    once for all simulations whose namelist groups that determine them are
+    unchanged rather than recomputed by every simulation.
+
+    Each intermediate is declared as a :py:class:`SharedFile` that names the
+    file unit through which |frescox| writes and reads it, the groups on
+    which it depends, and the settings that make |frescox| write or read it.
+    For each set of two or more simulations that agree on those groups, the
+    first simulation is run with the write settings before all others, which
+    are then run with the read settings and a copy of the file.  Each
+    simulation runs in the folder of its results file, where its |frescox|
+    file units are kept, so that each results file must be in its own folder.
+    Use :py:func:`shared_groups` to find the groups that are unchanged across
+    a batch.
+
+    Reuse is checked by first running ``n_checks`` of the simulations that
+    read intermediates a second time without reuse and comparing their
+    observables.  If they differ by more than the tolerance, then an error is
+    raised before the remaining simulations run.  The checked simulations
+    also provide the timings from which the time saved is estimated.
+
+    :param configurations: Sequence of :py:class:`Configuration` objects that
+        specify the simulations to run
+    :param filenames: Sequence of filenames including path of files to write
+        outputs to with one filename per configuration
+    :param shared: Sequence of :py:class:`SharedFile` objects
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns a real value or an array of
+        real values to compare.  Required unless ``n_checks`` is zero.
+    :param n_checks: Number of simulations that read intermediates to check
+        against full recomputation
+    :param tolerance: Largest acceptable difference of observables relative
+        to their largest magnitude
+    :param n_workers: Number of simulations to run concurrently
+    :param overwrite: If False, then a simulation fails if either of its input
+        or output files exist
+    :param external: (|bfrescox| only) **EXPERT USERS ONLY**
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all simulations
+    :return: :py:class:`ReuseReport`
+    """
+    if not isinstance(overwrite, bool):
+        raise TypeError("Given overwrite argument is not a boolean")
+
+    with create_runner(external=external,
+                       compression=compression,
+                       compression_level=compression_level,
+                       index=index,
+                       isolated=True) as runner:
+        run = functools.partial(runner.run, overwrite=overwrite)
+        return _reuse_intermediates(run, configurations, filenames, shared,
+                                    n_workers, observable=observable,
+                                    n_checks=n_checks, tolerance=tolerance)
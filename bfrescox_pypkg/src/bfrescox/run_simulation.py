@@ -10,27 +10,12 @@ from ._run_frescox_simulation import (
 )
 
 
-def run_simulation(configuration, filename, overwrite=False, external=None):
+def _select_installation(external):
     """
-    Run a |frescox| simulation based on the given simulation configuration
-    object.  Results are written to a file with the given output filename.  The
-    |frescox| Fortran namelist configuration file generated from the
-    configuration object for the simulation is written alongside the results
-    file.
-
-    .. todo::
-        * Load and return a result object once that class exists.
-
-    :param configuration: :py:class:`Configuration` object that specifies the
-        simulation to run
-    :param filename: Filename including path of file to write outputs to
-    :param overwrite: If False, then an error is raised if either of the
-        simulation input or output files exist
-    :param external: (|bfrescox| only) **EXPERT USERS ONLY**
+    :param external: ``dict`` that fully characterizes an external |frescox|
+        installation; ``None`` to use the internal installation
+    :return: ``dict`` that fully characterizes the installation to use
     """
-    # Assume for now that external installations will not be using MPI
-    NO_MPI_PLEASE = None
-
     frescox = information()
     if (not frescox) and (external is None):
         msg = (
@@ -53,8 +38,71 @@ def run_simulation(configuration, filename, overwrite=False, external=None):
         assert not frescox[FRESCOX_LAPACK_SUPPORT]
         assert not frescox[FRESCOX_COREX_SUPPORT]
 
+    return frescox
+
+
+def run_simulation(configuration, filename, overwrite=False, external=None,
+                   compression=None, compression_level=None,
+                   index=None, limits=None, monitor=None, layout=None,
+                   isolated=False, outputs=None):
+    """
+    Run a |frescox| simulation based on the given simulation configuration
+    object.  Results are written to a file with the given output filename.  The
+    |frescox| Fortran namelist configuration file generated from the
+    configuration object for the simulation is written alongside the results
+    file.
+
+    .. todo::
+        * Load and return a result object once that class exists.
+
+    :param configuration: :py:class:`Configuration` object that specifies the
+        simulation to run
+    :param filename: Filename including path of file to write outputs to
+    :param overwrite: If False, then an error is raised if either of the
+        simulation input or output files exist
+    :param external: (|bfrescox| only) **EXPERT USERS ONLY**
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed.  Use :py:func:`open_output` to read compressed results.
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record the run.  If ``None``, then the run is recorded in
+        the index named by the ``BFRESCOX_RUN_INDEX`` environment variable if
+        it is set.
+    :param limits: ``dict`` that maps ``LIMIT_STACK`` and/or
+        ``LIMIT_ADDRESS_SPACE`` to the limit in bytes, or ``None`` for no
+        limit, to apply to each |frescox| process; ``None`` to use the limits
+        of this process
+    :param monitor: :py:class:`Monitor` that watches the output of the
+        simulation as it is written and that can stop it early; ``None`` for
+        no monitoring
+    :param layout: :py:class:`CpuLayout` in one of whose slots to run the
+        simulation restricted to the slot's CPUs; ``None`` to let the
+        operating system place the simulation
+    :param isolated: If True, then the simulation runs in the folder of its
+        results file so that the auxiliary files that |frescox| writes are
+        kept with its results rather than in the current working directory
+    :param outputs: Names of the only results that |frescox| should write
+        (|eg| ``OUTPUT_CROSS_SECTIONS``).  The print controls in the input
+        file are set as by :py:meth:`Configuration.with_outputs` so that less
+        text is formatted, written, and later read.  ``None`` to use the print
+        controls of the configuration as given.
+    :return: :py:class:`RunStatistics` of the simulation.  If the monitor
+        stops the simulation, then :py:class:`RunAborted` is raised instead.
+    """
+    # Assume for now that external installations will not be using MPI
+    NO_MPI_PLEASE = None
+
+    frescox = _select_installation(external)
+
     # This function assumes that all error checking of arguments will be handled
     # by this internal function.  This includes the case of incorrectly
     # providing an MPI-based external installation.
-    run_frescox_simulation(frescox, configuration, NO_MPI_PLEASE,
-                           filename, overwrite)
+    return run_frescox_simulation(frescox, configuration, NO_MPI_PLEASE,
+                                  filename, overwrite,
+                                  compression=compression,
+                                  compression_level=compression_level,
+                                  index=index, limits=limits,
+                                  monitor=monitor, layout=layout,
+                                  isolated=isolated, outputs=outputs)
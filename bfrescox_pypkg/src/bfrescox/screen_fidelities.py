@@ -0,0 +1,89 @@
+import functools
+
+from .run_batch import run_batch
+from ._screening import run_screening
+
+
+def screen_fidelities(configurations, low_fidelity, score, threshold, path,
+                      n_calibration=4, margin=None, n_workers=1,
+                      overwrite=False, external=None, compression=None,
+                      compression_level=None, index=None, outputs=None):
+    """
+    Screen points with cheap, low-fidelity |frescox| simulations and run at
+    full fidelity only those points that might be accepted.  In calibration
+    studies, most points are clearly rejected even by a coarse calculation
+    so that most of the cost of running every point at full fidelity can be
+    saved.
+
+    Every point is first run with the configuration returned for it by
+    ``low_fidelity``.  A few calibration points spread evenly over the range
+    of low-fidelity scores are then also run at full fidelity to measure the
+    discrepancy between the fidelities.  Unless given, the margin is the
+    largest amount by which full fidelity scored a calibration point higher
+    than low fidelity did.  Finally, every point whose low-fidelity score plus
+    the margin reaches the threshold, or whose low-fidelity simulation
+    failed, is run at full fidelity.  Each fidelity's results are written to
+    its own subfolder of ``path`` with one subfolder per point.
+
+    The margin protects against rejecting good points only to the extent that
+    the calibration points are representative.  Check the discrepancies
+    reported before trusting the screening of a new low-fidelity
+    transformation.
+
+    .. code-block:: python
+
+        def coarse(configuration):
+            configuration["fresco.hcm"] = 0.2
+            configuration["fresco.jtmax"] = 30.0
+            return configuration
+
+        result = bfrescox.screen_fidelities(configurations, coarse,
+                                            log_likelihood, -50.0, "screen",
+                                            n_workers=8)
+        result.print_report()
+        best = np.flatnonzero(result.accepted)
+
+    :param configurations: Sequence of :py:class:`Configuration` objects of
+        the points at full fidelity
+    :param low_fidelity: Function that is called with a copy of a point's
+        configuration and that returns the :py:class:`Configuration` of its
+        low-fidelity version (|eg| with fewer partial waves, a coarser step,
+        or fewer channels)
+    :param score: Function that is called with the filename of a
+        simulation's results and that returns a real value that is larger for
+        better points (|eg| a log-likelihood).  Use :py:func:`open_output` to
+        read compressed results.
+    :param threshold: Score that a point must reach at full fidelity to be
+        accepted
+    :param path: Path to folder in which to write the results of all
+        simulations
+    :param n_calibration: Number of points to run at both fidelities to
+        measure their discrepancy
+    :param margin: Non-negative amount added to each low-fidelity score
+        before comparing it to the threshold; ``None`` to calibrate the margin
+        from the calibration points or to use zero if there are none
+    :param n_workers: Number of simulations to run concurrently
+    :param overwrite: If False, then a simulation fails if either of its
+        input or output files exist
+    :param external: (|bfrescox| only) **EXPERT USERS ONLY**
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all simulations
+    :param outputs: Names of the only results that |frescox| should write.
+        See :py:func:`create_runner`.
+    :return: :py:class:`ScreeningResult`
+    """
+    run = functools.partial(run_batch,
+                            n_workers=n_workers,
+                            overwrite=overwrite,
+                            external=external,
+                            compression=compression,
+                            compression_level=compression_level,
+                            index=index,
+                            outputs=outputs)
+    return run_screening(run, configurations, low_fidelity, score, threshold,
+                         path, n_calibration=n_calibration, margin=margin)
@@ -0,0 +1 @@
+../../../common/stage_installation.py
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Automatic unittest of Configuration class
+"""
+
+import copy
+import unittest
+
+import bfrescox
+
+from .reference import temporary_folder
+
+TEMPLATE = """p+Ni78 Coulomb + Nuclear
+NAMELIST
+&FRESCO hcm=0.1 rmatch=60.0
+    jtmin=0.0 jtmax=60.0 absend= 0.01
+  thmin=0.00 thmax=180.00 thinc=1.00
+    iter=0 ips=0.0 iblock=0 chans=1 smats=2  xstabl=1
+  wdisk=2
+    elab(1)=50.0 treneg=1 /
+
+ &PARTITION namep='projectile' massp=1 zp=1
+            namet='target'   masst=78 zt=28 qval=-0.000 nex=1  /
+ &STATES jp=0.5 bandp=1 ep=0.0000 cpot=1 jt=0.0 bandt=1 et=0.0 /
+ &partition /
+
+ &POT kp=1 ap=1 at=78 rc=1.2  /
+ &POT kp=1 type=1  p1=@V@ p2=@r@ p3=@a@ p4=@W@ p5=@rw@ p6=@aw@ /
+ &pot /
+ &overlap /
+ &coupling /
+"""
+
+PARAMETERS = {"V": 50.0, "r": 1.2, "a": 0.65, "W": 10.0, "rw": 1.2, "aw": 0.5}
+
+
+class TestConfiguration(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__template = self.__path.joinpath("template.in")
+        with open(self.__template, "w") as fptr:
+            fptr.write(TEMPLATE)
+
+    def testFromTemplate(self):
+        fname = self.__path.joinpath("ni78.in")
+        config = bfrescox.Configuration.from_template(
+            self.__template, fname, PARAMETERS
+        )
+        self.assertTrue(fname.is_file())
+        self.assertEqual("p+Ni78 Coulomb + Nuclear", config.title)
+        self.assertEqual(0.1, config["fresco.hcm"])
+        self.assertEqual(50.0, config["fresco.elab(1)"])
+        self.assertEqual("projectile", config["partition.namep"])
+        self.assertEqual("projectile", config["partition[0].namep"])
+        for i, key in enumerate(["V", "r", "a", "W", "rw", "aw"]):
+            self.assertEqual(PARAMETERS[key], config[f"pot[1].p{i + 1}"])
+        self.assertFalse("partition[1].namep" in config)
+
+        # Round trip through file
+        self.assertEqual(config, bfrescox.Configuration.from_NML(fname))
+
+        # Don't overwrite by default
+        with self.assertRaises(RuntimeError):
+            bfrescox.Configuration.from_template(self.__template, fname,
+                                                 PARAMETERS)
+
+        # Template and parameters must match
+        bad = copy.deepcopy(PARAMETERS)
+        del bad["aw"]
+        with self.assertRaises(ValueError):
+            bfrescox.Configuration.from_template(self.__template, fname, bad,
+                                                 overwrite=True)
+
+    def testParameters(self):
+        config = bfrescox.Configuration.from_template(
+            self.__template, self.__path.joinpath("ni78.in"), PARAMETERS
+        )
+        parameters = config.parameters
+        self.assertEqual(0.1, parameters["fresco.hcm"])
+        self.assertEqual(28, parameters["partition[0].zt"])
+        self.assertEqual(50.0, parameters["pot[1].p1"])
+        self.assertTrue("fresco[0].hcm" not in parameters)
+
+        modified = copy.deepcopy(config)
+        modified["pot[1].p1"] = 55.0
+        modified["fresco.hcm"] = 0.05
+        self.assertNotEqual(config, modified)
+        self.assertEqual(55.0, modified["pot[1].p1"])
+        self.assertEqual(50.0, config["pot[1].p1"])
+        with self.assertRaises(KeyError):
+            modified["pot[10].p1"] = 1.0
+
+    def testOutputs(self):
+        config = bfrescox.Configuration.from_template(
+            self.__template, self.__path.joinpath("ni78.in"), PARAMETERS
+        )
+        trimmed = config.with_outputs([bfrescox.OUTPUT_CROSS_SECTIONS,
+                                       bfrescox.OUTPUT_ANGULAR_DISTRIBUTIONS])
+        self.assertEqual(1, trimmed["fresco.smats"])
+        self.assertEqual(1, trimmed["fresco.xstabl"])
+        self.assertEqual(0, trimmed["fresco.chans"])
+        self.assertEqual(0, trimmed["fresco.treneg"])
+        self.assertEqual(0, trimmed["fresco.waves"])
+        self.assertEqual(0.1, trimmed["fresco.hcm"])
+        # Original is not altered
+        self.assertEqual(2, config["fresco.smats"])
+        self.assertEqual(1, config["fresco.chans"])
+        self.assertEqual(1, config["fresco.treneg"])
+        self.assertFalse("fresco.waves" in config)
+
+        # Largest setting needed by any output is used
+        trimmed = config.with_outputs([bfrescox.OUTPUT_ELASTIC_S_MATRIX,
+                                       bfrescox.OUTPUT_CROSS_SECTIONS])
+        self.assertEqual(2, trimmed["fresco.smats"])
+        self.assertEqual(0, config.with_outputs([])["fresco.smats"])
+        for output in bfrescox.OUTPUTS:
+            config.with_outputs([output])
+
+        fname = self.__path.joinpath("trimmed.in")
+        config.write_to_nml(fname, outputs=[bfrescox.OUTPUT_CROSS_SECTIONS])
+        self.assertEqual(
+            config.with_outputs([bfrescox.OUTPUT_CROSS_SECTIONS]),
+            bfrescox.Configuration.from_NML(fname)
+        )
+        self.assertEqual(config.to_NML_string([]),
+                         config.with_outputs([]).to_NML_string())
+
+        with self.assertRaises(ValueError):
+            config.with_outputs(["bad output"])
+        with self.assertRaises(TypeError):
+            config.with_outputs(bfrescox.OUTPUT_CROSS_SECTIONS)
+        with self.assertRaises(ValueError):
+            bfrescox.Configuration("No FRESCO", [("pot", {})]).with_outputs([])
+
+    def testValues(self):
+        contents = "\n".join([
+            "Test values",
+            "NAMELIST",
+            " &FRESCO hcm=0.1d0, rmatch=2.5E1 ! Comment",
+            "   pel=1 exl=2 smallchan=1e-3 /",
+            " &PARTITION namep='it''s' massp=1 zp=1 "
+            "namet='a/b!' masst=3*2.0 /",
+            " &STEP ib=T ia=.false. /"
+        ])
+        config = bfrescox.Configuration.from_NML_string(contents)
+        self.assertEqual(0.1, config["fresco.hcm"])
+        self.assertEqual(25.0, config["fresco.rmatch"])
+        self.assertEqual(1.0e-3, config["fresco.smallchan"])
+        self.assertEqual("it's", config["partition.namep"])
+        self.assertEqual("a/b!", config["partition.namet"])
+        self.assertEqual([2.0, 2.0, 2.0], config["partition.masst"])
+        self.assertIs(True, config["step.ib"])
+        self.assertIs(False, config["step.ia"])
+
+        reloaded = bfrescox.Configuration.from_NML_string(
+            config.to_NML_string()
+        )
+        self.assertEqual(config, reloaded)
+
+    def testBadContents(self):
+        with self.assertRaises(ValueError):
+            bfrescox.Configuration.from_NML_string("Title\n&FRESCO /\n")
+        with self.assertRaises(ValueError):
+            bfrescox.Configuration.from_NML_string(
+                "Title\nNAMELIST\n&FRESCO hcm=0.1\n"
+            )
@@ -0,0 +1,110 @@
+"""
+Automatic unittest of CpuLayout class
+"""
+
+import io
+import os
+import stat
+import unittest
+import warnings
+
+from contextlib import redirect_stdout
+
+import bfrescox
+
+from .reference import reference_configuration, temporary_folder
+
+# Stand-in for Frescox that reports the placement of its process
+REPORTER = """#!/bin/sh
+cat > /dev/null
+echo "threads=$OMP_NUM_THREADS"
+echo "places=$OMP_PLACES"
+echo "bind=$OMP_PROC_BIND"
+grep Cpus_allowed_list /proc/self/status
+"""
+
+
+@unittest.skipUnless(hasattr(os, "sched_setaffinity"),
+                     "CPU affinity not supported")
+class TestCpuLayout(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__config = reference_configuration()
+        self.__cpus = os.sched_getaffinity(0)
+
+    def testPartition(self):
+        for n_slots in range(1, min(len(self.__cpus), 4) + 1):
+            layout = bfrescox.CpuLayout(n_slots)
+            self.assertEqual(n_slots, layout.n_slots)
+
+            used = set()
+            for i, slot in enumerate(layout.slots):
+                self.assertEqual(i, slot.index)
+                self.assertTrue(len(slot.cpus) > 0)
+                self.assertTrue(len(slot.numa_nodes) > 0)
+                self.assertTrue(used.isdisjoint(slot.cpus))
+                used.update(slot.cpus)
+
+                env = layout.environment(slot)
+                self.assertEqual(str(len(slot.cpus)), env["OMP_NUM_THREADS"])
+                self.assertEqual(len(slot.cpus),
+                                 len(env["OMP_PLACES"].split(",")))
+                self.assertEqual("close", env["OMP_PROC_BIND"])
+            self.assertEqual(self.__cpus, used)
+
+            with redirect_stdout(io.StringIO()) as buffer:
+                layout.print_report()
+            self.assertEqual(n_slots + 3, len(buffer.getvalue().splitlines()))
+
+        with self.assertRaises(ValueError):
+            bfrescox.CpuLayout(0)
+        with self.assertRaises(ValueError):
+            bfrescox.CpuLayout(len(self.__cpus) + 1)
+        with self.assertRaises(ValueError):
+            bfrescox.CpuLayout(1, cpus=[max(self.__cpus) + 1])
+        with self.assertRaises(TypeError):
+            bfrescox.create_runner(layout=self.__cpus)
+
+    def testPlacement(self):
+        N_POINTS = 4
+
+        exe = self.__path.joinpath("reporter.sh")
+        with open(exe, "w") as fptr:
+            fptr.write(REPORTER)
+        exe.chmod(exe.stat().st_mode | stat.S_IXUSR)
+        external = bfrescox.information()
+        external[bfrescox.FRESCOX_EXE] = exe
+
+        n_slots = min(len(self.__cpus), 2)
+        layout = bfrescox.CpuLayout(n_slots)
+        configurations = [self.__config] * N_POINTS
+        filenames = [self.__path.joinpath(str(i), "frescox.out")
+                     for i in range(N_POINTS)]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            results = list(bfrescox.run_batch(configurations, filenames,
+                                              n_workers=n_slots,
+                                              external=external,
+                                              layout=layout))
+        for result in results:
+            self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+
+        # Each simulation ran on exactly the CPUs of one slot
+        expected = [layout.environment(slot) for slot in layout.slots]
+        for fname in filenames:
+            with open(fname, "r") as fptr:
+                report = dict(line.strip().replace(":\t", "=").split("=", 1)
+                              for line in fptr if line.strip())
+            env = {"OMP_NUM_THREADS": report["threads"],
+                   "OMP_PLACES": report["places"],
+                   "OMP_PROC_BIND": report["bind"]}
+            self.assertTrue(env in expected)
+            slot = layout.slots[expected.index(env)]
+            allowed = set()
+            for part in report["Cpus_allowed_list"].split(","):
+                first, _, last = part.partition("-")
+                allowed.update(range(int(first), int(last or first) + 1))
+            self.assertEqual(set(slot.cpus), allowed)
+
+        # The calling thread is not left restricted
+        self.assertEqual(self.__cpus, os.sched_getaffinity(0))
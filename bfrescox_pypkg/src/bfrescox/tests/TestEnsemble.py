@@ -0,0 +1,124 @@
+"""
+Automatic unittest of Ensemble class
+"""
+
+import unittest
+
+import numpy as np
+
+from pathlib import Path
+
+import bfrescox
+
+from .reference import reference_configuration, temporary_folder
+
+THETA = np.linspace(0.0, 180.0, 37)
+ENERGY = np.array([10.0, 20.0, 30.0])
+
+
+def observable(filename):
+    """
+    Observables computed from the simulation's inputs, which are written
+    alongside its results
+    """
+    config = bfrescox.Configuration.from_NML(
+        Path(filename).parent.joinpath("frescox.in")
+    )
+    v = config["pot[1].p1"]
+    return [(THETA, v * np.cos(np.radians(THETA))),
+            (ENERGY, v + ENERGY)]
+
+
+class TestEnsemble(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+
+    def testStore(self):
+        N_POINTS = 4
+
+        path = self.__path.joinpath("ensemble")
+        ensemble = bfrescox.Ensemble.create(path, N_POINTS, [THETA, ENERGY])
+        self.assertEqual(path, ensemble.path)
+        self.assertEqual(N_POINTS, ensemble.n_points)
+        self.assertEqual(2, len(ensemble.grids))
+        self.assertFalse(np.any(ensemble.filled))
+        self.assertTrue(np.all(np.isnan(ensemble.values(0))))
+
+        # Another opening of the ensemble sees stored values without copies
+        other = bfrescox.Ensemble(path)
+        ensemble.store(2, [(THETA, np.sin(np.radians(THETA))),
+                           (ENERGY, ENERGY**2)])
+        self.assertTrue(np.array_equal([False, False, True, False],
+                                       other.filled))
+        self.assertTrue(np.allclose(np.sin(np.radians(THETA)),
+                                    other.values(0)[2]))
+        self.assertTrue(np.array_equal(ENERGY**2, other.values(1)[2]))
+
+        # Values on other grids are interpolated
+        fine = np.linspace(0.0, 180.0, 361)
+        ensemble.store(0, [(fine, fine), (fine, 2.0 * fine)])
+        self.assertTrue(np.allclose(THETA, ensemble.values(0)[0]))
+        self.assertTrue(np.allclose(2.0 * ENERGY, ensemble.values(1)[0]))
+
+        with self.assertRaises(ValueError):
+            ensemble.store(N_POINTS, [(THETA, THETA), (ENERGY, ENERGY)])
+        with self.assertRaises(ValueError):
+            ensemble.store(1, [(THETA, THETA)])
+        with self.assertRaises(ValueError):
+            ensemble.store(1, [(THETA, THETA), (ENERGY[1:], ENERGY[1:])])
+        self.assertFalse(ensemble.filled[1])
+
+        ensemble.flush()
+        with self.assertRaises(RuntimeError):
+            bfrescox.Ensemble.create(path, N_POINTS, [THETA])
+        with self.assertRaises(ValueError):
+            bfrescox.Ensemble(self.__path)
+        with self.assertRaises(ValueError):
+            bfrescox.Ensemble.create(self.__path, 0, [THETA])
+        with self.assertRaises(ValueError):
+            bfrescox.Ensemble.create(self.__path, 1, [THETA[::-1]])
+
+    def testBatch(self):
+        N_POINTS = 5
+
+        configurations = []
+        for i in range(N_POINTS):
+            config = reference_configuration()
+            config["pot[1].p1"] = 40.0 + i
+            configurations.append(config)
+        # The last simulation fails since its input already exists
+        filenames = [self.__path.joinpath(f"point_{i}", "frescox.out")
+                     for i in range(N_POINTS)]
+        filenames[-1].parent.mkdir()
+        filenames[-1].parent.joinpath("frescox.in").touch()
+
+        ensemble = bfrescox.Ensemble.create(self.__path.joinpath("ensemble"),
+                                            N_POINTS, [THETA, ENERGY])
+        results = list(bfrescox.run_batch(configurations, filenames,
+                                          n_workers=2, ensemble=ensemble,
+                                          observable=observable))
+        self.assertEqual(N_POINTS, len(results))
+
+        expected = [True] * (N_POINTS - 1) + [False]
+        self.assertTrue(np.array_equal(expected, ensemble.filled))
+        for i in range(N_POINTS - 1):
+            models = observable(filenames[i])
+            self.assertTrue(np.array_equal(models[0][1],
+                                           ensemble.values(0)[i]))
+            self.assertTrue(np.array_equal(models[1][1],
+                                           ensemble.values(1)[i]))
+
+        # The ensemble is ready for comparison to data
+        likelihood = bfrescox.Likelihood([
+            bfrescox.DataSet([45.0, 90.0], [30.0, 0.0], [1.0, 1.0]),
+            bfrescox.DataSet([15.0], [57.0], [1.0])
+        ])
+        result = likelihood.evaluate_stacked(ensemble.stacked())
+        self.assertEqual(2, np.nanargmax(result.log_likelihood))
+        self.assertTrue(np.isnan(result.chi_square[-1]))
+
+        with self.assertRaises(ValueError):
+            bfrescox.run_batch(configurations, filenames, ensemble=ensemble)
+        with self.assertRaises(TypeError):
+            bfrescox.run_batch(configurations, filenames,
+                               ensemble=self.__path, observable=observable)
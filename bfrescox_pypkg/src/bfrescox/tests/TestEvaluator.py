@@ -0,0 +1,124 @@
+"""
+Automatic unittest of Evaluator class
+"""
+
+import unittest
+
+import numpy as np
+
+from pathlib import Path
+
+import bfrescox
+
+from .reference import (REFERENCE_INPUT, reference_configuration,
+                        temporary_folder)
+
+PARAMETERS = ["pot[1].p1", "pot[1].p4"]
+
+
+def observable(filename):
+    """
+    Value computed from the simulation's inputs, which are written alongside
+    its results
+    """
+    config = bfrescox.Configuration.from_NML(
+        Path(filename).parent.joinpath("frescox.in")
+    )
+    return np.array([config[name] for name in PARAMETERS])
+
+
+class TestEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__config = reference_configuration()
+
+    def testAskTell(self):
+        N_POINTS = 7
+        MAX_IN_FLIGHT = 3
+
+        rng = np.random.default_rng(3)
+        thetas = rng.uniform(40.0, 50.0, (N_POINTS, len(PARAMETERS)))
+
+        evaluations = []
+        futures = []
+        with bfrescox.create_evaluator(self.__config, PARAMETERS,
+                                       self.__path, observable=observable,
+                                       n_workers=2,
+                                       max_in_flight=MAX_IN_FLIGHT) \
+                as evaluator:
+            self.assertEqual(PARAMETERS, evaluator.parameters)
+            self.assertEqual(MAX_IN_FLIGHT, evaluator.max_in_flight)
+            # Submit a new point each time one completes
+            for theta in thetas:
+                futures.append(evaluator.submit(theta))
+                self.assertTrue(evaluator.n_in_flight <= MAX_IN_FLIGHT)
+                evaluations.extend(evaluator.ready())
+            while evaluator.n_in_flight > 0:
+                evaluations.extend(evaluator.ready(block=True))
+        evaluations.extend(evaluator.ready())
+
+        self.assertEqual(N_POINTS, len(evaluations))
+        self.assertEqual(list(range(N_POINTS)),
+                         sorted(each.point for each in evaluations))
+        for evaluation in evaluations:
+            self.assertEqual(bfrescox.RUN_SUCCEEDED, evaluation.status)
+            self.assertIsNone(evaluation.error)
+            self.assertTrue(evaluation.filename.is_file())
+            # Auxiliary files are kept with each evaluation's results
+            self.assertTrue(
+                evaluation.filename.parent.joinpath("fort.16").is_file()
+            )
+            self.assertTrue(np.array_equal(thetas[evaluation.point],
+                                           evaluation.theta))
+            self.assertTrue(np.allclose(evaluation.theta, evaluation.value))
+            self.assertEqual(evaluation,
+                             futures[evaluation.point].result())
+        self.assertEqual([], list(evaluator.ready()))
+
+        # The evaluator's configuration is not altered
+        self.assertEqual(45.0, self.__config["pot[1].p1"])
+        with self.assertRaises(RuntimeError):
+            evaluator.submit(thetas[0])
+
+    def testFailure(self):
+        def failing(filename):
+            raise RuntimeError("Unable to load results")
+
+        with bfrescox.create_evaluator(self.__config, PARAMETERS,
+                                       self.__path,
+                                       observable=failing) as evaluator:
+            evaluator.submit([45.0, 10.0])
+            evaluations = list(evaluator.ready(block=True))
+
+        self.assertEqual(1, len(evaluations))
+        self.assertEqual(bfrescox.RUN_FAILED, evaluations[0].status)
+        self.assertTrue("Unable to load" in evaluations[0].error)
+        self.assertIsNone(evaluations[0].value)
+
+        # Nothing to wait for
+        self.assertEqual([], list(evaluator.ready(block=True)))
+
+    def testBadArguments(self):
+        with bfrescox.create_evaluator(self.__config, PARAMETERS,
+                                       self.__path) as evaluator:
+            with self.assertRaises(ValueError):
+                evaluator.submit([45.0])
+            with self.assertRaises(ValueError):
+                evaluator.submit([[45.0, 10.0]])
+
+        with self.assertRaises(TypeError):
+            bfrescox.create_evaluator(REFERENCE_INPUT, PARAMETERS, self.__path)
+        with self.assertRaises(ValueError):
+            bfrescox.create_evaluator(self.__config, [], self.__path)
+        with self.assertRaises(ValueError):
+            bfrescox.create_evaluator(self.__config, PARAMETERS * 2,
+                                      self.__path)
+        with self.assertRaises(TypeError):
+            bfrescox.create_evaluator(self.__config, ["partition[0].namep"],
+                                      self.__path)
+        with self.assertRaises(ValueError):
+            bfrescox.create_evaluator(self.__config, PARAMETERS, self.__path,
+                                      n_workers=2, max_in_flight=1)
+        with self.assertRaises(TypeError):
+            bfrescox.create_evaluator(self.__config, PARAMETERS, self.__path,
+                                      observable="not callable")
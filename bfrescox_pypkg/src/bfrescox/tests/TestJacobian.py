@@ -0,0 +1,95 @@
+"""
+Automatic unittest of jacobian() function
+"""
+
+import unittest
+
+import numpy as np
+
+from pathlib import Path
+
+import bfrescox
+
+from .reference import reference_configuration, temporary_folder
+
+V = "pot[1].p1"
+E = "fresco.elab(1)"
+
+
+def observable(filename):
+    """
+    Observable with known derivatives computed from the simulation's inputs,
+    which are written alongside its results
+    """
+    config = bfrescox.Configuration.from_NML(
+        Path(filename).parent.joinpath("frescox.in")
+    )
+    theta = np.linspace(0.0, 180.0, 37)
+    v, e = config[V], config[E]
+    return theta, v**2 * np.cos(np.radians(theta)) + v * e
+
+
+class TestJacobian(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__config = reference_configuration()
+
+    def __expected(self, theta):
+        cos = np.cos(np.radians(theta))
+        return np.column_stack([2.0 * 45.0 * cos + 30.0,
+                                np.full(len(theta), 45.0)])
+
+    def testCentral(self):
+        grid = np.linspace(10.0, 170.0, 9)
+        result = bfrescox.jacobian(self.__config, [V, E], [0.5, 1.0],
+                                   observable, self.__path, grid=grid,
+                                   n_workers=2)
+        self.assertEqual([V, E], result.parameters)
+        self.assertTrue(np.array_equal(grid, result.grid))
+        self.assertEqual((9, 2), result.jacobian.shape)
+        fname = self.__path.joinpath("base", "frescox.out")
+        theta, values = observable(fname)
+        self.assertTrue(np.allclose(np.interp(grid, theta, values),
+                                    result.values))
+        self.assertTrue(np.allclose(self.__expected(grid), result.jacobian))
+        self.assertTrue(np.array_equal([0.5, 1.0], result.steps))
+
+        # Base simulation, one up and one down per parameter
+        n_runs = len(list(self.__path.glob("*/frescox.out")))
+        self.assertEqual(5, n_runs)
+
+    def testForwardAdaptive(self):
+        h = 0.4
+        result = bfrescox.jacobian(self.__config, [V], h, observable,
+                                   self.__path,
+                                   method=bfrescox.FINITE_DIFFERENCE_FORWARD,
+                                   n_refinements=3, n_workers=2)
+        self.assertEqual((37,), result.grid.shape)
+        # Truncation error shrinks with the step so that the smallest step
+        # must be selected
+        self.assertTrue(np.allclose([h / 4.0], result.steps))
+        cos = np.cos(np.radians(result.grid))
+        expected = 2.0 * 45.0 * cos + 30.0 + (h / 4.0) * cos
+        self.assertTrue(np.allclose(expected, result.jacobian[:, 0]))
+
+        # Base simulation shared by all steps
+        n_runs = len(list(self.__path.glob("*/frescox.out")))
+        self.assertEqual(4, n_runs)
+
+    def testBadArguments(self):
+        with self.assertRaises(TypeError):
+            bfrescox.jacobian(self.__config, ["partition.namep"], 0.1,
+                              observable, self.__path)
+        with self.assertRaises(ValueError):
+            bfrescox.jacobian(self.__config, [V], [0.1, 0.2],
+                              observable, self.__path)
+        with self.assertRaises(ValueError):
+            bfrescox.jacobian(self.__config, [V], 0.1, observable,
+                              self.__path, method="backward")
+
+    def testFailure(self):
+        self.__path.joinpath("base").mkdir()
+        self.__path.joinpath("base", "frescox.out").touch()
+        with self.assertRaises(RuntimeError):
+            bfrescox.jacobian(self.__config, [V], 0.1, observable,
+                              self.__path)
@@ -0,0 +1,163 @@
+"""
+Automatic unittest of DataSet and Likelihood classes
+"""
+
+import math
+import tempfile
+import unittest
+
+import numpy as np
+
+from pathlib import Path
+
+import bfrescox
+
+
+class TestLikelihood(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+
+        # Measurements need not be sorted nor fall on model grids
+        self.__angles = np.array([10.0, 35.5, 20.25, 90.0, 179.0, 120.0])
+        self.__xs = rng.uniform(1.0, 100.0, len(self.__angles))
+        self.__errors = 0.1 * self.__xs
+        self.__total = bfrescox.DataSet([30.0], [1250.0], [50.0],
+                                        name="total")
+        self.__dist = bfrescox.DataSet(self.__angles, self.__xs,
+                                       self.__errors, name="angular")
+
+        # Batch with models on two different angular grids
+        self.__grids = [np.arange(0.0, 181.0, 5.0), np.linspace(0.0, 180.0, 7)]
+        self.__models = []
+        for i in range(6):
+            grid = self.__grids[i % 2]
+            values = rng.uniform(1.0, 100.0, len(grid))
+            self.__models.append([(np.array([20.0, 40.0]),
+                                   np.array([1000.0 + i, 1500.0])),
+                                  (grid, values)])
+
+    def __expected(self, model):
+        """
+        Compute residuals one simulation at a time with no caching.
+        """
+        total = (np.interp(30.0, *model[0]) - 1250.0) / 50.0
+        dist = (np.interp(self.__angles, *model[1]) - self.__xs) / \
+            self.__errors
+        return np.concatenate([[total], dist])
+
+    def testDataSet(self):
+        self.assertEqual(len(self.__angles), len(self.__dist))
+        self.assertEqual("angular", self.__dist.name)
+        self.assertTrue(np.array_equal(self.__xs, self.__dist.y))
+        with self.assertRaises(ValueError):
+            self.__dist.y[0] = 0.0
+
+        with self.assertRaises(ValueError):
+            bfrescox.DataSet([], [], [])
+        with self.assertRaises(ValueError):
+            bfrescox.DataSet([1.0, 2.0], [1.0], [1.0, 1.0])
+        with self.assertRaises(ValueError):
+            bfrescox.DataSet([1.0, 2.0], [1.0, 1.0], [1.0, 0.0])
+
+        # Interpolation is cached per grid
+        grid = self.__grids[0]
+        matrix = self.__dist.interpolation_matrix(grid)
+        self.assertTrue(np.array_equal(
+            matrix, self.__dist.interpolation_matrix(grid.copy())
+        ))
+        self.assertTrue(np.allclose(1.0, np.sum(matrix, axis=1)))
+        values = np.sin(np.radians(grid))
+        self.assertTrue(np.allclose(np.interp(self.__angles, grid, values),
+                                    matrix @ values))
+
+        # Grids must cover all data and be increasing
+        with self.assertRaises(ValueError):
+            self.__dist.interpolation_matrix(np.linspace(0.0, 170.0, 10))
+        with self.assertRaises(ValueError):
+            self.__dist.interpolation_matrix(grid[::-1])
+
+    def testDataSetBatch(self):
+        grid = self.__grids[0]
+        values = np.array([model[1][1] for model in self.__models[::2]])
+        residuals = self.__dist.residuals(grid, values)
+        chi_square = self.__dist.chi_square(grid, values)
+        log_likelihood = self.__dist.log_likelihood(grid, values)
+
+        self.assertEqual((len(values), len(self.__dist)), residuals.shape)
+        norm = -np.sum(np.log(self.__errors)) - \
+            0.5 * len(self.__errors) * math.log(2.0 * math.pi)
+        for i, each in enumerate(self.__models[::2]):
+            expected = self.__expected(each)[1:]
+            self.assertTrue(np.allclose(expected, residuals[i]))
+            self.assertAlmostEqual(np.sum(expected**2), chi_square[i])
+            self.assertAlmostEqual(norm - 0.5 * np.sum(expected**2),
+                                   log_likelihood[i])
+
+        # A single simulation can be given as a 1D array
+        single = self.__dist.chi_square(grid, values[0])
+        self.assertEqual((1,), single.shape)
+        self.assertAlmostEqual(chi_square[0], single[0])
+        with self.assertRaises(ValueError):
+            self.__dist.residuals(grid, values[:, :-1])
+
+    def testLikelihood(self):
+        likelihood = bfrescox.Likelihood([self.__total, self.__dist])
+        self.assertEqual(1 + len(self.__angles), likelihood.n_data)
+        self.assertEqual(2, len(likelihood.datasets))
+
+        result = likelihood.evaluate(self.__models)
+        n_runs = len(self.__models)
+        self.assertEqual((n_runs,), result.chi_square.shape)
+        self.assertEqual((n_runs,), result.log_likelihood.shape)
+        self.assertEqual((n_runs, likelihood.n_data), result.residuals.shape)
+        for i, model in enumerate(self.__models):
+            expected = self.__expected(model)
+            self.assertTrue(np.allclose(expected, result.residuals[i]))
+            self.assertAlmostEqual(np.sum(expected**2), result.chi_square[i])
+            self.assertAlmostEqual(
+                self.__total.log_likelihood(*model[0])[0] +
+                self.__dist.log_likelihood(*model[1])[0],
+                result.log_likelihood[i]
+            )
+
+        with self.assertRaises(ValueError):
+            bfrescox.Likelihood([])
+        with self.assertRaises(TypeError):
+            bfrescox.Likelihood([(self.__angles, self.__xs)])
+        with self.assertRaises(ValueError):
+            likelihood.evaluate([model[1:] for model in self.__models])
+
+        # Simulations on a common grid can be given as 2D arrays
+        models = self.__models[::2]
+        stacked = [(model_grid, np.array([each[k][1] for each in models]))
+                   for k, (model_grid, _) in enumerate(models[0])]
+        result = likelihood.evaluate_stacked(stacked)
+        expected = likelihood.evaluate(models)
+        self.assertTrue(np.allclose(expected.residuals, result.residuals))
+        self.assertTrue(np.allclose(expected.log_likelihood,
+                                    result.log_likelihood))
+        with self.assertRaises(ValueError):
+            likelihood.evaluate_stacked(stacked[1:])
+
+    def testEvaluateFiles(self):
+        def observable(filename):
+            table = np.loadtxt(filename)
+            return [(np.array([20.0, 40.0]), table[0, :2]),
+                    (table[1:, 0], table[1:, 1])]
+
+        likelihood = bfrescox.Likelihood([self.__total, self.__dist])
+        with tempfile.TemporaryDirectory() as tmp:
+            filenames = []
+            for i, model in enumerate(self.__models):
+                fname = Path(tmp).joinpath(f"{i}.out")
+                table = np.column_stack([model[1][0], model[1][1]])
+                table = np.vstack([model[0][1], table])
+                np.savetxt(fname, table)
+                filenames.append(fname)
+            from_files = likelihood.evaluate_files(filenames, observable)
+
+        expected = likelihood.evaluate(self.__models)
+        self.assertTrue(np.allclose(expected.chi_square,
+                                    from_files.chi_square))
+        self.assertTrue(np.allclose(expected.log_likelihood,
+                                    from_files.log_likelihood))
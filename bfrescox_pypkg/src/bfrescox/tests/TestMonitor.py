@@ -0,0 +1,133 @@
+"""
+Automatic unittest of Monitor class
+"""
+
+import unittest
+
+from pathlib import Path
+
+import bfrescox
+
+from .reference import reference_configuration, temporary_folder, change_folder
+
+# Progress pattern that matches every nonblank line of output
+EVERY_LINE = {"line": r"(\S.*)"}
+
+
+class TestMonitor(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        change_folder(self, self.__path)
+        self.__config = reference_configuration()
+
+    def __filename(self, name):
+        path = self.__path.joinpath(name)
+        path.mkdir()
+        return path.joinpath("frescox.out")
+
+    def testBadArguments(self):
+        with self.assertRaises(TypeError):
+            bfrescox.Monitor(callback="not callable")
+        with self.assertRaises(TypeError):
+            bfrescox.Monitor(failures="NaN")
+        with self.assertRaises(ValueError):
+            bfrescox.Monitor(failures=["(unbalanced"])
+        with self.assertRaises(ValueError):
+            bfrescox.Monitor(progress={"line": r"\S"})
+        with self.assertRaises(ValueError):
+            bfrescox.Monitor(max_counts={"unknown": 1})
+        with self.assertRaises(ValueError):
+            bfrescox.Monitor(max_wall_time=0.0)
+        with self.assertRaises(TypeError):
+            bfrescox.create_runner(monitor="not a monitor")
+
+    def testProgress(self):
+        events = []
+        monitor = bfrescox.Monitor(callback=events.append,
+                                   progress=EVERY_LINE)
+
+        fname = self.__filename("plain")
+        fname_monitored = self.__filename("monitored")
+        bfrescox.run_simulation(self.__config, fname)
+        statistics = bfrescox.run_simulation(self.__config, fname_monitored,
+                                             monitor=monitor)
+        self.assertTrue(statistics.wall_time > 0.0)
+
+        # Monitoring does not alter the output
+        with open(fname, "r") as fptr:
+            lines = [each for each in fptr if each.strip()]
+        self.assertEqual(len(lines), len(events))
+        for i, event in enumerate(events):
+            self.assertEqual(fname_monitored, Path(event.filename))
+            self.assertEqual("line", event.name)
+            self.assertEqual(i + 1, event.count)
+            self.assertEqual(lines[i].rstrip("\n"), event.line)
+            self.assertTrue(event.elapsed >= 0.0)
+        self.assertEqual(fname.stat().st_size, fname_monitored.stat().st_size)
+
+    def testCompression(self):
+        events = []
+        monitor = bfrescox.Monitor(callback=events.append,
+                                   progress=EVERY_LINE)
+
+        fname = self.__filename("plain")
+        fname_zip = self.__filename("gzip")
+        bfrescox.run_simulation(self.__config, fname)
+        bfrescox.run_simulation(self.__config, fname_zip,
+                                compression="gzip", monitor=monitor)
+
+        self.assertTrue(len(events) > 0)
+        with bfrescox.open_output(fname) as fptr:
+            expected = fptr.read()
+        with bfrescox.open_output(fname_zip) as fptr:
+            self.assertEqual(expected, fptr.read())
+
+    def testAbort(self):
+        fname_index = self.__path.joinpath("index.sqlite")
+        monitors = {
+            "failure": bfrescox.Monitor(failures=[r"\S"]),
+            "count": bfrescox.Monitor(progress=EVERY_LINE,
+                                      max_counts={"line": 1}),
+            "callback": bfrescox.Monitor(callback=lambda event: True,
+                                         progress=EVERY_LINE),
+            "output": bfrescox.Monitor(max_output=1),
+            "time": bfrescox.Monitor(max_wall_time=1.0e-9)
+        }
+        for name, monitor in monitors.items():
+            fname = self.__filename(name)
+            with self.assertRaises(bfrescox.RunAborted):
+                bfrescox.run_simulation(self.__config, fname,
+                                        index=fname_index, monitor=monitor)
+            # Output written up to the abort is kept
+            self.assertTrue(fname.is_file())
+
+        with bfrescox.RunIndex(fname_index) as index:
+            runs = index.query()
+        self.assertEqual(len(monitors), len(runs))
+        for run in runs:
+            self.assertEqual(bfrescox.RUN_ABORTED, run.status)
+
+    def testBatch(self):
+        N_POINTS = 4
+
+        # Abort every other point
+        def callback(event):
+            return "odd" in event.filename
+
+        monitor = bfrescox.Monitor(callback=callback, progress=EVERY_LINE)
+        configurations = [self.__config] * N_POINTS
+        filenames = [self.__path.joinpath("odd" if i % 2 else "even",
+                                          str(i), "frescox.out")
+                     for i in range(N_POINTS)]
+        results = bfrescox.run_batch(configurations, filenames, n_workers=2,
+                                     monitor=monitor)
+
+        results = sorted(results, key=lambda result: result.point)
+        self.assertEqual(N_POINTS, len(results))
+        for i, result in enumerate(results):
+            if i % 2:
+                self.assertEqual(bfrescox.RUN_ABORTED, result.status)
+                self.assertTrue("callback" in result.error)
+            else:
+                self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+                self.assertIsNone(result.error)
@@ -0,0 +1,59 @@
+"""
+Automatic unittest of open_output() function
+"""
+
+import os
+import gzip
+import shutil
+import unittest
+
+import subprocess as sbp
+
+import bfrescox
+
+from .reference import temporary_folder
+
+
+class TestOpenOutput(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__text = "".join(
+            f" J = {0.5 * i:6.1f}  S-matrix = {1.0e-3 * i:14.6e}\n"
+            for i in range(1000)
+        )
+
+    def testUncompressed(self):
+        fname = self.__path.joinpath("fresco.out")
+        with open(fname, "w") as fptr:
+            fptr.write(self.__text)
+        with bfrescox.open_output(fname) as fptr:
+            self.assertEqual(self.__text, fptr.read())
+
+    def testGzip(self):
+        # Name should not influence how the file is read
+        fname = self.__path.joinpath("fresco.out")
+        with gzip.open(fname, "wt") as fptr:
+            fptr.write(self.__text)
+        with bfrescox.open_output(fname) as fptr:
+            self.assertEqual(self.__text, fptr.read())
+
+    def testZstd(self):
+        exe = shutil.which("zstd", mode=(os.F_OK | os.X_OK))
+        if exe is None:
+            self.skipTest("zstd program not installed")
+
+        fname = self.__path.joinpath("fresco.out.zst")
+        with open(fname, "wb") as fptr:
+            sbp.run([exe, "-c", "-q"], input=self.__text.encode(),
+                    stdout=fptr, check=True)
+        with bfrescox.open_output(fname) as fptr:
+            self.assertEqual(self.__text, fptr.read())
+
+        # Readers can stop early
+        with bfrescox.open_output(fname) as fptr:
+            self.assertEqual(self.__text.split("\n")[0] + "\n",
+                             fptr.readline())
+
+    def testBadFilename(self):
+        with self.assertRaises(ValueError):
+            bfrescox.open_output(self.__path.joinpath("not_a_file.out"))
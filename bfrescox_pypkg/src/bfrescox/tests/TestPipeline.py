@@ -0,0 +1,168 @@
+"""
+Automatic unittest of Pipeline class
+"""
+
+import io
+import time
+import unittest
+import contextlib
+
+from pathlib import Path
+
+import bfrescox
+
+from .reference import reference_configuration, temporary_folder
+
+
+def parse(filename):
+    """
+    Depth of the nuclear potential read from the simulation's inputs, which
+    are written alongside its results
+    """
+    config = bfrescox.Configuration.from_NML(
+        Path(filename).parent.joinpath("frescox.in")
+    )
+    return config["pot[1].p1"]
+
+
+def slow_parse(filename):
+    time.sleep(0.3)
+    return parse(filename)
+
+
+def reduce(depth):
+    return 2.0 * depth
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        N_POINTS = 6
+
+        self.__path = temporary_folder(self)
+
+        self.__configs = []
+        for i in range(N_POINTS):
+            config = reference_configuration()
+            config["pot[1].p1"] = 40.0 + i
+            self.__configs.append(config)
+        self.__fnames = [self.__path.joinpath(f"point_{i}", "frescox.out")
+                         for i in range(N_POINTS)]
+
+    def testPipeline(self):
+        N_POINTS = len(self.__configs)
+
+        with bfrescox.create_pipeline(self.__configs, self.__fnames, parse,
+                                      reduce=reduce, n_workers=3,
+                                      n_parsers=2, queue_size=1) as pipeline:
+            results = sorted(pipeline, key=lambda result: result.point)
+            statistics = pipeline.statistics
+
+        self.assertEqual(N_POINTS, len(results))
+        for i, (result, fname) in enumerate(zip(results, self.__fnames)):
+            self.assertTrue(isinstance(result, bfrescox.PipelineResult))
+            self.assertEqual(i, result.point)
+            self.assertEqual(fname, result.filename)
+            self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+            self.assertIsNone(result.error)
+            self.assertEqual(40.0 + i, result.parsed)
+            # Auxiliary files are kept with each simulation's results
+            self.assertTrue(fname.parent.joinpath("fort.16").is_file())
+            self.assertEqual(2.0 * (40.0 + i), result.value)
+
+        self.assertTrue(statistics.elapsed > 0.0)
+        self.assertEqual([bfrescox.STAGE_LAUNCH, bfrescox.STAGE_PARSE,
+                          bfrescox.STAGE_REDUCE],
+                         [stage.name for stage in statistics.stages])
+        self.assertEqual([3, 2, 1],
+                         [stage.n_workers for stage in statistics.stages])
+        for stage in statistics.stages:
+            self.assertEqual(N_POINTS, stage.n_items)
+            self.assertTrue(stage.busy_time >= 0.0)
+            self.assertTrue(0.0 <= stage.utilization(statistics.elapsed))
+
+        with contextlib.redirect_stdout(io.StringIO()) as fptr:
+            statistics.print_report()
+        self.assertTrue("Bottleneck" in fptr.getvalue())
+
+    def testNoReduction(self):
+        with bfrescox.create_pipeline(iter(self.__configs),
+                                      iter(self.__fnames),
+                                      parse) as pipeline:
+            results = list(pipeline)
+            self.assertEqual(2, len(pipeline.statistics.stages))
+        self.assertEqual(len(self.__configs), len(results))
+        for result in results:
+            self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+            self.assertEqual(40.0 + result.point, result.parsed)
+            self.assertIsNone(result.value)
+
+    def testFailures(self):
+        def failing_parse(filename):
+            if "point_2" in str(filename):
+                raise ValueError("Unreadable")
+            return parse(filename)
+
+        # A simulation that fails does not reach the parse stage
+        self.__fnames[4].parent.mkdir()
+        self.__fnames[4].touch()
+
+        with bfrescox.create_pipeline(self.__configs, self.__fnames,
+                                      failing_parse, reduce=reduce,
+                                      n_workers=2) as pipeline:
+            results = {result.point: result for result in pipeline}
+
+        self.assertEqual(len(self.__configs), len(results))
+        for point, result in results.items():
+            if point in (2, 4):
+                self.assertEqual(bfrescox.RUN_FAILED, result.status)
+                self.assertIsNone(result.parsed)
+                self.assertIsNone(result.value)
+            else:
+                self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+                self.assertEqual(2.0 * (40.0 + point), result.value)
+        self.assertEqual("ValueError: Unreadable", results[2].error)
+
+    def testBottleneck(self):
+        with bfrescox.create_pipeline(self.__configs, self.__fnames,
+                                      slow_parse, reduce=reduce,
+                                      n_workers=3) as pipeline:
+            for _ in pipeline:
+                pass
+        self.assertEqual(bfrescox.STAGE_PARSE,
+                         pipeline.statistics.bottleneck)
+
+    def testEarlyClose(self):
+        # Backpressure from the slow parser stops simulations from running
+        # far ahead of the consumer
+        with bfrescox.create_pipeline(self.__configs, self.__fnames,
+                                      slow_parse, queue_size=1) as pipeline:
+            result = next(iter(pipeline))
+        self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+        self.assertEqual([], list(pipeline))
+        self.assertFalse(self.__fnames[-1].exists())
+
+    def testBadArguments(self):
+        for bad in [None, 1.1]:
+            with self.assertRaises(TypeError):
+                bfrescox.create_pipeline(self.__configs, self.__fnames, bad)
+        with self.assertRaises(TypeError):
+            bfrescox.create_pipeline(self.__configs, self.__fnames, parse,
+                                     reduce=1.1)
+        with self.assertRaises(TypeError):
+            bfrescox.create_pipeline(self.__configs, self.__fnames, parse,
+                                     overwrite=None)
+        for bad in [0, -1, 1.5, None]:
+            with self.assertRaises(ValueError):
+                bfrescox.create_pipeline(self.__configs, self.__fnames,
+                                         parse, n_workers=bad)
+            with self.assertRaises(ValueError):
+                bfrescox.create_pipeline(self.__configs, self.__fnames,
+                                         parse, n_parsers=bad)
+            with self.assertRaises(ValueError):
+                bfrescox.create_pipeline(self.__configs, self.__fnames,
+                                         parse, reduce=reduce,
+                                         n_reducers=bad)
+        for bad in [0, -1, 1.5]:
+            with self.assertRaises(ValueError):
+                bfrescox.create_pipeline(self.__configs, self.__fnames,
+                                         parse, queue_size=bad)
@@ -0,0 +1,139 @@
+"""
+Automatic unittest of reuse_intermediates() function
+"""
+
+import io
+import unittest
+import contextlib
+
+from pathlib import Path
+
+import bfrescox
+
+from .reference import reference_configuration, temporary_folder
+
+# Frescox writes angular distributions to this unit in its working directory
+UNIT = 16
+
+
+def observable(filename):
+    """
+    Depth of the nuclear potential read from the simulation's inputs, which
+    are written alongside its results
+    """
+    config = bfrescox.Configuration.from_NML(
+        Path(filename).parent.joinpath("frescox.in")
+    )
+    return config["pot[1].p1"]
+
+
+class TestReuseIntermediates(unittest.TestCase):
+    def setUp(self):
+        N_POINTS = 5
+
+        self.__path = temporary_folder(self)
+
+        self.__configs = []
+        for i in range(N_POINTS):
+            config = reference_configuration()
+            config["pot[1].p1"] = 40.0 + i
+            self.__configs.append(config)
+        self.__fnames = [self.__path.joinpath(f"point_{i}", "frescox.out")
+                         for i in range(N_POINTS)]
+
+    def testSharedGroups(self):
+        groups = bfrescox.shared_groups(self.__configs)
+        self.assertTrue("pot[1]" not in groups)
+        for name in ["fresco", "partition[0]", "states", "pot[0]"]:
+            self.assertTrue(name in groups)
+        self.assertEqual([], bfrescox.shared_groups([]))
+
+    def testReuse(self):
+        shared = bfrescox.SharedFile(UNIT, ["states", "pot[0]"], {}, {})
+        self.assertEqual(f"fort.{UNIT}", shared.filename)
+
+        report = bfrescox.reuse_intermediates(self.__configs, self.__fnames,
+                                              [shared], observable,
+                                              n_workers=2)
+
+        N_POINTS = len(self.__configs)
+        self.assertEqual(N_POINTS, len(report.results))
+        for i, (result, fname) in enumerate(zip(report.results,
+                                                self.__fnames)):
+            self.assertEqual(i, result.point)
+            self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+            self.assertEqual(fname, result.filename)
+            # Each simulation ran in its own folder
+            self.assertTrue(fname.parent.joinpath(shared.filename).is_file())
+            self.assertEqual(40.0 + i, observable(fname))
+        self.assertEqual(1, report.n_producers)
+        self.assertEqual(N_POINTS - 1, report.n_consumers)
+        self.assertEqual([1], report.checked)
+        self.assertEqual(0.0, report.max_difference)
+        self.assertTrue(self.__fnames[1].parent.joinpath(
+            bfrescox.CHECK_FOLDER, "frescox.out"
+        ).is_file())
+        self.assertTrue(report.full_time > 0.0)
+        self.assertTrue(report.reuse_time > 0.0)
+
+        with contextlib.redirect_stdout(io.StringIO()) as fptr:
+            report.print_report()
+        self.assertTrue("Estimated time saved" in fptr.getvalue())
+
+    def testNoSharing(self):
+        shared = bfrescox.SharedFile(UNIT, ["pot[1]"], {}, {})
+        report = bfrescox.reuse_intermediates(self.__configs, self.__fnames,
+                                              [shared], n_checks=0)
+        self.assertEqual(0, report.n_producers)
+        self.assertEqual(0, report.n_consumers)
+        self.assertEqual([], report.checked)
+        self.assertIsNone(report.time_saved)
+        for result in report.results:
+            self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+
+    def testFailedCheck(self):
+        def differs(filename):
+            return float(bfrescox.CHECK_FOLDER in str(filename))
+
+        shared = bfrescox.SharedFile(UNIT, ["states"], {}, {})
+        with self.assertRaises(RuntimeError):
+            bfrescox.reuse_intermediates(self.__configs, self.__fnames,
+                                         [shared], differs)
+        # Only the producer and the check ran
+        self.assertFalse(self.__fnames[-1].exists())
+
+    def testMissingFile(self):
+        shared = bfrescox.SharedFile(97, ["states"], {}, {})
+        with self.assertRaises(RuntimeError):
+            bfrescox.reuse_intermediates(self.__configs, self.__fnames,
+                                         [shared], observable)
+
+    def testBadArguments(self):
+        shared = bfrescox.SharedFile(UNIT, ["states"], {}, {})
+        with self.assertRaises(TypeError):
+            bfrescox.reuse_intermediates(self.__configs, self.__fnames,
+                                         [None], observable)
+        with self.assertRaises(TypeError):
+            bfrescox.reuse_intermediates(self.__configs, self.__fnames,
+                                         [shared])
+        with self.assertRaises(ValueError):
+            bfrescox.reuse_intermediates(self.__configs, self.__fnames[:-1],
+                                         [shared], observable)
+        with self.assertRaises(ValueError):
+            bfrescox.reuse_intermediates(self.__configs, self.__fnames,
+                                         [shared, shared], observable)
+        with self.assertRaises(ValueError):
+            bfrescox.reuse_intermediates(
+                self.__configs, self.__fnames,
+                [bfrescox.SharedFile(UNIT, ["pot[9]"], {}, {})], observable
+            )
+        with self.assertRaises(ValueError):
+            bfrescox.reuse_intermediates(
+                self.__configs, self.__fnames,
+                [bfrescox.SharedFile(UNIT, ["states"],
+                                     {"overlap[3].nfl": 1}, {})],
+                observable
+            )
+        with self.assertRaises(ValueError):
+            bfrescox.reuse_intermediates(self.__configs, self.__fnames,
+                                         [shared], observable, n_checks=-1)
@@ -0,0 +1,73 @@
+"""
+Automatic unittest of RunIndex class
+"""
+
+import unittest
+
+import bfrescox
+
+from .reference import reference_configuration, temporary_folder
+
+
+class TestRunIndex(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__config = reference_configuration()
+
+    def testRecordAndQuery(self):
+        fname = self.__path.joinpath("runs.sqlite")
+        with bfrescox.RunIndex(fname) as index:
+            self.assertEqual(0, len(index))
+            for i, V0 in enumerate([40.0, 45.0, 50.0, 55.0]):
+                self.__config["pot[1].p1"] = V0
+                status = bfrescox.RUN_FAILED if i == 3 \
+                    else bfrescox.RUN_SUCCEEDED
+                index.record(self.__config, self.__path.joinpath(f"{i}.out"),
+                             started=1.0e9 + i, wall_time=2.0,
+                             status=status)
+            self.assertEqual(4, len(index))
+
+            # Replace existing run
+            index.record(self.__config, self.__path.joinpath("3.out"))
+            self.assertEqual(4, len(index))
+
+        # Index is persistent
+        with bfrescox.RunIndex(fname) as index:
+            runs = index.query({"partition.namep": "p",
+                                "pot[1].p1": (42.0, 52.0)})
+            self.assertEqual([45.0, 50.0],
+                             [run.configuration()["pot[1].p1"]
+                              for run in runs])
+            self.assertEqual(str(self.__path.joinpath("1.out")),
+                             runs[0].output)
+            self.assertEqual(2.0, runs[0].wall_time)
+
+            runs = index.query({"fresco.hcm": 0.1, "pot[1].p1": (50.0, None)},
+                               status=bfrescox.RUN_SUCCEEDED)
+            self.assertEqual(2, len(runs))
+            self.assertEqual([], index.query({"partition.namep": "alpha"}))
+            self.assertEqual(4, len(index.query()))
+
+    def testBackfill(self):
+        for i in range(3):
+            folder = self.__path.joinpath(f"run_{i}")
+            folder.mkdir()
+            self.__config["fresco.elab(1)"] = 10.0 * (i + 1)
+            self.__config.write_to_nml(folder.joinpath("frescox.in"))
+            with open(folder.joinpath("results.out"), "w") as fptr:
+                fptr.write("Results\n")
+        # Folder without an input file is ignored
+        self.__path.joinpath("other").mkdir()
+        with open(self.__path.joinpath("other", "results.out"), "w") as fptr:
+            fptr.write("Results\n")
+
+        with bfrescox.RunIndex(self.__path.joinpath("runs.sqlite")) as index:
+            self.assertEqual(3, index.backfill(self.__path))
+            # Runs already in the index are skipped
+            self.assertEqual(0, index.backfill(self.__path))
+
+            runs = index.query({"fresco.elab(1)": (15.0, 35.0)})
+            self.assertEqual(2, len(runs))
+            for run in runs:
+                self.assertEqual(bfrescox.RUN_UNKNOWN, run.status)
+                self.assertIsNone(run.fingerprint)
@@ -0,0 +1,139 @@
+"""
+Automatic unittest of Scheduler and CostModel classes
+"""
+
+import time
+import unittest
+import threading
+
+import numpy as np
+
+import bfrescox
+
+from .reference import reference_configuration, temporary_folder
+
+
+GiB = 1024**3
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__config = reference_configuration()
+
+    def __configuration(self, hcm, rmatch, jtmax):
+        config = reference_configuration()
+        config["fresco.hcm"] = hcm
+        config["fresco.rmatch"] = rmatch
+        config["fresco.jtmax"] = jtmax
+        return config
+
+    def testCostModel(self):
+        def cost(hcm, rmatch, jtmax):
+            n_radial = rmatch / hcm
+            return (1.0e5 * n_radial * np.sqrt(jtmax + 1.0),
+                    1.0e-4 * n_radial * (jtmax + 1.0)**2)
+
+        model = bfrescox.CostModel()
+        config = self.__configuration(0.1, 20.0, 39.0)
+        # Prior predicts run time but not memory
+        memory, wall_time = model.predict(config)
+        self.assertTrue(memory > 0.0)
+        self.assertTrue(wall_time > 0.0)
+
+        # Fit only scale until there are enough runs
+        model.observe(config, *cost(0.1, 20.0, 39.0))
+        self.assertEqual(1, len(model))
+        self.assertTrue(np.allclose(cost(0.1, 20.0, 39.0),
+                                    model.predict(config)))
+
+        rng = np.random.default_rng(12345)
+        for _ in range(10):
+            settings = (rng.uniform(0.01, 0.1), rng.uniform(10.0, 100.0),
+                        rng.uniform(5.0, 100.0))
+            model.observe(self.__configuration(*settings), *cost(*settings))
+        self.assertEqual(11, len(model))
+
+        settings = (0.05, 40.0, 20.0)
+        self.assertTrue(np.allclose(
+            cost(*settings), model.predict(self.__configuration(*settings))
+        ))
+
+    def testFromIndex(self):
+        fname = self.__path.joinpath("index.sqlite")
+        with bfrescox.RunIndex(fname) as index:
+            index.record(self.__config, self.__path.joinpath("0.out"),
+                         wall_time=2.0, peak_memory=GiB // 2)
+            index.record(self.__config, self.__path.joinpath("1.out"),
+                         wall_time=2.0)
+            self.assertEqual(GiB // 2, index.query()[0].peak_memory)
+            self.assertIsNone(index.query()[1].peak_memory)
+
+        model = bfrescox.CostModel.from_index(fname)
+        self.assertEqual(1, len(model))
+        self.assertTrue(np.allclose([GiB // 2, 2.0],
+                                    model.predict(self.__config)))
+
+    def testPacking(self):
+        N_JOBS = 8
+        # Only three simulations fit in memory with the prior prediction
+        scheduler = bfrescox.Scheduler(memory=3 * GiB, margin=1.0)
+        lock = threading.Lock()
+        started = []
+        running = [0, 0]
+
+        def run(config, _):
+            with lock:
+                started.append(config["fresco.jtmax"])
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return bfrescox.RunStatistics(0.05, GiB)
+
+        configurations = [self.__configuration(0.1, 20.0, 10.0 * (i + 1))
+                          for i in range(N_JOBS)]
+        filenames = [self.__path.joinpath(f"{i}", "frescox.out")
+                     for i in range(N_JOBS)]
+        # Which simulation starts first is only certain with a single worker
+        first = bfrescox.Scheduler(memory=3 * GiB, margin=1.0)
+        list(first.execute(run, configurations, filenames, n_workers=1))
+        # Longest simulations first
+        self.assertEqual(10.0 * N_JOBS, started[0])
+        self.assertEqual(1, running[1])
+
+        running[1] = 0
+        results = list(scheduler.execute(run, configurations, filenames,
+                                         n_workers=N_JOBS))
+
+        self.assertEqual(list(range(N_JOBS)),
+                         sorted(each.point for each in results))
+        for result in results:
+            self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+            self.assertEqual(GiB, result.peak_memory)
+        self.assertEqual(3, running[1])
+        self.assertEqual(N_JOBS, len(scheduler.model))
+
+    def testRunBatch(self):
+        N_JOBS = 3
+        fname = self.__path.joinpath("index.sqlite")
+        scheduler = bfrescox.Scheduler(memory=4 * GiB)
+        self.assertEqual(4 * GiB, scheduler.memory)
+        self.assertEqual(4 * GiB,
+                         scheduler.limits[bfrescox.LIMIT_ADDRESS_SPACE])
+
+        configurations = [self.__configuration(0.1, 20.0 + i, 40.0)
+                          for i in range(N_JOBS)]
+        filenames = [self.__path.joinpath(f"{i}", "frescox.out")
+                     for i in range(N_JOBS)]
+        results = list(bfrescox.run_batch(configurations, filenames,
+                                          n_workers=2, index=fname,
+                                          scheduler=scheduler))
+        for result in results:
+            self.assertEqual(bfrescox.RUN_SUCCEEDED, result.status)
+            self.assertTrue(result.peak_memory > 0)
+        self.assertEqual(N_JOBS, len(scheduler.model))
+
+        model = bfrescox.CostModel.from_index(fname)
+        self.assertEqual(N_JOBS, len(model))
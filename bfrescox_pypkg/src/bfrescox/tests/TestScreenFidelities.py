@@ -0,0 +1,153 @@
+"""
+Automatic unittest of screen_fidelities() function
+"""
+
+import io
+import unittest
+import contextlib
+
+import numpy as np
+
+from pathlib import Path
+
+import bfrescox
+
+from .reference import (REFERENCE_INPUT, reference_configuration,
+                        temporary_folder)
+
+THRESHOLD = -2.0
+
+
+def coarse(config):
+    config["fresco.hcm"] = 0.2
+    return config
+
+
+def score(filename):
+    """
+    Score computed from the simulation's inputs, which are written alongside
+    its results.  The coarse step scores every point lower by one.
+    """
+    config = bfrescox.Configuration.from_NML(
+        Path(filename).parent.joinpath("frescox.in")
+    )
+    return -abs(config["pot[1].p1"] - 45.0) \
+        - 10.0 * (config["fresco.hcm"] - 0.1)
+
+
+class TestScreenFidelities(unittest.TestCase):
+    def setUp(self):
+        N_POINTS = 10
+
+        self.__path = temporary_folder(self)
+
+        self.__depths = 40.0 + np.arange(N_POINTS)
+        self.__configs = []
+        for depth in self.__depths:
+            config = reference_configuration()
+            config["pot[1].p1"] = float(depth)
+            self.__configs.append(config)
+        self.__expected = np.abs(self.__depths - 45.0) <= -THRESHOLD
+
+    def testScreening(self):
+        result = bfrescox.screen_fidelities(self.__configs, coarse, score,
+                                            THRESHOLD, self.__path,
+                                            n_calibration=3, n_workers=2)
+
+        # The full-fidelity configurations are not changed
+        for config in self.__configs:
+            self.assertEqual(0.1, config["fresco.hcm"])
+
+        N_POINTS = len(self.__configs)
+        self.assertTrue(isinstance(result, bfrescox.ScreeningResult))
+        self.assertTrue(np.allclose(-np.abs(self.__depths - 45.0) - 1.0,
+                                    result.low_scores))
+        self.assertEqual(3, len(result.calibration))
+        self.assertTrue(np.allclose(1.0, result.discrepancies))
+        self.assertAlmostEqual(1.0, result.margin)
+        self.assertEqual(THRESHOLD, result.threshold)
+
+        # With the calibrated margin, no good point is rejected
+        self.assertTrue(np.array_equal(self.__expected, result.accepted))
+        escalated = self.__expected.copy()
+        escalated[result.calibration] = True
+        self.assertTrue(np.array_equal(escalated, result.escalated))
+        self.assertTrue(np.all(np.isnan(result.high_scores[~escalated])))
+        self.assertTrue(np.allclose(-np.abs(self.__depths - 45.0)[escalated],
+                                    result.high_scores[escalated]))
+        self.assertTrue(np.sum(escalated) < N_POINTS)
+
+        for i in range(N_POINTS):
+            folder = f"point_{i:06d}"
+            self.assertTrue(self.__path.joinpath(
+                bfrescox.LOW_FIDELITY_FOLDER, folder, "frescox.out"
+            ).is_file())
+            self.assertEqual(escalated[i], self.__path.joinpath(
+                bfrescox.HIGH_FIDELITY_FOLDER, folder, "frescox.out"
+            ).is_file())
+
+        self.assertTrue(result.low_time > 0.0)
+        self.assertTrue(result.high_time > 0.0)
+        self.assertIsNotNone(result.time_saved)
+
+        with contextlib.redirect_stdout(io.StringIO()) as fptr:
+            result.print_report()
+        self.assertTrue("Estimated time saved" in fptr.getvalue())
+
+    def testMargin(self):
+        # Without calibration, low fidelity rejects good points
+        result = bfrescox.screen_fidelities(self.__configs, coarse, score,
+                                            THRESHOLD, self.__path,
+                                            n_calibration=0)
+        self.assertEqual(0, len(result.calibration))
+        self.assertEqual(0.0, result.margin)
+        self.assertTrue(np.sum(result.accepted) < np.sum(self.__expected))
+        self.assertFalse(np.any(result.accepted & ~self.__expected))
+
+    def testFailedLowFidelity(self):
+        # Points whose low-fidelity simulation fails are always escalated
+        fname = self.__path.joinpath(bfrescox.LOW_FIDELITY_FOLDER,
+                                     "point_000000", "frescox.out")
+        fname.parent.mkdir(parents=True)
+        fname.touch()
+
+        result = bfrescox.screen_fidelities(self.__configs, coarse, score,
+                                            THRESHOLD, self.__path,
+                                            n_calibration=0, margin=1.0)
+        self.assertTrue(np.isnan(result.low_scores[0]))
+        self.assertTrue(result.escalated[0])
+        self.assertEqual(-5.0, result.high_scores[0])
+        self.assertFalse(result.accepted[0])
+        self.assertTrue(np.array_equal(self.__expected, result.accepted))
+
+    def testBadArguments(self):
+        def args(**kwargs):
+            values = {"configurations": self.__configs,
+                      "low_fidelity": coarse,
+                      "score": score,
+                      "threshold": THRESHOLD,
+                      "path": self.__path}
+            values.update(kwargs)
+            return values
+
+        for bad in [[None], [REFERENCE_INPUT]]:
+            with self.assertRaises(TypeError):
+                bfrescox.screen_fidelities(**args(configurations=bad))
+        for name in ["low_fidelity", "score"]:
+            with self.assertRaises(TypeError):
+                bfrescox.screen_fidelities(**args(**{name: None}))
+        with self.assertRaises(TypeError):
+            bfrescox.screen_fidelities(**args(low_fidelity=lambda _: None))
+        for bad in [None, "1.0", True]:
+            with self.assertRaises(TypeError):
+                bfrescox.screen_fidelities(**args(threshold=bad))
+        with self.assertRaises(ValueError):
+            bfrescox.screen_fidelities(**args(configurations=[]))
+        for bad in [-1, 1.5, None]:
+            with self.assertRaises(ValueError):
+                bfrescox.screen_fidelities(**args(n_calibration=bad))
+        for bad in [-1.0, "1.0"]:
+            with self.assertRaises(ValueError):
+                bfrescox.screen_fidelities(**args(margin=bad))
+        # Nothing was run
+        self.assertEqual([], list(self.__path.iterdir()))
@@ -0,0 +1,92 @@
+"""
+Automatic unittest of stage_installation() function
+"""
+
+import os
+import filecmp
+import unittest
+
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+import bfrescox
+
+from .reference import reference_configuration, temporary_folder, change_folder
+
+
+class TestStageInstallation(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        change_folder(self, self.__path)
+        self.__config = reference_configuration()
+        self.__info = bfrescox.information()
+
+    def testStage(self):
+        N_STAGERS = 8
+
+        local = self.__path.joinpath("local")
+        staged = bfrescox.stage_installation(self.__info, local)
+
+        frescox_exe = staged[bfrescox.FRESCOX_EXE]
+        self.assertTrue(frescox_exe.is_file())
+        self.assertTrue(frescox_exe.is_relative_to(local.resolve()))
+        self.assertTrue(os.access(frescox_exe, os.X_OK))
+        self.assertTrue(filecmp.cmp(self.__info[bfrescox.FRESCOX_EXE],
+                                    frescox_exe, shallow=False))
+        self.assertTrue(staged[bfrescox.FRESCOX_LIBRARY_PATH].is_dir())
+        for key, value in self.__info.items():
+            if key != bfrescox.FRESCOX_EXE:
+                self.assertEqual(value, staged[key])
+
+        # Staged once and reused by all
+        self.assertEqual(staged,
+                         bfrescox.stage_installation(self.__info, local))
+
+        # Concurrent stagers all use the same complete copy
+        racing = self.__path.joinpath("racing")
+        with ThreadPoolExecutor(max_workers=N_STAGERS) as pool:
+            results = list(pool.map(
+                lambda _: bfrescox.stage_installation(self.__info, racing),
+                range(N_STAGERS)
+            ))
+        for result in results:
+            self.assertEqual(results[0], result)
+        self.assertEqual(1, len(list(racing.iterdir())))
+
+        # The original is not staged again
+        self.assertEqual({}, bfrescox.stage_installation({}, local))
+
+    def testEnvironment(self):
+        local = self.__path.joinpath("local")
+        with mock.patch.dict(os.environ,
+                             {bfrescox.STAGE_PATH_ENV: str(local)}):
+            info = bfrescox.information()
+            self.assertEqual(bfrescox.stage_installation(self.__info, local),
+                             info)
+
+            fname = self.__path.joinpath("frescox.out")
+            statistics = bfrescox.run_simulation(self.__config, fname)
+            self.assertTrue(statistics.wall_time > 0.0)
+            self.assertTrue(fname.stat().st_size > 0)
+
+            with bfrescox.create_runner() as runner:
+                self.assertTrue(str(info[bfrescox.FRESCOX_EXE])
+                                in runner.command[-1])
+
+    def testCorrupt(self):
+        local = self.__path.joinpath("local")
+        staged = bfrescox.stage_installation(self.__info, local)
+        with open(staged[bfrescox.FRESCOX_EXE], "ab") as fptr:
+            fptr.write(b"corrupt")
+
+        with self.assertRaises(RuntimeError):
+            bfrescox.stage_installation(self.__info, local)
+
+    def testBadArguments(self):
+        with self.assertRaises(TypeError):
+            bfrescox.stage_installation(None, self.__path)
+        with self.assertRaises(TypeError):
+            bfrescox.stage_installation(
+                {bfrescox.FRESCOX_EXE: self.__path.joinpath("missing")},
+                self.__path
+            )
@@ -0,0 +1,160 @@
+"""
+Automatic unittest of WorkQueue class and run_worker() function
+"""
+
+import io
+import os
+import sys
+import filecmp
+import unittest
+import contextlib
+import multiprocessing
+
+import bfrescox
+import bfrescox.worker
+
+from .reference import reference_configuration, temporary_folder
+
+N_TASKS = 20
+N_WORKERS = 4
+# Potential depths whose inputs all have different lengths
+DEPTHS = [5.0, 45.0, 145.0, 1045.0]
+
+
+def fake_run(configuration, filename, overwrite=False):
+    """
+    Stand-in for run_simulation that does not require Frescox.
+    """
+    V0 = configuration["pot[1].p1"]
+    if V0 < 0.0:
+        raise ValueError("Unphysical potential")
+    mode = "w" if overwrite else "x"
+    with open(filename, mode) as fptr:
+        fptr.write(f"{V0}\n")
+
+
+def start_worker(path):
+    bfrescox.run_worker(path, fake_run, heartbeat=0.1, timeout=1.0, poll=0.05)
+
+
+def start_worker_program(path, folder):
+    """
+    Run the worker program as if started from the given folder.
+    """
+    os.chdir(folder)
+    sys.argv = ["bfrescox-worker", str(path), "--heartbeat", "0.1",
+                "--poll", "0.05"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        sys.exit(bfrescox.worker.main())
+
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self).joinpath("queue")
+        self.__config = reference_configuration()
+
+    def testSeveralWorkers(self):
+        queue = bfrescox.WorkQueue(self.__path)
+        expected = {}
+        for i in range(N_TASKS):
+            self.__config["pot[1].p1"] = 40.0 + i
+            expected[queue.submit(self.__config)] = 40.0 + i
+        # This one fails
+        self.__config["pot[1].p1"] = -1.0
+        failed = queue.submit(self.__config, task_id="unphysical")
+        self.assertEqual(N_TASKS + 1, queue.counts()["pending"])
+
+        workers = [multiprocessing.Process(target=start_worker,
+                                           args=(self.__path,))
+                   for _ in range(N_WORKERS)]
+        for each in workers:
+            each.start()
+        for each in workers:
+            each.join(60.0)
+            self.assertEqual(0, each.exitcode)
+
+        counts = queue.counts()
+        self.assertEqual(0, counts["pending"])
+        self.assertEqual(0, counts["claimed"])
+        self.assertEqual(N_TASKS, counts["done"])
+        self.assertEqual(1, counts["failed"])
+        self.assertEqual("failed", queue.state(failed))
+
+        # Each task run exactly once and in its own folder
+        results = queue.results()
+        self.assertEqual(sorted(expected), [each["task_id"]
+                                            for each in results])
+        for record in results:
+            with open(record["filename"], "r") as fptr:
+                V0 = float(fptr.read())
+            self.assertEqual(expected[record["task_id"]], V0)
+            self.assertEqual(1, record["attempts"])
+
+    def testWorkerProgram(self):
+        # Workers started in the same folder must not overwrite each other's
+        # Frescox auxiliary files
+        shared = self.__path.parent.joinpath("shared")
+        shared.mkdir()
+        queue = bfrescox.WorkQueue(self.__path)
+        configs = {}
+        for V0 in DEPTHS:
+            config = reference_configuration()
+            config["pot[1].p1"] = V0
+            configs[queue.submit(config)] = config
+
+        workers = [multiprocessing.Process(target=start_worker_program,
+                                           args=(self.__path, shared))
+                   for _ in range(2)]
+        for each in workers:
+            each.start()
+        for each in workers:
+            each.join(60.0)
+            self.assertEqual(0, each.exitcode)
+        self.assertEqual(len(DEPTHS), queue.counts()["done"])
+        self.assertFalse(shared.joinpath("fort.16").exists())
+
+        # Each task's auxiliary files are those of its simulation run alone
+        alone = self.__path.parent.joinpath("alone")
+        for record in queue.results():
+            task_id = record["task_id"]
+            fname = alone.joinpath(task_id, "frescox.out")
+            fname.parent.mkdir(parents=True)
+            bfrescox.run_simulation(configs[task_id], fname, isolated=True)
+            folder = os.path.dirname(record["filename"])
+            self.assertTrue(filecmp.cmp(
+                fname.parent.joinpath("fort.16"),
+                os.path.join(folder, "fort.16"), shallow=False
+            ))
+
+    def testReclaim(self):
+        queue = bfrescox.WorkQueue(self.__path)
+        task_id = queue.submit(self.__config)
+
+        # Worker claims the task and then dies
+        now = queue.heartbeat("dead-worker")
+        task = queue.claim("dead-worker")
+        self.assertEqual(task_id, task.task_id)
+        self.assertEqual("claimed", queue.state(task_id))
+        self.assertIsNone(queue.claim("live-worker"))
+
+        # Not dead yet
+        self.assertEqual(0, queue.reclaim(10.0))
+        heartbeat = self.__path.joinpath("workers", "dead-worker")
+        os.utime(heartbeat, (now - 60.0, now - 60.0))
+        self.assertEqual(1, queue.reclaim(10.0))
+        self.assertEqual("pending", queue.state(task_id))
+
+        task = queue.claim("live-worker")
+        self.assertEqual(2, task.attempts)
+        self.assertEqual(self.__config, task.configuration)
+
+    def testMaxAttempts(self):
+        queue = bfrescox.WorkQueue(self.__path)
+        task_id = queue.submit(self.__config)
+        queue.heartbeat("worker")
+        self.assertIsNotNone(queue.claim("worker", max_attempts=1))
+        heartbeat = self.__path.joinpath("workers", "worker")
+        os.utime(heartbeat, (0.0, 0.0))
+        self.assertEqual(1, queue.reclaim(10.0))
+        self.assertIsNone(queue.claim("worker", max_attempts=1))
+        self.assertEqual("failed", queue.state(task_id))
@@ -0,0 +1,59 @@
+"""
+Reference Frescox input and scaffolding shared by the test suites
+"""
+
+import os
+import tempfile
+
+from pathlib import Path
+
+import bfrescox
+
+# Input file of the p+Ni78 elastic scattering simulation that test suites run
+# unless they need a particular input
+REFERENCE_INPUT = """p+Ni78 reference
+NAMELIST
+ &FRESCO hcm=0.1 rmatch=60.0 jtmax=60.0 thmin=0.0 thmax=180.0 thinc=5.0
+    elab(1)=30.0 /
+ &PARTITION namep='p' massp=1 zp=1 namet='Ni78' masst=78 zt=28 nex=1 /
+ &STATES jp=0.5 bandp=1 ep=0.0 cpot=1 jt=0.0 bandt=1 et=0.0 /
+ &partition /
+ &POT kp=1 ap=1 at=78 rc=1.2 /
+ &POT kp=1 type=1 p1=45.0 p2=1.2 p3=0.65 p4=10.0 p5=1.2 p6=0.65 /
+ &pot /
+ &overlap /
+ &coupling /
+"""
+
+
+def reference_configuration():
+    """
+    :return: :py:class:`Configuration` of the reference input
+    """
+    return bfrescox.Configuration.from_NML_string(REFERENCE_INPUT)
+
+
+def temporary_folder(test):
+    """
+    Create a temporary folder that is removed once the given test completes.
+
+    :param test: ``unittest.TestCase`` instance whose test uses the folder
+    :return: Path to the folder
+    """
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    return Path(tmp.name)
+
+
+def change_folder(test, folder):
+    """
+    Run the given test from the given folder so that simulations that run in
+    the working directory do not leave their auxiliary files behind.
+
+    :param test: ``unittest.TestCase`` instance whose test runs simulations
+    :param folder: Path to folder that is the working directory until the
+        test completes
+    """
+    cwd = os.getcwd()
+    os.chdir(folder)
+    test.addCleanup(os.chdir, cwd)
@@ -34,32 +34,91 @@ FRESCOX_FLAG_DEFAULTS = [
     ("use_mpi", "auto"),
     ("use_openmp", "auto"),
     ("use_lapack", "disabled"),
-    ("use_corex", "false")
+    ("use_corex", "false"),
+    ("profiling", "none")
 ]
 
+
 # ------ ALLOW USERS TO OVERRIDE FRESCOX BUILD STRATEGY
 # For Meson options of type "feature", allowed values are
 # * disabled - build will not include the feature
 # * enabled  - build requires the feature and its dependencies
 # * auto     - include feature in build if it and its dependencies are found
-FRESCOX_FLAGS = []
-for flag, default in FRESCOX_FLAG_DEFAULTS:
-    # We declare the options in Meson with acceptable values.  No need to error
-    # check env var values here.
-    name = "BFRESCOX_{}".format(flag.upper())
-    value = default if name not in os.environ else os.environ[name]
-    FRESCOX_FLAGS += ["-D{}={}".format(flag.lower(), value)]
+#
+# Allowed values of BFRESCOX_PROFILING are
+# * none           - build without profiling support
+# * gprof          - instrument build for profiling with gprof
+# * frame_pointers - keep frame pointers and debug symbols for sampling
+#                    profilers such as perf
+def frescox_flags(overrides=None):
+    """
+    :param overrides: ``dict`` that maps the names of flags to the values
+        that replace those of the default build; ``None`` for no overrides
+    :return: Meson flags of the default build with the given overrides
+    """
+    flags = []
+    for flag, default in FRESCOX_FLAG_DEFAULTS:
+        # We declare the options in Meson with acceptable values.  No need to
+        # error check env var values here.
+        name = "BFRESCOX_{}".format(flag.upper())
+        value = default if name not in os.environ else os.environ[name]
+        if overrides is not None:
+            value = overrides.get(flag, value)
+        flags += ["-D{}={}".format(flag.lower(), value)]
+    return flags
+
+
+FRESCOX_FLAGS = frescox_flags()
+
+# ------ ALLOW USERS TO BUILD VARIANTS ALONGSIDE THE DEFAULT BUILD
+# BFRESCOX_VARIANTS is a comma-separated list of the names of the variants to
+# build (e.g., "serial,openmp,mpi").  Each variant requires its MPI, OpenMP, and
+# profiling settings and uses the other flags of the default build.  Each is
+# installed in its own folder with its own build information so that the
+# package can select a variant for each simulation.  The profile variant is a
+# serial build instrumented for gprof that is used by profile_simulation().
+VARIANT_FLAGS = {
+    "serial": {"use_mpi": "disabled", "use_openmp": "disabled"},
+    "openmp": {"use_mpi": "disabled", "use_openmp": "enabled"},
+    "mpi": {"use_mpi": "enabled", "use_openmp": "disabled"},
+    "profile": {"use_mpi": "disabled", "use_openmp": "disabled",
+                "profiling": "gprof"}
+}
+VARIANTS_PATH = PY_SRC_PATH.joinpath("variants")
+
+FRESCOX_VARIANTS = []
+if os.environ.get("BFRESCOX_VARIANTS", "").strip() != "":
+    for name in os.environ["BFRESCOX_VARIANTS"].split(","):
+        name = name.strip().lower()
+        if name not in VARIANT_FLAGS:
+            print()
+            print(f"Unknown Frescox variant {name} in BFRESCOX_VARIANTS")
+            print("Valid variants are " + ", ".join(VARIANT_FLAGS))
+            print()
+            sys.exit(1)
+        elif name not in FRESCOX_VARIANTS:
+            FRESCOX_VARIANTS.append(name)
+
 
 # Package metadata
 PYTHON_REQUIRES = ">=3.9"
-CODE_REQUIRES = []
+CODE_REQUIRES = ["numpy"]
 TEST_REQUIRES = []
 INSTALL_REQUIRES = CODE_REQUIRES + TEST_REQUIRES
 
 PACKAGE_DATA = {
     "bfrescoxpro":
         [f"bin/{exe}" for exe in EXE_NAMES] +
-        ["build/build_info.csv"]
+        ["build/build_info.csv"] +
+        [f"variants/*/bin/{exe}" for exe in EXE_NAMES] +
+        ["variants/*/build/build_info.csv"]
+}
+
+ENTRY_POINTS = {
+    "console_scripts": [
+        "bfrescoxpro = bfrescoxpro.cli:main",
+        "bfrescoxpro-worker = bfrescoxpro.worker:main"
+    ]
 }
 
 PROJECT_URLS = {
@@ -122,6 +181,34 @@ class build_frescox(Command):
                 print(msg.format(err.returncode))
                 print("[meson build] " + " ".join(err.cmd))
                 sys.exit(2)
+
+        # Variants of previous builds must not be packaged with this build.
+        # Since the default build is available, a variant whose dependencies
+        # cannot be found is skipped and the package falls back to the
+        # variants that were built.
+        shutil.rmtree(VARIANTS_PATH, ignore_errors=True)
+        for name in FRESCOX_VARIANTS:
+            builddir = f"builddir_{name}"
+            prefix = VARIANTS_PATH.joinpath(name)
+            VARIANT_CMDS = [
+                ["meson", "setup", "--wipe", "--clearcache",
+                 "--buildtype=release", builddir, f"-Dprefix={prefix}",
+                 "--warnlevel", "0"] + frescox_flags(VARIANT_FLAGS[name]),
+                ["meson", "compile", "-v", "-j", "1", "-C", builddir],
+                ["meson", "install", "--quiet", "-C", builddir]
+            ]
+            for cmd in VARIANT_CMDS:
+                try:
+                    sbp.run(cmd,
+                            stdin=sbp.DEVNULL, capture_output=False,
+                            check=True)
+                except sbp.CalledProcessError as err:
+                    print()
+                    msg = "[meson build] Skipping {} variant (Return code {})"
+                    print(msg.format(name, err.returncode))
+                    print("[meson build] " + " ".join(err.cmd))
+                    shutil.rmtree(prefix, ignore_errors=True)
+                    break
         os.chdir(cwd)
 
 
@@ -155,6 +242,7 @@ setup(
     cmdclass=cmdclass,
     python_requires=PYTHON_REQUIRES,
     install_requires=INSTALL_REQUIRES,
+    entry_points=ENTRY_POINTS,
     classifiers=[
         "Natural Language :: English",
         "Development Status :: 3 - Alpha",
@@ -0,0 +1 @@
+../../../common/CpuLayout.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../common/Ensemble.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../common/Likelihood.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../common/Pipeline.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../common/RunIndex.py
\ No newline at end of file
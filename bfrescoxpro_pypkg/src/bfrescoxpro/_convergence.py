@@ -0,0 +1 @@
+../../../common/convergence.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../common/energy_sweep.py
\ No newline at end of file
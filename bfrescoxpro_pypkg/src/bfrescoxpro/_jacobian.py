@@ -0,0 +1 @@
+../../../common/jacobian.py
\ No newline at end of file
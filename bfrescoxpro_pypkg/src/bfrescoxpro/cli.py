@@ -0,0 +1,239 @@
+import sys
+import signal
+import argparse
+import contextlib
+
+from .run_batch import run_batch
+from .create_server import create_server
+from .Monitor import Monitor
+from .CpuLayout import CpuLayout
+from .Scheduler import Scheduler, CostModel
+from .information import VARIANTS
+from .select_variant import VARIANT_AUTO
+from ._run_frescox_simulation import (
+    MPI_N_PROCESSES, COMPRESSION_GZIP, COMPRESSION_ZSTD
+)
+from ._batch import (
+    load_parameter_table, configurations_from_table,
+    batch_filenames, stream_batch
+)
+
+
+def _run_batch_command(args):
+    names, rows = load_parameter_table(args.table)
+    configurations = configurations_from_table(args.namelist, rows)
+    filenames = batch_filenames(args.output_dir, len(rows))
+
+    scheduler = None
+    if args.memory is not None:
+        model = None
+        if args.index is not None:
+            model = CostModel.from_index(args.index)
+        scheduler = Scheduler(memory=int(args.memory * 1024**3), model=model)
+
+    monitor = None
+    if args.abort_on or (args.time_limit is not None):
+        monitor = Monitor(failures=args.abort_on,
+                          max_wall_time=args.time_limit)
+
+    layout = None
+    if args.pin:
+        layout = CpuLayout(args.workers)
+        with contextlib.redirect_stdout(sys.stderr):
+            layout.print_report()
+
+    mpi_setup = None
+    if args.mpi_processes is not None:
+        mpi_setup = {MPI_N_PROCESSES: args.mpi_processes}
+    results = run_batch(configurations, filenames,
+                        n_workers=args.workers,
+                        overwrite=args.overwrite,
+                        mpi_setup=mpi_setup,
+                        compression=args.compression,
+                        index=args.index,
+                        scheduler=scheduler,
+                        monitor=monitor,
+                        layout=layout,
+                        variant=args.variant)
+
+    with results, contextlib.ExitStack() as stack:
+        if args.results == "-":
+            fptr = sys.stdout
+        else:
+            fptr = stack.enter_context(open(args.results, "w", newline=""))
+        n_failed = stream_batch(results, names, rows, fptr)
+
+    if n_failed > 0:
+        print(f"{n_failed} of {len(rows)} simulation(s) failed",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+def _serve_command(args):
+    monitor = None
+    if args.abort_on or (args.time_limit is not None):
+        monitor = Monitor(failures=args.abort_on,
+                          max_wall_time=args.time_limit)
+
+    layout = None
+    if args.pin:
+        layout = CpuLayout(args.workers)
+        with contextlib.redirect_stdout(sys.stderr):
+            layout.print_report()
+
+    mpi_setup = None
+    if args.mpi_processes is not None:
+        mpi_setup = {MPI_N_PROCESSES: args.mpi_processes}
+
+    # Stop cleanly, and remove the socket, when asked to terminate
+    def terminate(*_):
+        sys.exit(0)
+    signal.signal(signal.SIGTERM, terminate)
+
+    with create_server(path=args.socket,
+                       n_workers=args.workers,
+                       mpi_setup=mpi_setup,
+                       compression=args.compression,
+                       index=args.index,
+                       monitor=monitor,
+                       layout=layout,
+                       variant=args.variant) as server:
+        print(f"Serving on {server.path} with {server.n_workers} "
+              "worker(s)", file=sys.stderr)
+        try:
+            server.wait()
+        except KeyboardInterrupt:
+            pass
+
+    return 0
+
+
+def main(argv=None):
+    """
+    Entry point of the ``bfrescoxpro`` command line program.  Its
+    ``run-batch`` command runs every point in a table of parameter values
+    through |frescox| and streams a table of outcomes as simulations complete.
+    Its ``serve`` command starts a :py:class:`Server` that runs simulations
+    requested by local clients until it is interrupted or terminated.
+    """
+    parser = argparse.ArgumentParser(
+        prog="bfrescoxpro",
+        description="Run Frescox simulations with Bfrescoxpro"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser(
+        "run-batch",
+        help="Run a table of parameter values through Frescox",
+        description=(
+            "Run one simulation per row of a CSV or NPY parameter table.  If "
+            "the namelist is a template, columns give the values of its "
+            "@key@ entries.  Otherwise, columns are parameter names such as "
+            "pot[1].p1 whose values replace those in the namelist."
+        )
+    )
+    batch.add_argument("namelist",
+                       help="Base Frescox namelist or namelist template")
+    batch.add_argument("table", help="CSV or NPY table of parameter values")
+    batch.add_argument("-o", "--output-dir", default=".",
+                       help="Folder in which each point gets a subfolder")
+    batch.add_argument("-j", "--workers", type=int, default=1,
+                       help="Number of simulations to run concurrently")
+    batch.add_argument("-r", "--results", default="-",
+                       help="CSV file for outcomes or - for stdout")
+    batch.add_argument("--overwrite", action="store_true",
+                       help="Overwrite existing inputs and results")
+    batch.add_argument("--compression",
+                       choices=[COMPRESSION_GZIP, COMPRESSION_ZSTD],
+                       help="Compress results as they are written")
+    batch.add_argument("--index",
+                       help="Run index database in which to record runs")
+    batch.add_argument("--memory", type=float,
+                       help=(
+                           "Memory in GiB available to all simulations.  If "
+                           "given, simulations are ordered longest first and "
+                           "started only while their predicted memory fits, "
+                           "with predictions learned from runs in the index"
+                       ))
+    batch.add_argument("--mpi-processes", type=int,
+                       help="Number of MPI processes per simulation")
+    batch.add_argument("--abort-on", action="append", default=[],
+                       metavar="PATTERN",
+                       help=(
+                           "Stop a simulation as soon as a line of its output "
+                           "matches this regular expression.  Can be given "
+                           "more than once."
+                       ))
+    batch.add_argument("--pin", action="store_true",
+                       help=(
+                           "Give each concurrent simulation its own CPUs, "
+                           "grouped by NUMA domain, with one OpenMP thread "
+                           "bound to each.  The layout is printed to stderr."
+                       ))
+    batch.add_argument("--time-limit", type=float, metavar="SECONDS",
+                       help="Stop simulations that run longer than this")
+    batch.add_argument("--variant", choices=list(VARIANTS) + [VARIANT_AUTO],
+                       help=(
+                           "Frescox variant with which to run simulations or "
+                           "auto to select each simulation's variant from "
+                           "its size.  By default, the default installation "
+                           "is used."
+                       ))
+    batch.set_defaults(func=_run_batch_command)
+
+    serve = commands.add_parser(
+        "serve",
+        help="Run Frescox simulations requested by clients on this node",
+        description=(
+            "Listen on a Unix domain socket for simulations requested with "
+            "run_via_server and run them with a fixed number of workers "
+            "shared fairly among clients.  Identical requests in flight are "
+            "run once."
+        )
+    )
+    serve.add_argument("--socket",
+                       help=(
+                           "Socket on which to listen.  By default, that named "
+                           "by BFRESCOX_SERVER_SOCKET or one private to this "
+                           "user."
+                       ))
+    serve.add_argument("-j", "--workers", type=int, default=1,
+                       help="Number of simulations to run concurrently")
+    serve.add_argument("--compression",
+                       choices=[COMPRESSION_GZIP, COMPRESSION_ZSTD],
+                       help="Compress results as they are written")
+    serve.add_argument("--index",
+                       help="Run index database in which to record runs")
+    serve.add_argument("--abort-on", action="append", default=[],
+                       metavar="PATTERN",
+                       help=(
+                           "Stop a simulation as soon as a line of its output "
+                           "matches this regular expression.  Can be given "
+                           "more than once."
+                       ))
+    serve.add_argument("--pin", action="store_true",
+                       help=(
+                           "Give each concurrent simulation its own CPUs, "
+                           "grouped by NUMA domain, with one OpenMP thread "
+                           "bound to each.  The layout is printed to stderr."
+                       ))
+    serve.add_argument("--time-limit", type=float, metavar="SECONDS",
+                       help="Stop simulations that run longer than this")
+    serve.add_argument("--mpi-processes", type=int,
+                       help="Number of MPI processes per simulation")
+    serve.add_argument("--variant", choices=list(VARIANTS) + [VARIANT_AUTO],
+                       help=(
+                           "Frescox variant with which to run simulations or "
+                           "auto to select each simulation's variant from "
+                           "its size.  By default, the default installation "
+                           "is used."
+                       ))
+    serve.set_defaults(func=_serve_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+from .create_runner import create_runner
+from .Evaluator import Evaluator
+
+
+def create_evaluator(configuration, parameters, path, observable=None,
+                     n_workers=1, max_in_flight=None, overwrite=False,
+                     mpi_setup=None, compression=None, compression_level=None,
+                     index=None, monitor=None, layout=None,
+                     variant=None):
+    """
+    Prepare an :py:class:`Evaluator` that runs a |frescox| simulation for each
+    set of parameter values submitted to it and that returns the outcomes in
+    order of completion.  Samplers and optimizers can keep ``max_in_flight``
+    evaluations submitted so that all workers stay busy even if run times
+    vary greatly.  The setup is checked once for all simulations by a single
+    :py:class:`Runner`.  Each simulation runs in the folder of its results so
+    that concurrent simulations do not overwrite each other's auxiliary
+    files.
+
+    :param configuration: :py:class:`Configuration` object into which the
+        parameter values of each evaluation are set
+    :param parameters: Sequence of names of real-valued parameters (|eg|
+        ``pot[1].p1``) in the order of the values of each evaluation
+    :param path: Path to folder in which each evaluation's results are written
+        to its own subfolder
+    :param observable: Function that is called with the filename of a
+        simulation's results by the thread that ran it and whose return value
+        is the value of the evaluation (|eg| a log-likelihood); ``None`` to
+        only run simulations.  Use :py:func:`open_output` to read compressed
+        results.
+    :param n_workers: Number of simulations to run concurrently
+    :param max_in_flight: Largest number of evaluations submitted but not yet
+        completed; ``None`` for twice the number of workers
+    :param overwrite: If False, then an evaluation fails if either of its
+        input or output files exist
+    :param mpi_setup: `dict` that provides MPI setup values used for every
+        simulation if executable built with MPI; `None`, otherwise.
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all simulations
+    :param monitor: :py:class:`Monitor` that watches the output of each
+        simulation as it is written and that can stop it early; ``None`` for
+        no monitoring
+    :param layout: :py:class:`CpuLayout` whose slots partition the CPUs of
+        the node among concurrent simulations so that each runs restricted to
+        its own CPUs with a matching number of OpenMP threads; ``None`` to let
+        the operating system place all simulations
+    :param variant: ``None`` to run the default |frescox| installation.
+        Otherwise, the name of the variant built alongside it with which to
+        run all simulations.  See :py:func:`create_runner`.
+    :return: :py:class:`Evaluator`
+    """
+    runner = create_runner(mpi_setup=mpi_setup,
+                           compression=compression,
+                           compression_level=compression_level,
+                           index=index,
+                           monitor=monitor,
+                           layout=layout,
+                           variant=variant,
+                           isolated=True)
+    try:
+        return Evaluator(runner, configuration, parameters, path,
+                         observable=observable, n_workers=n_workers,
+                         max_in_flight=max_in_flight, overwrite=overwrite)
+    except Exception:
+        runner.close()
+        raise
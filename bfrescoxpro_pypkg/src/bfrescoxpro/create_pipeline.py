@@ -0,0 +1,83 @@
+from .create_runner import create_runner
+from .select_variant import _VariantRunners, VARIANT_AUTO
+from .Pipeline import Pipeline
+
+
+def create_pipeline(configurations, filenames, parse, reduce=None,
+                    n_workers=1, n_parsers=1, n_reducers=1, queue_size=None,
+                    overwrite=False, mpi_setup=None, compression=None,
+                    compression_level=None, index=None, monitor=None,
+                    layout=None, outputs=None, variant=None):
+    """
+    Prepare and start a :py:class:`Pipeline` that runs a batch of |frescox|
+    simulations while other workers parse and reduce the results of
+    simulations that have already completed.  The number of workers of each
+    stage is set separately so that, |eg| a few parsers keep up with many
+    simulations.  The setup is checked once for all simulations by a single
+    :py:class:`Runner`.  Each simulation runs in the folder of its results so
+    that concurrent simulations do not overwrite each other's auxiliary
+    files.
+
+    :param configurations: Iterable of :py:class:`Configuration` objects,
+        which is consumed lazily
+    :param filenames: Iterable of filenames including path of files to write
+        results to with one filename per configuration.  Folders are created
+        as needed.
+    :param parse: Function that is called with the filename of a successful
+        simulation's results and whose return value is passed to ``reduce``.
+        Use :py:func:`open_output` to read compressed results.
+    :param reduce: Function that is called with the value returned by
+        ``parse`` and whose return value is the value of the simulation (|eg|
+        a log-likelihood); ``None`` for no reduction stage
+    :param n_workers: Number of simulations to run concurrently
+    :param n_parsers: Number of results to parse concurrently
+    :param n_reducers: Number of values to reduce concurrently
+    :param queue_size: Largest number of items waiting for each stage after
+        the launch stage; ``None`` for twice the stage's number of workers
+    :param overwrite: If False, then a simulation fails if either of its
+        input or output files exist
+    :param mpi_setup: `dict` that provides MPI setup values used for every
+        simulation if executable built with MPI; `None`, otherwise.
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all simulations
+    :param monitor: :py:class:`Monitor` that watches the output of each
+        simulation as it is written and that can stop it early; ``None`` for
+        no monitoring
+    :param layout: :py:class:`CpuLayout` whose slots partition the CPUs of
+        the node among concurrent simulations so that each runs restricted to
+        its own CPUs with a matching number of OpenMP threads; ``None`` to let
+        the operating system place all simulations
+    :param outputs: Names of the only results that |frescox| should write.
+        See :py:func:`create_runner`.
+    :param variant: ``None`` to run the default |frescox| installation.
+        Otherwise, the name of the variant built alongside it with which to
+        run all simulations or ``VARIANT_AUTO`` to select the variant of each
+        simulation from its problem size.  See :py:func:`run_batch`.
+    :return: :py:class:`Pipeline`
+    """
+    # Check the setup once for all simulations or, with automatic selection,
+    # once for each variant selected
+    setup = {"compression": compression,
+             "compression_level": compression_level,
+             "index": index,
+             "monitor": monitor,
+             "layout": layout,
+             "outputs": outputs,
+             "isolated": True}
+    if variant == VARIANT_AUTO:
+        runner = _VariantRunners(mpi_setup=mpi_setup, **setup)
+    else:
+        runner = create_runner(mpi_setup=mpi_setup, variant=variant, **setup)
+    try:
+        return Pipeline(runner, configurations, filenames, parse,
+                        reduce=reduce, n_workers=n_workers,
+                        n_parsers=n_parsers, n_reducers=n_reducers,
+                        queue_size=queue_size, overwrite=overwrite)
+    except Exception:
+        runner.close()
+        raise
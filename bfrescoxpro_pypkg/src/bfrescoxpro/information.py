@@ -1,9 +1,22 @@
 from pathlib import Path
 
 from ._load_build_information import load_build_information
+from .stage_installation import staged_information
 
+# Names of the variants of Frescox that can be built alongside the default
+# installation
+VARIANT_SERIAL = "serial"
+VARIANT_OPENMP = "openmp"
+VARIANT_MPI = "mpi"
+# Serial build instrumented for gprof, which is never selected automatically
+VARIANT_PROFILE = "profile"
+VARIANTS = (VARIANT_SERIAL, VARIANT_OPENMP, VARIANT_MPI, VARIANT_PROFILE)
 
-def information():
+# Folder in the package that contains one installation folder per variant
+_VARIANTS_PATH = "variants"
+
+
+def information(variant=None):
     """
     All code that would like to use the |frescox| executable built for this
     package should use this information to obtain the absolute path to the
@@ -11,11 +24,48 @@ def information():
     and inadvertently using a different executable if, for example, the ``PATH``
     variable is mismanaged.
 
+    If the ``BFRESCOX_STAGE_PATH`` environment variable is set, then the
+    installation is first staged to that node-local folder with
+    :py:func:`stage_installation` and the staged copy is returned.
+
+    :param variant: Name of the variant (``VARIANT_SERIAL``,
+        ``VARIANT_OPENMP``, ``VARIANT_MPI``, or ``VARIANT_PROFILE``) built
+        alongside the default installation; ``None`` for the default
+        installation.  Use :py:func:`variants` to list all variants that were
+        built.
     :return: ``dict`` that contains information regarding the |frescox|
         executable used by the package.
     """
-    frescox = load_build_information(Path(__file__).resolve().parent)
+    src_path = Path(__file__).resolve().parent
+    if variant is None:
+        frescox = load_build_information(src_path)
+    elif variant not in VARIANTS:
+        raise ValueError(f"Unknown Frescox variant {variant}")
+    else:
+        frescox = load_build_information(
+            src_path.joinpath(_VARIANTS_PATH, variant)
+        )
+
     if not frescox:
-        raise RuntimeError("No valid Frescox installation found")
+        if variant is None:
+            raise RuntimeError("No valid Frescox installation found")
+        raise RuntimeError(f"No valid {variant} Frescox variant found")
+
+    return staged_information(frescox)
+
+
+def variants():
+    """
+    :return: ``dict`` that maps the name of each variant of |frescox| built
+        alongside the default installation to its information as returned by
+        :py:func:`information`, which are staged if ``BFRESCOX_STAGE_PATH``
+        is set.  Empty if no variants were built.
+    """
+    src_path = Path(__file__).resolve().parent.joinpath(_VARIANTS_PATH)
+    built = {}
+    for name in VARIANTS:
+        frescox = load_build_information(src_path.joinpath(name))
+        if frescox:
+            built[name] = staged_information(frescox)
 
-    return frescox
+    return built
@@ -0,0 +1,71 @@
+import functools
+
+from .run_batch import run_batch
+from ._jacobian import compute_jacobian, FINITE_DIFFERENCE_CENTRAL
+
+
+def jacobian(configuration, parameters, steps, observable, path,
+             method=FINITE_DIFFERENCE_CENTRAL, grid=None, n_refinements=1,
+             n_workers=1, overwrite=False, mpi_setup=None,
+             compression=None, compression_level=None, index=None):
+    """
+    Estimate the derivatives of an observable with respect to the given
+    configuration parameters by finite differences.
+
+    The base configuration and all perturbed configurations are run
+    concurrently as a single :py:func:`run_batch` with each simulation written
+    to its own subfolder of ``path``.  Forward differences need one simulation
+    per parameter and step size in addition to the base simulation, which is
+    shared by all parameters.  Central differences need two.
+
+    The observable is a user-supplied function so that any quantity that can be
+    extracted from the results of a simulation can be differentiated.  For
+    example, a function that loads an angular distribution and returns the
+    angles and cross sections.  All observables are interpolated onto a
+    common grid before differencing.
+
+    :param configuration: :py:class:`Configuration` object of the point at
+        which to evaluate derivatives
+    :param parameters: Sequence of names of real-valued parameters (|eg|
+        ``pot[1].p1``)
+    :param steps: Step size used for all parameters or sequence of step sizes
+        with one per parameter
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns ``(grid, values)`` 1D arrays.
+        Use :py:func:`open_output` to read compressed results.
+    :param path: Path to folder in which to write the results of all
+        simulations
+    :param method: ``"forward"`` or ``"central"`` differences
+    :param grid: 1D array of strictly increasing points (|eg| angles or
+        energies) on which to evaluate all observables; ``None`` to use the
+        grid of the base configuration
+    :param n_refinements: Number of step sizes to try for each parameter
+        starting with the given step and halving it each time.  If greater
+        than one, then the step whose estimate best agrees with that of the
+        next larger step is used for each parameter.
+    :param n_workers: Number of simulations to run concurrently.  For MPI
+        installations, each simulation uses the number of MPI processes given
+        in ``mpi_setup``.
+    :param overwrite: If False, then an error is raised if any of the
+        simulation input or output files exist
+    :param mpi_setup: `dict` that provides MPI setup values used for every
+        simulation if executable built with MPI; `None`, otherwise.
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all simulations
+    :return: :py:class:`Jacobian`
+    """
+    run = functools.partial(run_batch,
+                            n_workers=n_workers,
+                            overwrite=overwrite,
+                            mpi_setup=mpi_setup,
+                            compression=compression,
+                            compression_level=compression_level,
+                            index=index)
+    return compute_jacobian(run, configuration, parameters, steps,
+                            observable, path, method=method, grid=grid,
+                            n_refinements=n_refinements)
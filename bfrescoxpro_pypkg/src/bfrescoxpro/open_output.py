@@ -0,0 +1 @@
+../../../common/open_output.py
\ No newline at end of file
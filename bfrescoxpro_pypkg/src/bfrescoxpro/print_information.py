@@ -5,7 +5,7 @@ import platform
 
 import subprocess as sbp
 
-from .information import information
+from .information import information, variants
 from ._run_frescox_simulation import (
     FRESCOX_EXE,
     FRESCOX_MPI_SUPPORT, FRESCOX_OPENMP_SUPPORT,
@@ -14,21 +14,14 @@ from ._run_frescox_simulation import (
 )
 
 
-def print_information():
+def _print_installation(built_with):
     """
-    Print information about the |frescox| executable used internally by the
-    package.
-
-    If ``otool`` is installed in macOS systems or ``ldd`` in unix-based systems,
-    then |frescox| external dependences are listed.
+    Print information about a single |frescox| installation.
     """
-    built_with = information()
     frescox_exe = built_with[FRESCOX_EXE]
 
     os_name = platform.system()
 
-    print("Frescox executable")
-    print("-" * 80)
     if os_name.lower() == "darwin":
         if shutil.which("otool", mode=(os.F_OK | os.X_OK)):
             try:
@@ -86,3 +79,22 @@ def print_information():
         print("\tBuilt with corex capabilities")
     else:
         print("\tNo corex capablilities")
+
+
+def print_information():
+    """
+    Print information about the |frescox| executable used internally by the
+    package and about all variants built alongside it.
+
+    If ``otool`` is installed in macOS systems or ``ldd`` in unix-based systems,
+    then |frescox| external dependences are listed.
+    """
+    print("Frescox executable")
+    print("-" * 80)
+    _print_installation(information())
+
+    for name, built_with in variants().items():
+        print()
+        print(f"Frescox {name} variant")
+        print("-" * 80)
+        _print_installation(built_with)
@@ -0,0 +1,179 @@
+import os
+import shutil
+import tempfile
+
+import subprocess as sbp
+
+from pathlib import Path
+from collections import namedtuple
+
+from .information import information, VARIANT_PROFILE
+from .Configuration import Configuration
+from ._run_frescox_simulation import FRESCOX_EXE, Runner
+
+# glibc writes the profile of an instrumented program to <prefix>.<pid> at
+# exit rather than to gmon.out in its working directory if this is set
+_GMON_PREFIX_ENV = "GMON_OUT_PREFIX"
+_GMON_NAME = "gmon.out"
+
+# Seconds per unit of the per-call columns of gprof's flat profile
+_TIME_UNITS = {"Ks": 1.0e3, "s": 1.0, "ms": 1.0e-3, "us": 1.0e-6, "ns": 1.0e-9}
+
+
+class RoutineProfile(namedtuple("RoutineProfile", ["name", "percent",
+                                                   "self_time", "calls",
+                                                   "self_per_call",
+                                                   "total_per_call"])):
+    """
+    Time spent in a single |frescox| routine as sampled by ``gprof``.
+    ``name`` is the routine's symbol (|eg| ``erwin_`` for routine ``ERWIN``),
+    ``percent`` is its share of the sampled time, and ``self_time`` is the
+    time in seconds spent in the routine excluding the routines that it
+    calls.  ``calls`` is the number of calls and ``self_per_call`` and
+    ``total_per_call`` are the time in seconds per call excluding and
+    including the routines that it calls.  These are ``None`` for routines
+    that were not instrumented (|eg| system libraries).
+    """
+    __slots__ = ()
+
+
+class Profile(namedtuple("Profile", ["wall_time", "sampled_time",
+                                     "routines"])):
+    """
+    Per-routine time breakdown of a single |frescox| simulation.
+    ``wall_time`` is the simulation's wall time in seconds, ``sampled_time``
+    is the total time in seconds sampled by the profiler, and ``routines`` is
+    a ``list`` of :py:class:`RoutineProfile` ordered from the routine with the
+    largest self time to that with the smallest.
+    """
+    __slots__ = ()
+
+    def print_report(self, n_routines=20):
+        """
+        Print the routines that dominate the run time.
+
+        :param n_routines: Largest number of routines to print
+        """
+        print()
+        print(f"{'%':>7s} {'Self (s)':>10s} {'Calls':>10s} "
+              f"{'Self/call (s)':>14s} {'Total/call (s)':>15s}  Routine")
+        print("-" * 80)
+        for routine in self.routines[:n_routines]:
+            if routine.calls is None:
+                calls = f"{'':>10s} {'':>14s} {'':>15s}"
+            else:
+                calls = f"{routine.calls:10d} {routine.self_per_call:14.3e} " \
+                        f"{routine.total_per_call:15.3e}"
+            print(f"{routine.percent:7.2f} {routine.self_time:10.3f} "
+                  f"{calls}  {routine.name}")
+        print()
+        print(f"Sampled {self.sampled_time:.3f} s of "
+              f"{self.wall_time:.3f} s wall time")
+        print()
+
+
+def _parse_flat_profile(text):
+    """
+    :param text: Flat profile printed by ``gprof -b -p``
+    :return: ``list`` of :py:class:`RoutineProfile` in the order printed
+    """
+    routines = []
+    scale = None
+    in_table = False
+    for line in text.splitlines():
+        fields = line.split()
+        if fields and (fields[-1] == "name") and ("seconds" in fields):
+            in_table = True
+            per_call = [each for each in fields if each.endswith("/call")]
+            if per_call:
+                unit = per_call[0].split("/")[0]
+                if unit not in _TIME_UNITS:
+                    raise RuntimeError(f"Unknown gprof time unit {unit}")
+                scale = _TIME_UNITS[unit]
+            continue
+        elif (not in_table) or (len(fields) < 4):
+            continue
+
+        try:
+            percent, _, self_time = [float(each) for each in fields[:3]]
+        except ValueError:
+            continue
+
+        # Routines without call counts have only their name after the times
+        try:
+            calls = int(fields[3])
+            self_per_call = float(fields[4]) * scale
+            total_per_call = float(fields[5]) * scale
+            name = " ".join(fields[6:])
+        except (ValueError, IndexError, TypeError):
+            calls, self_per_call, total_per_call = None, None, None
+            name = " ".join(fields[3:])
+
+        routines.append(RoutineProfile(name, percent, self_time, calls,
+                                       self_per_call, total_per_call))
+
+    return routines
+
+
+def profile_simulation(configuration, filename, overwrite=False, index=None,
+                       limits=None):
+    """
+    Run a |frescox| simulation with the ``profile`` variant, which is
+    instrumented for ``gprof``, and return the time spent in each of its
+    routines.  This shows which routines (|eg| the coupled-equation solvers)
+    dominate the run time of a configuration so that optimization effort can
+    be directed where it matters.  Results are written as for
+    :py:func:`run_simulation`.
+
+    Instrumentation slows the simulation so that its wall time is not
+    representative of that of the other installations.  The profile variant
+    must be built at installation and ``gprof`` must be installed.  Profiling
+    data is collected with glibc's ``GMON_OUT_PREFIX`` so that only Linux is
+    supported.
+
+    :param configuration: :py:class:`Configuration` object that specifies the
+        simulation to profile
+    :param filename: Filename including path of file to write outputs to
+    :param overwrite: If False, then an error is raised if either of the
+        simulation input or output files exist
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record the run.  If ``None``, then the run is recorded in
+        the index named by the ``BFRESCOX_RUN_INDEX`` environment variable if
+        it is set.
+    :param limits: ``dict`` that maps ``LIMIT_STACK`` and/or
+        ``LIMIT_ADDRESS_SPACE`` to the limit in bytes, or ``None`` for no
+        limit, to apply to the |frescox| process; ``None`` to use the limits
+        of this process
+    :return: :py:class:`Profile` of the simulation
+    """
+    # ----- ERROR CHECK ARGUMENTS
+    if not isinstance(configuration, Configuration):
+        msg = "Configuration information not given as a Configuration object"
+        raise TypeError(msg)
+    elif not isinstance(filename, (str, Path)):
+        raise TypeError(f"Invalid output filename ({filename})")
+
+    gprof = shutil.which("gprof", mode=(os.F_OK | os.X_OK))
+    if gprof is None:
+        raise RuntimeError("Unable to find gprof program")
+    frescox = information(VARIANT_PROFILE)
+
+    # ----- RUN & COLLECT PROFILE
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = Path(tmp).joinpath(_GMON_NAME)
+        with Runner(frescox, None, index=index, limits=limits,
+                    environment={_GMON_PREFIX_ENV: prefix}) as runner:
+            statistics = runner.run(configuration, filename, overwrite)
+
+        # gprof sums the profiles of all processes (e.g., of wrappers)
+        dumps = sorted(str(each) for each in Path(tmp).glob(f"{_GMON_NAME}*"))
+        if not dumps:
+            raise RuntimeError("No profiling data written by Frescox")
+        reply = sbp.run([gprof, "-b", "-p", str(frescox[FRESCOX_EXE])] + dumps,
+                        stdin=sbp.DEVNULL, capture_output=True, check=True,
+                        text=True)
+
+    routines = _parse_flat_profile(reply.stdout)
+    sampled_time = sum(routine.self_time for routine in routines)
+
+    return Profile(statistics.wall_time, sampled_time, routines)
@@ -0,0 +1,121 @@
+import functools
+
+from .create_runner import create_runner
+from ._batch import execute_batch, store_observables, RunningBatch
+from .Ensemble import Ensemble
+from .Scheduler import Scheduler
+from .select_variant import _VariantRunners, VARIANT_AUTO
+
+
+def run_batch(configurations, filenames, n_workers=1, overwrite=False,
+              mpi_setup=None, compression=None, compression_level=None,
+              index=None, scheduler=None, monitor=None, layout=None,
+              ensemble=None, observable=None, variant=None,
+              outputs=None):
+    """
+    Run a batch of |frescox| simulations concurrently with each simulation run
+    as if by :py:func:`run_simulation`.  The setup is checked once for the
+    whole batch by a single :py:class:`Runner`.  Each simulation runs in the
+    folder of its results, where |frescox| writes its input file and
+    auxiliary files, so that concurrent simulations do not overwrite each
+    other's files.  Each results file should therefore be in its own folder.
+
+    The outcomes are yielded as simulations complete so that callers can
+    process results while the remaining simulations run.  A simulation that
+    fails or that is aborted by the monitor does not stop the batch.
+
+    :param configurations: Iterable of :py:class:`Configuration` objects that
+        specify the simulations to run
+    :param filenames: Iterable of filenames including path of files to write
+        outputs to with one filename per configuration
+    :param n_workers: Number of simulations to run concurrently.  For MPI
+        installations, each simulation uses the number of MPI processes given
+        in ``mpi_setup`` so that ``n_workers`` times that number of processes
+        run at once.
+    :param overwrite: If False, then a simulation fails if either of its input
+        or output files exist
+    :param mpi_setup: `dict` that provides MPI setup values used for every
+        simulation if executable built with MPI; `None`, otherwise.
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all simulations
+    :param scheduler: :py:class:`Scheduler` that orders simulations and
+        starts them only while their predicted memory usage fits on the node,
+        in which case ``n_workers`` is the largest number of simulations run
+        concurrently and all configurations are loaded before starting;
+        ``None`` to start simulations in the given order
+    :param monitor: :py:class:`Monitor` that watches the output of each
+        simulation as it is written and that can stop it early; ``None`` for
+        no monitoring
+    :param layout: :py:class:`CpuLayout` whose slots partition the CPUs of
+        the node among concurrent simulations so that each runs restricted to
+        its own CPUs with a matching number of OpenMP threads.  It should have
+        ``n_workers`` slots.  ``None`` to let the operating system place all
+        simulations.
+    :param ensemble: :py:class:`Ensemble` with one row per simulation into
+        which the observables of each successful simulation are written by
+        the thread that ran it; ``None`` to not collect observables
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns a sequence of ``(grid,
+        values)`` 1D arrays with one pair per observable of the ensemble.
+        Required if and only if an ensemble is given.  If it raises, then the
+        simulation fails.
+    :param variant: ``None`` to run the default |frescox| installation.
+        Otherwise, the name of the variant built alongside it with which to
+        run all simulations or ``VARIANT_AUTO`` to select the variant of each
+        simulation from the size of its problem.  See
+        :py:func:`select_variant` for how missing variants are replaced.
+        ``mpi_setup`` is only used for installations built with MPI.
+    :param outputs: Names of the only results that |frescox| should write
+        (|eg| ``OUTPUT_CROSS_SECTIONS``).  The print controls of each input
+        file are set as by :py:meth:`Configuration.with_outputs` so that less
+        text is formatted, written, and later read.  ``None`` to use the print
+        controls of the configuration as given.
+    :return: Iterator of :py:class:`BatchResult` in order of completion.
+        Use it as a context manager so that the batch is stopped and its
+        resources released even if not all outcomes are consumed.
+    """
+    if (not isinstance(n_workers, int)) or (n_workers < 1):
+        raise ValueError("Number of workers must be a positive integer")
+    elif (scheduler is not None) and (not isinstance(scheduler, Scheduler)):
+        raise TypeError("Scheduler is not a Scheduler object")
+    elif not isinstance(overwrite, bool):
+        raise TypeError("Given overwrite argument is not a boolean")
+    elif (ensemble is not None) and (not isinstance(ensemble, Ensemble)):
+        raise TypeError("Ensemble is not an Ensemble object")
+    elif (ensemble is None) != (observable is None):
+        raise ValueError("Ensemble and observable must be given together")
+
+    # Check the setup once for all simulations or, with automatic selection,
+    # once for each variant selected
+    setup = {"compression": compression,
+             "compression_level": compression_level,
+             "index": index,
+             "monitor": monitor,
+             "layout": layout,
+             "outputs": outputs,
+             "limits": None if scheduler is None else scheduler.limits,
+             "isolated": True}
+    if variant == VARIANT_AUTO:
+        runner = _VariantRunners(mpi_setup=mpi_setup, **setup)
+    else:
+        runner = create_runner(mpi_setup=mpi_setup, variant=variant, **setup)
+    run = functools.partial(runner.run, overwrite=overwrite)
+    store = None
+    if ensemble is not None:
+        store = store_observables(ensemble, observable)
+    try:
+        if scheduler is None:
+            results = execute_batch(run, configurations, filenames,
+                                    n_workers, store=store)
+        else:
+            results = scheduler.execute(run, configurations, filenames,
+                                        n_workers, store=store)
+    except BaseException:
+        runner.close()
+        raise
+    return RunningBatch(runner, results)
@@ -1,8 +1,15 @@
 from .information import information
-from ._run_frescox_simulation import run_frescox_simulation
+from .select_variant import select_variant
+from ._run_frescox_simulation import (
+    FRESCOX_MPI_SUPPORT,
+    run_frescox_simulation
+)
 
 
-def run_simulation(configuration, filename, overwrite=False, mpi_setup=None):
+def run_simulation(configuration, filename, overwrite=False, mpi_setup=None,
+                   compression=None, compression_level=None,
+                   index=None, limits=None, monitor=None, layout=None,
+                   variant=None, isolated=False, outputs=None):
     """
     Run a |frescox| simulation based on the given simulation configuration
     object.  Results are written to a file with the given output filename.  The
@@ -20,8 +27,56 @@ def run_simulation(configuration, filename, overwrite=False, mpi_setup=None):
         simulation input or output files exist
     :param mpi_setup: `dict` that provides MPI setup values if executable built
         with MPI; `None`, otherwise.
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed.  Use :py:func:`open_output` to read compressed results.
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record the run.  If ``None``, then the run is recorded in
+        the index named by the ``BFRESCOX_RUN_INDEX`` environment variable if
+        it is set.
+    :param limits: ``dict`` that maps ``LIMIT_STACK`` and/or
+        ``LIMIT_ADDRESS_SPACE`` to the limit in bytes, or ``None`` for no
+        limit, to apply to each |frescox| process; ``None`` to use the limits
+        of this process
+    :param monitor: :py:class:`Monitor` that watches the output of the
+        simulation as it is written and that can stop it early; ``None`` for
+        no monitoring
+    :param layout: :py:class:`CpuLayout` in one of whose slots to run the
+        simulation restricted to the slot's CPUs; ``None`` to let the
+        operating system place the simulation
+    :param variant: ``None`` to run the default |frescox| installation.
+        Otherwise, the name of the variant built alongside it with which to
+        run the simulation or ``VARIANT_AUTO`` to select the variant from the
+        size of the problem.  See :py:func:`select_variant` for how missing
+        variants are replaced.  ``mpi_setup`` is only used if the selected
+        installation was built with MPI.
+    :param isolated: If True, then the simulation runs in the folder of its
+        results file so that the auxiliary files that |frescox| writes are
+        kept with its results rather than in the current working directory
+    :param outputs: Names of the only results that |frescox| should write
+        (|eg| ``OUTPUT_CROSS_SECTIONS``).  The print controls in the input
+        file are set as by :py:meth:`Configuration.with_outputs` so that less
+        text is formatted, written, and later read.  ``None`` to use the print
+        controls of the configuration as given.
+    :return: :py:class:`RunStatistics` of the simulation.  If the monitor
+        stops the simulation, then :py:class:`RunAborted` is raised instead.
     """
     # This function assumes that all error checking of arguments will be handled
     # by this internal function.
-    run_frescox_simulation(information(), configuration, mpi_setup, filename,
-                           overwrite=overwrite)
+    if variant is None:
+        frescox = information()
+    else:
+        _, frescox = select_variant(configuration, variant, mpi_setup)
+        if not frescox[FRESCOX_MPI_SUPPORT]:
+            mpi_setup = None
+
+    return run_frescox_simulation(frescox, configuration, mpi_setup,
+                                  filename,
+                                  overwrite=overwrite,
+                                  compression=compression,
+                                  compression_level=compression_level,
+                                  index=index, limits=limits,
+                                  monitor=monitor, layout=layout,
+                                  isolated=isolated, outputs=outputs)
@@ -0,0 +1,186 @@
+import os
+import warnings
+import threading
+
+import numpy as np
+
+from .information import (
+    information, variants,
+    VARIANT_SERIAL, VARIANT_OPENMP, VARIANT_MPI, VARIANT_PROFILE, VARIANTS
+)
+from .Scheduler import CostModel
+from ._run_frescox_simulation import (
+    FRESCOX_MPI_SUPPORT, FRESCOX_OPENMP_SUPPORT,
+    Runner
+)
+
+# Name of the hint that selects the variant from the size of the problem
+VARIANT_AUTO = "auto"
+
+# Problem sizes above which OpenMP and MPI variants are preferred.  The size
+# of a problem is the product of the number of radial points, the number of
+# partial waves, and the cube of the number of channels.
+_OPENMP_MIN_SIZE = 1.0e6
+_MPI_MIN_SIZE = 1.0e9
+_SIZE_EXPONENTS = np.array([1.0, 1.0, 3.0])
+
+# Variants to try in order for each variant preferred
+_FALLBACKS = {
+    VARIANT_SERIAL: [VARIANT_SERIAL, VARIANT_OPENMP, VARIANT_MPI],
+    VARIANT_OPENMP: [VARIANT_OPENMP, VARIANT_SERIAL, VARIANT_MPI],
+    VARIANT_MPI: [VARIANT_MPI, VARIANT_OPENMP, VARIANT_SERIAL],
+    VARIANT_PROFILE: [VARIANT_PROFILE, VARIANT_SERIAL, VARIANT_OPENMP,
+                      VARIANT_MPI]
+}
+
+
+def _usable(frescox, mpi_setup):
+    """
+    :return: True if the installation can be run with the given MPI setup and
+        the present environment
+    """
+    if frescox[FRESCOX_MPI_SUPPORT] and (mpi_setup is None):
+        return False
+    elif frescox[FRESCOX_OPENMP_SUPPORT] and \
+            ("OMP_NUM_THREADS" not in os.environ):
+        return False
+    return True
+
+
+def problem_size(configuration):
+    """
+    :param configuration: :py:class:`Configuration` object of a simulation
+    :return: Size of the simulation used to select a variant, which is the
+        product of the number of radial points, the number of partial waves,
+        and the cube of the number of channels
+    """
+    features = CostModel.features(configuration)
+    return float(np.exp(np.dot(_SIZE_EXPONENTS, features)))
+
+
+def _preferred(configuration, openmp_size, mpi_size):
+    """
+    :return: Name of the variant best suited to the size of the problem
+    """
+    size = problem_size(configuration)
+    if size >= mpi_size:
+        return VARIANT_MPI
+    elif size >= openmp_size:
+        return VARIANT_OPENMP
+    return VARIANT_SERIAL
+
+
+def _select(preferred, built, mpi_setup):
+    """
+    :param built: Information of all variants built as returned by
+        :py:func:`variants`
+    :return: ``(name, frescox)`` of the first usable variant in the fallback
+        order of the preferred variant or ``(None, frescox)`` of the default
+        installation
+    """
+    for name in _FALLBACKS[preferred]:
+        if (name in built) and _usable(built[name], mpi_setup):
+            return name, built[name]
+    return None, information()
+
+
+def select_variant(configuration=None, variant=VARIANT_AUTO, mpi_setup=None,
+                   openmp_size=_OPENMP_MIN_SIZE, mpi_size=_MPI_MIN_SIZE):
+    """
+    Choose the |frescox| installation with which to run a simulation.  Small
+    problems usually run fastest with a serial binary, medium problems with
+    OpenMP, and large coupled-channel problems with MPI.
+
+    If the preferred variant was not built or cannot be run, then the other
+    variants are tried in order of similarity (|eg| OpenMP then serial then
+    MPI for a medium problem) followed by the default installation.  A
+    variant built with MPI is only run if an MPI setup is given and a variant
+    built with OpenMP only if ``OMP_NUM_THREADS`` is set.
+
+    :param configuration: :py:class:`Configuration` object of the simulation.
+        Only needed if the variant is selected automatically.
+    :param variant: Name of the preferred variant or ``VARIANT_AUTO`` to
+        prefer a variant based on the size of the problem as given by
+        :py:func:`problem_size`.  A warning is issued if an explicitly
+        preferred variant is not used.
+    :param mpi_setup: ``dict`` that provides MPI setup values to use if an MPI
+        variant is selected; ``None`` to select only variants without MPI
+    :param openmp_size: Smallest problem size for which an OpenMP variant is
+        preferred
+    :param mpi_size: Smallest problem size for which an MPI variant is
+        preferred
+    :return: ``(name, frescox)`` where ``name`` is the name of the selected
+        variant or ``None`` for the default installation and ``frescox`` is
+        its information as returned by :py:func:`information`
+    """
+    if variant == VARIANT_AUTO:
+        preferred = _preferred(configuration, openmp_size, mpi_size)
+    elif variant in VARIANTS:
+        preferred = variant
+    else:
+        raise ValueError(f"Unknown Frescox variant {variant}")
+
+    selected = _select(preferred, variants(), mpi_setup)
+    if (variant != VARIANT_AUTO) and (selected[0] != variant):
+        msg = "Frescox variant {} not available.  Using {}."
+        warnings.warn(msg.format(variant, selected[0] or "default"))
+
+    return selected
+
+
+class _VariantRunners(object):
+    def __init__(self, mpi_setup=None, **kwargs):
+        """
+        Run each simulation with the variant selected automatically for it by
+        a :py:class:`Runner` that is created the first time that its variant is
+        selected and that is reused for all later simulations.  This can be
+        used by several threads concurrently in place of a single runner.
+
+        :param mpi_setup: ``dict`` that provides MPI setup values to use if an
+            MPI variant is selected; ``None`` to select only variants without
+            MPI
+        :param kwargs: Arguments passed to each :py:class:`Runner`
+        """
+        super().__init__()
+
+        self.__built = variants()
+        self.__mpi_setup = mpi_setup
+        self.__kwargs = kwargs
+        self.__runners = {}
+        self.__lock = threading.Lock()
+
+    def __runner(self, configuration):
+        preferred = _preferred(configuration, _OPENMP_MIN_SIZE, _MPI_MIN_SIZE)
+        with self.__lock:
+            runner = self.__runners.get(preferred)
+            if runner is None:
+                _, frescox = _select(preferred, self.__built, self.__mpi_setup)
+                mpi_setup = self.__mpi_setup
+                if not frescox[FRESCOX_MPI_SUPPORT]:
+                    mpi_setup = None
+                runner = Runner(frescox, mpi_setup, **self.__kwargs)
+                self.__runners[preferred] = runner
+        return runner
+
+    def run(self, config, filename, overwrite=False):
+        """
+        Run the simulation as if by :py:meth:`Runner.run` with the variant
+        selected for it.
+        """
+        return self.__runner(config).run(config, filename,
+                                         overwrite=overwrite)
+
+    def close(self):
+        """
+        Release the resources of all runners created.
+        """
+        with self.__lock:
+            for runner in self.__runners.values():
+                runner.close()
+            self.__runners = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,70 @@
+import functools
+
+from .run_batch import run_batch
+from ._energy_sweep import refine_energies, ENERGY_PARAMETER
+
+
+def sweep_energies(configuration, energies, observable, path, tolerance,
+                   max_runs=100, min_spacing=0.0, parameter=ENERGY_PARAMETER,
+                   n_workers=1, overwrite=False, mpi_setup=None,
+                   compression=None, compression_level=None, index=None):
+    """
+    Sample an excitation function with energies concentrated where it varies
+    rapidly (|eg| near resonances) rather than on a dense uniform grid.
+
+    The simulations of the initial grid are run concurrently as a single
+    :py:func:`run_batch`.  The error of interpolating linearly between
+    neighboring energies is then estimated from the local curvature of the
+    observable and every interval whose error exceeds the tolerance is split
+    at its midpoint.  All new energies of a refinement are run concurrently.
+    Refinement stops once all errors are within tolerance or once the budget
+    of simulations is spent, in which case the intervals with the largest
+    errors are split first.  Each simulation is written to its own subfolder
+    of ``path``.
+
+    Since errors are estimated from sampled energies, a resonance that is
+    much narrower than the spacing of the initial grid can be missed
+    entirely.  The initial grid should be fine enough that each feature of
+    interest affects at least one sampled energy.
+
+    :param configuration: :py:class:`Configuration` object of the simulation
+        at every energy
+    :param energies: Initial grid of at least three distinct energies
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns a real value or a 1D array of
+        real values (|eg| the total reaction and elastic cross sections).
+        Use :py:func:`open_output` to read compressed results.
+    :param path: Path to folder in which to write the results of all
+        simulations
+    :param tolerance: Largest acceptable error of interpolation relative to
+        the largest magnitude of each observable
+    :param max_runs: Largest number of simulations to run including those of
+        the initial grid
+    :param min_spacing: Intervals no wider than twice this are not split,
+        which limits refinement at discontinuities such as thresholds
+    :param parameter: Name of the energy parameter
+    :param n_workers: Number of simulations to run concurrently
+    :param overwrite: If False, then an error is raised if any of the
+        simulation input or output files exist
+    :param mpi_setup: `dict` that provides MPI setup values used for every
+        simulation if executable built with MPI; `None`, otherwise.
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record all simulations
+    :return: :py:class:`EnergySweep` whose
+        :py:meth:`EnergySweep.interpolate` evaluates the interpolant
+    """
+    run = functools.partial(run_batch,
+                            n_workers=n_workers,
+                            overwrite=overwrite,
+                            mpi_setup=mpi_setup,
+                            compression=compression,
+                            compression_level=compression_level,
+                            index=index)
+    return refine_energies(run, configuration, energies, observable, path,
+                           tolerance, max_runs=max_runs,
+                           min_spacing=min_spacing, parameter=parameter)
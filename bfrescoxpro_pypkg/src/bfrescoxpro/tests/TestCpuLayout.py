@@ -0,0 +1,79 @@
+"""
+Automatic unittest of CpuLayout class
+"""
+
+import io
+import os
+import unittest
+
+from unittest import mock
+from contextlib import redirect_stdout
+
+import bfrescoxpro
+
+from .reference import (reference_configuration, temporary_folder,
+                        smallest_parallel_setup)
+
+
+@unittest.skipUnless(hasattr(os, "sched_setaffinity"),
+                     "CPU affinity not supported")
+class TestCpuLayout(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__config = reference_configuration()
+        self.__cpus = os.sched_getaffinity(0)
+        self.__mpi_setup = smallest_parallel_setup(self)
+
+    def testPartition(self):
+        for n_slots in range(1, min(len(self.__cpus), 4) + 1):
+            layout = bfrescoxpro.CpuLayout(n_slots)
+            self.assertEqual(n_slots, layout.n_slots)
+
+            used = set()
+            for i, slot in enumerate(layout.slots):
+                self.assertEqual(i, slot.index)
+                self.assertTrue(len(slot.cpus) > 0)
+                self.assertTrue(len(slot.numa_nodes) > 0)
+                self.assertTrue(used.isdisjoint(slot.cpus))
+                used.update(slot.cpus)
+
+                env = layout.environment(slot)
+                self.assertEqual(str(len(slot.cpus)), env["OMP_NUM_THREADS"])
+                self.assertEqual(len(slot.cpus),
+                                 len(env["OMP_PLACES"].split(",")))
+                self.assertEqual("close", env["OMP_PROC_BIND"])
+            self.assertEqual(self.__cpus, used)
+
+            with redirect_stdout(io.StringIO()) as buffer:
+                layout.print_report()
+            self.assertEqual(n_slots + 3, len(buffer.getvalue().splitlines()))
+
+        with self.assertRaises(ValueError):
+            bfrescoxpro.CpuLayout(0)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.CpuLayout(len(self.__cpus) + 1)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.CpuLayout(1, cpus=[max(self.__cpus) + 1])
+        with self.assertRaises(TypeError):
+            bfrescoxpro.create_runner(layout=self.__cpus)
+
+    def testPlacement(self):
+        N_POINTS = 4
+
+        n_slots = min(len(self.__cpus), 2)
+        layout = bfrescoxpro.CpuLayout(n_slots)
+        configurations = [self.__config] * N_POINTS
+        filenames = [self.__path.joinpath(str(i), "frescox.out")
+                     for i in range(N_POINTS)]
+        # OMP_NUM_THREADS is given by the layout
+        with mock.patch.dict(os.environ):
+            os.environ.pop("OMP_NUM_THREADS", None)
+            results = list(bfrescoxpro.run_batch(configurations, filenames,
+                                                 n_workers=n_slots,
+                                                 mpi_setup=self.__mpi_setup,
+                                                 layout=layout))
+        for result in results:
+            self.assertEqual(bfrescoxpro.RUN_SUCCEEDED, result.status)
+
+        # The calling thread is not left restricted
+        self.assertEqual(self.__cpus, os.sched_getaffinity(0))
@@ -0,0 +1,90 @@
+"""
+Automatic unittest of find_converged_settings() function
+"""
+
+import io
+import unittest
+
+import numpy as np
+
+from pathlib import Path
+from contextlib import redirect_stdout
+
+import bfrescoxpro
+
+from .reference import (reference_configuration, temporary_folder,
+                        smallest_parallel_setup)
+
+
+SETTINGS = {
+    "fresco.hcm": [0.2, 0.1, 0.05, 0.025],
+    "fresco.rmatch": [20.0, 40.0, 80.0, 160.0]
+}
+
+
+def observable(filename):
+    """
+    Observable with known discretization errors computed from the simulation's
+    inputs, which are written alongside its results
+    """
+    config = bfrescoxpro.Configuration.from_NML(
+        Path(filename).parent.joinpath("frescox.in")
+    )
+    theta = np.linspace(0.0, 180.0, 37)
+    error = config["fresco.hcm"]**2 + 1.0 / config["fresco.rmatch"]**2
+    return theta, np.cos(np.radians(theta)) + error
+
+
+class TestFindConvergedSettings(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__config = reference_configuration()
+        self.__mpi_setup = smallest_parallel_setup(self)
+
+    def testConverge(self):
+        # Individually, hcm=0.05 and rmatch=20 are within tolerance but their
+        # errors accumulate so that rmatch must be refined
+        result = bfrescoxpro.find_converged_settings(
+            self.__config, SETTINGS, observable, self.__path, 3.0e-3,
+            n_workers=2, mpi_setup=self.__mpi_setup
+        )
+        expected = {"fresco.hcm": 0.05, "fresco.rmatch": 40.0}
+        self.assertEqual(expected, result.settings)
+        self.assertTrue(result.error <= 3.0e-3)
+        self.assertEqual(0.0, result.reference.error)
+        self.assertEqual({"fresco.hcm": 0.025, "fresco.rmatch": 160.0},
+                         result.reference.settings)
+        # Each value individually and two combinations
+        self.assertEqual(3 + 3 + 2, len(result.trials))
+
+        config = result.apply(self.__config)
+        self.assertEqual(0.05, config["fresco.hcm"])
+        self.assertEqual(40.0, config["fresco.rmatch"])
+        self.assertEqual(0.1, self.__config["fresco.hcm"])
+
+        fname = self.__path.joinpath("converged.json")
+        result.save(fname)
+        self.assertEqual(result, bfrescoxpro.ConvergenceResult.load(fname))
+
+        with redirect_stdout(io.StringIO()) as output:
+            result.print_report()
+        self.assertTrue(len(output.getvalue().split("\n")) > len(SETTINGS))
+
+    def testMostRefined(self):
+        result = bfrescoxpro.find_converged_settings(
+            self.__config, SETTINGS, observable, self.__path, 1.0e-8,
+            mpi_setup=self.__mpi_setup
+        )
+        self.assertEqual(result.reference.settings, result.settings)
+        self.assertEqual(0.0, result.error)
+
+    def testBadArguments(self):
+        with self.assertRaises(ValueError):
+            bfrescoxpro.find_converged_settings(
+                self.__config, {"fresco.nosuch": [1, 2]}, observable,
+                self.__path, 1.0e-3
+            )
+        with self.assertRaises(ValueError):
+            bfrescoxpro.find_converged_settings(
+                self.__config, SETTINGS, observable, self.__path, 0.0
+            )
@@ -0,0 +1,69 @@
+"""
+Automatic unittest of profile_simulation() function
+"""
+
+import io
+import shutil
+import unittest
+
+from contextlib import redirect_stdout
+
+import bfrescoxpro
+
+from .reference import (REFERENCE_INPUT, reference_configuration,
+                        temporary_folder, change_folder)
+
+
+@unittest.skipUnless(
+    (bfrescoxpro.VARIANT_PROFILE in bfrescoxpro.variants()) and
+    (shutil.which("gprof") is not None),
+    "Profile variant or gprof not available"
+)
+class TestProfileSimulation(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        change_folder(self, self.__path)
+        self.__config = reference_configuration()
+
+    def testProfile(self):
+        fname = self.__path.joinpath("frescox.out")
+        profile = bfrescoxpro.profile_simulation(self.__config, fname)
+
+        self.assertTrue(fname.is_file())
+        self.assertTrue(self.__path.joinpath("frescox.in").is_file())
+        self.assertTrue(profile.wall_time > 0.0)
+        self.assertTrue(profile.sampled_time >= 0.0)
+        self.assertTrue(len(profile.routines) > 0)
+
+        self_times = [each.self_time for each in profile.routines]
+        self.assertEqual(sorted(self_times, reverse=True), self_times)
+        self.assertAlmostEqual(profile.sampled_time, sum(self_times))
+        for routine in profile.routines:
+            self.assertTrue(isinstance(routine, bfrescoxpro.RoutineProfile))
+            self.assertTrue(routine.name != "")
+            self.assertTrue(0.0 <= routine.percent <= 100.0)
+            if routine.calls is not None:
+                self.assertTrue(routine.calls >= 0)
+                self.assertTrue(routine.total_per_call >=
+                                routine.self_per_call)
+        if profile.sampled_time > 0.0:
+            total = sum(each.percent for each in profile.routines)
+            self.assertAlmostEqual(100.0, total, delta=1.0)
+
+        with redirect_stdout(io.StringIO()) as buffer:
+            profile.print_report(n_routines=1)
+        self.assertTrue(profile.routines[0].name in buffer.getvalue())
+
+        # Results are protected as for run_simulation
+        with self.assertRaises(RuntimeError):
+            bfrescoxpro.profile_simulation(self.__config, fname)
+        profile = bfrescoxpro.profile_simulation(self.__config, fname,
+                                                 overwrite=True)
+        self.assertTrue(len(profile.routines) > 0)
+
+    def testBadArguments(self):
+        fname = self.__path.joinpath("frescox.out")
+        with self.assertRaises(TypeError):
+            bfrescoxpro.profile_simulation(REFERENCE_INPUT, fname)
+        with self.assertRaises(TypeError):
+            bfrescoxpro.profile_simulation(self.__config, None)
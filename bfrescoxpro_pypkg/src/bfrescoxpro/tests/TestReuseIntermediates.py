@@ -0,0 +1,151 @@
+"""
+Automatic unittest of reuse_intermediates() function
+"""
+
+import io
+import unittest
+import contextlib
+
+from pathlib import Path
+
+import bfrescoxpro
+
+from .reference import (reference_configuration, temporary_folder,
+                        smallest_parallel_setup)
+
+# Frescox writes angular distributions to this unit in its working directory
+UNIT = 16
+
+
+def observable(filename):
+    """
+    Depth of the nuclear potential read from the simulation's inputs, which
+    are written alongside its results
+    """
+    config = bfrescoxpro.Configuration.from_NML(
+        Path(filename).parent.joinpath("frescox.in")
+    )
+    return config["pot[1].p1"]
+
+
+class TestReuseIntermediates(unittest.TestCase):
+    def setUp(self):
+        N_POINTS = 5
+        self.__mpi_setup = smallest_parallel_setup(self)
+
+        self.__path = temporary_folder(self)
+
+        self.__configs = []
+        for i in range(N_POINTS):
+            config = reference_configuration()
+            config["pot[1].p1"] = 40.0 + i
+            self.__configs.append(config)
+        self.__fnames = [self.__path.joinpath(f"point_{i}", "frescox.out")
+                         for i in range(N_POINTS)]
+
+    def testSharedGroups(self):
+        groups = bfrescoxpro.shared_groups(self.__configs)
+        self.assertTrue("pot[1]" not in groups)
+        for name in ["fresco", "partition[0]", "states", "pot[0]"]:
+            self.assertTrue(name in groups)
+        self.assertEqual([], bfrescoxpro.shared_groups([]))
+
+    def testReuse(self):
+        shared = bfrescoxpro.SharedFile(UNIT, ["states", "pot[0]"], {}, {})
+        self.assertEqual(f"fort.{UNIT}", shared.filename)
+
+        report = bfrescoxpro.reuse_intermediates(self.__configs, self.__fnames,
+                                                 [shared], observable,
+                                                 n_workers=2,
+                                                 mpi_setup=self.__mpi_setup)
+
+        N_POINTS = len(self.__configs)
+        self.assertEqual(N_POINTS, len(report.results))
+        for i, (result, fname) in enumerate(zip(report.results,
+                                                self.__fnames)):
+            self.assertEqual(i, result.point)
+            self.assertEqual(bfrescoxpro.RUN_SUCCEEDED, result.status)
+            self.assertEqual(fname, result.filename)
+            # Each simulation ran in its own folder
+            self.assertTrue(fname.parent.joinpath(shared.filename).is_file())
+            self.assertEqual(40.0 + i, observable(fname))
+        self.assertEqual(1, report.n_producers)
+        self.assertEqual(N_POINTS - 1, report.n_consumers)
+        self.assertEqual([1], report.checked)
+        self.assertEqual(0.0, report.max_difference)
+        self.assertTrue(self.__fnames[1].parent.joinpath(
+            bfrescoxpro.CHECK_FOLDER, "frescox.out"
+        ).is_file())
+        self.assertTrue(report.full_time > 0.0)
+        self.assertTrue(report.reuse_time > 0.0)
+
+        with contextlib.redirect_stdout(io.StringIO()) as fptr:
+            report.print_report()
+        self.assertTrue("Estimated time saved" in fptr.getvalue())
+
+    def testNoSharing(self):
+        shared = bfrescoxpro.SharedFile(UNIT, ["pot[1]"], {}, {})
+        report = bfrescoxpro.reuse_intermediates(self.__configs, self.__fnames,
+                                                 [shared], n_checks=0,
+                                                 mpi_setup=self.__mpi_setup)
+        self.assertEqual(0, report.n_producers)
+        self.assertEqual(0, report.n_consumers)
+        self.assertEqual([], report.checked)
+        self.assertIsNone(report.time_saved)
+        for result in report.results:
+            self.assertEqual(bfrescoxpro.RUN_SUCCEEDED, result.status)
+
+    def testFailedCheck(self):
+        def differs(filename):
+            return float(bfrescoxpro.CHECK_FOLDER in str(filename))
+
+        shared = bfrescoxpro.SharedFile(UNIT, ["states"], {}, {})
+        with self.assertRaises(RuntimeError):
+            bfrescoxpro.reuse_intermediates(self.__configs, self.__fnames,
+                                            [shared], differs,
+                                            mpi_setup=self.__mpi_setup)
+        # Only the producer and the check ran
+        self.assertFalse(self.__fnames[-1].exists())
+
+    def testMissingFile(self):
+        shared = bfrescoxpro.SharedFile(97, ["states"], {}, {})
+        with self.assertRaises(RuntimeError):
+            bfrescoxpro.reuse_intermediates(self.__configs, self.__fnames,
+                                            [shared], observable,
+                                            mpi_setup=self.__mpi_setup)
+
+    def testBadArguments(self):
+        shared = bfrescoxpro.SharedFile(UNIT, ["states"], {}, {})
+        with self.assertRaises(TypeError):
+            bfrescoxpro.reuse_intermediates(self.__configs, self.__fnames,
+                                            [None], observable,
+                                            mpi_setup=self.__mpi_setup)
+        with self.assertRaises(TypeError):
+            bfrescoxpro.reuse_intermediates(self.__configs, self.__fnames,
+                                            [shared],
+                                            mpi_setup=self.__mpi_setup)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.reuse_intermediates(self.__configs, self.__fnames[:-1],
+                                            [shared], observable,
+                                            mpi_setup=self.__mpi_setup)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.reuse_intermediates(self.__configs, self.__fnames,
+                                            [shared, shared], observable,
+                                            mpi_setup=self.__mpi_setup)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.reuse_intermediates(
+                self.__configs, self.__fnames,
+                [bfrescoxpro.SharedFile(UNIT, ["pot[9]"], {}, {})], observable,
+                mpi_setup=self.__mpi_setup
+            )
+        with self.assertRaises(ValueError):
+            bfrescoxpro.reuse_intermediates(
+                self.__configs, self.__fnames,
+                [bfrescoxpro.SharedFile(UNIT, ["states"],
+                                        {"overlap[3].nfl": 1}, {})],
+                observable, mpi_setup=self.__mpi_setup
+            )
+        with self.assertRaises(ValueError):
+            bfrescoxpro.reuse_intermediates(self.__configs, self.__fnames,
+                                            [shared], observable, n_checks=-1,
+                                            mpi_setup=self.__mpi_setup)
@@ -0,0 +1,185 @@
+"""
+Automatic unittest of run_batch() function and run-batch command
+"""
+
+import io
+import csv
+import filecmp
+import unittest
+
+import numpy as np
+
+from pathlib import Path
+from contextlib import redirect_stderr
+
+import bfrescoxpro
+import bfrescoxpro.cli
+
+from .reference import temporary_folder, smallest_parallel_setup
+
+TEMPLATE = """p+Ni78 Coulomb + Nuclear
+NAMELIST
+&FRESCO hcm=0.1 rmatch=60.0
+    jtmin=0.0 jtmax=60.0 absend= 0.01
+  thmin=0.00 thmax=180.00 thinc=1.00
+    iter=0 ips=0.0 iblock=0 chans=1 smats=2  xstabl=1
+  wdisk=2
+    elab(1)=@E@ treneg=1 /
+
+ &PARTITION namep='projectile' massp=1 zp=1
+            namet='target'   masst=78 zt=28 qval=-0.000 nex=1  /
+ &STATES jp=0.5 bandp=1 ep=0.0000 cpot=1 jt=0.0 bandt=1 et=0.0 /
+ &partition /
+
+ &POT kp=1 ap=1 at=78 rc=1.2  /
+ &POT kp=1 type=1  p1=@V@ p2=1.2 p3=0.65 p4=10.0 p5=1.2 p6=0.65 /
+ &pot /
+ &overlap /
+ &coupling /
+"""
+
+
+class TestRunBatch(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__template = self.__path.joinpath("template.in")
+        with open(self.__template, "w") as fptr:
+            fptr.write(TEMPLATE)
+        self.__mpi_setup = smallest_parallel_setup(self)
+
+    def testRunBatch(self):
+        points = [{"E": 30.0, "V": 45.0},
+                  {"E": 40.0, "V": 50.0},
+                  {"E": 50.0, "V": 55.0}]
+        configurations = [
+            bfrescoxpro.Configuration.from_template_string(TEMPLATE, each)
+            for each in points
+        ]
+        filenames = [self.__path.joinpath(f"run_{i}", "frescox.out")
+                     for i in range(len(points))]
+
+        # Existing result is not overwritten
+        filenames[1].parent.mkdir()
+        filenames[1].touch()
+
+        results = list(bfrescoxpro.run_batch(configurations, filenames,
+                                             n_workers=2,
+                                             mpi_setup=self.__mpi_setup))
+        self.assertEqual([0, 1, 2], sorted(each.point for each in results))
+        for result in results:
+            self.assertEqual(filenames[result.point], result.filename)
+            if result.point == 1:
+                self.assertEqual(bfrescoxpro.RUN_FAILED, result.status)
+                self.assertIsNotNone(result.error)
+            else:
+                self.assertEqual(bfrescoxpro.RUN_SUCCEEDED, result.status)
+                self.assertIsNone(result.error)
+                self.assertTrue(result.filename.stat().st_size > 0)
+                loaded = bfrescoxpro.Configuration.from_NML(
+                    result.filename.parent.joinpath("frescox.in")
+                )
+                self.assertEqual(configurations[result.point], loaded)
+
+    def testBadArguments(self):
+        config = bfrescoxpro.Configuration.from_template_string(
+            TEMPLATE, {"E": 30.0, "V": 45.0}
+        )
+        fname = self.__path.joinpath("run_0", "frescox.out")
+        # Errors are raised before any outcome is requested
+        for bad in [0, -1, 1.0, None]:
+            with self.assertRaises(ValueError):
+                bfrescoxpro.run_batch([config], [fname], n_workers=bad)
+        with self.assertRaises(TypeError):
+            bfrescoxpro.run_batch([config], [fname], overwrite=1)
+        self.assertFalse(fname.parent.exists())
+
+    def testClose(self):
+        N_POINTS = 6
+        configurations = [
+            bfrescoxpro.Configuration.from_template_string(
+                TEMPLATE, {"E": 30.0 + i, "V": 45.0}
+            )
+            for i in range(N_POINTS)
+        ]
+        filenames = [self.__path.joinpath(f"run_{i}", "frescox.out")
+                     for i in range(N_POINTS)]
+
+        with bfrescoxpro.run_batch(configurations, filenames,
+                                   n_workers=1) as results:
+            self.assertEqual(bfrescoxpro.RUN_SUCCEEDED, next(results).status)
+        # Closing the batch stops it
+        with self.assertRaises(StopIteration):
+            next(results)
+        n_run = sum(each.exists() for each in filenames)
+        self.assertTrue(n_run < N_POINTS)
+
+    def testAuxiliaryFiles(self):
+        # Potential depths whose inputs all have different lengths
+        points = [{"E": 30.0, "V": V} for V in [5.0, 45.0, 145.0, 1045.0]]
+        configurations = [
+            bfrescoxpro.Configuration.from_template_string(TEMPLATE, each)
+            for each in points
+        ]
+        filenames = [self.__path.joinpath(f"run_{i}", "frescox.out")
+                     for i in range(len(points))]
+
+        results = list(bfrescoxpro.run_batch(configurations, filenames,
+                                             n_workers=2,
+                                             mpi_setup=self.__mpi_setup))
+        self.assertTrue(all(each.status == bfrescoxpro.RUN_SUCCEEDED
+                            for each in results))
+
+        # Concurrent simulations each wrote their own auxiliary files, which
+        # are those of the same simulation run alone
+        for config, fname in zip(configurations, filenames):
+            alone = self.__path.joinpath("alone", fname.parent.name,
+                                         "frescox.out")
+            alone.parent.mkdir(parents=True)
+            bfrescoxpro.run_simulation(config, alone,
+                                       mpi_setup=self.__mpi_setup,
+                                       isolated=True)
+            self.assertTrue(filecmp.cmp(
+                alone.parent.joinpath("fort.16"),
+                fname.parent.joinpath("fort.16"), shallow=False
+            ))
+
+    def testCommand(self):
+        table = np.array([(30.0, 45.0), (40.0, 50.0)],
+                         dtype=[("E", float), ("V", float)])
+        fname_table = self.__path.joinpath("table.npy")
+        np.save(fname_table, table)
+        fname_results = self.__path.joinpath("results.csv")
+
+        argv = ["run-batch", str(self.__template), str(fname_table),
+                "--output-dir", str(self.__path.joinpath("batch")),
+                "--workers", "2",
+                "--results", str(fname_results)]
+        if self.__mpi_setup is not None:
+            argv += ["--mpi-processes", "1"]
+        with redirect_stderr(io.StringIO()):
+            status = bfrescoxpro.cli.main(argv)
+        self.assertEqual(0, status)
+
+        with open(fname_results, "r", newline="") as fptr:
+            rows = list(csv.DictReader(fptr))
+        self.assertEqual(2, len(rows))
+        for row in rows:
+            self.assertEqual(bfrescoxpro.RUN_SUCCEEDED, row["status"])
+            point = int(row["point"])
+            self.assertEqual(table[point]["E"], float(row["E"]))
+            self.assertTrue(Path(row["filename"]).is_file())
+
+    def testBadTable(self):
+        fname_table = self.__path.joinpath("table.csv")
+        for table in ["E,V\n30.0,45.0\n40.0\n",
+                      "E,V\n30.0,45.0,1.0\n",
+                      "E,E\n30.0,45.0\n",
+                      ""]:
+            with open(fname_table, "w") as fptr:
+                fptr.write(table)
+            with self.assertRaises(ValueError):
+                bfrescoxpro.cli.main([
+                    "run-batch", str(self.__template), str(fname_table),
+                    "--output-dir", str(self.__path.joinpath("batch"))
+                ])
+        self.assertFalse(self.__path.joinpath("batch").exists())
@@ -0,0 +1,173 @@
+"""
+Automatic unittest of Runner class
+"""
+
+import io
+import os
+import unittest
+
+from unittest import mock
+from contextlib import redirect_stdout
+
+import bfrescoxpro
+
+from .reference import (reference_configuration, temporary_folder,
+                        change_folder, smallest_parallel_setup)
+
+
+class TestRunner(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        change_folder(self, self.__path)
+        self.__config = reference_configuration()
+        self.__mpi_setup = smallest_parallel_setup(self)
+
+    def __filename(self, name):
+        path = self.__path.joinpath(name)
+        path.mkdir()
+        return path.joinpath("frescox.out")
+
+    def testRun(self):
+        N_RUNS = 3
+
+        with bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup) as runner:
+            self.assertTrue(len(runner.command) > 0)
+            for i in range(N_RUNS):
+                config = reference_configuration()
+                config["pot[1].p1"] = 40.0 + i
+                fname = self.__filename(f"run_{i}")
+                statistics = runner.run(config, fname)
+
+                self.assertTrue(statistics.wall_time > 0.0)
+                self.assertTrue(statistics.peak_memory > 0)
+                self.assertTrue(fname.stat().st_size > 0)
+                loaded = bfrescoxpro.Configuration.from_NML(
+                    fname.parent.joinpath("frescox.in")
+                )
+                self.assertEqual(config, loaded)
+
+    def testOverwrite(self):
+        fname = self.__filename("run")
+        with bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup) as runner:
+            runner.run(self.__config, fname)
+            with self.assertRaises(RuntimeError):
+                runner.run(self.__config, fname)
+            size = fname.stat().st_size
+            runner.run(self.__config, fname, overwrite=True)
+            self.assertEqual(size, fname.stat().st_size)
+
+            # Existing inputs are not overwritten either
+            fname.unlink()
+            with self.assertRaises(RuntimeError):
+                runner.run(self.__config, fname)
+            self.assertFalse(fname.exists())
+
+    def testIsolated(self):
+        # Tests run from the temporary folder
+        fname = self.__filename("shared")
+        with bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup,
+                                       isolated=False) as runner:
+            runner.run(self.__config, fname)
+        self.assertTrue(self.__path.joinpath("fort.16").is_file())
+        self.assertFalse(fname.parent.joinpath("fort.16").exists())
+
+        self.__path.joinpath("fort.16").unlink()
+        fname = self.__filename("isolated")
+        with bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup,
+                                       isolated=True) as runner:
+            runner.run(self.__config, fname)
+        self.assertFalse(self.__path.joinpath("fort.16").exists())
+        self.assertTrue(fname.parent.joinpath("fort.16").is_file())
+
+    def testCompression(self):
+        fname = self.__filename("plain")
+        fname_zip = self.__filename("gzip")
+        with bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup) as runner:
+            runner.run(self.__config, fname)
+        with bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup,
+                                       compression="gzip") as runner:
+            runner.run(self.__config, fname_zip)
+
+        with open(fname, "rb") as fptr:
+            self.assertNotEqual(fptr.read(2), b"\x1f\x8b")
+        with open(fname_zip, "rb") as fptr:
+            self.assertEqual(fptr.read(2), b"\x1f\x8b")
+        with bfrescoxpro.open_output(fname) as fptr:
+            expected = fptr.read()
+        with bfrescoxpro.open_output(fname_zip) as fptr:
+            self.assertEqual(expected, fptr.read())
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"),
+                         "Open file descriptors cannot be listed")
+    def testCompressorFailure(self):
+        fname = self.__filename("gzip")
+        with bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup,
+                                       compression="gzip") as runner:
+            n_open = len(os.listdir("/proc/self/fd"))
+            # The compressor is the first process started
+            with mock.patch(
+                "bfrescoxpro._run_frescox_simulation._spawn",
+                side_effect=OSError("Cannot start compressor")
+            ):
+                with self.assertRaises(OSError):
+                    runner.run(self.__config, fname)
+            self.assertEqual(n_open, len(os.listdir("/proc/self/fd")))
+
+    def testLaunchFailure(self):
+        fname_index = self.__path.joinpath("index.sqlite")
+        with bfrescoxpro.create_runner(index=fname_index) as runner:
+            with mock.patch(
+                "bfrescoxpro._run_frescox_simulation._spawn",
+                side_effect=OSError("Cannot start Frescox")
+            ):
+                with redirect_stdout(io.StringIO()):
+                    with self.assertRaises(OSError):
+                        runner.run(self.__config, self.__filename("run"))
+
+        # The failure is recorded like that of a simulation that failed
+        with bfrescoxpro.RunIndex(fname_index) as index:
+            runs = index.query()
+        self.assertEqual(1, len(runs))
+        self.assertEqual(bfrescoxpro.RUN_FAILED, runs[0].status)
+
+    def testIndex(self):
+        fname_index = self.__path.joinpath("index.sqlite")
+        with bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup,
+                                       index=fname_index) as runner:
+            runner.run(self.__config, self.__filename("run"))
+
+        with bfrescoxpro.RunIndex(fname_index) as index:
+            runs = index.query()
+        self.assertEqual(1, len(runs))
+        self.assertEqual(bfrescoxpro.RUN_SUCCEEDED, runs[0].status)
+        self.assertTrue(runs[0].peak_memory > 0)
+        self.assertEqual(self.__config, runs[0].configuration())
+
+    def testOutputs(self):
+        OUTPUTS = [bfrescoxpro.OUTPUT_CROSS_SECTIONS]
+
+        fname_index = self.__path.joinpath("index.sqlite")
+        fname = self.__filename("run")
+        with bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup,
+                                       index=fname_index,
+                                       outputs=OUTPUTS) as runner:
+            runner.run(self.__config, fname)
+
+        trimmed = self.__config.with_outputs(OUTPUTS)
+        self.assertNotEqual(self.__config, trimmed)
+        self.assertEqual(trimmed, bfrescoxpro.Configuration.from_NML(
+            fname.parent.joinpath("frescox.in")
+        ))
+        self.assertTrue(fname.stat().st_size > 0)
+        # The index records the configuration that was run
+        with bfrescoxpro.RunIndex(fname_index) as index:
+            self.assertEqual(trimmed, index.query()[0].configuration())
+
+        with self.assertRaises(ValueError):
+            bfrescoxpro.create_runner(mpi_setup=self.__mpi_setup,
+                                      outputs=["bad output"])
+        with self.assertRaises(TypeError):
+            bfrescoxpro.create_runner(
+                mpi_setup=self.__mpi_setup,
+                outputs=bfrescoxpro.OUTPUT_CROSS_SECTIONS
+            )
@@ -0,0 +1,127 @@
+"""
+Automatic unittest of variants() and select_variant() functions
+"""
+
+import os
+import unittest
+import warnings
+
+from unittest import mock
+
+import bfrescoxpro
+
+from .reference import (REFERENCE_INPUT, reference_configuration,
+                        temporary_folder, change_folder)
+
+
+class TestSelectVariant(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        change_folder(self, self.__path)
+        self.__config = reference_configuration()
+        self.__built = bfrescoxpro.variants()
+
+        # OpenMP variants can always be run while MPI variants can only be run
+        # if the default installation was built with MPI
+        info = bfrescoxpro.information()
+        self.__mpi_setup = None
+        if info[bfrescoxpro.FRESCOX_MPI_SUPPORT]:
+            self.__mpi_setup = {bfrescoxpro.MPI_N_PROCESSES: 1}
+        self.__env = mock.patch.dict(os.environ, {"OMP_NUM_THREADS": "1"})
+        self.__env.start()
+
+    def tearDown(self):
+        self.__env.stop()
+
+    def testVariants(self):
+        self.assertTrue(set(self.__built).issubset(bfrescoxpro.VARIANTS))
+
+        expected = {
+            bfrescoxpro.VARIANT_SERIAL: (False, False),
+            bfrescoxpro.VARIANT_OPENMP: (False, True),
+            bfrescoxpro.VARIANT_MPI: (True, False),
+            bfrescoxpro.VARIANT_PROFILE: (False, False)
+        }
+        for name in bfrescoxpro.VARIANTS:
+            if name not in self.__built:
+                with self.assertRaises(RuntimeError):
+                    bfrescoxpro.information(name)
+                continue
+
+            info = self.__built[name]
+            self.assertEqual(info, bfrescoxpro.information(name))
+            self.assertTrue(info[bfrescoxpro.FRESCOX_EXE].is_file())
+            self.assertEqual(expected[name],
+                             (info[bfrescoxpro.FRESCOX_MPI_SUPPORT],
+                              info[bfrescoxpro.FRESCOX_OPENMP_SUPPORT]))
+
+        with self.assertRaises(ValueError):
+            bfrescoxpro.information("unknown")
+
+    def testSelect(self):
+        # Size grows with the number of partial waves and channels
+        size = bfrescoxpro.problem_size(self.__config)
+        self.assertAlmostEqual(600.0 * 61.0, size)
+        large = reference_configuration()
+        large["fresco.jtmax"] = 600.0
+        self.assertTrue(bfrescoxpro.problem_size(large) > size)
+
+        name, info = bfrescoxpro.select_variant(self.__config)
+        if bfrescoxpro.VARIANT_SERIAL in self.__built:
+            self.assertEqual(bfrescoxpro.VARIANT_SERIAL, name)
+        if name is None:
+            self.assertEqual(bfrescoxpro.information(), info)
+        else:
+            self.assertEqual(self.__built[name], info)
+
+        name, _ = bfrescoxpro.select_variant(self.__config, openmp_size=0.0)
+        if bfrescoxpro.VARIANT_OPENMP in self.__built:
+            self.assertEqual(bfrescoxpro.VARIANT_OPENMP, name)
+
+        # MPI variants are selected only if there is an MPI setup
+        name, _ = bfrescoxpro.select_variant(self.__config, mpi_size=0.0)
+        self.assertNotEqual(bfrescoxpro.VARIANT_MPI, name)
+
+        # Explicitly requested variants that are missing are replaced
+        for name in bfrescoxpro.VARIANTS:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                selected, _ = bfrescoxpro.select_variant(
+                    variant=name, mpi_setup={bfrescoxpro.MPI_N_PROCESSES: 1}
+                )
+            self.assertEqual(name != selected, len(caught) > 0)
+            if name in self.__built:
+                self.assertEqual(name, selected)
+
+        with self.assertRaises(ValueError):
+            bfrescoxpro.select_variant(self.__config, variant="unknown")
+        with self.assertRaises(TypeError):
+            bfrescoxpro.select_variant(REFERENCE_INPUT)
+
+    def testRun(self):
+        N_POINTS = 3
+
+        fname = self.__path.joinpath("single", "frescox.out")
+        fname.parent.mkdir()
+        statistics = bfrescoxpro.run_simulation(
+            self.__config, fname, mpi_setup=self.__mpi_setup,
+            variant=bfrescoxpro.VARIANT_AUTO
+        )
+        self.assertTrue(statistics.wall_time > 0.0)
+        self.assertTrue(fname.is_file())
+
+        configurations = [self.__config] * N_POINTS
+        filenames = [self.__path.joinpath(str(i), "frescox.out")
+                     for i in range(N_POINTS)]
+        results = list(bfrescoxpro.run_batch(
+            configurations, filenames, n_workers=2,
+            mpi_setup=self.__mpi_setup, variant=bfrescoxpro.VARIANT_AUTO
+        ))
+        self.assertEqual(N_POINTS, len(results))
+        for result in results:
+            self.assertEqual(bfrescoxpro.RUN_SUCCEEDED, result.status)
+
+        with self.assertRaises(ValueError):
+            bfrescoxpro.create_runner(variant=bfrescoxpro.VARIANT_AUTO)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.create_runner(variant="unknown")
@@ -0,0 +1,140 @@
+"""
+Automatic unittest of Server class and run_via_server() function
+"""
+
+import os
+import time
+import stat
+import unittest
+import threading
+
+from pathlib import Path
+
+import bfrescoxpro
+
+from .reference import (REFERENCE_INPUT, reference_configuration,
+                        temporary_folder, smallest_parallel_setup)
+
+TIMEOUT = 30.0
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__socket = self.__path.joinpath("server.sock")
+        self.__config = reference_configuration()
+        self.__mpi_setup = smallest_parallel_setup(self)
+
+    def __wait_for_requests(self, server, n_requests):
+        start = time.time()
+        while server.statistics.n_requests < n_requests:
+            self.assertTrue(time.time() - start < TIMEOUT)
+            time.sleep(0.01)
+
+    def testRun(self):
+        fname = self.__path.joinpath("frescox.out")
+        with bfrescoxpro.create_server(path=self.__socket, n_workers=2,
+                                       mpi_setup=self.__mpi_setup) as server:
+            self.assertEqual(self.__socket, server.path)
+            self.assertEqual(2, server.n_workers)
+            self.assertTrue(self.__socket.exists())
+            # Only the user running the server can connect
+            mode = stat.S_IMODE(os.stat(self.__socket).st_mode)
+            self.assertEqual(0, mode & 0o077)
+
+            statistics = bfrescoxpro.run_via_server(self.__config, fname,
+                                                    path=self.__socket)
+            self.assertTrue(isinstance(statistics, bfrescoxpro.RunStatistics))
+            self.assertTrue(statistics.wall_time > 0.0)
+            self.assertTrue(fname.is_file())
+            self.assertTrue(self.__path.joinpath("frescox.in").is_file())
+            # Auxiliary files are kept with the results
+            self.assertTrue(self.__path.joinpath("fort.16").is_file())
+
+            # Errors of the simulation are raised by the client
+            with self.assertRaises(RuntimeError):
+                bfrescoxpro.run_via_server(self.__config, fname,
+                                           path=self.__socket)
+            bfrescoxpro.run_via_server(self.__config, fname, overwrite=True,
+                                       path=self.__socket)
+
+            self.assertEqual(bfrescoxpro.ServerStatistics(3, 0, 3, 0, 0),
+                             server.statistics)
+
+        # Closing the server removes its socket
+        self.assertFalse(self.__socket.exists())
+        with self.assertRaises(RuntimeError):
+            bfrescoxpro.run_via_server(self.__config, fname, overwrite=True,
+                                       path=self.__socket)
+
+    def testSharing(self):
+        # Hold each simulation until the test releases it so that requests
+        # can be queued behind it
+        gate = threading.Event()
+        started = []
+
+        def hold(event):
+            if event.filename not in started:
+                started.append(event.filename)
+            gate.wait(TIMEOUT)
+
+        def request(name, client):
+            fname = self.__path.joinpath(name, "frescox.out")
+            bfrescoxpro.run_via_server(self.__config, fname,
+                                       path=self.__socket, client=client)
+
+        for name in ["held", "a1", "a2", "a3", "b1"]:
+            self.__path.joinpath(name).mkdir()
+
+        monitor = bfrescoxpro.Monitor(callback=hold)
+        requests = [("held", "a"), ("held", "b"), ("a1", "a"), ("a2", "a"),
+                    ("a3", "a"), ("b1", "b")]
+        threads = []
+        with bfrescoxpro.create_server(path=self.__socket, n_workers=1,
+                                       mpi_setup=self.__mpi_setup,
+                                       monitor=monitor) as server:
+            for i, args in enumerate(requests):
+                threads.append(threading.Thread(target=request, args=args))
+                threads[-1].start()
+                self.__wait_for_requests(server, i + 1)
+            statistics = server.statistics
+            self.assertEqual(1, statistics.n_running)
+            self.assertEqual(4, statistics.n_queued)
+
+            gate.set()
+            for thread in threads:
+                thread.join(TIMEOUT)
+            statistics = server.statistics
+
+        self.assertEqual(bfrescoxpro.ServerStatistics(6, 1, 5, 0, 0),
+                         statistics)
+        # Each client gets the worker in turn
+        expected = [self.__path.joinpath(name, "frescox.out")
+                    for name in ["held", "a1", "b1", "a2", "a3"]]
+        self.assertEqual(expected, [Path(each) for each in started])
+
+    def testBadArguments(self):
+        fname = self.__path.joinpath("frescox.out")
+        with self.assertRaises(RuntimeError):
+            bfrescoxpro.run_via_server(self.__config, fname, path=self.__socket)
+
+        with bfrescoxpro.create_server(path=self.__socket,
+                                       mpi_setup=self.__mpi_setup):
+            # Only one server can listen on a socket
+            with self.assertRaises(RuntimeError):
+                bfrescoxpro.create_server(path=self.__socket,
+                                          mpi_setup=self.__mpi_setup)
+            for bad in [None, REFERENCE_INPUT]:
+                with self.assertRaises(TypeError):
+                    bfrescoxpro.run_via_server(bad, fname, path=self.__socket)
+            with self.assertRaises(TypeError):
+                bfrescoxpro.run_via_server(self.__config, fname, overwrite=None,
+                                           path=self.__socket)
+
+        fname.touch()
+        with self.assertRaises(ValueError):
+            bfrescoxpro.create_server(path=fname, mpi_setup=self.__mpi_setup)
+        for bad in [0, -1, 1.5, None]:
+            with self.assertRaises(ValueError):
+                bfrescoxpro.create_server(path=self.__socket, n_workers=bad,
+                                          mpi_setup=self.__mpi_setup)
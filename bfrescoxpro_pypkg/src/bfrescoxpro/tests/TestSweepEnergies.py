@@ -0,0 +1,134 @@
+"""
+Automatic unittest of sweep_energies() function
+"""
+
+import unittest
+
+import numpy as np
+
+from pathlib import Path
+
+import bfrescoxpro
+
+from .reference import (REFERENCE_INPUT, reference_configuration,
+                        temporary_folder, smallest_parallel_setup)
+
+RESONANCE = 32.0
+WIDTH = 1.0
+
+
+def excitation(energy):
+    """
+    Smooth background with a single resonance
+    """
+    peak = (0.5 * WIDTH)**2 / ((energy - RESONANCE)**2 + (0.5 * WIDTH)**2)
+    return np.array([10.0 + 0.1 * energy + 5.0 * peak, 2.0 + peak])
+
+
+def observable(filename):
+    """
+    Excitation function computed from the simulation's inputs, which are
+    written alongside its results
+    """
+    config = bfrescoxpro.Configuration.from_NML(
+        Path(filename).parent.joinpath("frescox.in")
+    )
+    return excitation(config[bfrescoxpro.ENERGY_PARAMETER])
+
+
+class TestSweepEnergies(unittest.TestCase):
+    def setUp(self):
+        self.__path = temporary_folder(self)
+        self.__config = reference_configuration()
+        self.__mpi_setup = smallest_parallel_setup(self)
+
+    def testRefine(self):
+        TOLERANCE = 1.0e-3
+
+        initial = np.linspace(10.0, 50.0, 9)
+        result = bfrescoxpro.sweep_energies(self.__config, initial,
+                                            observable, self.__path,
+                                            TOLERANCE, max_runs=200,
+                                            n_workers=2,
+                                            mpi_setup=self.__mpi_setup)
+
+        self.assertTrue(result.converged)
+        self.assertEqual(TOLERANCE, result.tolerance)
+        self.assertTrue(result.n_runs <= 200)
+        self.assertEqual(result.n_runs, len(result.energies))
+        self.assertEqual(result.n_runs,
+                         len(list(self.__path.glob("*/frescox.out"))))
+        self.assertTrue(np.all(np.diff(result.energies) > 0.0))
+        self.assertTrue(set(initial).issubset(result.energies))
+        self.assertEqual((len(result.energies), 2), result.values.shape)
+        self.assertEqual(len(result.energies) - 1, len(result.errors))
+        self.assertTrue(np.all(result.errors <= TOLERANCE))
+        for energy, values, fname in zip(result.energies, result.values,
+                                         result.filenames):
+            self.assertTrue(np.allclose(excitation(energy), values))
+            self.assertTrue(np.allclose(observable(fname), values))
+
+        # Energies are concentrated around the resonance
+        near = np.abs(result.energies - RESONANCE) <= 2.0 * WIDTH
+        self.assertTrue(np.sum(near) > np.sum(~near))
+
+        # The interpolant is accurate everywhere
+        dense = np.linspace(10.0, 50.0, 2001)
+        expected = np.array([excitation(energy) for energy in dense])
+        scale = np.max(np.abs(expected), axis=0)
+        error = np.max(np.abs(result.interpolate(dense) - expected) / scale)
+        self.assertTrue(error < 10.0 * TOLERANCE)
+        self.assertEqual((2,), result.interpolate(30.0).shape)
+        with self.assertRaises(ValueError):
+            result.interpolate([5.0])
+
+    def testBudget(self):
+        MAX_RUNS = 12
+
+        def cross_section(filename):
+            return observable(filename)[0]
+
+        result = bfrescoxpro.sweep_energies(self.__config, [10.0, 30.0, 50.0],
+                                            cross_section, self.__path,
+                                            1.0e-6, max_runs=MAX_RUNS,
+                                            n_workers=2,
+                                            mpi_setup=self.__mpi_setup)
+        self.assertFalse(result.converged)
+        self.assertEqual(MAX_RUNS, result.n_runs)
+        self.assertEqual(MAX_RUNS, len(result.energies))
+        self.assertEqual((MAX_RUNS,), result.values.shape)
+        self.assertTrue(np.isscalar(result.interpolate(20.0)))
+
+        # Intervals are not split below the smallest spacing
+        path = self.__path.joinpath("spacing")
+        result = bfrescoxpro.sweep_energies(self.__config, [10.0, 30.0, 50.0],
+                                            cross_section, path, 1.0e-6,
+                                            max_runs=1000, min_spacing=5.0,
+                                            mpi_setup=self.__mpi_setup)
+        self.assertFalse(result.converged)
+        self.assertTrue(np.all(np.diff(result.energies) >= 5.0))
+
+    def testBadArguments(self):
+        energies = [10.0, 30.0, 50.0]
+        with self.assertRaises(TypeError):
+            bfrescoxpro.sweep_energies(REFERENCE_INPUT, energies, observable,
+                                       self.__path, 1.0e-3)
+        with self.assertRaises(TypeError):
+            bfrescoxpro.sweep_energies(self.__config, energies, None,
+                                       self.__path, 1.0e-3)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.sweep_energies(self.__config, energies, observable,
+                                       self.__path, 0.0)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.sweep_energies(self.__config, [10.0, 10.0, 50.0],
+                                       observable, self.__path, 1.0e-3)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.sweep_energies(self.__config, energies, observable,
+                                       self.__path, 1.0e-3, max_runs=2)
+        with self.assertRaises(ValueError):
+            bfrescoxpro.sweep_energies(self.__config, energies, observable,
+                                       self.__path, 1.0e-3, min_spacing=-1.0)
+        with self.assertRaises(TypeError):
+            bfrescoxpro.sweep_energies(self.__config, energies, observable,
+                                       self.__path, 1.0e-3,
+                                       parameter="partition[0].namep")
@@ -0,0 +1,59 @@
+import sys
+import argparse
+
+from .create_runner import create_runner
+from .WorkQueue import run_worker
+from ._run_frescox_simulation import (
+    MPI_N_PROCESSES, COMPRESSION_GZIP, COMPRESSION_ZSTD
+)
+
+
+def main():
+    """
+    Entry point of the ``bfrescoxpro-worker`` program, which repeatedly claims
+    simulations from a shared-filesystem :py:class:`WorkQueue`, runs them with
+    a :py:class:`Runner`, and publishes their results.  Each simulation runs
+    in the folder of its results so that workers sharing a working directory
+    do not overwrite each other's auxiliary files.  Start one worker per core
+    or per node on as many nodes as desired.
+    """
+    parser = argparse.ArgumentParser(
+        prog="bfrescoxpro-worker",
+        description="Run Frescox simulations from a shared work queue"
+    )
+    parser.add_argument("queue", help="Path to the work queue folder")
+    parser.add_argument("--heartbeat", type=float, default=30.0,
+                        help="Seconds between heartbeats")
+    parser.add_argument("--timeout", type=float, default=300.0,
+                        help="Seconds after which silent workers are dead")
+    parser.add_argument("--poll", type=float, default=5.0,
+                        help="Seconds between checks for new tasks")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="Maximum number of times a task can be claimed")
+    parser.add_argument("--forever", action="store_true",
+                        help="Keep waiting for tasks once the queue is empty")
+    parser.add_argument("--compression",
+                        choices=[COMPRESSION_GZIP, COMPRESSION_ZSTD],
+                        help="Compress results as they are written")
+    parser.add_argument("--mpi-processes", type=int,
+                        help="Number of MPI processes per simulation")
+    args = parser.parse_args()
+
+    mpi_setup = None
+    if args.mpi_processes is not None:
+        mpi_setup = {MPI_N_PROCESSES: args.mpi_processes}
+    with create_runner(mpi_setup=mpi_setup, compression=args.compression,
+                       isolated=True) as runner:
+        n_done, n_failed = run_worker(args.queue, runner.run,
+                                      heartbeat=args.heartbeat,
+                                      timeout=args.timeout,
+                                      poll=args.poll,
+                                      exit_when_empty=(not args.forever),
+                                      max_attempts=args.max_attempts)
+    print(f"{n_done} task(s) done and {n_failed} task(s) failed")
+
+    return 0 if n_failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
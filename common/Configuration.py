@@ -1,17 +1,453 @@
+import re
+import copy
+
+from pathlib import Path
+from numbers import Integral, Real
+
+# Name of the line that separates the title from the namelist groups in a
+# |frescox| namelist input file
+_NAMELIST_MARKER = "NAMELIST"
+# Keys in templates are written as @key_name@
+_TEMPLATE_KEY = re.compile(r"@([A-Za-z_][A-Za-z0-9_]*)@")
+# Tokens within the body of a namelist group are quoted strings, equal signs,
+# commas, the group terminator, or any other run of non-separator characters
+_TOKEN = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|=|,|/|[^\s,='"/]+""")
+# Parameter names are group.key or group[index].key
+_PARAMETER = re.compile(r"^([a-z_0-9]+)(?:\[(\d+)\])?\.(.+)$")
+# Target length of lines written to namelist files
+_LINE_LENGTH = 72
+
+# Names of the results that callers can request so that |frescox| writes only
+# what is needed
+OUTPUT_CROSS_SECTIONS = "cross_sections"
+OUTPUT_ANGULAR_DISTRIBUTIONS = "angular_distributions"
+OUTPUT_ELASTIC_S_MATRIX = "elastic_s_matrix"
+OUTPUT_CHANNELS = "channels"
+OUTPUT_COUPLINGS = "couplings"
+OUTPUT_WAVEFUNCTIONS = "wavefunctions"
+OUTPUT_AMPLITUDES = "amplitudes"
+OUTPUT_POTENTIALS = "potentials"
+# Print controls of the FRESCO group with the values that minimize the text
+# written by |frescox| and the smallest value of each control that writes
+# each result.  The values of controls needed by several results are combined
+# by taking the largest.
+_PRINT_GROUP = "fresco"
+_QUIET = {
+    "chans": 0, "listcc": 0, "treneg": 0, "cdetr": 0, "smats": 0,
+    "xstabl": 0, "nlpl": 0, "waves": 0, "lampl": 0, "veff": 0
+}
+_PRINT_CONTROLS = {
+    OUTPUT_CROSS_SECTIONS: {"smats": 1},
+    OUTPUT_ANGULAR_DISTRIBUTIONS: {"xstabl": 1},
+    OUTPUT_ELASTIC_S_MATRIX: {"smats": 2},
+    OUTPUT_CHANNELS: {"chans": 1},
+    OUTPUT_COUPLINGS: {"listcc": 1},
+    OUTPUT_WAVEFUNCTIONS: {"waves": 1},
+    OUTPUT_AMPLITUDES: {"lampl": 1},
+    OUTPUT_POTENTIALS: {"veff": 1}
+}
+OUTPUTS = tuple(_PRINT_CONTROLS)
+
+
+def _parse_value(token):
+    """
+    Convert a single namelist value token to its Python value.
+    """
+    if token[0] in ("'", '"'):
+        quote = token[0]
+        return token[1:-1].replace(quote * 2, quote)
+
+    lowered = token.lower()
+    if lowered in (".true.", ".t.", "t"):
+        return True
+    elif lowered in (".false.", ".f.", "f"):
+        return False
+
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(lowered.replace("d", "e"))
+    except ValueError:
+        pass
+
+    # Unquoted strings are tolerated by some compilers
+    return token
+
+
+def _format_value(value):
+    """
+    Convert a Python value to its namelist representation.
+    """
+    if isinstance(value, bool):
+        return "T" if value else "F"
+    elif isinstance(value, str):
+        return "'{}'".format(value.replace("'", "''"))
+    elif isinstance(value, Integral):
+        return str(int(value))
+    elif isinstance(value, Real):
+        return repr(float(value))
+    elif isinstance(value, (list, tuple)):
+        return " ".join(_format_value(each) for each in value)
+
+    raise TypeError(f"Cannot write {value} to a namelist file")
+
+
+def _parse_group(body):
+    """
+    Parse the assignments in the body of a single namelist group.
+    """
+    tokens = [each for each in _TOKEN.findall(body) if each != ","]
+
+    group = {}
+    key = None
+    values = []
+    for i, token in enumerate(tokens):
+        if token == "=":
+            continue
+        elif (i + 1 < len(tokens)) and (tokens[i + 1] == "="):
+            if key is not None:
+                group[key] = values[0] if len(values) == 1 else values
+            key = token.lower()
+            values = []
+            if key in group:
+                raise ValueError(f"{key} assigned twice in namelist group")
+        elif key is None:
+            raise ValueError(f"Value {token} given without a key")
+        elif ("*" in token) and (token[0] not in ("'", '"')):
+            count, value = token.split("*", 1)
+            values += [_parse_value(value)] * int(count)
+        else:
+            values.append(_parse_value(token))
+    if key is not None:
+        if not values:
+            raise ValueError(f"No value assigned to {key}")
+        group[key] = values[0] if len(values) == 1 else values
+
+    return group
+
+
+def _strip_comments(line):
+    """
+    Remove any comment from a line of a namelist file while leaving any !
+    characters inside strings untouched.
+    """
+    quote = None
+    for i, char in enumerate(line):
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "!":
+            return line[:i]
+    return line
+
+
 class Configuration(object):
-    def __init__(self):
+    def __init__(self, title, namelists):
         """
         Create an object that fully specifies the configuration of a |frescox|
         simulation.
 
-        .. todo::
-            * Write this class
+        The configuration is stored as the ordered sequence of namelist groups
+        that |frescox| reads from its input.  Groups that |frescox| uses as
+        terminators (|eg| an empty ``&partition /``) are included as groups
+        with no values.
+
+        Individual values are accessed by parameter names of the form
+        ``group.key`` or ``group[i].key``, where ``i`` is the zero-based index
+        of the occurrence of the group in the configuration.  The former is
+        shorthand for ``group[0].key``.  All names are lowercase.  For example,
+        ``fresco.hcm`` or ``pot[1].p1``.
+
+        :param title: Single line of text that identifies the simulation
+        :param namelists: Sequence of ``(name, values)`` pairs, where ``name``
+            is the name of a namelist group and ``values`` is a ``dict`` that
+            maps each key in the group to its value
         """
         super().__init__()
 
-        raise NotImplementedError("This class will be written soon")
+        if not isinstance(title, str):
+            raise TypeError("Title must be a string")
+        elif "\n" in title:
+            raise ValueError("Title must be a single line")
+
+        self.__title = title
+        self.__namelists = []
+        for name, values in namelists:
+            if not isinstance(name, str):
+                raise TypeError(f"Invalid namelist group name ({name})")
+            elif not isinstance(values, dict):
+                raise TypeError(f"Values of {name} group not given as dict")
+            values = {key.lower(): copy.deepcopy(value)
+                      for key, value in values.items()}
+            for value in values.values():
+                _format_value(value)
+            self.__namelists.append((name.lower(), values))
 
-    def write_to_nml(self, filename, overwrite=False):
+    @classmethod
+    def from_NML_string(cls, contents):
+        """
+        :param contents: Full contents of a |frescox| Fortran namelist file
+        :return: Configuration object specified by the given contents
+        """
+        lines = contents.split("\n")
+        if (len(lines) < 2) or (lines[1].strip().upper() != _NAMELIST_MARKER):
+            msg = "Only Frescox namelist-format inputs are supported"
+            raise ValueError(msg)
+        title = lines[0].rstrip()
+
+        body = "\n".join(_strip_comments(line) for line in lines[2:])
+        namelists = []
+        position = 0
+        while True:
+            start = body.find("&", position)
+            if start < 0:
+                if body[position:].strip() != "":
+                    msg = "Unexpected text outside of namelist groups ({})"
+                    raise ValueError(msg.format(body[position:].strip()))
+                break
+            elif body[position:start].strip() != "":
+                msg = "Unexpected text outside of namelist groups ({})"
+                raise ValueError(msg.format(body[position:start].strip()))
+
+            # Find the terminating / while skipping quoted strings
+            name_match = re.match(r"&(\w+)", body[start:])
+            if name_match is None:
+                raise ValueError("Namelist group without name")
+            end = None
+            for token in _TOKEN.finditer(body, start + len(name_match[0])):
+                if token[0] == "/":
+                    end = token.start()
+                    break
+            if end is None:
+                msg = "Namelist group {} is not terminated"
+                raise ValueError(msg.format(name_match[1]))
+
+            group_body = body[start + len(name_match[0]):end]
+            namelists.append((name_match[1], _parse_group(group_body)))
+            position = end + 1
+
+        return cls(title, namelists)
+
+    @classmethod
+    def from_NML(cls, filename):
+        """
+        :param filename: Name including path of |frescox| Fortran namelist
+            file to load
+        :return: Configuration object specified by the given file
+        """
+        fname = Path(filename).resolve()
+        if not fname.is_file():
+            raise ValueError(f"{fname} does not exist or is not a file")
+
+        with open(fname, "r") as fptr:
+            return cls.from_NML_string(fptr.read())
+
+    @classmethod
+    def from_template_string(cls, contents, parameters):
+        """
+        :param contents: Full contents of a |frescox| Fortran namelist
+            template in which values to be filled in are replaced with keys of
+            the form ``@key_name@``
+        :param parameters: ``dict`` that maps each key in the template to its
+            value.  All keys in the template must be given and all given keys
+            must be in the template.
+        :return: Configuration object specified by the filled-in template
+        """
+        keys = cls.template_keys(contents)
+        if keys != set(parameters):
+            msg = "Template keys ({}) do not match given parameters ({})"
+            raise ValueError(msg.format(sorted(keys), sorted(parameters)))
+
+        def fill(match):
+            return _format_value(parameters[match[1]])
+
+        return cls.from_NML_string(_TEMPLATE_KEY.sub(fill, contents))
+
+    @classmethod
+    def from_template(cls, template, filename, parameters, overwrite=False):
+        """
+        Fill in a |frescox| Fortran namelist template with the given values
+        and write the result to file.  Templates are |frescox| namelist files
+        in which values to be filled in are replaced with keys of the form
+        ``@key_name@``.
+
+        :param template: Name including path of template file
+        :param filename: Name including path of file to write the filled-in
+            namelist to
+        :param parameters: ``dict`` that maps each key in the template to its
+            value.  All keys in the template must be given and all given keys
+            must be in the template.
+        :param overwrite: If a file already exists with the given output
+            filename, then overwrite the file if True; otherwise, raise an
+            error.
+        :return: Configuration object specified by the filled-in template
+        """
+        fname = Path(template).resolve()
+        if not fname.is_file():
+            raise ValueError(f"{fname} does not exist or is not a file")
+        with open(fname, "r") as fptr:
+            contents = fptr.read()
+
+        configuration = cls.from_template_string(contents, parameters)
+        configuration.write_to_nml(filename, overwrite)
+
+        return configuration
+
+    @staticmethod
+    def template_keys(contents):
+        """
+        :param contents: Full contents of a |frescox| Fortran namelist file or
+            template
+        :return: ``set`` of the keys of all values to be filled in.  This is
+            empty if the contents are not a template.
+        """
+        return set(_TEMPLATE_KEY.findall(contents))
+
+    @property
+    def title(self):
+        """
+        Title of the simulation
+        """
+        return self.__title
+
+    @property
+    def namelists(self):
+        """
+        Copy of the ordered sequence of ``(name, values)`` namelist groups
+        """
+        return copy.deepcopy(self.__namelists)
+
+    @property
+    def parameters(self):
+        """
+        ``dict`` that maps the name of every value in the configuration to its
+        value.  Names are of the form ``group.key`` for groups that occur only
+        once and ``group[i].key`` otherwise.
+        """
+        counts = {}
+        for name, _ in self.__namelists:
+            counts[name] = counts.get(name, 0) + 1
+
+        parameters = {}
+        occurrence = {}
+        for name, values in self.__namelists:
+            i = occurrence.get(name, 0)
+            occurrence[name] = i + 1
+            prefix = name if counts[name] == 1 else f"{name}[{i}]"
+            for key, value in values.items():
+                parameters[f"{prefix}.{key}"] = copy.deepcopy(value)
+
+        return parameters
+
+    def __locate(self, name):
+        """
+        :return: Values of the namelist group occurrence and the key in that
+            group that are identified by the given parameter name
+        """
+        match = _PARAMETER.match(name.lower()) if isinstance(name, str) \
+            else None
+        if match is None:
+            raise KeyError(f"Invalid parameter name ({name})")
+        group, index, key = match[1], int(match[2] or 0), match[3]
+
+        occurrences = [values for each, values in self.__namelists
+                       if each == group]
+        if index >= len(occurrences):
+            raise KeyError(f"No occurrence {index} of {group} group")
+
+        return occurrences[index], key
+
+    def __getitem__(self, name):
+        values, key = self.__locate(name)
+        if key not in values:
+            raise KeyError(f"{name} not set in configuration")
+        return copy.deepcopy(values[key])
+
+    def __setitem__(self, name, value):
+        """
+        Set the value of an existing or new key in an existing namelist group.
+        """
+        _format_value(value)
+        values, key = self.__locate(name)
+        values[key] = copy.deepcopy(value)
+
+    def __delitem__(self, name):
+        values, key = self.__locate(name)
+        if key not in values:
+            raise KeyError(f"{name} not set in configuration")
+        del values[key]
+
+    def __contains__(self, name):
+        try:
+            values, key = self.__locate(name)
+        except KeyError:
+            return False
+        return key in values
+
+    def __eq__(self, other):
+        if not isinstance(other, Configuration):
+            return NotImplemented
+        return (self.__title == other.__title) and \
+            (self.__namelists == other.__namelists)
+
+    def with_outputs(self, outputs):
+        """
+        Create a copy of the configuration whose print controls are set so
+        that |frescox| writes only the given results.  All other print
+        controls of the ``fresco`` group are turned off regardless of their
+        values in this configuration, which is not altered.
+
+        :param outputs: Iterable of the names of the results needed (|eg|
+            ``OUTPUT_CROSS_SECTIONS``).  See ``OUTPUTS`` for all names.
+        :return: :py:class:`Configuration` object
+        """
+        if isinstance(outputs, str):
+            raise TypeError("Outputs must be given as a sequence of names")
+        controls = dict(_QUIET)
+        for output in outputs:
+            if output not in _PRINT_CONTROLS:
+                raise ValueError(f"Unknown output ({output})")
+            for key, value in _PRINT_CONTROLS[output].items():
+                controls[key] = max(controls[key], value)
+
+        trimmed = copy.deepcopy(self)
+        names = [name for name, _ in trimmed.__namelists]
+        if _PRINT_GROUP not in names:
+            msg = "No {} group in which to set print controls"
+            raise ValueError(msg.format(_PRINT_GROUP))
+        trimmed.__namelists[names.index(_PRINT_GROUP)][1].update(controls)
+
+        return trimmed
+
+    def to_NML_string(self, outputs=None):
+        """
+        :param outputs: Names of the results to write as accepted by
+            :py:meth:`with_outputs`; ``None`` to use the print controls as
+            given in the configuration
+        :return: Full contents of a valid |frescox| Fortran namelist file that
+            specifies this configuration
+        """
+        if outputs is not None:
+            return self.with_outputs(outputs).to_NML_string()
+
+        lines = [self.__title, _NAMELIST_MARKER]
+        for name, values in self.__namelists:
+            line = f" &{name.upper()}"
+            for key, value in values.items():
+                assignment = f"{key}={_format_value(value)}"
+                if len(line) + len(assignment) + 1 > _LINE_LENGTH:
+                    lines.append(line)
+                    line = "    "
+                line += " " + assignment
+            lines.append(line + " /")
+
+        return "\n".join(lines) + "\n"
+
+    def write_to_nml(self, filename, overwrite=False, outputs=None):
         """
         Write the object's full simulation specification to a valid |frescox|
         Fortran namelist file.
@@ -20,5 +456,14 @@ class Configuration(object):
         :param overwrite: If a file already exists with the given output
             filename, then overwrite the file if True; otherwise, raise an
             error.
+        :param outputs: Names of the results that |frescox| should write as
+            accepted by :py:meth:`with_outputs`, whose print controls are set
+            in the file so that all other output is suppressed; ``None`` to
+            write the print controls as given in the configuration
         """
-        raise NotImplementedError("This class will be written soon")
+        fname = Path(filename).resolve()
+        if fname.exists() and (not overwrite):
+            raise RuntimeError(f"Input file ({fname}) already exists")
+
+        with open(fname, "w") as fptr:
+            fptr.write(self.to_NML_string(outputs))
@@ -0,0 +1,205 @@
+import os
+import queue
+import contextlib
+
+import numpy as np
+
+from pathlib import Path
+from collections import namedtuple
+
+# Locations of the CPU and NUMA topology of Linux nodes
+_NODE_PATH = Path("/sys/devices/system/node")
+_CPU_PATH = Path("/sys/devices/system/cpu")
+
+
+class CpuSlot(namedtuple("CpuSlot", ["index", "cpus", "numa_nodes"])):
+    """
+    Disjoint set of CPUs on which a single simulation runs.  ``cpus`` and
+    ``numa_nodes`` are sorted tuples of the IDs of the CPUs of the slot and of
+    the NUMA domains that contain them.
+    """
+    __slots__ = ()
+
+
+def _parse_cpulist(text):
+    """
+    :param text: List of CPUs in the kernel's format (|eg| ``"0-3,8,10-11"``)
+    :return: ``list`` of CPU IDs
+    """
+    cpus = []
+    for part in text.strip().split(","):
+        if part == "":
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _format_cpulist(cpus):
+    """
+    :return: CPUs in the kernel's list format with consecutive CPUs merged
+        into ranges
+    """
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and (cpu == ranges[-1][1] + 1):
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(first) if first == last else f"{first}-{last}"
+                    for first, last in ranges)
+
+
+def _read(fname):
+    try:
+        with open(fname, "r") as fptr:
+            return fptr.read()
+    except OSError:
+        return None
+
+
+def _numa_nodes():
+    """
+    :return: ``dict`` that maps each CPU ID to the ID of its NUMA domain.  Empty
+        if the topology is not available.
+    """
+    nodes = {}
+    for path in sorted(_NODE_PATH.glob("node[0-9]*")):
+        text = _read(path.joinpath("cpulist"))
+        if text is not None:
+            node = int(path.name[len("node"):])
+            for cpu in _parse_cpulist(text):
+                nodes[cpu] = node
+    return nodes
+
+
+def _core(cpu):
+    """
+    :return: ``(package, core)`` IDs of the physical core of the CPU so that
+        hardware threads of a core are kept together
+    """
+    path = _CPU_PATH.joinpath(f"cpu{cpu}", "topology")
+    ids = []
+    for name in ["physical_package_id", "core_id"]:
+        text = _read(path.joinpath(name))
+        ids.append(cpu if text is None else int(text))
+    return tuple(ids)
+
+
+class CpuLayout(object):
+    def __init__(self, n_slots, cpus=None):
+        """
+        Partition the CPUs of this node into disjoint slots so that
+        concurrent |frescox| simulations do not compete for cores and each
+        keeps its threads, caches, and memory local.
+
+        CPUs are ordered by NUMA domain, socket, and core and split into
+        ``n_slots`` contiguous slots of nearly equal size.  Whole cores are
+        assigned to slots whenever there are at least as many cores as slots
+        so that hardware threads of a core are never split.  If the number of
+        slots is a multiple of the number of NUMA domains and the domains have
+        equal size, then every slot lies within a single domain.
+
+        A :py:class:`Runner` given a layout runs each simulation in a free
+        slot.  Each simulation's process is restricted to the slot's CPUs and
+        is given ``OMP_NUM_THREADS`` equal to the number of CPUs of the slot
+        with ``OMP_PLACES`` and ``OMP_PROC_BIND`` set to bind one thread to
+        each CPU.  MPI launchers might apply their own binding within the
+        slot.  Only Linux is supported.
+
+        :param n_slots: Number of simulations to run concurrently
+        :param cpus: Iterable of the IDs of the CPUs to partition; ``None`` to
+            use all CPUs on which this process can run
+        """
+        super().__init__()
+
+        if not hasattr(os, "sched_setaffinity"):
+            raise RuntimeError("CPU affinity not supported on this platform")
+        elif (not isinstance(n_slots, int)) or (n_slots < 1):
+            raise ValueError("Number of slots must be a positive integer")
+
+        allowed = os.sched_getaffinity(0)
+        cpus = sorted(allowed if cpus is None else set(cpus))
+        if not set(cpus).issubset(allowed):
+            msg = "CPUs {} not available to this process"
+            raise ValueError(msg.format(_format_cpulist(set(cpus) - allowed)))
+        elif n_slots > len(cpus):
+            msg = "{} slots requested for {} CPUs"
+            raise ValueError(msg.format(n_slots, len(cpus)))
+
+        nodes = _numa_nodes()
+        cores = {}
+        for cpu in cpus:
+            key = (nodes.get(cpu, 0),) + _core(cpu)
+            cores.setdefault(key, []).append(cpu)
+        units = [cores[key] for key in sorted(cores)]
+        if n_slots > len(units):
+            units = [[cpu] for unit in units for cpu in unit]
+
+        self.__slots = []
+        for index, chunk in enumerate(np.array_split(np.arange(len(units)),
+                                                     n_slots)):
+            slot_cpus = tuple(sorted(cpu for i in chunk for cpu in units[i]))
+            slot_nodes = tuple(sorted({nodes.get(cpu, 0)
+                                       for cpu in slot_cpus}))
+            self.__slots.append(CpuSlot(index, slot_cpus, slot_nodes))
+
+        self.__free = queue.Queue()
+        for slot in self.__slots:
+            self.__free.put(slot)
+
+    @property
+    def n_slots(self):
+        """
+        Number of slots
+        """
+        return len(self.__slots)
+
+    @property
+    def slots(self):
+        """
+        ``list`` of :py:class:`CpuSlot` in order
+        """
+        return list(self.__slots)
+
+    @staticmethod
+    def environment(slot):
+        """
+        :param slot: :py:class:`CpuSlot`
+        :return: ``dict`` of the OpenMP environment variables that bind one
+            thread to each CPU of the slot
+        """
+        return {
+            "OMP_NUM_THREADS": str(len(slot.cpus)),
+            "OMP_PLACES": ",".join(f"{{{cpu}}}" for cpu in slot.cpus),
+            "OMP_PROC_BIND": "close"
+        }
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """
+        Wait for a free slot and hold it until the end of the ``with``
+        block.
+
+        :return: Context manager that yields the :py:class:`CpuSlot`
+        """
+        slot = self.__free.get()
+        try:
+            yield slot
+        finally:
+            self.__free.put(slot)
+
+    def print_report(self):
+        """
+        Print the CPUs and NUMA domains of each slot.
+        """
+        n_nodes = len({node for slot in self.__slots
+                       for node in slot.numa_nodes})
+        print(f"CPU layout of {self.n_slots} slot(s) on {n_nodes} NUMA "
+              "domain(s)")
+        print("-" * 80)
+        print(f"{'Slot':<6}{'NUMA':<10}{'Threads':<9}CPUs")
+        for slot in self.__slots:
+            numa = _format_cpulist(slot.numa_nodes)
+            print(f"{slot.index:<6}{numa:<10}{len(slot.cpus):<9}"
+                  f"{_format_cpulist(slot.cpus)}")
@@ -0,0 +1,202 @@
+import json
+
+import numpy as np
+
+from pathlib import Path
+
+# Names of the files in an ensemble's folder
+_LAYOUT_NAME = "ensemble.json"
+_FILLED_NAME = "filled.npy"
+
+
+def _values_name(k):
+    return f"observable_{k:02d}.npy"
+
+
+def _grid_name(k):
+    return f"observable_{k:02d}_grid.npy"
+
+
+class Ensemble(object):
+    def __init__(self, path):
+        """
+        Open the preallocated observables of a batch of simulations stored in
+        the given folder by :py:meth:`create`.
+
+        Each observable is stored as a 2D array with one row per simulation in
+        a memory-mapped NumPy file.  Every thread or process that opens the
+        ensemble maps the same pages so that the observables of a simulation
+        stored by any of them appear in all of them without being copied or
+        serialized.  Processes on different nodes that share the folder
+        should call :py:meth:`flush` after storing and reopen the ensemble
+        before reading.
+
+        :param path: Path to the folder that contains the ensemble
+        """
+        super().__init__()
+
+        path = Path(path).resolve()
+        fname = path.joinpath(_LAYOUT_NAME)
+        if not fname.is_file():
+            raise ValueError(f"{path} does not contain an ensemble")
+        with open(fname, "r") as fptr:
+            layout = json.load(fptr)
+
+        self.__path = path
+        self.__n_points = layout["n_points"]
+        self.__grids = []
+        self.__values = []
+        for k in range(layout["n_observables"]):
+            grid = np.load(path.joinpath(_grid_name(k)))
+            grid.flags.writeable = False
+            self.__grids.append(grid)
+            self.__values.append(
+                np.load(path.joinpath(_values_name(k)), mmap_mode="r+")
+            )
+        self.__filled = np.load(path.joinpath(_FILLED_NAME), mmap_mode="r+")
+
+    @classmethod
+    def create(cls, path, n_points, grids, overwrite=False):
+        """
+        Preallocate the observables of a batch of simulations.  The values of
+        simulations not yet stored are NaN.
+
+        :param path: Path to the folder in which to create the ensemble.  It
+            is created if it does not exist.
+        :param n_points: Number of simulations in the batch
+        :param grids: Sequence of 1D arrays with the grid of each observable
+            (|eg| angles of the angular distribution at each energy)
+        :param overwrite: If False, then an error is raised if the folder
+            already contains an ensemble
+        :return: :py:class:`Ensemble`
+        """
+        if (not isinstance(n_points, int)) or (n_points < 1):
+            raise ValueError("Number of points must be a positive integer")
+        grids = [np.asarray(each, dtype=float) for each in grids]
+        if not grids:
+            raise ValueError("No observable grids given")
+        for grid in grids:
+            if (grid.ndim != 1) or (len(grid) == 0) or \
+                    (not np.all(np.diff(grid) > 0.0)):
+                msg = "Grids must be strictly increasing 1D arrays"
+                raise ValueError(msg)
+
+        path = Path(path).resolve()
+        fname = path.joinpath(_LAYOUT_NAME)
+        if fname.exists() and (not overwrite):
+            raise RuntimeError(f"Ensemble already exists in {path}")
+        path.mkdir(parents=True, exist_ok=True)
+
+        for k, grid in enumerate(grids):
+            np.save(path.joinpath(_grid_name(k)), grid)
+            values = np.lib.format.open_memmap(
+                path.joinpath(_values_name(k)), mode="w+", dtype=float,
+                shape=(n_points, len(grid))
+            )
+            values.fill(np.nan)
+            values.flush()
+            del values
+        filled = np.lib.format.open_memmap(path.joinpath(_FILLED_NAME),
+                                           mode="w+", dtype=np.bool_,
+                                           shape=(n_points,))
+        filled.flush()
+        del filled
+
+        # Written last so that a partially created ensemble cannot be opened
+        with open(fname, "w") as fptr:
+            json.dump({"n_points": n_points,
+                       "n_observables": len(grids)}, fptr)
+
+        return cls(path)
+
+    @property
+    def path(self):
+        """
+        Path to the folder that contains the ensemble
+        """
+        return self.__path
+
+    @property
+    def n_points(self):
+        """
+        Number of simulations in the ensemble
+        """
+        return self.__n_points
+
+    @property
+    def grids(self):
+        """
+        ``list`` of the grid of each observable
+        """
+        return list(self.__grids)
+
+    @property
+    def filled(self):
+        """
+        Boolean array that is True for each simulation whose observables have
+        been stored
+        """
+        return np.array(self.__filled)
+
+    def values(self, k):
+        """
+        :param k: Index of the observable
+        :return: Memory-mapped 2D array of the observable with one row per
+            simulation.  Rows of simulations not yet stored are NaN.
+        """
+        return self.__values[k]
+
+    def stacked(self):
+        """
+        :return: ``list`` of ``(grid, values)`` with one pair per observable
+            as accepted by :py:meth:`Likelihood.evaluate_stacked`
+        """
+        return list(zip(self.__grids, self.__values))
+
+    def store(self, point, models):
+        """
+        Write the observables of a single simulation into its row.  Different
+        threads or processes can store different simulations concurrently.
+
+        :param point: Position of the simulation in the batch
+        :param models: Sequence of ``(grid, values)`` 1D arrays with one pair
+            per observable.  Values given on a grid other than the ensemble's
+            are interpolated linearly onto it.
+        """
+        if (point < 0) or (point >= self.__n_points):
+            msg = "Point {} not in ensemble of {} simulations"
+            raise ValueError(msg.format(point, self.__n_points))
+        models = list(models)
+        if len(models) != len(self.__grids):
+            msg = "{} observables given for ensemble of {}"
+            raise ValueError(msg.format(len(models), len(self.__grids)))
+
+        rows = []
+        for (x, y), grid in zip(models, self.__grids):
+            x = np.asarray(x, dtype=float)
+            y = np.asarray(y, dtype=float)
+            if (x.ndim != 1) or (x.shape != y.shape):
+                msg = "Observables must be two 1D arrays of equal length"
+                raise ValueError(msg)
+            elif np.array_equal(x, grid):
+                rows.append(y)
+                continue
+            elif (len(x) < 2) or (not np.all(np.diff(x) > 0.0)):
+                msg = "Observable grid is not strictly increasing"
+                raise ValueError(msg)
+            elif (grid[0] < x[0]) or (grid[-1] > x[-1]):
+                raise ValueError("Observable does not cover ensemble grid")
+            rows.append(np.interp(grid, x, y))
+
+        # Mark the row as filled only once all of its values are written
+        for values, row in zip(self.__values, rows):
+            values[point, :] = row
+        self.__filled[point] = True
+
+    def flush(self):
+        """
+        Write all stored observables to the underlying files.
+        """
+        for values in self.__values:
+            values.flush()
+        self.__filled.flush()
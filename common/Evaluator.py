@@ -0,0 +1,250 @@
+import copy
+import queue
+import functools
+import threading
+
+import numpy as np
+
+from pathlib import Path
+from numbers import Real
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# TODO: This assumes in a package
+from .Configuration import Configuration
+from ._batch import run_point, BATCH_OUTPUT_NAME
+
+
+class Evaluation(namedtuple("Evaluation", ["point", "theta", "filename",
+                                           "status", "wall_time", "error",
+                                           "value"])):
+    """
+    Outcome of a single evaluation submitted to an :py:class:`Evaluator`.
+    ``point`` is the position of the evaluation in the order of submission,
+    ``theta`` are the parameter values with which it was submitted, and
+    ``value`` is the value returned by the observable or ``None`` if there is
+    no observable or if the simulation did not succeed.  ``status``,
+    ``wall_time``, and ``error`` are as for :py:class:`BatchResult`.
+    """
+    __slots__ = ()
+
+
+class Evaluator(object):
+    def __init__(self, runner, configuration, parameters, path,
+                 observable=None, n_workers=1, max_in_flight=None,
+                 overwrite=False):
+        """
+        Evaluate a model at parameter values submitted one at a time and
+        return the outcomes in order of completion.  This suits ask/tell
+        samplers and optimizers (|eg| ensemble MCMC or Bayesian optimization)
+        that propose new points as soon as earlier ones complete rather than
+        in synchronous generations, in which the slowest simulation of each
+        generation idles all other workers.
+
+        .. code-block:: python
+
+            with create_evaluator(configuration, ["pot[1].p1"], "runs",
+                                  observable=log_posterior,
+                                  n_workers=8) as evaluator:
+                for theta in initial_points:
+                    evaluator.submit(theta)
+                while evaluator.n_in_flight > 0:
+                    for evaluation in evaluator.ready(block=True):
+                        theta = propose(evaluation.theta, evaluation.value)
+                        if theta is not None:
+                            evaluator.submit(theta)
+
+        Use :py:func:`create_evaluator` rather than creating evaluators
+        directly.
+
+        :param runner: :py:class:`Runner` used to run all simulations.  Since
+            simulations run concurrently, it should be isolated so that each
+            runs in the folder of its results.  It is closed with the
+            evaluator.
+        :param configuration: :py:class:`Configuration` object into which the
+            parameter values of each evaluation are set
+        :param parameters: Sequence of names of real-valued parameters (|eg|
+            ``pot[1].p1``) in the order of the values of each evaluation
+        :param path: Path to folder in which each evaluation's results are
+            written to its own subfolder
+        :param observable: Function that is called with the filename of a
+            simulation's results by the thread that ran it and whose return
+            value is the value of the evaluation; ``None`` to only run
+            simulations.  If it raises, then the evaluation fails.
+        :param n_workers: Number of simulations to run concurrently
+        :param max_in_flight: Largest number of evaluations submitted but not
+            yet completed; ``None`` for twice the number of workers so that
+            workers never wait for submissions
+        :param overwrite: If False, then an evaluation fails if either of its
+            input or output files exist
+        """
+        super().__init__()
+
+        if not isinstance(configuration, Configuration):
+            msg = "Configuration information not given as a {} object"
+            raise TypeError(msg.format(Configuration.__name__))
+        elif (observable is not None) and (not callable(observable)):
+            raise TypeError("Observable is not callable")
+        elif (not isinstance(n_workers, int)) or (n_workers < 1):
+            raise ValueError("Number of workers must be a positive integer")
+        elif not isinstance(overwrite, bool):
+            raise TypeError("Given overwrite argument is not a boolean")
+
+        if max_in_flight is None:
+            max_in_flight = 2 * n_workers
+        elif (not isinstance(max_in_flight, int)) or \
+                (max_in_flight < n_workers):
+            msg = "Largest number in flight must be an integer no smaller "
+            msg += "than the number of workers"
+            raise ValueError(msg)
+
+        parameters = list(parameters)
+        if not parameters:
+            raise ValueError("No parameters given")
+        elif len(set(parameters)) != len(parameters):
+            raise ValueError("Parameters must be unique")
+        for name in parameters:
+            value = configuration[name]
+            if isinstance(value, bool) or (not isinstance(value, Real)):
+                raise TypeError(f"{name} is not a real-valued parameter")
+
+        self.__runner = runner
+        self.__run = functools.partial(runner.run, overwrite=overwrite)
+        self.__configuration = copy.deepcopy(configuration)
+        self.__parameters = parameters
+        self.__path = Path(path).resolve()
+        self.__observable = observable
+        self.__max_in_flight = max_in_flight
+
+        self.__pool = ThreadPoolExecutor(max_workers=n_workers)
+        # Each evaluation holds a slot of the window from submission until
+        # its outcome is queued
+        self.__slots = threading.BoundedSemaphore(max_in_flight)
+        self.__completed = queue.Queue()
+        self.__lock = threading.Lock()
+        self.__n_submitted = 0
+        self.__n_in_flight = 0
+        self.__closed = False
+
+    @property
+    def parameters(self):
+        """
+        ``list`` of the names of the parameters of each evaluation
+        """
+        return list(self.__parameters)
+
+    @property
+    def max_in_flight(self):
+        """
+        Largest number of evaluations submitted but not yet completed
+        """
+        return self.__max_in_flight
+
+    @property
+    def n_in_flight(self):
+        """
+        Number of evaluations submitted but not yet completed
+        """
+        with self.__lock:
+            return self.__n_in_flight
+
+    def __evaluate(self, point, theta, config, filename):
+        """
+        Run a single evaluation and queue its outcome.
+        """
+        values = []
+
+        def store(_, fname):
+            values.append(self.__observable(fname))
+
+        try:
+            result = run_point(self.__run, point, config, filename,
+                               store=None if self.__observable is None
+                               else store)
+            evaluation = Evaluation(result.point, theta, result.filename,
+                                    result.status, result.wall_time,
+                                    result.error,
+                                    values[0] if values else None)
+            self.__completed.put(evaluation)
+            return evaluation
+        finally:
+            with self.__lock:
+                self.__n_in_flight -= 1
+            self.__slots.release()
+
+    def submit(self, theta):
+        """
+        Start evaluating the model at the given parameter values.  This
+        returns as soon as the evaluation is queued.  If the largest number of
+        evaluations is already in flight, then this waits until one of them
+        completes.
+
+        :param theta: Sequence of real values with one value per parameter
+        :return: ``concurrent.futures.Future`` whose result is the
+            :py:class:`Evaluation`.  The evaluation is also returned by
+            :py:meth:`ready` once it completes.
+        """
+        theta = np.array(theta, dtype=float)
+        if theta.shape != (len(self.__parameters),):
+            msg = "{} values given for {} parameters"
+            raise ValueError(msg.format(theta.size, len(self.__parameters)))
+        theta.flags.writeable = False
+
+        config = copy.deepcopy(self.__configuration)
+        for name, value in zip(self.__parameters, theta):
+            config[name] = float(value)
+
+        self.__slots.acquire()
+        with self.__lock:
+            if self.__closed:
+                self.__slots.release()
+                raise RuntimeError("Evaluator is closed")
+            point = self.__n_submitted
+            filename = self.__path.joinpath(f"point_{point:06d}",
+                                            BATCH_OUTPUT_NAME)
+            future = self.__pool.submit(self.__evaluate, point, theta, config,
+                                        filename)
+            self.__n_submitted += 1
+            self.__n_in_flight += 1
+
+        return future
+
+    def ready(self, block=False, timeout=None):
+        """
+        Yield the evaluations that have completed since they were last
+        yielded in order of completion.  Each evaluation is yielded once.
+
+        :param block: If True and no evaluation has completed, then wait for
+            one to complete if any are in flight
+        :param timeout: Largest time in seconds to wait if blocking; ``None``
+            to wait until an evaluation completes
+        :return: Generator of :py:class:`Evaluation`
+        """
+        if block and self.__completed.empty() and (self.n_in_flight > 0):
+            try:
+                yield self.__completed.get(timeout=timeout)
+            except queue.Empty:
+                return
+
+        while True:
+            try:
+                yield self.__completed.get_nowait()
+            except queue.Empty:
+                return
+
+    def close(self):
+        """
+        Wait for all evaluations in flight to complete and release all
+        resources.  Completed evaluations can still be obtained with
+        :py:meth:`ready`.
+        """
+        with self.__lock:
+            self.__closed = True
+        self.__pool.shutdown(wait=True)
+        self.__runner.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
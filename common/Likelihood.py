@@ -0,0 +1,350 @@
+import math
+import threading
+
+import numpy as np
+
+from collections import OrderedDict, namedtuple
+
+# Largest number of interpolations cached per data set.  Batches
+# usually share one or a few angular grids.
+_CACHE_SIZE = 8
+
+
+class LikelihoodEvaluation(namedtuple("LikelihoodEvaluation",
+                                      ["chi_square", "log_likelihood",
+                                       "residuals"])):
+    """
+    Goodness of fit of a batch of simulations to experimental data.
+    ``chi_square`` and ``log_likelihood`` are 1D arrays with one value per
+    simulation.  ``residuals[i, :]`` are the uncertainty-normalized residuals
+    ``(model - data) / uncertainty`` of simulation ``i`` for all data points
+    of all data sets in order.
+    """
+    __slots__ = ()
+
+
+def _as_grid(grid):
+    grid = np.asarray(grid, dtype=float)
+    if (grid.ndim != 1) or (len(grid) < 2) or \
+            (not np.all(np.diff(grid) > 0.0)):
+        msg = "Model grid must be a strictly increasing 1D array of at least "
+        msg += "two points"
+        raise ValueError(msg)
+    return grid
+
+
+class DataSet(object):
+    def __init__(self, x, y, uncertainties, name=None):
+        """
+        Create a set of measurements of a single observable (|eg| an angular
+        distribution at one energy) with independent Gaussian uncertainties.
+
+        Model predictions are compared to the data by linear interpolation
+        from the grid on which they were computed onto the measured points.
+        The interpolation depends only on the model grid.  It is computed once
+        per grid and cached so that a batch of simulations computed on the
+        same grid is interpolated with a few array operations.
+
+        :param x: 1D array of points at which the observable was measured
+            (|eg| angles in degrees)
+        :param y: 1D array of measured values
+        :param uncertainties: 1D array of the standard deviation of each
+            measured value
+        :param name: Name used to identify the data set; ``None`` for no name
+        """
+        super().__init__()
+
+        x = np.array(x, dtype=float)
+        y = np.array(y, dtype=float)
+        uncertainties = np.array(uncertainties, dtype=float)
+        if (x.ndim != 1) or (len(x) == 0):
+            raise ValueError("Data points must be a non-empty 1D array")
+        elif (y.shape != x.shape) or (uncertainties.shape != x.shape):
+            msg = "Data points, values, and uncertainties must have same shape"
+            raise ValueError(msg)
+        elif not np.all(np.isfinite(x) & np.isfinite(y)):
+            raise ValueError("Data points and values must be finite")
+        elif not np.all(uncertainties > 0.0):
+            raise ValueError("Uncertainties must be positive")
+
+        for each in [x, y, uncertainties]:
+            each.flags.writeable = False
+        self.__x = x
+        self.__y = y
+        self.__uncertainties = uncertainties
+        self.__name = name
+        # Normalization of the Gaussian log-likelihood
+        self.__log_norm = -np.sum(np.log(uncertainties)) - \
+            0.5 * len(x) * math.log(2.0 * math.pi)
+        self.__cache = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @property
+    def x(self):
+        """
+        Points at which the observable was measured
+        """
+        return self.__x
+
+    @property
+    def y(self):
+        """
+        Measured values
+        """
+        return self.__y
+
+    @property
+    def uncertainties(self):
+        """
+        Standard deviation of each measured value
+        """
+        return self.__uncertainties
+
+    @property
+    def name(self):
+        """
+        Name of the data set or ``None``
+        """
+        return self.__name
+
+    def __len__(self):
+        """
+        :return: Number of data points
+        """
+        return len(self.__x)
+
+    def __interpolation(self, grid):
+        """
+        :return: ``(j, weight)`` such that the model values linearly
+            interpolated onto the data points are ``(1 - weight) *
+            values[..., j] + weight * values[..., j + 1]``
+        """
+        grid = _as_grid(grid)
+        key = grid.tobytes()
+        with self.__lock:
+            cached = self.__cache.get(key)
+            if cached is not None:
+                self.__cache.move_to_end(key)
+                return cached
+
+        if (self.__x.min() < grid[0]) or (self.__x.max() > grid[-1]):
+            msg = "Model grid [{}, {}] does not cover data set {}"
+            raise ValueError(msg.format(grid[0], grid[-1], self.__name))
+
+        # Interpolate in the interval to the left of each point except for
+        # points on the last grid point
+        j = np.clip(np.searchsorted(grid, self.__x, side="right") - 1,
+                    0, len(grid) - 2)
+        weight = (self.__x - grid[j]) / (grid[j + 1] - grid[j])
+        j.flags.writeable = False
+        weight.flags.writeable = False
+
+        with self.__lock:
+            self.__cache[key] = (j, weight)
+            while len(self.__cache) > _CACHE_SIZE:
+                self.__cache.popitem(last=False)
+        return j, weight
+
+    def interpolation_matrix(self, grid):
+        """
+        :param grid: 1D array of strictly increasing points on which model
+            values are given.  It must cover all data points.
+        :return: 2D array ``M`` such that ``values @ M.T`` are the model
+            values linearly interpolated onto the data points
+        """
+        j, weight = self.__interpolation(grid)
+        rows = np.arange(len(self.__x))
+        matrix = np.zeros((len(self.__x), len(grid)))
+        matrix[rows, j] = 1.0 - weight
+        matrix[rows, j + 1] = weight
+        return matrix
+
+    def residuals(self, grid, values):
+        """
+        :param grid: 1D array of points on which model values are given
+        :param values: 1D array of one simulation's values or 2D array with
+            one row of values per simulation on the given grid
+        :return: Uncertainty-normalized residuals ``(model - data) /
+            uncertainty`` with one row per simulation
+        """
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values[np.newaxis, :]
+        j, weight = self.__interpolation(grid)
+        if (values.ndim != 2) or (values.shape[1] != len(grid)):
+            msg = "Model values do not match grid of {} points"
+            raise ValueError(msg.format(len(grid)))
+        # Each interpolated value depends on only two grid points so that
+        # gathering them is much cheaper than multiplying by the matrix
+        model = values[:, j]
+        model += weight * (values[:, j + 1] - model)
+        return (model - self.__y) / self.__uncertainties
+
+    def chi_square(self, grid, values):
+        """
+        :param grid: 1D array of points on which model values are given
+        :param values: 1D array of one simulation's values or 2D array with
+            one row of values per simulation on the given grid
+        :return: 1D array of chi-square of each simulation
+        """
+        return np.sum(self.residuals(grid, values)**2, axis=1)
+
+    def log_likelihood(self, grid, values):
+        """
+        :param grid: 1D array of points on which model values are given
+        :param values: 1D array of one simulation's values or 2D array with
+            one row of values per simulation on the given grid
+        :return: 1D array of Gaussian log-likelihood of each simulation
+        """
+        return self.log_likelihood_from(self.chi_square(grid, values))
+
+    def log_likelihood_from(self, chi_square):
+        """
+        :param chi_square: Chi-square of simulations with respect to the data
+            set
+        :return: Gaussian log-likelihood of the simulations
+        """
+        return -0.5 * np.asarray(chi_square) + self.__log_norm
+
+
+class Likelihood(object):
+    def __init__(self, datasets):
+        """
+        Combine independent data sets into a single likelihood that evaluates
+        whole batches of simulations at once.
+
+        Each simulation's model values for all data sets are given as a
+        sequence of ``(grid, values)`` pairs with one pair per data set in the
+        order of the data sets.  Simulations whose model values for a data set
+        share a grid are interpolated and compared with that data set as one
+        2D array so that the cost of evaluating a batch is dominated by a few
+        NumPy operations rather than by Python loops over simulations.
+
+        :param datasets: Sequence of :py:class:`DataSet` objects
+        """
+        super().__init__()
+
+        datasets = list(datasets)
+        if not datasets:
+            raise ValueError("No data sets given")
+        for each in datasets:
+            if not isinstance(each, DataSet):
+                raise TypeError("Data sets must be DataSet objects")
+
+        self.__datasets = datasets
+
+    @property
+    def datasets(self):
+        """
+        ``list`` of :py:class:`DataSet` objects in order
+        """
+        return list(self.__datasets)
+
+    @property
+    def n_data(self):
+        """
+        Total number of data points in all data sets
+        """
+        return sum(len(each) for each in self.__datasets)
+
+    def __evaluate(self, n_runs, groups):
+        """
+        :param groups: ``list`` with one element per data set, each of which
+            is a ``list`` of ``(grid, rows, values)`` where ``values`` is a 2D
+            array of the model values of the simulations in ``rows`` on
+            ``grid``
+        :return: :py:class:`LikelihoodEvaluation` of all simulations
+        """
+        residuals = np.empty((n_runs, self.n_data))
+        log_likelihood = np.zeros(n_runs)
+        offset = 0
+        for dataset, dataset_groups in zip(self.__datasets, groups):
+            columns = slice(offset, offset + len(dataset))
+            for grid, rows, values in dataset_groups:
+                residuals[rows, columns] = dataset.residuals(grid, values)
+            log_likelihood += dataset.log_likelihood_from(
+                np.sum(residuals[:, columns]**2, axis=1)
+            )
+            offset += len(dataset)
+
+        chi_square = np.sum(residuals**2, axis=1)
+        return LikelihoodEvaluation(chi_square, log_likelihood, residuals)
+
+    def evaluate(self, models):
+        """
+        :param models: Sequence with one element per simulation, each of which
+            is a sequence of ``(grid, values)`` 1D arrays with one pair per
+            data set
+        :return: :py:class:`LikelihoodEvaluation` of all simulations
+        """
+        models = list(models)
+        for i, model in enumerate(models):
+            if len(model) != len(self.__datasets):
+                msg = "Simulation {} has {} models for {} data sets"
+                raise ValueError(msg.format(i, len(model),
+                                            len(self.__datasets)))
+
+        groups = []
+        for k in range(len(self.__datasets)):
+            # Simulations usually share grid objects.  Group by object first
+            # and then merge groups whose grids are equal so that each group
+            # is interpolated at once.
+            by_object = {}
+            for i, model in enumerate(models):
+                grid, values = model[k]
+                group = by_object.get(id(grid))
+                if group is None:
+                    group = by_object[id(grid)] = (grid, [], [])
+                group[1].append(i)
+                group[2].append(values)
+
+            by_value = {}
+            for grid, rows, values in by_object.values():
+                grid = np.asarray(grid, dtype=float)
+                key = (grid.shape, grid.tobytes())
+                if key not in by_value:
+                    by_value[key] = (grid, [], [])
+                by_value[key][1].extend(rows)
+                by_value[key][2].extend(values)
+            groups.append([(grid, rows, np.asarray(values, dtype=float))
+                           for grid, rows, values in by_value.values()])
+
+        return self.__evaluate(len(models), groups)
+
+    def evaluate_stacked(self, models):
+        """
+        Evaluate simulations whose model values for each data set are all
+        given on the same grid.  This avoids all Python loops over
+        simulations.
+
+        :param models: Sequence of ``(grid, values)`` with one pair per data
+            set, where ``values`` is a 2D array with one row of model values
+            on ``grid`` per simulation
+        :return: :py:class:`LikelihoodEvaluation` of all simulations
+        """
+        models = [(grid, np.asarray(values, dtype=float))
+                  for grid, values in models]
+        if len(models) != len(self.__datasets):
+            msg = "{} models given for {} data sets"
+            raise ValueError(msg.format(len(models), len(self.__datasets)))
+        n_runs = {values.shape[0] for _, values in models
+                  if values.ndim == 2}
+        if (len(n_runs) != 1) or any(values.ndim != 2 for _, values in models):
+            msg = "Model values must be 2D arrays with one row per simulation"
+            raise ValueError(msg)
+
+        return self.__evaluate(n_runs.pop(),
+                               [[(grid, slice(None), values)]
+                                for grid, values in models])
+
+    def evaluate_files(self, filenames, observable):
+        """
+        :param filenames: Sequence of filenames including path of the results
+            of each simulation
+        :param observable: Function that is called with the filename of a
+            simulation's results and that returns a sequence of ``(grid,
+            values)`` 1D arrays with one pair per data set
+        :return: :py:class:`LikelihoodEvaluation` of all simulations in the
+            order of the filenames
+        """
+        return self.evaluate([observable(each) for each in filenames])
@@ -0,0 +1,263 @@
+import re
+import time
+
+from numbers import Real, Integral
+from collections import namedtuple
+
+# Names of progress events published by default.  The default patterns match
+# the lines that |frescox| writes as it starts each laboratory energy, each
+# total angular momentum, and each coupled-channels iteration.  Other events
+# can be published by giving patterns for them.
+PROGRESS_ENERGY = "energy"
+PROGRESS_PARTIAL_WAVE = "partial_wave"
+PROGRESS_ITERATION = "iteration"
+DEFAULT_PROGRESS_PATTERNS = {
+    PROGRESS_ENERGY: r"(?i)\blab(?:oratory)?\.?\s+energy\s*=?\s*"
+                     r"([-+]?\d+\.?\d*(?:[eEdD][-+]?\d+)?)",
+    PROGRESS_PARTIAL_WAVE: r"^\s*J\s*=\s*(\d+\.?\d*)",
+    PROGRESS_ITERATION: r"(?i)\biteration\s*(?:#|no\.?)?\s*(\d+)"
+}
+
+# Output is decoded as Latin-1 so that no byte sequence written by Frescox
+# can cause a decoding error
+_ENCODING = "latin-1"
+
+
+class ProgressEvent(namedtuple("ProgressEvent", ["filename", "name", "value",
+                                                 "count", "elapsed",
+                                                 "line"])):
+    """
+    Progress of a running |frescox| simulation.  ``name`` identifies the kind
+    of event (|eg| ``"energy"``), ``value`` is the value captured from the
+    output line as a ``float`` if possible and a ``str`` otherwise, ``count``
+    is the number of events of the same kind so far including this one,
+    ``elapsed`` is the run time in seconds so far, and ``line`` is the full
+    line of output.  ``filename`` is the results file of the simulation.
+    """
+    __slots__ = ()
+
+
+class RunAborted(RuntimeError):
+    def __init__(self, reason):
+        """
+        Raised when a :py:class:`Monitor` stops a simulation early.
+
+        :param reason: Description of the failure pattern or budget that
+            caused the simulation to be stopped
+        """
+        super().__init__(f"Simulation aborted ({reason})")
+        self.reason = reason
+
+
+def _to_value(text):
+    try:
+        return float(text.replace("d", "e").replace("D", "E"))
+    except ValueError:
+        return text
+
+
+class Monitor(object):
+    def __init__(self, callback=None, progress=None, failures=(),
+                 max_wall_time=None, max_counts=None, max_output=None):
+        """
+        Create a monitor that reads the output of each |frescox| simulation as
+        it is written, publishes progress events, and stops simulations that
+        are evidently failing or that exceed their budget.
+
+        When a simulation is stopped, |frescox| is sent ``SIGTERM``, and
+        ``SIGKILL`` if it has not ended shortly after, all output written so
+        far is kept, and :py:class:`RunAborted` is raised.  A single monitor
+        can watch many simulations concurrently, in which case the callback is
+        called from several threads.
+
+        :param callback: Function that is called with a
+            :py:class:`ProgressEvent` each time a progress pattern matches.
+            If it returns ``True``, then the simulation is stopped.  ``None``
+            to not publish events.
+        :param progress: ``dict`` that maps event names to regular expressions
+            whose first group captures the event's value; ``None`` to use
+            ``DEFAULT_PROGRESS_PATTERNS``
+        :param failures: Sequence of regular expressions that stop the
+            simulation if any line of output matches (|eg| ``r"\\bNaN\\b"``)
+        :param max_wall_time: Run time in seconds after which a simulation is
+            stopped; ``None`` for no limit
+        :param max_counts: ``dict`` that maps event names to the largest
+            number of events allowed (|eg| to stop runaway iterations);
+            ``None`` for no limits
+        :param max_output: Size of output in bytes after which a simulation is
+            stopped; ``None`` for no limit
+        """
+        super().__init__()
+
+        if progress is None:
+            progress = DEFAULT_PROGRESS_PATTERNS
+        if max_counts is None:
+            max_counts = {}
+
+        if (callback is not None) and (not callable(callback)):
+            raise TypeError("Progress callback is not callable")
+        elif not isinstance(progress, dict):
+            raise TypeError("Progress patterns not given as a dictionary")
+        elif isinstance(failures, str):
+            raise TypeError("Failure patterns must be a sequence of patterns")
+        elif not isinstance(max_counts, dict):
+            raise TypeError("Event count limits not given as a dictionary")
+
+        for name, value in [("wall time", max_wall_time),
+                            ("output", max_output)]:
+            if value is None:
+                continue
+            elif isinstance(value, bool) or (not isinstance(value, Real)):
+                raise TypeError(f"Maximum {name} must be a number")
+            elif value <= 0:
+                raise ValueError(f"Maximum {name} ({value}) must be positive")
+        for name, value in max_counts.items():
+            if name not in progress:
+                raise ValueError(f"No progress pattern for {name} events")
+            elif (not isinstance(value, Integral)) or (value < 1):
+                msg = "Maximum number of {} events must be positive integer"
+                raise ValueError(msg.format(name))
+
+        try:
+            self.__progress = {name: re.compile(pattern)
+                               for name, pattern in progress.items()}
+            self.__failures = [re.compile(each) for each in failures]
+        except re.error as err:
+            raise ValueError(f"Invalid pattern ({err})")
+        for name, pattern in self.__progress.items():
+            if pattern.groups < 1:
+                msg = "Progress pattern for {} events has no group"
+                raise ValueError(msg.format(name))
+
+        self.__callback = callback
+        self.__max_wall_time = max_wall_time
+        self.__max_counts = dict(max_counts)
+        self.__max_output = max_output
+
+    @property
+    def max_wall_time(self):
+        """
+        Run time in seconds after which a simulation is stopped or ``None``
+        """
+        return self.__max_wall_time
+
+    def watch(self, filename):
+        """
+        Begin watching a single simulation.  This is called by
+        :py:class:`Runner` as each simulation starts.
+
+        :param filename: Filename including path of the simulation's results
+        :return: Object whose ``feed`` method is called with each chunk of
+            output and returns the reason to stop the simulation or ``None``,
+            and whose ``remaining`` method returns the run time in seconds
+            left or ``None`` if unlimited
+        """
+        return _Watch(self, filename)
+
+    def _check_line(self, watch, line):
+        """
+        :return: Reason to stop the simulation or ``None``
+        """
+        for pattern in self.__failures:
+            if pattern.search(line):
+                return f"Output matched {pattern.pattern!r}: {line.strip()}"
+
+        for name, pattern in self.__progress.items():
+            match = pattern.search(line)
+            if match is None:
+                continue
+
+            count = watch.count(name)
+            limit = self.__max_counts.get(name)
+            if (limit is not None) and (count > limit):
+                return f"More than {limit} {name} events"
+            elif self.__callback is not None:
+                event = ProgressEvent(watch.filename, name,
+                                      _to_value(match.group(1)), count,
+                                      watch.elapsed(), line.rstrip("\n"))
+                if self.__callback(event) is True:
+                    return f"Stopped by callback at {name} {event.value}"
+
+        return None
+
+    def _check_size(self, n_bytes):
+        """
+        :return: Reason to stop the simulation or ``None``
+        """
+        if (self.__max_output is not None) and (n_bytes > self.__max_output):
+            return f"Output exceeded {self.__max_output} bytes"
+        return None
+
+
+class _Watch(object):
+    def __init__(self, monitor, filename):
+        """
+        State of a single simulation watched by a :py:class:`Monitor`.
+        """
+        super().__init__()
+
+        self.__monitor = monitor
+        self.__filename = filename
+        self.__start = time.perf_counter()
+        self.__counts = {}
+        self.__partial = ""
+        self.__n_bytes = 0
+
+    @property
+    def filename(self):
+        return self.__filename
+
+    def elapsed(self):
+        """
+        :return: Run time in seconds so far
+        """
+        return time.perf_counter() - self.__start
+
+    def remaining(self):
+        """
+        :return: Run time in seconds left before the simulation is stopped;
+            ``None`` if its run time is not limited
+        """
+        if self.__monitor.max_wall_time is None:
+            return None
+        return self.__monitor.max_wall_time - self.elapsed()
+
+    def expired(self):
+        """
+        :return: Reason to stop the simulation if it has run out of time;
+            ``None``, otherwise
+        """
+        remaining = self.remaining()
+        if (remaining is not None) and (remaining <= 0.0):
+            msg = "Run time exceeded {} s"
+            return msg.format(self.__monitor.max_wall_time)
+        return None
+
+    def count(self, name):
+        """
+        Count one more event of the given kind.
+
+        :return: Number of events of the kind so far
+        """
+        self.__counts[name] = self.__counts.get(name, 0) + 1
+        return self.__counts[name]
+
+    def feed(self, data):
+        """
+        :param data: Next chunk of output as ``bytes``
+        :return: Reason to stop the simulation or ``None``
+        """
+        self.__n_bytes += len(data)
+        reason = self.__monitor._check_size(self.__n_bytes)
+        if reason is not None:
+            return reason
+
+        # Only complete lines are checked
+        lines = (self.__partial + data.decode(_ENCODING)).split("\n")
+        self.__partial = lines.pop()
+        for line in lines:
+            reason = self.__monitor._check_line(self, line)
+            if reason is not None:
+                return reason
+
+        return self.expired()
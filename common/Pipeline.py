@@ -0,0 +1,382 @@
+import time
+import queue
+import functools
+import threading
+
+from numbers import Integral
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# TODO: This assumes in a package
+from ._batch import run_point
+from .RunIndex import RUN_SUCCEEDED, RUN_FAILED
+
+# Names of the stages of a pipeline
+STAGE_LAUNCH = "launch"
+STAGE_PARSE = "parse"
+STAGE_REDUCE = "reduce"
+
+# Seconds between checks of whether a pipeline was closed while a worker waits
+# on a queue
+_POLL_INTERVAL = 0.1
+
+
+class _Done(object):
+    """
+    Marks the end of the input of a stage
+    """
+
+
+_DONE = _Done()
+
+
+class PipelineResult(namedtuple("PipelineResult", ["point", "filename",
+                                                   "status", "wall_time",
+                                                   "error", "peak_memory",
+                                                   "parsed", "value"])):
+    """
+    Outcome of a single simulation that passed through a
+    :py:class:`Pipeline`.  ``point`` through ``peak_memory`` are as for
+    :py:class:`BatchResult` except that a simulation whose results could not
+    be parsed or reduced also fails.  ``parsed`` is the value returned by the
+    parse function and ``value`` is that returned by the reduction function.
+    Each is ``None`` if its stage was not reached or does not exist.
+    """
+    __slots__ = ()
+
+
+class StageStatistics(namedtuple("StageStatistics", ["name", "n_workers",
+                                                     "n_items", "busy_time",
+                                                     "starved_time",
+                                                     "blocked_time"])):
+    """
+    Time spent by all workers of one stage of a :py:class:`Pipeline`.
+    ``busy_time`` is the total time in seconds spent working on items,
+    ``starved_time`` that spent waiting for input from the previous stage,
+    and ``blocked_time`` that spent waiting for the next stage to accept
+    output.
+    """
+    __slots__ = ()
+
+    def utilization(self, elapsed):
+        """
+        :param elapsed: Wall time in seconds over which the stage ran
+        :return: Fraction of the available worker time that the stage's
+            workers were busy
+        """
+        if elapsed <= 0.0:
+            return 0.0
+        return self.busy_time / (self.n_workers * elapsed)
+
+
+class PipelineStatistics(namedtuple("PipelineStatistics", ["elapsed",
+                                                           "stages"])):
+    """
+    Instrumentation of a :py:class:`Pipeline`.  ``elapsed`` is the wall time in
+    seconds since the pipeline started and ``stages`` is a ``list`` of
+    :py:class:`StageStatistics` in the order of the stages.
+    """
+    __slots__ = ()
+
+    @property
+    def bottleneck(self):
+        """
+        Name of the stage whose workers were busiest, which limits the
+        throughput of the pipeline.  Adding workers to it or making its work
+        cheaper should speed up the pipeline, while adding workers to other
+        stages should not.
+        """
+        return max(self.stages,
+                   key=lambda stage: stage.utilization(self.elapsed)).name
+
+    def print_report(self):
+        """
+        Print the time that each stage spent working and waiting and identify
+        the bottleneck
+        """
+        print()
+        print(f"Elapsed time {self.elapsed:.3f} s")
+        print()
+        print(f"{'Stage':<8}{'Workers':>8}{'Items':>8}{'Busy (s)':>11}"
+              f"{'Starved (s)':>13}{'Blocked (s)':>13}{'Utilization':>13}")
+        print("-" * 74)
+        for stage in self.stages:
+            utilization = 100.0 * stage.utilization(self.elapsed)
+            print(f"{stage.name:<8}{stage.n_workers:>8}{stage.n_items:>8}"
+                  f"{stage.busy_time:>11.3f}{stage.starved_time:>13.3f}"
+                  f"{stage.blocked_time:>13.3f}{utilization:>12.1f}%")
+        print()
+        print(f"Bottleneck: {self.bottleneck}")
+        print()
+
+
+class Pipeline(object):
+    def __init__(self, runner, configurations, filenames, parse, reduce=None,
+                 n_workers=1, n_parsers=1, n_reducers=1, queue_size=None,
+                 overwrite=False):
+        """
+        Run a batch of simulations through overlapping stages so that results
+        are parsed and reduced while later simulations run rather than by the
+        worker that ran them.  The launch stage runs simulations, the parse
+        stage extracts values from each simulation's results, and the optional
+        reduction stage computes a value (|eg| a likelihood) from the parsed
+        values.  Each stage has its own pool of workers and passes items to
+        the next stage through a bounded queue.  A stage whose output queue
+        is full waits so that a slow stage throttles all earlier stages rather
+        than letting work pile up in memory.  Iterating over the pipeline is
+        the final stage.  A caller that stops iterating does not stop the
+        pipeline, whose workers fill the queues and then wait for the caller
+        to resume.  Only :py:meth:`close` stops the pipeline, so use it as a
+        context manager.
+
+        .. code-block:: python
+
+            with create_pipeline(configurations, filenames, parse,
+                                 reduce=log_likelihood, n_workers=8,
+                                 n_parsers=2) as pipeline:
+                for result in pipeline:
+                    print(result.point, result.value)
+                pipeline.statistics.print_report()
+
+        The time that each stage spends working, waiting for input, and
+        waiting to pass on output is recorded so that the stage that limits
+        the throughput can be identified with :py:attr:`statistics`.
+
+        Use :py:func:`create_pipeline` rather than creating pipelines
+        directly.
+
+        :param runner: :py:class:`Runner` used to run all simulations.  Since
+            simulations run concurrently, it should be isolated so that each
+            runs in the folder of its results.  It is closed with the
+            pipeline.
+        :param configurations: Iterable of :py:class:`Configuration` objects,
+            which is consumed lazily
+        :param filenames: Iterable of filenames including path of files to
+            write results to with one filename per configuration.  Folders
+            are created as needed.
+        :param parse: Function that is called with the filename of a
+            successful simulation's results and whose return value is passed
+            to the reduction stage.  If it raises, then the simulation fails.
+        :param reduce: Function that is called with the value returned by
+            ``parse`` and whose return value is the value of the simulation;
+            ``None`` for no reduction stage.  If it raises, then the
+            simulation fails.  With more than one reducer, it must be safe to
+            call from several threads at once.
+        :param n_workers: Number of simulations to run concurrently
+        :param n_parsers: Number of results to parse concurrently
+        :param n_reducers: Number of values to reduce concurrently
+        :param queue_size: Largest number of items waiting for each stage
+            after the launch stage; ``None`` for twice the stage's number of
+            workers
+        :param overwrite: If False, then a simulation fails if either of its
+            input or output files exist
+        """
+        super().__init__()
+
+        if not callable(parse):
+            raise TypeError("Parse function is not callable")
+        elif (reduce is not None) and (not callable(reduce)):
+            raise TypeError("Reduction function is not callable")
+        elif not isinstance(overwrite, bool):
+            raise TypeError("Given overwrite argument is not a boolean")
+        for name, value in [("workers", n_workers), ("parsers", n_parsers),
+                            ("reducers", n_reducers)]:
+            if (not isinstance(value, Integral)) or (value < 1):
+                msg = f"Number of {name} must be a positive integer"
+                raise ValueError(msg)
+        if (queue_size is not None) and \
+                ((not isinstance(queue_size, Integral)) or (queue_size < 1)):
+            raise ValueError("Queue size must be a positive integer")
+
+        stages = [(STAGE_LAUNCH, n_workers, self.__launch),
+                  (STAGE_PARSE, n_parsers, self.__parse)]
+        if reduce is not None:
+            stages.append((STAGE_REDUCE, n_reducers, self.__reduce))
+
+        self.__runner = runner
+        self.__run = functools.partial(runner.run, overwrite=overwrite)
+        self.__points = enumerate(zip(configurations, filenames))
+        self.__parse_function = parse
+        self.__reduce_function = reduce
+        self.__names = [name for name, _, _ in stages]
+        self.__n_workers = [n for _, n, _ in stages]
+
+        # inboxes[i] is the queue from which stage i takes its input.  The
+        # launch stage takes its input from the configurations instead.  The
+        # last queue is read by the caller.
+        self.__inboxes = [None]
+        for _, n, _ in stages[1:]:
+            self.__inboxes.append(queue.Queue(
+                2 * n if queue_size is None else queue_size
+            ))
+        self.__inboxes.append(queue.Queue(
+            2 * n_workers if queue_size is None else queue_size
+        ))
+
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+        # Running totals of items, busy, starved, and blocked times of each
+        # stage and number of its workers that are still running
+        self.__totals = [[0, 0.0, 0.0, 0.0] for _ in stages]
+        self.__n_running = list(self.__n_workers)
+        self.__finished = False
+        self.__start = time.perf_counter()
+        self.__end = None
+
+        self.__pools = []
+        self.__futures = []
+        for i, (name, n, function) in enumerate(stages):
+            pool = ThreadPoolExecutor(max_workers=n,
+                                      thread_name_prefix=f"pipeline-{name}")
+            self.__pools.append(pool)
+            for _ in range(n):
+                self.__futures.append(pool.submit(self.__work, i, function))
+
+    @property
+    def statistics(self):
+        """
+        :py:class:`PipelineStatistics` of the pipeline so far
+        """
+        with self.__lock:
+            end = time.perf_counter() if self.__end is None else self.__end
+            stages = [StageStatistics(name, n, *totals)
+                      for name, n, totals in zip(self.__names,
+                                                 self.__n_workers,
+                                                 self.__totals)]
+        return PipelineStatistics(end - self.__start, stages)
+
+    def __get(self, stage):
+        """
+        :return: Next input of the given stage or ``_DONE`` if there is no
+            more input or if the pipeline was closed
+        """
+        if stage == 0:
+            with self.__lock:
+                if self.__stopped.is_set():
+                    return _DONE
+                return next(self.__points, _DONE)
+
+        inbox = self.__inboxes[stage]
+        while not self.__stopped.is_set():
+            try:
+                return inbox.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def __put(self, stage, item):
+        """
+        Pass an item to the stage after the given stage and wait while the
+        next stage's queue is full.
+        """
+        outbox = self.__inboxes[stage + 1]
+        while not self.__stopped.is_set():
+            try:
+                outbox.put(item, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                pass
+
+    def __work(self, stage, function):
+        """
+        Process the input of a stage until it is exhausted.  The last worker
+        of the stage to finish tells each worker of the next stage that its
+        input is exhausted.
+        """
+        try:
+            while True:
+                start = time.perf_counter()
+                item = self.__get(stage)
+                fetched = time.perf_counter()
+                if item is _DONE:
+                    break
+                item = function(item)
+                done = time.perf_counter()
+                self.__put(stage, item)
+                with self.__lock:
+                    totals = self.__totals[stage]
+                    totals[0] += 1
+                    totals[1] += done - fetched
+                    totals[2] += fetched - start
+                    totals[3] += time.perf_counter() - done
+        finally:
+            with self.__lock:
+                self.__n_running[stage] -= 1
+                last = (self.__n_running[stage] == 0)
+            if last:
+                n_next = 1 if stage + 1 == len(self.__names) \
+                    else self.__n_workers[stage + 1]
+                for _ in range(n_next):
+                    self.__put(stage, _DONE)
+
+    def __launch(self, item):
+        point, (config, filename) = item
+        result = run_point(self.__run, point, config, filename)
+        return PipelineResult(*result, None, None)
+
+    def __parse(self, result):
+        if result.status != RUN_SUCCEEDED:
+            return result
+        start = time.perf_counter()
+        try:
+            parsed = self.__parse_function(result.filename)
+        except Exception as err:
+            return result._replace(
+                status=RUN_FAILED,
+                wall_time=result.wall_time + time.perf_counter() - start,
+                error=f"{type(err).__name__}: {err}"
+            )
+        return result._replace(parsed=parsed)
+
+    def __reduce(self, result):
+        if result.status != RUN_SUCCEEDED:
+            return result
+        try:
+            value = self.__reduce_function(result.parsed)
+        except Exception as err:
+            return result._replace(status=RUN_FAILED,
+                                   error=f"{type(err).__name__}: {err}")
+        return result._replace(value=value)
+
+    def __iter__(self):
+        """
+        Yield the outcome of each simulation in order of completion once it
+        has passed through all stages.
+
+        :return: Generator of :py:class:`PipelineResult`
+        """
+        while True:
+            with self.__lock:
+                if self.__finished:
+                    return
+            item = self.__get(len(self.__names))
+            if item is _DONE:
+                with self.__lock:
+                    self.__finished = True
+                    self.__end = time.perf_counter()
+                # Report errors of the pipeline itself
+                for future in self.__futures:
+                    future.result()
+                return
+            yield item
+
+    def close(self):
+        """
+        Stop the pipeline and release all resources.  Simulations already
+        running are completed but no new simulations are started and results
+        not yet yielded are discarded.
+        """
+        self.__stopped.set()
+        for pool in self.__pools:
+            pool.shutdown(wait=True)
+        with self.__lock:
+            self.__finished = True
+            if self.__end is None:
+                self.__end = time.perf_counter()
+        self.__runner.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
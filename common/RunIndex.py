@@ -0,0 +1,354 @@
+import os
+import re
+import sqlite3
+import warnings
+import threading
+
+from pathlib import Path
+from numbers import Real
+from collections import namedtuple
+
+from .Configuration import Configuration
+from ._fingerprint import installation_fingerprint
+
+# Environment variable that names the index to which all runs are recorded if
+# no index is given explicitly
+RUN_INDEX_ENV = "BFRESCOX_RUN_INDEX"
+
+# Status of indexed runs
+RUN_SUCCEEDED = "succeeded"
+RUN_FAILED = "failed"
+# For runs stopped early by a monitor
+RUN_ABORTED = "aborted"
+# For runs whose outcome was not observed (e.g., backfilled from disk)
+RUN_UNKNOWN = "unknown"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    output      TEXT UNIQUE NOT NULL,
+    fingerprint TEXT,
+    started     REAL,
+    wall_time   REAL,
+    peak_memory INTEGER,
+    status      TEXT NOT NULL,
+    nml         TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    run_id INTEGER NOT NULL,
+    name   TEXT NOT NULL,
+    value  REAL,
+    text   TEXT
+);
+CREATE INDEX IF NOT EXISTS parameters_by_value ON parameters (name, value);
+CREATE INDEX IF NOT EXISTS parameters_by_text  ON parameters (name, text);
+CREATE INDEX IF NOT EXISTS parameters_by_run   ON parameters (run_id);
+CREATE INDEX IF NOT EXISTS runs_by_status      ON runs (status);
+CREATE INDEX IF NOT EXISTS runs_by_fingerprint ON runs (fingerprint);
+"""
+
+# Columns added to the runs table after its creation with their types so that
+# indices created by older versions can be upgraded
+_ADDED_COLUMNS = {
+    "peak_memory": "INTEGER"
+}
+
+_GROUP_NAME = re.compile(r"^([a-z_0-9]+)\.")
+
+
+def _canonical(name):
+    """
+    :return: Parameter name with occurrence index given explicitly so that
+        group.key and group[0].key are stored and queried identically
+    """
+    return _GROUP_NAME.sub(r"\1[0].", name.lower(), count=1)
+
+
+class RunRecord(namedtuple("RunRecord", ["run_id", "output", "fingerprint",
+                                         "started", "wall_time",
+                                         "peak_memory", "status", "nml"])):
+    """
+    Handle to a single run in a :py:class:`RunIndex`.  Times are in seconds
+    with ``started`` given as seconds since the epoch.  ``peak_memory`` is the
+    peak resident set size of the largest |frescox| process in bytes.  Values
+    that were not recorded are ``None``.
+    """
+    __slots__ = ()
+
+    def configuration(self):
+        """
+        :return: :py:class:`Configuration` object used for the run
+        """
+        return Configuration.from_NML_string(self.nml)
+
+
+class RunIndex(object):
+    def __init__(self, filename):
+        """
+        Open or create a local SQLite database that indexes |frescox| runs by
+        their configuration parameters, the installation used, timing, status,
+        and the location of their results.
+
+        The index can be shared by several processes on the same machine and
+        each object can be used by several threads.  It should **not** be
+        stored on a network filesystem, where SQLite's file locking is often
+        unreliable.
+
+        :param filename: Filename including path of the index database
+        """
+        super().__init__()
+
+        self.__fname = Path(filename).resolve()
+        self.__db = sqlite3.connect(str(self.__fname), timeout=60.0,
+                                    check_same_thread=False)
+        self.__lock = threading.Lock()
+        self.__db.execute("PRAGMA journal_mode=WAL")
+        with self.__db:
+            self.__db.executescript(_SCHEMA)
+            existing = {row[1] for row in
+                        self.__db.execute("PRAGMA table_info(runs)")}
+            for column, kind in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    sql = f"ALTER TABLE runs ADD COLUMN {column} {kind}"
+                    self.__db.execute(sql)
+
+    @property
+    def filename(self):
+        """
+        Filename including path of the index database
+        """
+        return self.__fname
+
+    def close(self):
+        with self.__lock:
+            self.__db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        with self.__lock:
+            sql = "SELECT COUNT(*) FROM runs"
+            return self.__db.execute(sql).fetchone()[0]
+
+    def __insert(self, config, output, fingerprint, started, wall_time,
+                 peak_memory, status):
+        """
+        Add or replace a single run within the caller's transaction.
+        """
+        output = str(Path(output).resolve())
+        self.__db.execute(
+            "DELETE FROM parameters WHERE run_id IN "
+            "(SELECT id FROM runs WHERE output = ?)", (output,)
+        )
+        self.__db.execute("DELETE FROM runs WHERE output = ?", (output,))
+        run_id = self.__db.execute(
+            "INSERT INTO runs "
+            "(output, fingerprint, started, wall_time, peak_memory, status, "
+            "nml) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (output, fingerprint, started, wall_time, peak_memory, status,
+             config.to_NML_string())
+        ).lastrowid
+
+        rows = []
+        for name, value in config.parameters.items():
+            if isinstance(value, Real):
+                rows.append((run_id, _canonical(name), float(value), None))
+            elif isinstance(value, str):
+                rows.append((run_id, _canonical(name), None, value))
+            else:
+                text = " ".join(str(each) for each in value)
+                rows.append((run_id, _canonical(name), None, text))
+        self.__db.executemany(
+            "INSERT INTO parameters (run_id, name, value, text) "
+            "VALUES (?, ?, ?, ?)", rows
+        )
+
+        return run_id
+
+    def record(self, config, output, frescox=None, started=None,
+               wall_time=None, status=RUN_SUCCEEDED, peak_memory=None):
+        """
+        Add a run to the index.  If the index already contains a run with the
+        same output file, then that run is replaced.
+
+        :param config: :py:class:`Configuration` object used for the run
+        :param output: Filename including path of the run's results
+        :param frescox: ``dict`` that fully characterizes the |frescox|
+            installation used for the run; ``None`` if unknown
+        :param started: Time at which the run started in seconds since the
+            epoch; ``None`` if unknown
+        :param wall_time: Wall time of the run in seconds; ``None`` if unknown
+        :param status: Status of the run
+        :param peak_memory: Peak resident set size of the largest |frescox|
+            process of the run in bytes; ``None`` if unknown
+        :return: Integer identifier of the run within the index
+        """
+        if not isinstance(config, Configuration):
+            raise TypeError("Run configuration is not a Configuration object")
+        elif status not in (RUN_SUCCEEDED, RUN_FAILED, RUN_ABORTED,
+                            RUN_UNKNOWN):
+            raise ValueError(f"Invalid run status ({status})")
+
+        fingerprint = None
+        if frescox is not None:
+            fingerprint = installation_fingerprint(frescox)
+
+        with self.__lock, self.__db:
+            return self.__insert(config, output, fingerprint, started,
+                                 wall_time, peak_memory, status)
+
+    def backfill(self, root, pattern="*.out*", input_name="frescox.in"):
+        """
+        Add to the index all existing runs found in the given folder and its
+        subfolders.  A run is identified as an output file that matches the
+        given pattern and that is in the same folder as a |frescox| namelist
+        input file with the given name.  This is the layout of files written
+        by ``run_simulation``.  Runs whose output files are already indexed
+        are skipped.
+
+        All runs are added in a single transaction.  Folders whose input file
+        cannot be loaded are skipped with a warning.
+
+        :param root: Path to the folder to search
+        :param pattern: Glob pattern that identifies output files
+        :param input_name: Name of the |frescox| input file
+        :return: Number of runs added to the index
+        """
+        root = Path(root).resolve()
+        if not root.is_dir():
+            raise ValueError(f"{root} does not exist or is not a folder")
+
+        n_added = 0
+        with self.__lock, self.__db:
+            indexed = {row[0] for row in
+                       self.__db.execute("SELECT output FROM runs")}
+            for path, _, files in os.walk(root):
+                if input_name not in files:
+                    continue
+                path = Path(path)
+                outputs = [each for each in sorted(path.glob(pattern))
+                           if each.is_file() and (each.name != input_name) and
+                           (str(each) not in indexed)]
+                if not outputs:
+                    continue
+
+                try:
+                    config = Configuration.from_NML(path.joinpath(input_name))
+                except ValueError as err:
+                    msg = "Skipping {} ({})"
+                    warnings.warn(msg.format(path.joinpath(input_name), err))
+                    continue
+
+                for output in outputs:
+                    self.__insert(config, output, None,
+                                  output.stat().st_mtime, None, None,
+                                  RUN_UNKNOWN)
+                    n_added += 1
+
+        return n_added
+
+    def query(self, parameters=None, status=None, fingerprint=None):
+        """
+        Find all indexed runs that satisfy all of the given criteria.
+
+        :param parameters: ``dict`` that maps parameter names (|eg|
+            ``pot[1].p1``) to the required value of the parameter or to a
+            ``(low, high)`` tuple that gives the inclusive range of allowed
+            values.  Either bound can be ``None`` for an open range.
+        :param status: Required status of the runs; ``None`` for any status
+        :param fingerprint: Required installation fingerprint; ``None`` for any
+            installation
+        :return: ``list`` of :py:class:`RunRecord` handles ordered by the time
+            at which they were added to the index
+        """
+        clauses = []
+        args = []
+        if status is not None:
+            clauses.append("status = ?")
+            args.append(status)
+        if fingerprint is not None:
+            clauses.append("fingerprint = ?")
+            args.append(fingerprint)
+
+        subquery = "id IN (SELECT run_id FROM parameters WHERE name = ? AND {})"
+        if parameters is None:
+            parameters = {}
+        for name, condition in parameters.items():
+            name = _canonical(name)
+            if isinstance(condition, tuple):
+                low, high = condition
+                if low is not None:
+                    clauses.append(subquery.format("value >= ?"))
+                    args += [name, low]
+                if high is not None:
+                    clauses.append(subquery.format("value <= ?"))
+                    args += [name, high]
+                if (low is None) and (high is None):
+                    clauses.append(subquery.format("value IS NOT NULL"))
+                    args.append(name)
+            elif isinstance(condition, bool):
+                clauses.append(subquery.format("value = ?"))
+                args += [name, float(condition)]
+            elif isinstance(condition, Real):
+                clauses.append(subquery.format("value = ?"))
+                args += [name, float(condition)]
+            elif isinstance(condition, str):
+                clauses.append(subquery.format("text = ?"))
+                args += [name, condition]
+            else:
+                msg = "Invalid condition for {} ({})"
+                raise TypeError(msg.format(name, condition))
+
+        sql = "SELECT {} FROM runs".format(", ".join(
+            ["id"] + list(RunRecord._fields[1:])
+        ))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+
+        with self.__lock:
+            return [RunRecord(*row) for row in self.__db.execute(sql, args)]
+
+
+def open_run_index(index):
+    """
+    :param index: :py:class:`RunIndex` object, filename of an index database,
+        or ``None``.  If ``None``, then the index named by the
+        ``BFRESCOX_RUN_INDEX`` environment variable is used if it is set.
+    :return: ``(index, owned)`` where ``index`` is the :py:class:`RunIndex`
+        object to use or ``None`` if runs should not be indexed and ``owned``
+        is True if the caller is responsible for closing the index
+    """
+    if index is None:
+        index = os.environ.get(RUN_INDEX_ENV)
+        if (index is None) or (index == ""):
+            return None, False
+
+    if isinstance(index, RunIndex):
+        return index, False
+    elif isinstance(index, (str, Path)):
+        return RunIndex(index), True
+
+    raise TypeError(f"Invalid run index ({index})")
+
+
+def record_run(index, frescox, config, output, started, wall_time, status,
+               peak_memory=None):
+    """
+    Record a run in the given index, which can be specified in any way accepted
+    by :py:func:`open_run_index`.  This is a no-op if no index is in use.
+    """
+    index, owned = open_run_index(index)
+    if index is None:
+        return
+    try:
+        index.record(config, output, frescox=frescox, started=started,
+                     wall_time=wall_time, status=status,
+                     peak_memory=peak_memory)
+    finally:
+        if owned:
+            index.close()
@@ -0,0 +1,349 @@
+import os
+import math
+import warnings
+
+import numpy as np
+
+from concurrent.futures import (
+    ThreadPoolExecutor, wait, FIRST_COMPLETED
+)
+
+# TODO: This assumes in a package
+from .Configuration import Configuration
+from .RunIndex import RunIndex, RUN_SUCCEEDED
+from ._batch import run_point
+from ._run_frescox_simulation import LIMIT_STACK, LIMIT_ADDRESS_SPACE
+
+# Stack limit applied to each Frescox process by default.  This matches the
+# stack size linked into macOS builds of Frescox, which cannot raise its limit
+# at runtime.
+DEFAULT_STACK_LIMIT = 512 * 1024**2
+
+# Predicted peak memory of every simulation until runs have been observed
+_DEFAULT_MEMORY = 1024**3
+# Exponents of the number of radial points, partial waves, and channels that
+# approximate how memory usage and run time grow before enough runs have been
+# observed to fit them.  Only the ratio of predicted run times matters when
+# ordering simulations so that the scale of the run time prior is arbitrary.
+_MEMORY_EXPONENTS = np.array([1.0, 0.0, 2.0])
+_TIME_EXPONENTS = np.array([1.0, 1.0, 3.0])
+_TIME_SCALE = 1.0e-6
+# Number of observed runs per model coefficient needed to fit all exponents
+_RUNS_PER_COEFFICIENT = 2
+
+
+def _available_memory():
+    """
+    :return: Memory in bytes available for new processes on this node
+    """
+    try:
+        with open("/proc/meminfo", "r") as fptr:
+            for line in fptr:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+
+class CostModel(object):
+    def __init__(self):
+        """
+        Create a model that predicts the peak memory usage and run time of a
+        |frescox| simulation from its configuration and that learns from
+        observed runs.
+
+        Both quantities are modeled as power laws in the number of radial
+        integration points (``fresco.rmatch / fresco.hcm``), the number of
+        partial waves (``fresco.jtmax - fresco.jtmin + 1``), and the number of
+        channels (the number of ``states`` groups).  Until enough runs have
+        been observed to fit all exponents, the exponents are fixed at values
+        typical of coupled-channel calculations and only the scale is fit.
+        Exponents of quantities that do not vary across the observed runs also
+        keep their typical values.
+        """
+        super().__init__()
+
+        self.__features = []
+        self.__memory = []
+        self.__time = []
+        self.__memory_coefficients = None
+        self.__time_coefficients = None
+
+    @classmethod
+    def from_index(cls, index, fingerprint=None):
+        """
+        :param index: :py:class:`RunIndex` object or filename of an index
+            database
+        :param fingerprint: Installation fingerprint of the runs to learn from;
+            ``None`` to learn from runs of all installations
+        :return: Model that has observed all successful runs in the index with
+            recorded run time and peak memory usage
+        """
+        model = cls()
+        owned = not isinstance(index, RunIndex)
+        if owned:
+            index = RunIndex(index)
+        try:
+            records = index.query(status=RUN_SUCCEEDED,
+                                  fingerprint=fingerprint)
+        finally:
+            if owned:
+                index.close()
+
+        for record in records:
+            if (record.wall_time is not None) and \
+                    (record.peak_memory is not None):
+                model.observe(record.configuration(), record.peak_memory,
+                              record.wall_time)
+
+        return model
+
+    @staticmethod
+    def features(configuration):
+        """
+        :param configuration: :py:class:`Configuration` object of a simulation
+        :return: Logarithms of the number of radial points, partial waves, and
+            channels of the simulation
+        """
+        if not isinstance(configuration, Configuration):
+            msg = "Configuration information not given as a {} object"
+            raise TypeError(msg.format(Configuration.__name__))
+
+        def value(name, default):
+            if name in configuration:
+                return abs(float(configuration[name]))
+            return default
+
+        hcm = value("fresco.hcm", 0.1)
+        rmatch = value("fresco.rmatch", 20.0)
+        n_radial = max(1.0, rmatch / hcm) if hcm > 0.0 else 1.0
+        n_waves = max(1.0, value("fresco.jtmax", 0.0) -
+                      value("fresco.jtmin", 0.0) + 1.0)
+        n_channels = max(1, sum(1 for name, _ in configuration.namelists
+                                if name == "states"))
+
+        return np.log([n_radial, n_waves, n_channels])
+
+    def __len__(self):
+        """
+        :return: Number of observed runs
+        """
+        return len(self.__features)
+
+    def __fit(self, values, exponents):
+        """
+        :return: Intercept and exponents of power law fit to observations.
+            Exponents of features that have not varied across the observed
+            runs cannot be fit and are kept at their prior values.
+        """
+        x = np.array(self.__features)
+        y = np.log(values)
+        exponents = exponents.copy()
+
+        varied = np.ptp(x, axis=0) > 0.0
+        n_coefficients = 1 + np.count_nonzero(varied)
+        if len(y) >= _RUNS_PER_COEFFICIENT * n_coefficients:
+            design = np.column_stack([np.ones(len(y)), x[:, varied]])
+            target = y - x[:, ~varied] @ exponents[~varied]
+            coefficients, _, rank, _ = np.linalg.lstsq(design, target,
+                                                       rcond=None)
+            if rank == n_coefficients:
+                exponents[varied] = coefficients[1:]
+                return np.concatenate([[coefficients[0]], exponents])
+
+        # Too few or too similar runs to fit exponents
+        intercept = np.mean(y - x @ exponents)
+        return np.concatenate([[intercept], exponents])
+
+    def observe(self, configuration, peak_memory, wall_time):
+        """
+        Learn from a completed simulation.
+
+        :param configuration: :py:class:`Configuration` object of the
+            simulation
+        :param peak_memory: Peak resident set size of the simulation in bytes
+        :param wall_time: Wall time of the simulation in seconds
+        """
+        if (peak_memory <= 0) or (wall_time <= 0.0):
+            msg = "Observed memory ({}) and time ({}) must be positive"
+            raise ValueError(msg.format(peak_memory, wall_time))
+
+        self.__features.append(self.features(configuration))
+        self.__memory.append(float(peak_memory))
+        self.__time.append(float(wall_time))
+        self.__memory_coefficients = self.__fit(self.__memory,
+                                                _MEMORY_EXPONENTS)
+        self.__time_coefficients = self.__fit(self.__time, _TIME_EXPONENTS)
+
+    def predict(self, configuration):
+        """
+        :param configuration: :py:class:`Configuration` object of a simulation
+        :return: ``(peak_memory, wall_time)`` predicted for the simulation in
+            bytes and seconds
+        """
+        x = np.concatenate([[1.0], self.features(configuration)])
+        if self.__memory_coefficients is None:
+            memory = _DEFAULT_MEMORY
+            wall_time = _TIME_SCALE * math.exp(x[1:] @ _TIME_EXPONENTS)
+        else:
+            memory = math.exp(x @ self.__memory_coefficients)
+            wall_time = math.exp(x @ self.__time_coefficients)
+
+        return memory, wall_time
+
+
+class Scheduler(object):
+    def __init__(self, memory=None, model=None, stack=DEFAULT_STACK_LIMIT,
+                 address_space=None, margin=1.25):
+        """
+        Create a scheduler that packs concurrent |frescox| simulations onto a
+        single node so that their predicted peak memory usage fits in the
+        given memory.
+
+        Simulations are started in order of decreasing predicted run time so
+        that long simulations do not delay the end of a batch.  A simulation
+        is started only if its predicted memory fits alongside that of the
+        running simulations.  If it does not, then shorter simulations that do
+        fit are started in its place.  Predictions are updated from every
+        completed simulation.
+
+        Each |frescox| process is also started with limits on its stack size
+        and address space so that a single simulation whose memory usage was
+        badly underestimated fails rather than exhausting the node's memory.
+
+        :param memory: Memory in bytes available to all simulations; ``None``
+            to use the memory presently available on this node
+        :param model: :py:class:`CostModel` used to predict the cost of each
+            simulation, which continues to learn from the batch; ``None`` to
+            use a new model
+        :param stack: Stack size limit of each |frescox| process in bytes;
+            ``None`` for no limit
+        :param address_space: Address space limit of each |frescox| process in
+            bytes; ``None`` to use the available memory
+        :param margin: Factor by which predicted memory usage is increased to
+            allow for prediction errors
+        """
+        super().__init__()
+
+        if memory is None:
+            memory = _available_memory()
+        if model is None:
+            model = CostModel()
+        if address_space is None:
+            address_space = memory
+
+        if memory <= 0:
+            raise ValueError(f"Memory ({memory}) must be positive")
+        elif not isinstance(model, CostModel):
+            raise TypeError("Model is not a CostModel object")
+        elif margin < 1.0:
+            raise ValueError(f"Memory margin ({margin}) must be at least 1")
+
+        self.__memory = int(memory)
+        self.__model = model
+        self.__limits = {LIMIT_STACK: stack,
+                         LIMIT_ADDRESS_SPACE: int(address_space)}
+        self.__margin = margin
+
+    @property
+    def memory(self):
+        """
+        Memory in bytes available to all simulations
+        """
+        return self.__memory
+
+    @property
+    def model(self):
+        """
+        :py:class:`CostModel` used to predict the cost of simulations
+        """
+        return self.__model
+
+    @property
+    def limits(self):
+        """
+        Resource limits applied to each |frescox| process
+        """
+        return dict(self.__limits)
+
+    def execute(self, run, configurations, filenames, n_workers, store=None):
+        """
+        Run a batch of simulations and yield their outcomes as they complete.
+        All configurations are loaded before any simulation starts so that
+        they can be ordered.
+
+        :param run: Function that is called with a configuration and a
+            filename to run a single simulation.  Since simulations run
+            concurrently, it must run each simulation in its own folder
+            (|eg| with an isolated :py:class:`Runner`).
+        :param configurations: Iterable of :py:class:`Configuration` objects
+        :param filenames: Iterable of filenames including path of files to
+            write results to with one filename per configuration
+        :param n_workers: Largest number of simulations to run concurrently
+        :param store: Function that is called with the point and the filename
+            of each successful simulation by the thread that ran it; ``None``
+            for no function
+        :return: Generator of :py:class:`BatchResult` in order of completion
+        """
+        if (not isinstance(n_workers, int)) or (n_workers < 1):
+            raise ValueError("Number of workers must be a positive integer")
+
+        jobs = list(enumerate(zip(configurations, filenames)))
+        return self.__execute(run, jobs, n_workers, store)
+
+    def __execute(self, run, jobs, n_workers, store):
+        def prioritize(pending):
+            """
+            Predict the memory usage of each pending job and order the jobs by
+            decreasing predicted run time.
+            """
+            predicted = []
+            for job in pending:
+                memory, wall_time = self.__model.predict(job[1][0])
+                predicted.append((wall_time, memory * self.__margin, job))
+            predicted.sort(key=lambda each: each[0], reverse=True)
+            return [(memory, job) for _, memory, job in predicted]
+
+        pending = prioritize(jobs)
+        in_flight = {}
+        in_use = 0.0
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            while pending or in_flight:
+                started = set()
+                for i, (memory, job) in enumerate(pending):
+                    if len(in_flight) >= n_workers:
+                        break
+                    elif in_flight and (in_use + memory > self.__memory):
+                        continue
+                    elif memory > self.__memory:
+                        msg = "Simulation {} is predicted to need {:.3g} GiB"
+                        msg += " of the {:.3g} GiB available"
+                        warnings.warn(msg.format(job[0], memory / 1024**3,
+                                                 self.__memory / 1024**3))
+
+                    point, (config, filename) = job
+                    future = pool.submit(run_point, run, point, config,
+                                         filename, store)
+                    in_flight[future] = (memory, config)
+                    in_use += memory
+                    started.add(i)
+                pending = [each for i, each in enumerate(pending)
+                           if i not in started]
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                learned = False
+                for future in done:
+                    memory, config = in_flight.pop(future)
+                    in_use -= memory
+                    result = future.result()
+                    if (result.status == RUN_SUCCEEDED) and \
+                            (result.peak_memory is not None) and \
+                            (result.peak_memory > 0):
+                        self.__model.observe(config, result.peak_memory,
+                                             result.wall_time)
+                        learned = True
+                    yield result
+
+                if learned and pending:
+                    pending = prioritize([job for _, job in pending])
@@ -0,0 +1,384 @@
+import os
+import json
+import stat
+import socket
+import tempfile
+import threading
+import socketserver
+
+from pathlib import Path
+from collections import namedtuple, OrderedDict, deque
+
+# TODO: This assumes in a package
+from .Configuration import Configuration
+from .Monitor import RunAborted
+from ._run_frescox_simulation import RunStatistics
+
+# Name of environment variable that gives the socket of the server to which
+# clients connect by default
+SERVER_SOCKET_ENV = "BFRESCOX_SERVER_SOCKET"
+
+# Seconds between checks of whether the server was closed
+_POLL_INTERVAL = 0.1
+
+# Exceptions raised by running a simulation that clients raise as is
+_CLIENT_ERRORS = {"TypeError": TypeError, "ValueError": ValueError,
+                  "RuntimeError": RuntimeError}
+
+
+def default_socket_path():
+    """
+    :return: Filename including path of the socket named by the
+        ``BFRESCOX_SERVER_SOCKET`` environment variable if it is set.
+        Otherwise, that of a socket private to this user in the runtime or
+        temporary folder.
+    """
+    if SERVER_SOCKET_ENV in os.environ:
+        return Path(os.environ[SERVER_SOCKET_ENV])
+    folder = os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir())
+    return Path(folder).joinpath(f"bfrescox-{os.getuid()}.sock")
+
+
+class ServerStatistics(namedtuple("ServerStatistics", ["n_requests",
+                                                       "n_deduplicated",
+                                                       "n_runs", "n_queued",
+                                                       "n_running"])):
+    """
+    Activity of a :py:class:`Server` since it started.  ``n_deduplicated`` is
+    the number of requests that were served by a simulation already requested
+    by another client rather than by a simulation of their own.  ``n_queued``
+    and ``n_running`` are the numbers of simulations presently waiting for a
+    worker and running.
+    """
+    __slots__ = ()
+
+
+class _Job(object):
+    """
+    A simulation requested by one or more clients
+    """
+    def __init__(self, key, configuration, filename, overwrite):
+        super().__init__()
+
+        self.key = key
+        self.configuration = configuration
+        self.filename = filename
+        self.overwrite = overwrite
+        self.response = None
+        self.done = threading.Event()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """
+    Read one request from a client and write the response once its simulation
+    is complete
+    """
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        response = self.server.respond(line)
+        try:
+            self.wfile.write((json.dumps(response) + "\n").encode())
+        except OSError:
+            # The client stopped waiting
+            pass
+
+
+class _SocketServer(socketserver.ThreadingMixIn,
+                    socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _check_socket_path(path):
+    """
+    Remove a socket left by a server that is no longer running.
+    """
+    if not os.path.lexists(path):
+        return
+    elif not stat.S_ISSOCK(os.lstat(path).st_mode):
+        raise ValueError(f"{path} exists and is not a socket")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            os.remove(path)
+            return
+    raise RuntimeError(f"Server already running at {path}")
+
+
+class Server(object):
+    def __init__(self, runner, path=None, n_workers=1):
+        """
+        Serve requests to run |frescox| simulations from clients on this node
+        through a Unix domain socket.  Tools that would each run their own
+        simulations instead share a single set of workers, which own the
+        node's CPU budget, and the installation is loaded and checked once
+        for all of them rather than once in every client.
+
+        Requests are queued separately for each client and free workers take
+        the next request of each client in turn so that a client that
+        submits many requests cannot starve the others.  A request that is
+        identical to one already queued or running (|ie| same configuration,
+        results file, and ``overwrite``) is not run again but is answered with
+        the outcome of the earlier request.
+
+        Clients submit requests with :py:func:`run_via_server`.  Use
+        :py:func:`create_server` rather than creating servers directly.
+
+        .. code-block:: python
+
+            with create_server(n_workers=8, layout=CpuLayout(8)) as server:
+                server.wait()
+
+        :param runner: :py:class:`Runner` used to run all simulations.  Since
+            simulations run concurrently, it should be isolated so that each
+            runs in the folder of its results.  It is closed with the server.
+        :param path: Filename including path of the socket on which to listen;
+            ``None`` to use :py:func:`default_socket_path`.  Only the user
+            running the server can connect.
+        :param n_workers: Number of simulations to run concurrently
+        """
+        super().__init__()
+
+        if (not isinstance(n_workers, int)) or (n_workers < 1):
+            raise ValueError("Number of workers must be a positive integer")
+
+        self.__path = default_socket_path() if path is None else Path(path)
+        _check_socket_path(self.__path)
+
+        self.__runner = runner
+        self.__cond = threading.Condition()
+        self.__closed = threading.Event()
+        # Jobs waiting for a worker in order of submission for each client with
+        # clients in the order in which they next get a worker
+        self.__queues = OrderedDict()
+        self.__in_flight = {}
+        self.__n_requests = 0
+        self.__n_deduplicated = 0
+        self.__n_runs = 0
+        self.__n_running = 0
+
+        # Create the socket without access for other users rather than
+        # restricting access once it is bound, when they could already connect
+        umask = os.umask(0o077)
+        try:
+            self.__server = _SocketServer(str(self.__path), _Handler)
+        finally:
+            os.umask(umask)
+        self.__server.respond = self.__respond
+
+        self.__workers = [threading.Thread(target=self.__work,
+                                           name=f"server-worker-{i}",
+                                           daemon=True)
+                          for i in range(n_workers)]
+        for worker in self.__workers:
+            worker.start()
+        self.__listener = threading.Thread(
+            target=self.__server.serve_forever,
+            kwargs={"poll_interval": _POLL_INTERVAL},
+            name="server-listener", daemon=True
+        )
+        self.__listener.start()
+
+    @property
+    def path(self):
+        """
+        Filename including path of the socket on which the server listens
+        """
+        return self.__path
+
+    @property
+    def n_workers(self):
+        """
+        Number of simulations run concurrently
+        """
+        return len(self.__workers)
+
+    @property
+    def statistics(self):
+        """
+        :py:class:`ServerStatistics` of the server so far
+        """
+        with self.__cond:
+            n_queued = sum(len(jobs) for jobs in self.__queues.values())
+            return ServerStatistics(self.__n_requests, self.__n_deduplicated,
+                                    self.__n_runs, n_queued,
+                                    self.__n_running)
+
+    def __respond(self, line):
+        try:
+            request = json.loads(line)
+            configuration = Configuration.from_NML_string(
+                request["configuration"]
+            )
+            filename = Path(request["filename"])
+            overwrite = request["overwrite"]
+            client = str(request["client"])
+            if (not filename.is_absolute()) or \
+                    (not isinstance(overwrite, bool)):
+                raise ValueError("Invalid filename or overwrite argument")
+        except Exception as err:
+            return {"error": "ValueError",
+                    "message": f"Invalid request ({err})"}
+
+        key = (request["configuration"], str(filename), overwrite)
+        with self.__cond:
+            if self.__closed.is_set():
+                return {"error": "RuntimeError", "message": "Server closed"}
+            self.__n_requests += 1
+            job = self.__in_flight.get(key)
+            if job is None:
+                job = _Job(key, configuration, filename, overwrite)
+                self.__in_flight[key] = job
+                self.__queues.setdefault(client, deque()).append(job)
+                self.__cond.notify()
+            else:
+                self.__n_deduplicated += 1
+
+        job.done.wait()
+        return job.response
+
+    def __next_job(self):
+        """
+        :return: Next job of the client whose turn it is or ``None`` once the
+            server is closed
+        """
+        with self.__cond:
+            while (not self.__queues) and (not self.__closed.is_set()):
+                self.__cond.wait()
+            if self.__closed.is_set():
+                return None
+            client, jobs = next(iter(self.__queues.items()))
+            job = jobs.popleft()
+            if jobs:
+                self.__queues.move_to_end(client)
+            else:
+                del self.__queues[client]
+            self.__n_runs += 1
+            self.__n_running += 1
+            return job
+
+    def __work(self):
+        while True:
+            job = self.__next_job()
+            if job is None:
+                return
+
+            try:
+                statistics = self.__runner.run(job.configuration, job.filename,
+                                               overwrite=job.overwrite)
+                response = {"wall_time": statistics.wall_time,
+                            "peak_memory": statistics.peak_memory}
+            except RunAborted as err:
+                response = {"aborted": err.reason}
+            except Exception as err:
+                response = {"error": type(err).__name__, "message": str(err)}
+
+            with self.__cond:
+                del self.__in_flight[job.key]
+                self.__n_running -= 1
+            job.response = response
+            job.done.set()
+
+    def wait(self):
+        """
+        Block until the server is closed by another thread, by an interrupt,
+        or by a signal whose handler raises.
+        """
+        while not self.__closed.wait(timeout=1.0):
+            pass
+
+    def close(self):
+        """
+        Stop accepting requests, let running simulations complete, and answer
+        requests still waiting for a worker with an error.  The socket is
+        removed and all resources are released.
+        """
+        with self.__cond:
+            if self.__closed.is_set():
+                return
+            self.__closed.set()
+            self.__cond.notify_all()
+
+        self.__server.shutdown()
+        self.__server.server_close()
+        for worker in self.__workers:
+            worker.join()
+
+        with self.__cond:
+            for jobs in self.__queues.values():
+                for job in jobs:
+                    job.response = {"error": "RuntimeError",
+                                    "message": "Server closed"}
+                    job.done.set()
+            self.__queues.clear()
+            self.__in_flight.clear()
+
+        if os.path.lexists(self.__path):
+            os.remove(self.__path)
+        self.__runner.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def run_via_server(configuration, filename, overwrite=False, path=None,
+                   client=None):
+    """
+    Run a |frescox| simulation as if by :py:func:`run_simulation` but by the
+    workers of a :py:class:`Server` running on this node.  The setup of the
+    simulation (|eg| compression and CPU placement) is that with which the
+    server was started.  The simulation runs in the folder of its results,
+    where |frescox| also writes its auxiliary files.
+
+    :param configuration: :py:class:`Configuration` object that specifies the
+        simulation to run
+    :param filename: Filename including path of file to write outputs to.  A
+        relative path is relative to the working directory of the caller.
+    :param overwrite: If False, then an error is raised if either of the
+        simulation input or output files exist
+    :param path: Filename including path of the server's socket; ``None`` to
+        use :py:func:`default_socket_path`
+    :param client: Name under which requests are shared fairly with those of
+        other clients; ``None`` to share as this process
+    :return: :py:class:`RunStatistics` of the simulation.  If the server's
+        monitor stops the simulation, then :py:class:`RunAborted` is raised
+        instead.
+    """
+    if not isinstance(configuration, Configuration):
+        raise TypeError("Configuration is not a Configuration object")
+    elif not isinstance(overwrite, bool):
+        raise TypeError("Given overwrite argument is not a boolean")
+
+    path = default_socket_path() if path is None else Path(path)
+    request = {"configuration": configuration.to_NML_string(),
+               "filename": str(Path(filename).resolve()),
+               "overwrite": overwrite,
+               "client": str(os.getpid()) if client is None else str(client)}
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError as err:
+            raise RuntimeError(f"No server at {path} ({err})")
+        with sock.makefile("rwb") as fptr:
+            fptr.write((json.dumps(request) + "\n").encode())
+            fptr.flush()
+            line = fptr.readline()
+    if not line:
+        raise RuntimeError("Server closed connection without responding")
+
+    response = json.loads(line)
+    if "aborted" in response:
+        raise RunAborted(response["aborted"])
+    elif response.get("error") in _CLIENT_ERRORS:
+        raise _CLIENT_ERRORS[response["error"]](response["message"])
+    elif "error" in response:
+        raise RuntimeError(f"{response['error']}: {response['message']}")
+
+    return RunStatistics(response["wall_time"], response["peak_memory"])
@@ -0,0 +1,383 @@
+import os
+import json
+import time
+import uuid
+import socket
+import threading
+import traceback
+
+from pathlib import Path
+from collections import namedtuple
+
+from .Configuration import Configuration
+
+# Names of the folders that hold tasks in each state
+_PENDING = "pending"
+_CLAIMED = "claimed"
+_DONE = "done"
+_FAILED = "failed"
+_WORKERS = "workers"
+_RESULTS = "results"
+
+# Separates the task identifier from the worker identifier in the names of
+# claimed task files
+_OWNER_SEP = "@"
+_TASK_EXT = ".json"
+
+
+class Task(namedtuple("Task", ["task_id", "configuration", "filename",
+                               "attempts"])):
+    """
+    A single simulation to be run by a queue worker.
+    """
+    __slots__ = ()
+
+
+def _write_atomic(filename, contents):
+    """
+    Write a file so that other processes either see the full contents or no
+    file at all.
+    """
+    tmp = filename.parent.joinpath(f".{filename.name}.{uuid.uuid4().hex}")
+    with open(tmp, "w") as fptr:
+        json.dump(contents, fptr)
+    os.rename(tmp, filename)
+
+
+def new_worker_id():
+    """
+    :return: Identifier that is unique across all workers on all nodes
+    """
+    host = socket.gethostname().split(".")[0].replace(_OWNER_SEP, "-")
+    return f"{host}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class WorkQueue(object):
+    def __init__(self, path):
+        """
+        Create or open a queue of |frescox| simulations stored in a folder on a
+        filesystem shared by all workers.  No external broker is required.
+
+        Each task is a file that moves between the ``pending``, ``claimed``,
+        ``done``, and ``failed`` subfolders.  Workers claim a task by renaming
+        its file into ``claimed``, which is atomic and therefore succeeds for
+        exactly one worker.  Each worker regularly updates a heartbeat file so
+        that tasks claimed by workers that have died can be returned to
+        ``pending`` by any other worker.
+
+        :param path: Path to the folder that contains the queue
+        """
+        super().__init__()
+
+        self.__path = Path(path).resolve()
+        for name in [_PENDING, _CLAIMED, _DONE, _FAILED, _WORKERS, _RESULTS]:
+            self.__path.joinpath(name).mkdir(parents=True, exist_ok=True)
+
+        # Listing large folders on parallel filesystems is expensive.  Cache
+        # the pending tasks and list again only after all have been tried.
+        self.__candidates = []
+
+    @property
+    def path(self):
+        """
+        Path to the folder that contains the queue
+        """
+        return self.__path
+
+    def __tasks(self, state):
+        return sorted(each for each in os.listdir(self.__path.joinpath(state))
+                      if each.endswith(_TASK_EXT) and not each.startswith("."))
+
+    def submit(self, configuration, filename=None, task_id=None):
+        """
+        Add a simulation to the queue.
+
+        :param configuration: :py:class:`Configuration` object that specifies
+            the simulation to run
+        :param filename: Filename including path of file to which the results
+            should be written.  If ``None``, then results are written to a
+            dedicated folder for the task in the queue's ``results`` folder.
+        :param task_id: Unique name of the task.  If ``None``, then a name is
+            generated such that tasks are run in the order submitted.
+        :return: Identifier of the task
+        """
+        if not isinstance(configuration, Configuration):
+            raise TypeError("Task configuration is not a Configuration object")
+
+        if task_id is None:
+            task_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        elif (_OWNER_SEP in task_id) or ("/" in task_id) or \
+                task_id.startswith("."):
+            raise ValueError(f"Invalid task identifier ({task_id})")
+        if self.state(task_id) is not None:
+            raise ValueError(f"Task {task_id} already in queue")
+
+        if filename is None:
+            filename = self.__path.joinpath(_RESULTS, task_id, "frescox.out")
+        else:
+            filename = Path(filename).resolve()
+
+        contents = {"task_id": task_id,
+                    "configuration": configuration.to_NML_string(),
+                    "filename": str(filename),
+                    "attempts": 0}
+        _write_atomic(self.__path.joinpath(_PENDING, task_id + _TASK_EXT),
+                      contents)
+
+        return task_id
+
+    def state(self, task_id):
+        """
+        :return: Name of the state of the given task (``"pending"``,
+            ``"claimed"``, ``"done"``, or ``"failed"``); ``None`` if the task
+            is not in the queue
+        """
+        for state in [_PENDING, _DONE, _FAILED]:
+            if self.__path.joinpath(state, task_id + _TASK_EXT).exists():
+                return state
+        prefix = task_id + _OWNER_SEP
+        for each in os.listdir(self.__path.joinpath(_CLAIMED)):
+            if each.startswith(prefix):
+                return _CLAIMED
+        return None
+
+    def counts(self):
+        """
+        :return: ``dict`` that maps the name of each state to the number of
+            tasks in that state
+        """
+        return {state: len(self.__tasks(state))
+                for state in [_PENDING, _CLAIMED, _DONE, _FAILED]}
+
+    def heartbeat(self, worker_id):
+        """
+        Inform all other workers that the given worker is alive.
+
+        :return: Time of the heartbeat as recorded by the filesystem
+        """
+        fname = self.__path.joinpath(_WORKERS, worker_id)
+        fname.touch()
+        os.utime(fname)
+        return fname.stat().st_mtime
+
+    def claim(self, worker_id, max_attempts=3):
+        """
+        Claim the oldest pending task for the given worker.  Tasks that have
+        already been claimed the given number of times without completing are
+        moved to ``failed`` rather than being claimed again.
+
+        :param worker_id: Identifier of the claiming worker
+        :param max_attempts: Maximum number of times a task can be claimed
+        :return: :py:class:`Task` or ``None`` if there are no pending tasks
+        """
+        pending = self.__path.joinpath(_PENDING)
+        claimed = self.__path.joinpath(_CLAIMED)
+        # If a cached listing is exhausted without a successful claim, list
+        # again in case new tasks were submitted or returned to pending
+        used_cache = bool(self.__candidates)
+        while True:
+            if not self.__candidates:
+                self.__candidates = self.__tasks(_PENDING)
+            while self.__candidates:
+                name = self.__candidates.pop(0)
+                task_id = name[:-len(_TASK_EXT)]
+                fname = claimed.joinpath(
+                    f"{task_id}{_OWNER_SEP}{worker_id}{_TASK_EXT}"
+                )
+                try:
+                    os.rename(pending.joinpath(name), fname)
+                except FileNotFoundError:
+                    # Another worker won
+                    continue
+
+                # The file is now owned by this worker
+                with open(fname, "r") as fptr:
+                    contents = json.load(fptr)
+                contents["attempts"] += 1
+                if contents["attempts"] > max_attempts:
+                    contents["error"] = "Maximum number of attempts exceeded"
+                    _write_atomic(
+                        self.__path.joinpath(_FAILED, task_id + _TASK_EXT),
+                        contents
+                    )
+                    os.remove(fname)
+                    continue
+                _write_atomic(fname, contents)
+
+                return Task(task_id,
+                            Configuration.from_NML_string(
+                                contents["configuration"]
+                            ),
+                            Path(contents["filename"]),
+                            contents["attempts"])
+
+            if not used_cache:
+                return None
+            used_cache = False
+
+    def __finish(self, task, worker_id, state, extra):
+        fname = self.__path.joinpath(
+            _CLAIMED, f"{task.task_id}{_OWNER_SEP}{worker_id}{_TASK_EXT}"
+        )
+        contents = {"task_id": task.task_id,
+                    "configuration": task.configuration.to_NML_string(),
+                    "filename": str(task.filename),
+                    "attempts": task.attempts}
+        contents.update(extra)
+        contents["worker"] = worker_id
+        _write_atomic(self.__path.joinpath(state, task.task_id + _TASK_EXT),
+                      contents)
+        try:
+            os.remove(fname)
+        except FileNotFoundError:
+            # The task was reclaimed because this worker's heartbeat was
+            # late.  It will be run again, but the result is still valid.
+            pass
+
+    def complete(self, task, worker_id, wall_time):
+        """
+        Publish the successful completion of a claimed task.
+        """
+        self.__finish(task, worker_id, _DONE, {"wall_time": wall_time})
+
+    def fail(self, task, worker_id, error):
+        """
+        Publish that a claimed task could not be run successfully.
+        """
+        self.__finish(task, worker_id, _FAILED, {"error": error})
+
+    def reclaim(self, timeout, worker_id=None):
+        """
+        Return to ``pending`` all tasks claimed by workers whose last
+        heartbeat is older than the given timeout.  Ages are measured using
+        filesystem timestamps so that clocks on different nodes need not agree.
+
+        :param timeout: Heartbeat age in seconds after which a worker is
+            considered dead
+        :param worker_id: Identifier of the calling worker, whose heartbeat is
+            used to obtain the current filesystem time; ``None`` to use a
+            temporary probe file
+        :return: Number of tasks returned to ``pending``
+        """
+        workers = self.__path.joinpath(_WORKERS)
+        if worker_id is None:
+            worker_id = "." + new_worker_id()
+            now = self.heartbeat(worker_id)
+            os.remove(workers.joinpath(worker_id))
+        else:
+            now = self.heartbeat(worker_id)
+
+        n_reclaimed = 0
+        for name in os.listdir(self.__path.joinpath(_CLAIMED)):
+            if (_OWNER_SEP not in name) or name.startswith("."):
+                continue
+            task_id, owner = name[:-len(_TASK_EXT)].split(_OWNER_SEP, 1)
+            try:
+                age = now - workers.joinpath(owner).stat().st_mtime
+            except FileNotFoundError:
+                # Owner claimed the task but died before its first heartbeat
+                claimed = self.__path.joinpath(_CLAIMED, name)
+                try:
+                    age = now - claimed.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+            if age <= timeout:
+                continue
+            try:
+                os.rename(self.__path.joinpath(_CLAIMED, name),
+                          self.__path.joinpath(_PENDING, task_id + _TASK_EXT))
+                n_reclaimed += 1
+            except FileNotFoundError:
+                # Another worker reclaimed it or the owner finished
+                pass
+
+        return n_reclaimed
+
+    def results(self):
+        """
+        :return: ``list`` of ``dict`` records of all completed tasks in the
+            order in which they were submitted
+        """
+        records = []
+        for name in self.__tasks(_DONE):
+            with open(self.__path.joinpath(_DONE, name), "r") as fptr:
+                records.append(json.load(fptr))
+        return records
+
+
+def run_worker(queue, run, heartbeat=30.0, timeout=300.0, poll=5.0,
+               exit_when_empty=True, max_attempts=3, worker_id=None):
+    """
+    Repeatedly claim tasks from a :py:class:`WorkQueue` and run them until the
+    queue is exhausted.
+
+    While waiting for tasks, the worker returns to ``pending`` tasks claimed
+    by workers that have died.  Therefore, a worker does not exit while any
+    tasks are claimed by other workers even if ``exit_when_empty`` is True.
+
+    :param queue: :py:class:`WorkQueue` object or path to its folder
+    :param run: Function with the same signature as ``run_simulation`` that
+        is called with a task's configuration, filename, and
+        ``overwrite=True`` to run the task
+    :param heartbeat: Seconds between heartbeats
+    :param timeout: Heartbeat age in seconds after which a worker is
+        considered dead.  This must be several times larger than
+        ``heartbeat``.
+    :param poll: Seconds to wait before checking again for pending tasks
+    :param exit_when_empty: Exit once no tasks are pending or claimed if
+        True; otherwise, run until interrupted
+    :param max_attempts: Maximum number of times a task can be claimed
+    :param worker_id: Identifier of the worker; ``None`` to generate one
+    :return: ``(n_done, n_failed)`` number of tasks run by this worker
+    """
+    if not isinstance(queue, WorkQueue):
+        queue = WorkQueue(queue)
+    if timeout <= 2.0 * heartbeat:
+        raise ValueError("Timeout must be larger than twice the heartbeat")
+    if worker_id is None:
+        worker_id = new_worker_id()
+
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(heartbeat):
+            queue.heartbeat(worker_id)
+
+    queue.heartbeat(worker_id)
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+
+    n_done = 0
+    n_failed = 0
+    try:
+        while True:
+            task = queue.claim(worker_id, max_attempts=max_attempts)
+            if task is None:
+                queue.reclaim(timeout, worker_id)
+                counts = queue.counts()
+                if exit_when_empty and (counts[_PENDING] == 0) and \
+                        (counts[_CLAIMED] == 0):
+                    break
+                elif counts[_PENDING] == 0:
+                    time.sleep(poll)
+                continue
+
+            task.filename.parent.mkdir(parents=True, exist_ok=True)
+            start = time.perf_counter()
+            try:
+                run(task.configuration, task.filename, overwrite=True)
+            except Exception:
+                queue.fail(task, worker_id, traceback.format_exc())
+                n_failed += 1
+            else:
+                queue.complete(task, worker_id, time.perf_counter() - start)
+                n_done += 1
+    finally:
+        stop.set()
+        thread.join()
+        try:
+            os.remove(queue.path.joinpath(_WORKERS, worker_id))
+        except FileNotFoundError:
+            pass
+
+    return n_done, n_failed
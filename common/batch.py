@@ -0,0 +1,312 @@
+import csv
+import copy
+import time
+
+import numpy as np
+
+from pathlib import Path
+from collections import namedtuple
+from concurrent.futures import (
+    ThreadPoolExecutor, wait, FIRST_COMPLETED
+)
+
+from .Configuration import Configuration
+from .Monitor import RunAborted
+from .RunIndex import RUN_SUCCEEDED, RUN_FAILED, RUN_ABORTED
+
+# Name of results file in each point's folder when a batch writes results to a
+# single output folder
+BATCH_OUTPUT_NAME = "frescox.out"
+
+
+class BatchResult(namedtuple("BatchResult", ["point", "filename", "status",
+                                             "wall_time", "error",
+                                             "peak_memory"],
+                             defaults=(None,))):
+    """
+    Outcome of a single simulation in a batch.  ``point`` is the position of
+    the simulation in the batch and ``error`` is a description of the error
+    that caused the simulation to fail, or the reason for which it was
+    aborted, or ``None`` if it succeeded.
+    ``peak_memory`` is the peak resident set size in bytes of the largest
+    |frescox| process of a successful simulation or ``None`` if unknown.
+    """
+    __slots__ = ()
+
+
+class RunningBatch(object):
+    """
+    Outcomes of a batch of simulations in order of completion.  The runner of
+    the batch is closed once all outcomes have been yielded or once the batch
+    is closed.  Use it as a context manager so that the runner is also closed
+    if not all outcomes are consumed.
+    """
+    def __init__(self, runner, results):
+        """
+        :param runner: :py:class:`Runner` that runs the simulations
+        :param results: Generator of :py:class:`BatchResult` of the
+            simulations run by the runner
+        """
+        super().__init__()
+
+        self.__runner = runner
+        self.__results = results
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.__results)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """
+        Stop the batch and close its runner.  Simulations already started are
+        completed, but their outcomes are discarded.
+        """
+        try:
+            self.__results.close()
+        finally:
+            self.__runner.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def run_point(run, point, config, filename, store=None):
+    """
+    Run a single simulation of a batch and capture its outcome so that a
+    failed simulation does not stop the batch.
+
+    :param run: Function that is called with a configuration and a filename
+        to run a single simulation.  If it returns a
+        :py:class:`RunStatistics`, then the peak memory usage is included
+        in the outcome.
+    :param point: Position of the simulation in the batch
+    :param config: :py:class:`Configuration` object of the simulation
+    :param filename: Filename including path of file to write results to.  Its
+        folder is created as needed.
+    :param store: Function that is called with the point and the filename
+        once the simulation has succeeded to store its observables; ``None``
+        to not store observables.  If it raises, then the simulation fails.
+    :return: :py:class:`BatchResult`
+    """
+    start = time.perf_counter()
+    try:
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        statistics = run(config, filename)
+        if store is not None:
+            store(point, filename)
+    except RunAborted as err:
+        return BatchResult(point, Path(filename), RUN_ABORTED,
+                           time.perf_counter() - start, err.reason)
+    except Exception as err:
+        return BatchResult(point, Path(filename), RUN_FAILED,
+                           time.perf_counter() - start,
+                           f"{type(err).__name__}: {err}")
+    peak_memory = getattr(statistics, "peak_memory", None)
+    return BatchResult(point, Path(filename), RUN_SUCCEEDED,
+                       time.perf_counter() - start, None, peak_memory)
+
+
+def execute_batch(run, configurations, filenames, n_workers, store=None):
+    """
+    Run a batch of simulations concurrently and yield their outcomes as they
+    complete.
+
+    |frescox| runs in its own process so that threads are sufficient for
+    running simulations concurrently.  At most ``2 * n_workers`` simulations
+    are queued at any time so that the configurations and filenames can be
+    produced lazily for very large batches.
+
+    :param run: Function that is called with a configuration and a filename
+        to run a single simulation.  Since simulations run concurrently, it
+        must run each simulation in its own folder (|eg| with an isolated
+        :py:class:`Runner`) so that their auxiliary files do not collide.
+    :param configurations: Iterable of :py:class:`Configuration` objects
+    :param filenames: Iterable of filenames including path of files to write
+        results to with one filename per configuration.  Folders are created
+        as needed.
+    :param n_workers: Number of simulations to run concurrently
+    :param store: Function that is called with the point and the filename of
+        each successful simulation by the thread that ran it; ``None`` for no
+        function
+    :return: Generator of :py:class:`BatchResult` in order of completion
+    """
+    if (not isinstance(n_workers, int)) or (n_workers < 1):
+        raise ValueError("Number of workers must be a positive integer")
+
+    return _execute_batch(run, configurations, filenames, n_workers, store)
+
+
+def _execute_batch(run, configurations, filenames, n_workers, store):
+    points = enumerate(zip(configurations, filenames))
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        in_flight = set()
+        exhausted = False
+        while True:
+            while (not exhausted) and (len(in_flight) < 2 * n_workers):
+                try:
+                    point, (config, filename) = next(points)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight.add(pool.submit(run_point, run, point, config,
+                                          filename, store))
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _parse_cell(cell):
+    try:
+        return int(cell)
+    except ValueError:
+        pass
+    try:
+        return float(cell)
+    except ValueError:
+        return cell
+
+
+def load_parameter_table(filename):
+    """
+    Load a table of parameter values with one row per simulation.
+
+    CSV files must have a header row with the name of each column.  NPY files
+    must contain a NumPy structured array whose field names are the column
+    names.
+
+    :param filename: Filename including path of ``.csv`` or ``.npy`` file
+    :return: ``(names, rows)`` where ``names`` is a ``list`` of column names
+        and ``rows`` is a ``list`` of ``dict`` that map each name to its value
+    """
+    fname = Path(filename).resolve()
+    if not fname.is_file():
+        raise ValueError(f"{fname} does not exist or is not a file")
+
+    if fname.suffix.lower() == ".csv":
+        with open(fname, "r", newline="") as fptr:
+            table = [row for row in csv.reader(fptr) if row]
+        if not table:
+            raise ValueError(f"{fname} has no header row")
+        names = [each.strip() for each in table[0]]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate column names in {fname}")
+        for i, row in enumerate(table[1:]):
+            if len(row) != len(names):
+                msg = "Row {} of {} has {} values for {} columns"
+                raise ValueError(msg.format(i, fname, len(row), len(names)))
+        rows = [dict(zip(names, (_parse_cell(each.strip()) for each in row)))
+                for row in table[1:]]
+    elif fname.suffix.lower() == ".npy":
+        table = np.load(fname, allow_pickle=False)
+        if table.dtype.names is None:
+            msg = "{} must contain a structured array with named fields"
+            raise ValueError(msg.format(fname))
+        names = list(table.dtype.names)
+        rows = [{name: row[name].item() for name in names} for row in table]
+    else:
+        raise ValueError(f"Unknown parameter table format ({fname.suffix})")
+
+    return names, rows
+
+
+def configurations_from_table(base, rows):
+    """
+    Generate the configuration of each row in a parameter table.
+
+    If the base namelist is a template, then each row must give the value of
+    every key in the template.  Otherwise, column names must be parameter
+    names (|eg| ``pot[1].p1``) and the values in each row replace those in the
+    base configuration.
+
+    :param base: Name including path of |frescox| namelist or namelist
+        template file
+    :param rows: Iterable of ``dict`` that map column names to values
+    :return: Generator of :py:class:`Configuration` objects
+    """
+    fname = Path(base).resolve()
+    if not fname.is_file():
+        raise ValueError(f"{fname} does not exist or is not a file")
+    with open(fname, "r") as fptr:
+        contents = fptr.read()
+
+    if Configuration.template_keys(contents):
+        for row in rows:
+            yield Configuration.from_template_string(contents, row)
+    else:
+        config = Configuration.from_NML_string(contents)
+        for row in rows:
+            for name, value in row.items():
+                config[name] = value
+            yield copy.deepcopy(config)
+
+
+def store_observables(ensemble, observable):
+    """
+    :param ensemble: :py:class:`Ensemble` in which to store observables
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns a sequence of ``(grid,
+        values)`` 1D arrays with one pair per observable of the ensemble
+    :return: Function that is called with the point and the filename of a
+        simulation to store its observables in the point's row
+    """
+    def store(point, filename):
+        ensemble.store(point, observable(filename))
+
+    return store
+
+
+def batch_filenames(path, n_points):
+    """
+    :param path: Path to folder in which to store the results of all points
+    :param n_points: Number of points in the batch
+    :return: ``list`` of filenames with each point's results written to its own
+        subfolder so that |frescox| input files do not collide
+    """
+    path = Path(path).resolve()
+    width = max(6, len(str(n_points - 1)))
+    return [path.joinpath(f"point_{i:0{width}d}", BATCH_OUTPUT_NAME)
+            for i in range(n_points)]
+
+
+def stream_batch(results, names, rows, fptr):
+    """
+    Write the outcome of each simulation as a CSV row as soon as it completes.
+
+    :param results: Iterable of :py:class:`BatchResult`
+    :param names: Names of parameter columns to include
+    :param rows: ``list`` of ``dict`` of parameter values for each point
+    :param fptr: Text file object to write to
+    :return: Number of failed simulations
+    """
+    writer = csv.writer(fptr)
+    writer.writerow(["point"] + names +
+                    ["status", "wall_time", "peak_memory", "filename",
+                     "error"])
+    fptr.flush()
+
+    n_failed = 0
+    for result in results:
+        values = [rows[result.point][name] for name in names]
+        writer.writerow([result.point] + values +
+                        [result.status, f"{result.wall_time:.6f}",
+                         "" if result.peak_memory is None
+                         else result.peak_memory,
+                         result.filename,
+                         "" if result.error is None else result.error])
+        fptr.flush()
+        if result.status != RUN_SUCCEEDED:
+            n_failed += 1
+
+    return n_failed
@@ -0,0 +1,267 @@
+import copy
+import json
+
+import numpy as np
+
+from pathlib import Path
+from collections import namedtuple
+
+# TODO: This assumes in a package
+from .Configuration import Configuration
+from .RunIndex import RUN_SUCCEEDED
+from ._batch import BATCH_OUTPUT_NAME
+from ._jacobian import evaluate_observable
+
+
+class ConvergenceTrial(namedtuple("ConvergenceTrial", ["settings", "error",
+                                                       "wall_time"])):
+    """
+    Single simulation run while searching for converged numerical settings.
+    ``settings`` maps the name of each numerical parameter to the value used,
+    ``error`` is the relative error of the observable with respect to the
+    reference simulation, and ``wall_time`` is the simulation's wall time in
+    seconds.
+    """
+    __slots__ = ()
+
+
+class ConvergenceResult(namedtuple("ConvergenceResult", ["settings", "error",
+                                                         "wall_time",
+                                                         "reference",
+                                                         "tolerance",
+                                                         "trials"])):
+    """
+    Cheapest numerical settings found to be converged.  ``settings`` maps the
+    name of each numerical parameter to its converged value and ``error`` and
+    ``wall_time`` are those of the simulation run with all converged settings.
+    ``reference`` is the :py:class:`ConvergenceTrial` of the most refined
+    settings and ``trials`` is a ``list`` of all other simulations run.
+    """
+    __slots__ = ()
+
+    def apply(self, configuration):
+        """
+        :param configuration: :py:class:`Configuration` object to which to
+            apply the converged settings
+        :return: New :py:class:`Configuration` object identical to the given
+            one except for the converged settings
+        """
+        if not isinstance(configuration, Configuration):
+            msg = "Configuration information not given as a {} object"
+            raise TypeError(msg.format(Configuration.__name__))
+        configuration = copy.deepcopy(configuration)
+        for name, value in self.settings.items():
+            configuration[name] = value
+        return configuration
+
+    def print_report(self):
+        """
+        Print the error and cost of every simulation run during the search so
+        that the accuracy gained by each refinement can be weighed against its
+        cost.
+        """
+        names = list(self.settings)
+        width = max(10, max(len(each) for each in names))
+        header = "".join(f"{each:>{width}s} " for each in names)
+
+        print()
+        print(f"{header}{'Rel. Error':>12s} {'Wall (s)':>10s} {'Speedup':>8s}")
+        print("-" * (len(header) + 32))
+        rows = sorted(self.trials, key=lambda trial: trial.wall_time)
+        for trial in rows + [self.reference]:
+            values = "".join(f"{str(trial.settings[each]):>{width}s} "
+                             for each in names)
+            speedup = self.reference.wall_time / trial.wall_time
+            mark = " *" if trial.settings == self.settings else ""
+            print(f"{values}{trial.error:12.3e} {trial.wall_time:10.3f} "
+                  f"{speedup:8.2f}{mark}")
+        print()
+        msg = "* Cheapest settings converged to relative tolerance {:.3e}"
+        print(msg.format(self.tolerance))
+        print()
+
+    def save(self, filename):
+        """
+        Write the result to a JSON file so that the converged settings can be
+        reused.
+
+        :param filename: Filename including path of file to write
+        """
+        contents = {
+            "settings": self.settings,
+            "error": self.error,
+            "wall_time": self.wall_time,
+            "reference": self.reference._asdict(),
+            "tolerance": self.tolerance,
+            "trials": [each._asdict() for each in self.trials]
+        }
+        with open(Path(filename).resolve(), "w") as fptr:
+            json.dump(contents, fptr, indent=2)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        :param filename: Filename including path of file written by
+            :py:meth:`save`
+        :return: :py:class:`ConvergenceResult` loaded from file
+        """
+        fname = Path(filename).resolve()
+        if not fname.is_file():
+            raise ValueError(f"{fname} does not exist or is not a file")
+        with open(fname, "r") as fptr:
+            contents = json.load(fptr)
+
+        return cls(contents["settings"], contents["error"],
+                   contents["wall_time"],
+                   ConvergenceTrial(**contents["reference"]),
+                   contents["tolerance"],
+                   [ConvergenceTrial(**each) for each in contents["trials"]])
+
+
+def _relative_error(values, reference):
+    """
+    :return: Largest absolute difference from the reference scaled by the
+        largest magnitude of the reference
+    """
+    scale = np.max(np.abs(reference))
+    if scale == 0.0:
+        scale = 1.0
+    return float(np.max(np.abs(values - reference)) / scale)
+
+
+def converge_settings(run, configuration, settings, observable, path,
+                      tolerance):
+    """
+    Find the cheapest combination of numerical settings for which an observable
+    agrees with that of the most refined settings to within a relative
+    tolerance.
+
+    The search first runs the reference simulation with every setting at its
+    most refined value together with every candidate value of each setting
+    with all other settings most refined.  All of these simulations are
+    independent and are run in a single batch.  The cheapest value of each
+    setting that is individually within tolerance is selected.  Since errors
+    from different settings can accumulate, the selected combination is then
+    run.  While its error exceeds the tolerance, the setting with the largest
+    individual error is refined by one step and the combination is rerun.
+
+    :param run: Function that is called with a ``list`` of configurations and
+        a ``list`` of filenames and that returns an iterable of
+        :py:class:`BatchResult`
+    :param configuration: :py:class:`Configuration` object of a representative
+        simulation
+    :param settings: ``dict`` that maps the name of each numerical parameter
+        (|eg| ``fresco.hcm``) to a sequence of its candidate values ordered
+        from cheapest to most refined
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns ``(grid, values)`` 1D arrays
+    :param path: Path to folder in which to write the results of all
+        simulations
+    :param tolerance: Largest acceptable relative error of the observable
+    :return: :py:class:`ConvergenceResult`
+    """
+    # ----- ERROR CHECK ARGUMENTS
+    if not isinstance(configuration, Configuration):
+        msg = "Configuration information not given as a Configuration object"
+        raise TypeError(msg)
+    elif not isinstance(settings, dict):
+        raise TypeError("Settings must be given as a dict")
+    elif not settings:
+        raise ValueError("No settings given")
+    elif tolerance <= 0.0:
+        raise ValueError(f"Tolerance ({tolerance}) must be positive")
+
+    names = list(settings)
+    candidates = {}
+    for name in names:
+        if name not in configuration:
+            raise ValueError(f"{name} not set in configuration")
+        candidates[name] = list(settings[name])
+        if not candidates[name]:
+            raise ValueError(f"No candidate values given for {name}")
+
+    path = Path(path).resolve()
+    most_refined = {name: candidates[name][-1] for name in names}
+
+    def simulate(labels, points):
+        """
+        Run one simulation per point and return the filenames of their results
+        and their wall times.
+        """
+        configurations = []
+        filenames = []
+        for label, point in zip(labels, points):
+            config = copy.deepcopy(configuration)
+            for name, value in point.items():
+                config[name] = value
+            configurations.append(config)
+            filenames.append(path.joinpath(label, BATCH_OUTPUT_NAME))
+
+        results = sorted(run(configurations, filenames),
+                         key=lambda result: result.point)
+        failed = [each for each in results if each.status != RUN_SUCCEEDED]
+        if failed:
+            msg = "{} of {} simulations failed (First error - {})"
+            raise RuntimeError(msg.format(len(failed), len(points),
+                                          failed[0].error))
+        return filenames, [each.wall_time for each in results]
+
+    # ----- RUN REFERENCE & EACH SETTING INDIVIDUALLY
+    labels = ["reference"]
+    points = [most_refined]
+    varied = [None]
+    for j, name in enumerate(names):
+        for k, value in enumerate(candidates[name][:-1]):
+            labels.append(f"setting_{j:02d}_value_{k:02d}")
+            points.append(dict(most_refined, **{name: value}))
+            varied.append((name, k))
+
+    filenames, wall_times = simulate(labels, points)
+    grid, reference_values = evaluate_observable(observable, filenames[0],
+                                                 None)
+    reference = ConvergenceTrial(most_refined, 0.0, wall_times[0])
+    trials = []
+    errors = {}
+    for i in range(1, len(points)):
+        values = evaluate_observable(observable, filenames[i], grid)[1]
+        errors[varied[i]] = _relative_error(values, reference_values)
+        trials.append(ConvergenceTrial(points[i], errors[varied[i]],
+                                       wall_times[i]))
+
+    selected = {}
+    for name in names:
+        selected[name] = len(candidates[name]) - 1
+        for k in range(len(candidates[name]) - 1):
+            if errors[(name, k)] <= tolerance:
+                selected[name] = k
+                break
+
+    # ----- CONFIRM THAT SELECTED SETTINGS ARE CONVERGED IN COMBINATION
+    iteration = 0
+    while True:
+        point = {name: candidates[name][selected[name]] for name in names}
+        if point == most_refined:
+            return ConvergenceResult(most_refined, 0.0, reference.wall_time,
+                                     reference, tolerance, trials)
+
+        known = [each for each in trials if each.settings == point]
+        if known:
+            trial = known[0]
+        else:
+            filenames, wall_times = simulate([f"combined_{iteration:02d}"],
+                                             [point])
+            values = evaluate_observable(observable, filenames[0], grid)[1]
+            trial = ConvergenceTrial(point,
+                                     _relative_error(values, reference_values),
+                                     wall_times[0])
+            trials.append(trial)
+            iteration += 1
+        if trial.error <= tolerance:
+            return ConvergenceResult(point, trial.error, trial.wall_time,
+                                     reference, tolerance, trials)
+
+        # Refine the setting that contributes the largest error
+        worst = max((name for name in names
+                     if selected[name] < len(candidates[name]) - 1),
+                    key=lambda name: errors[(name, selected[name])])
+        selected[worst] += 1
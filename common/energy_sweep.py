@@ -0,0 +1,187 @@
+import copy
+
+import numpy as np
+
+from pathlib import Path
+from numbers import Real
+from collections import namedtuple
+
+# TODO: This assumes in a package
+from .Configuration import Configuration
+from .RunIndex import RUN_SUCCEEDED
+from ._batch import BATCH_OUTPUT_NAME
+
+# Name of the parameter that sets the laboratory energy of the first (and
+# usually only) energy of a simulation
+ENERGY_PARAMETER = "fresco.elab(1)"
+
+
+class EnergySweep(namedtuple("EnergySweep", ["energies", "values", "errors",
+                                             "filenames", "tolerance",
+                                             "converged", "n_runs"])):
+    """
+    Excitation function sampled on an adaptively refined energy grid.
+    ``energies`` is the strictly increasing grid, ``values[i]`` is the
+    observable at ``energies[i]``, and ``filenames[i]`` is the filename of the
+    results of that simulation.  ``errors[i]`` is the estimated relative error
+    of interpolating linearly between ``energies[i]`` and ``energies[i + 1]``.
+    ``converged`` is True if no error exceeds ``tolerance`` and ``n_runs`` is
+    the number of simulations run.
+    """
+    __slots__ = ()
+
+    def interpolate(self, energies):
+        """
+        Evaluate the interpolant of the excitation function, which is linear
+        between the sampled energies so that its error is that estimated
+        while sampling.
+
+        :param energies: Energies within the sampled range at which to
+            evaluate the interpolant
+        :return: Interpolated values with one value, or one row of values if
+            the observable is an array, per energy
+        """
+        energies = np.asarray(energies, dtype=float)
+        if (np.min(energies) < self.energies[0]) or \
+                (np.max(energies) > self.energies[-1]):
+            raise ValueError("Energies outside of the sampled range")
+        elif self.values.ndim == 1:
+            return np.interp(energies, self.energies, self.values)
+        return np.stack([np.interp(energies, self.energies, column)
+                         for column in self.values.T], axis=-1)
+
+
+def _interval_errors(energies, values):
+    """
+    Estimate the relative error of linear interpolation on each interval from
+    the local curvature, which is the second divided difference at the
+    interval's ends.  The error of interval ``i`` is ``h**2 / 8`` times the
+    largest curvature of its ends relative to the largest magnitude of each
+    observable.
+
+    :param energies: Strictly increasing 1D array of at least three energies
+    :param values: 2D array with one row of observables per energy
+    :return: 1D array of the estimated error of each interval
+    """
+    h = np.diff(energies)
+    slopes = np.diff(values, axis=0) / h[:, np.newaxis]
+    curvature = np.zeros_like(values)
+    curvature[1:-1] = 2.0 * np.diff(slopes, axis=0) \
+        / (h[:-1] + h[1:])[:, np.newaxis]
+    # The end points have no curvature of their own
+    curvature[0] = curvature[1]
+    curvature[-1] = curvature[-2]
+
+    scale = np.max(np.abs(values), axis=0)
+    scale[scale == 0.0] = 1.0
+    largest = np.maximum(np.abs(curvature[:-1]), np.abs(curvature[1:]))
+    errors = (h**2 / 8.0)[:, np.newaxis] * largest / scale
+
+    return np.max(errors, axis=1)
+
+
+def refine_energies(run, configuration, energies, observable, path, tolerance,
+                    max_runs=100, min_spacing=0.0,
+                    parameter=ENERGY_PARAMETER):
+    """
+    Sample an excitation function on an energy grid that is refined only
+    where linear interpolation between sampled energies is inaccurate.
+
+    The initial grid is run as a single batch.  Each refinement then splits
+    every interval whose estimated error exceeds the tolerance at its midpoint
+    and runs all new energies as a single batch so that they run
+    concurrently.  If the remaining budget does not allow all such intervals
+    to be split, then those with the largest errors are split first.
+
+    :param run: Function that is called with a ``list`` of configurations and
+        a ``list`` of filenames and that returns an iterable of
+        :py:class:`BatchResult`
+    :param configuration: :py:class:`Configuration` object of the simulation
+        at every energy
+    :param energies: Initial grid of at least three distinct energies
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns a real value or a 1D array of
+        real values (|eg| several cross sections)
+    :param path: Path to folder in which to write the results of all
+        simulations
+    :param tolerance: Largest acceptable relative error of interpolation
+    :param max_runs: Largest number of simulations to run including those of
+        the initial grid
+    :param min_spacing: Intervals no wider than twice this are not split
+    :param parameter: Name of the energy parameter
+    :return: :py:class:`EnergySweep`
+    """
+    # ----- ERROR CHECK ARGUMENTS
+    if not isinstance(configuration, Configuration):
+        msg = "Configuration information not given as a Configuration object"
+        raise TypeError(msg)
+    elif not callable(observable):
+        raise TypeError("Observable is not callable")
+    elif (not isinstance(tolerance, Real)) or (tolerance <= 0.0):
+        raise ValueError("Tolerance must be a positive real value")
+    elif (not isinstance(min_spacing, Real)) or (min_spacing < 0.0):
+        raise ValueError("Minimum spacing must be a non-negative real value")
+
+    value = configuration[parameter]
+    if isinstance(value, bool) or (not isinstance(value, Real)):
+        raise TypeError(f"{parameter} is not a real-valued parameter")
+
+    energies = np.unique(np.asarray(energies, dtype=float))
+    if (energies.ndim != 1) or (len(energies) < 3):
+        raise ValueError("At least three distinct energies required")
+    elif (not isinstance(max_runs, int)) or (max_runs < len(energies)):
+        msg = "Largest number of runs must be an integer no smaller than "
+        msg += "the number of initial energies"
+        raise ValueError(msg)
+
+    path = Path(path).resolve()
+
+    # ----- SAMPLE & REFINE
+    sampled = {}
+    pending = list(energies)
+    n_runs = 0
+    while True:
+        configurations = []
+        filenames = []
+        for energy in pending:
+            config = copy.deepcopy(configuration)
+            config[parameter] = float(energy)
+            configurations.append(config)
+            filenames.append(path.joinpath(f"energy_{n_runs:06d}",
+                                           BATCH_OUTPUT_NAME))
+            n_runs += 1
+
+        results = sorted(run(configurations, filenames),
+                         key=lambda result: result.point)
+        failed = [each for each in results if each.status != RUN_SUCCEEDED]
+        if failed:
+            msg = "{} of {} simulations failed (First error - {})"
+            raise RuntimeError(msg.format(len(failed), len(pending),
+                                          failed[0].error))
+
+        for energy, fname in zip(pending, filenames):
+            values = np.asarray(observable(fname), dtype=float)
+            if values.ndim > 1:
+                msg = "Observable of {} must be a real value or a 1D array"
+                raise ValueError(msg.format(fname))
+            sampled[energy] = (values, fname)
+
+        grid = np.array(sorted(sampled))
+        shapes = {sampled[energy][0].shape for energy in grid}
+        if len(shapes) != 1:
+            raise ValueError("Observable shape differs between energies")
+        values = np.array([sampled[energy][0] for energy in grid])
+        errors = _interval_errors(grid, values.reshape(len(grid), -1))
+
+        widths = np.diff(grid)
+        refine = [i for i in np.argsort(-errors)
+                  if (errors[i] > tolerance) and
+                  (widths[i] > 2.0 * min_spacing)]
+        refine = refine[:max_runs - n_runs]
+        if not refine:
+            break
+        pending = [0.5 * (grid[i] + grid[i + 1]) for i in refine]
+
+    return EnergySweep(grid, values, errors,
+                       [sampled[energy][1] for energy in grid], tolerance,
+                       bool(np.all(errors <= tolerance)), n_runs)
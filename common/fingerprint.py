@@ -0,0 +1,46 @@
+import hashlib
+
+from pathlib import Path
+
+# TODO: This assumes in a package
+from ._run_frescox_simulation import FRESCOX_EXE, FRESCOX_LIBRARY_PATH
+
+# Hashes of files already computed in this process keyed by the path, size, and
+# modification time of the file so that repeated calls are cheap
+_HASH_CACHE = {}
+
+
+def file_hash(filename):
+    """
+    :param filename: Filename including path of file to hash
+    :return: SHA-256 hash of the file's contents as a hexadecimal ``str``
+    """
+    fname = Path(filename).resolve()
+    stat = fname.stat()
+    key = (str(fname), stat.st_size, stat.st_mtime_ns)
+    if key not in _HASH_CACHE:
+        sha = hashlib.sha256()
+        with open(fname, "rb") as fptr:
+            for block in iter(lambda: fptr.read(1 << 20), b""):
+                sha.update(block)
+        _HASH_CACHE[key] = sha.hexdigest()
+
+    return _HASH_CACHE[key]
+
+
+def installation_fingerprint(frescox):
+    """
+    Identify a |frescox| installation by the contents of its executable and by
+    its build information so that results can be associated with the exact
+    binary that produced them regardless of where it is installed or staged.
+
+    :param frescox: ``dict`` that fully characterizes a |frescox| installation
+    :return: Fingerprint as a hexadecimal ``str``
+    """
+    sha = hashlib.sha256()
+    sha.update(file_hash(frescox[FRESCOX_EXE]).encode())
+    for key in sorted(frescox):
+        if key not in (FRESCOX_EXE, FRESCOX_LIBRARY_PATH):
+            sha.update(f"{key}={frescox[key]};".encode())
+
+    return sha.hexdigest()
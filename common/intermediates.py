@@ -0,0 +1,371 @@
+import re
+import copy
+import shutil
+
+import numpy as np
+
+from pathlib import Path
+from numbers import Integral, Real
+from collections import namedtuple
+
+# TODO: This assumes in a package
+from .Configuration import Configuration
+from .RunIndex import RUN_SUCCEEDED, RUN_FAILED
+from ._batch import BatchResult, execute_batch
+
+# Name of the subfolder of a checked simulation's folder in which the same
+# simulation is run again without reusing intermediates
+CHECK_FOLDER = "recomputed"
+
+_GROUP = re.compile(r"^([a-z_0-9]+)(?:\[(\d+)\])?$")
+
+
+class SharedFile(namedtuple("SharedFile", ["unit", "groups", "write",
+                                           "read"])):
+    """
+    Intermediate result that |frescox| can write to and read from the file
+    ``fort.<unit>`` in its working directory.  ``groups`` names the namelist
+    group occurrences (|eg| ``"overlap[0]"`` or ``"states"``) whose values
+    fully determine the contents of the file.  ``write`` and ``read`` are
+    ``dict`` that map parameter names to the values that make |frescox| write
+    the file while computing it and read it in place of computing it.
+    """
+    __slots__ = ()
+
+    @property
+    def filename(self):
+        """
+        Name of the file in the working directory of |frescox|
+        """
+        return f"fort.{self.unit}"
+
+
+class ReuseReport(namedtuple("ReuseReport", ["results", "n_producers",
+                                             "n_consumers", "checked",
+                                             "max_difference", "full_time",
+                                             "reuse_time", "time_saved"])):
+    """
+    Outcome of running a batch that reuses intermediate files.  ``results``
+    is the :py:class:`BatchResult` of each simulation in the order of the
+    batch.  ``n_producers`` simulations wrote intermediates and
+    ``n_consumers`` read at least one.  The consumers at the positions in
+    ``checked`` were also run without reusing intermediates and
+    ``max_difference`` is the largest relative difference of their
+    observables.  ``full_time`` and ``reuse_time`` are the mean wall times in
+    seconds of the checked simulations without and with reuse and
+    ``time_saved`` is the estimated wall time saved over all consumers less
+    the time spent checking.  Timings are ``None`` if no simulation was
+    checked.
+    """
+    __slots__ = ()
+
+    def print_report(self):
+        """
+        Print a summary of the reuse and of the time that it saved
+        """
+        n_failed = sum(result.status != RUN_SUCCEEDED
+                       for result in self.results)
+        print()
+        print(f"Simulations          {len(self.results)}")
+        print(f"Failed               {n_failed}")
+        print(f"Producers            {self.n_producers}")
+        print(f"Consumers            {self.n_consumers}")
+        if self.checked:
+            print(f"Checked              {len(self.checked)}")
+            print(f"Max rel. difference  {self.max_difference:.3e}")
+            print(f"Mean full time       {self.full_time:.3f} s")
+            print(f"Mean reuse time      {self.reuse_time:.3f} s")
+            print(f"Estimated time saved {self.time_saved:.3f} s")
+        print()
+
+
+def _group_labels(configuration):
+    """
+    :return: ``dict`` that maps the name of each namelist group occurrence in
+        the configuration to its values.  Names are of the form ``group`` for
+        groups that occur only once and ``group[i]`` otherwise.
+    """
+    namelists = configuration.namelists
+    counts = {}
+    for name, _ in namelists:
+        counts[name] = counts.get(name, 0) + 1
+
+    labels = {}
+    occurrence = {}
+    for name, values in namelists:
+        i = occurrence.get(name, 0)
+        occurrence[name] = i + 1
+        labels[name if counts[name] == 1 else f"{name}[{i}]"] = values
+
+    return labels
+
+
+def _group_values(configuration, group):
+    """
+    :return: Values of the namelist group occurrence with the given name
+    """
+    match = _GROUP.match(group.lower()) if isinstance(group, str) else None
+    if match is None:
+        raise ValueError(f"Invalid namelist group name ({group})")
+    name, index = match[1], int(match[2] or 0)
+
+    occurrences = [values for each, values in configuration.namelists
+                   if each == name]
+    if index >= len(occurrences):
+        raise ValueError(f"No occurrence {index} of {name} group")
+
+    return occurrences[index]
+
+
+def shared_groups(configurations):
+    """
+    :param configurations: Sequence of :py:class:`Configuration` objects
+    :return: ``list`` of the names of namelist group occurrences whose values
+        are identical in all configurations in the order of the first
+        configuration.  Intermediates that depend only on these groups can be
+        computed once for all configurations.
+    """
+    labels = [_group_labels(config) for config in configurations]
+    if not labels:
+        return []
+    return [name for name, values in labels[0].items()
+            if all(each.get(name) == values for each in labels[1:])]
+
+
+def _check_shared(shared, configuration):
+    if not isinstance(shared, SharedFile):
+        raise TypeError("Intermediate file not given as a SharedFile object")
+    elif (not isinstance(shared.unit, Integral)) or (shared.unit < 1):
+        msg = "Unit of intermediate file must be a positive integer"
+        raise ValueError(msg)
+    elif isinstance(shared.groups, str) or (len(shared.groups) == 0):
+        msg = "Groups of {} must be a non-empty sequence of group names"
+        raise ValueError(msg.format(shared.filename))
+    elif (not isinstance(shared.write, dict)) or \
+            (not isinstance(shared.read, dict)):
+        msg = "Write and read settings of {} must be dictionaries"
+        raise TypeError(msg.format(shared.filename))
+
+    for group in shared.groups:
+        _group_values(configuration, group)
+    config = copy.deepcopy(configuration)
+    for name, value in list(shared.write.items()) + list(shared.read.items()):
+        try:
+            config[name] = value
+        except KeyError as err:
+            msg = "Invalid setting of {} ({})"
+            raise ValueError(msg.format(shared.filename, err))
+
+
+def _relative_difference(a, b):
+    a = np.asarray(a, dtype=float).ravel()
+    b = np.asarray(b, dtype=float).ravel()
+    if a.shape != b.shape:
+        return np.inf
+    elif len(a) == 0:
+        return 0.0
+    scale = np.max(np.abs(a))
+    if scale == 0.0:
+        scale = 1.0
+    return float(np.max(np.abs(a - b)) / scale)
+
+
+def reuse_intermediates(run, configurations, filenames, shared, n_workers,
+                        observable=None, n_checks=1, tolerance=1.0e-6):
+    """
+    Run a batch of simulations with each intermediate file computed once for
+    all simulations that agree on the namelist groups on which it depends.
+
+    Simulations are grouped separately for each shared file by the values of
+    its groups.  The first simulation of each group of two or more is a
+    producer, which is run with the file's write settings.  Producers are run
+    concurrently first and compute all other intermediates themselves.  Every
+    other simulation of a group is a consumer, which is run with the file's
+    read settings after the producer's file is copied into its folder.
+
+    Before the remaining consumers are run, the first ``n_checks`` consumers
+    are also run without reuse in the ``CHECK_FOLDER`` subfolder of their
+    folders and the observables of both runs are compared.
+
+    :param run: Function that is called with a configuration and a filename
+        to run a single simulation in the folder of the filename and that
+        returns a :py:class:`RunStatistics`
+    :param configurations: Sequence of :py:class:`Configuration` objects
+    :param filenames: Sequence of filenames including path of files to write
+        results to with one filename per configuration.  Each should be in its
+        own folder.
+    :param shared: Sequence of :py:class:`SharedFile` objects
+    :param n_workers: Number of simulations to run concurrently
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns a real value or an array of
+        real values.  Required if any simulation is to be checked.
+    :param n_checks: Number of consumers to check
+    :param tolerance: Largest acceptable relative difference between the
+        observables of a checked simulation with and without reuse
+    :return: :py:class:`ReuseReport`
+    """
+    # ----- ERROR CHECK ARGUMENTS
+    configurations = list(configurations)
+    filenames = [Path(fname).resolve() for fname in filenames]
+    shared = list(shared)
+    if len(configurations) != len(filenames):
+        raise ValueError("One filename required per configuration")
+    for config in configurations:
+        if not isinstance(config, Configuration):
+            msg = "Configuration information not given as a Configuration "
+            msg += "object"
+            raise TypeError(msg)
+    if (not isinstance(n_checks, Integral)) or (n_checks < 0):
+        raise ValueError("Number of checks must be a non-negative integer")
+    elif (n_checks > 0) and (not callable(observable)):
+        raise TypeError("Observable is not callable")
+    elif (not isinstance(tolerance, Real)) or (tolerance < 0.0):
+        raise ValueError("Tolerance must be a non-negative real value")
+    for each in shared:
+        for config in configurations:
+            _check_shared(each, config)
+    if len({each.unit for each in shared}) != len(shared):
+        raise ValueError("Each intermediate file must have its own unit")
+
+    # ----- ASSIGN PRODUCERS & CONSUMERS
+    # producer[i] is the point that writes shared[i] for each point or None
+    # if the point computes it
+    producers = [set() for _ in configurations]
+    producer = [[None] * len(shared) for _ in configurations]
+    for i, each in enumerate(shared):
+        groups = {}
+        for point, config in enumerate(configurations):
+            key = repr([sorted(_group_values(config, group).items())
+                        for group in each.groups])
+            groups.setdefault(key, []).append(point)
+        for points in groups.values():
+            if len(points) > 1:
+                producers[points[0]].add(i)
+                for point in points[1:]:
+                    producer[point][i] = points[0]
+
+    def modified(point):
+        config = copy.deepcopy(configurations[point])
+        for i in producers[point]:
+            for name, value in shared[i].write.items():
+                config[name] = value
+        for i, source in enumerate(producer[point]):
+            if (source is not None) and (not producers[point]):
+                for name, value in shared[i].read.items():
+                    config[name] = value
+        return config
+
+    def copy_inputs(point):
+        for i, source in enumerate(producer[point]):
+            if source is not None:
+                fname = filenames[source].parent.joinpath(shared[i].filename)
+                shutil.copyfile(fname, filenames[point].parent.joinpath(
+                    shared[i].filename
+                ))
+
+    def consume(point, config, filename):
+        copy_inputs(point)
+        return run(config, filename)
+
+    results = [None] * len(configurations)
+    timings = {}
+
+    def run_points(points, full=()):
+        """
+        Run the given points concurrently and also, for those in ``full``,
+        without reuse in their check subfolders.
+        """
+        jobs = [(point, False) for point in points] + \
+            [(point, True) for point in full]
+        configs = [configurations[point] if whole else modified(point)
+                   for point, whole in jobs]
+        fnames = [filenames[point].parent.joinpath(CHECK_FOLDER,
+                                                   filenames[point].name)
+                  if whole else filenames[point]
+                  for point, whole in jobs]
+
+        by_name = dict(zip(fnames, jobs))
+
+        def run_job(config, filename):
+            point, whole = by_name[filename]
+            if whole or producers[point]:
+                statistics = run(config, filename)
+            else:
+                statistics = consume(point, config, filename)
+            timings[(point, whole)] = statistics.wall_time
+            return statistics
+
+        outcomes = {}
+        for result in execute_batch(run_job, configs, fnames, n_workers):
+            point, whole = jobs[result.point]
+            outcomes[(point, whole)] = result._replace(point=point)
+        return outcomes
+
+    # ----- RUN PRODUCERS
+    first = [point for point in range(len(configurations))
+             if producers[point]]
+    for (point, _), result in run_points(first).items():
+        results[point] = result
+        if result.status == RUN_SUCCEEDED:
+            for i in producers[point]:
+                fname = filenames[point].parent.joinpath(shared[i].filename)
+                if not fname.is_file():
+                    msg = "Frescox did not write intermediate file {}"
+                    raise RuntimeError(msg.format(fname))
+
+    # Consumers of a failed producer cannot run
+    rest = []
+    for point in range(len(configurations)):
+        if results[point] is not None:
+            continue
+        failed = [source for source in producer[point]
+                  if (source is not None) and
+                  (results[source].status != RUN_SUCCEEDED)]
+        if failed:
+            msg = f"Producer of intermediates (point {failed[0]}) failed"
+            results[point] = BatchResult(point, filenames[point], RUN_FAILED,
+                                         0.0, msg)
+        else:
+            rest.append(point)
+    consumers = [point for point in rest
+                 if any(source is not None for source in producer[point])]
+
+    # ----- CHECK REUSE AGAINST FULL RECOMPUTATION
+    checked = consumers[:n_checks]
+    max_difference = None
+    if checked:
+        outcomes = run_points(checked, full=checked)
+        max_difference = 0.0
+        for point in checked:
+            for whole in [False, True]:
+                if outcomes[(point, whole)].status != RUN_SUCCEEDED:
+                    msg = "Check of point {} failed ({})"
+                    raise RuntimeError(msg.format(
+                        point, outcomes[(point, whole)].error
+                    ))
+            difference = _relative_difference(
+                observable(filenames[point]),
+                observable(outcomes[(point, True)].filename)
+            )
+            max_difference = max(max_difference, difference)
+            results[point] = outcomes[(point, False)]
+        if max_difference > tolerance:
+            msg = "Results with reused intermediates differ from those "
+            msg += "recomputed by {:.3e} (tolerance {:.3e})"
+            raise RuntimeError(msg.format(max_difference, tolerance))
+
+    # ----- RUN ALL OTHERS
+    for (point, _), result in run_points([point for point in rest
+                                          if point not in checked]).items():
+        results[point] = result
+
+    full_time = reuse_time = time_saved = None
+    if checked:
+        full_time = np.mean([timings[(point, True)] for point in checked])
+        reuse_time = np.mean([timings[(point, False)] for point in checked])
+        time_saved = len(consumers) * (full_time - reuse_time) \
+            - len(checked) * full_time
+
+    return ReuseReport(results, sum(bool(each) for each in producers),
+                       len(consumers), checked, max_difference, full_time,
+                       reuse_time, time_saved)
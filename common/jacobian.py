@@ -0,0 +1,195 @@
+import copy
+
+import numpy as np
+
+from pathlib import Path
+from numbers import Real
+from collections import namedtuple
+
+# TODO: This assumes in a package
+from .Configuration import Configuration
+from .RunIndex import RUN_SUCCEEDED
+from ._batch import BATCH_OUTPUT_NAME
+
+# Supported finite-difference methods
+FINITE_DIFFERENCE_FORWARD = "forward"
+FINITE_DIFFERENCE_CENTRAL = "central"
+# Each adaptive refinement halves the step size
+_REFINEMENT_FACTOR = 0.5
+
+
+class Jacobian(namedtuple("Jacobian", ["parameters", "grid", "values",
+                                       "jacobian", "steps"])):
+    """
+    Finite-difference Jacobian of an observable with respect to configuration
+    parameters.  ``values`` is the observable of the base configuration on
+    ``grid`` and ``jacobian[i, j]`` is the derivative of the observable at
+    ``grid[i]`` with respect to ``parameters[j]``.  ``steps[j]`` is the step
+    size used for ``parameters[j]``.
+    """
+    __slots__ = ()
+
+
+def evaluate_observable(observable, filename, grid):
+    """
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns ``(grid, values)`` 1D arrays
+    :param filename: Filename including path of the simulation's results
+    :param grid: 1D array of strictly increasing points on which to evaluate
+        the observable; ``None`` to use the observable's own grid
+    :return: ``(grid, values)`` of the observable interpolated onto the given
+        grid
+    """
+    x, y = observable(filename)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if (x.ndim != 1) or (x.shape != y.shape):
+        msg = "Observable of {} must be two 1D arrays of equal length"
+        raise ValueError(msg.format(filename))
+    elif not np.all(np.diff(x) > 0.0):
+        msg = "Observable grid of {} is not strictly increasing"
+        raise ValueError(msg.format(filename))
+    elif grid is None:
+        return x, y
+    elif (grid[0] < x[0]) or (grid[-1] > x[-1]):
+        msg = "Observable of {} does not cover the common grid"
+        raise ValueError(msg.format(filename))
+    return grid, np.interp(grid, x, y)
+
+
+def _select_step(estimates):
+    """
+    Choose the estimate whose difference from the estimate at the next larger
+    step is smallest.  Truncation error dominates at large steps and the
+    limited precision of |frescox| output dominates at small steps so that
+    successive estimates agree best between these two regimes.
+
+    :return: Index of the selected estimate
+    """
+    if len(estimates) == 1:
+        return 0
+    changes = [np.max(np.abs(estimates[k] - estimates[k - 1]))
+               for k in range(1, len(estimates))]
+    return 1 + int(np.argmin(changes))
+
+
+def compute_jacobian(run, configuration, parameters, steps, observable, path,
+                     method=FINITE_DIFFERENCE_CENTRAL, grid=None,
+                     n_refinements=1):
+    """
+    Estimate the Jacobian of an observable with respect to configuration
+    parameters by finite differences.
+
+    All perturbed configurations are run in a single batch so that they can
+    run concurrently.  The base configuration is run once and is reused by all
+    forward differences.  It also defines the common grid if none is given.
+
+    :param run: Function that is called with a ``list`` of configurations and
+        a ``list`` of filenames and that returns an iterable of
+        :py:class:`BatchResult`
+    :param configuration: :py:class:`Configuration` object of the base point
+    :param parameters: Sequence of names of real-valued parameters (|eg|
+        ``pot[1].p1``)
+    :param steps: Step size used for all parameters or sequence of step sizes
+        with one per parameter.  With adaptive step selection, these are the
+        largest steps tried.
+    :param observable: Function that is called with the filename of a
+        simulation's results and that returns ``(grid, values)`` 1D arrays
+    :param path: Path to folder in which to write the results of all
+        simulations
+    :param method: ``"forward"`` or ``"central"`` differences
+    :param grid: 1D array of strictly increasing points on which to evaluate
+        all observables; ``None`` to use the grid of the base configuration
+    :param n_refinements: Number of step sizes tried per parameter with each
+        step half the previous one.  If greater than one, then the step whose
+        estimate best agrees with that of the next larger step is used.
+    :return: :py:class:`Jacobian`
+    """
+    # ----- ERROR CHECK ARGUMENTS
+    if not isinstance(configuration, Configuration):
+        msg = "Configuration information not given as a Configuration object"
+        raise TypeError(msg)
+    elif method not in (FINITE_DIFFERENCE_FORWARD, FINITE_DIFFERENCE_CENTRAL):
+        raise ValueError(f"Unknown finite-difference method ({method})")
+    elif (not isinstance(n_refinements, int)) or (n_refinements < 1):
+        raise ValueError("Number of refinements must be a positive integer")
+
+    parameters = list(parameters)
+    if not parameters:
+        raise ValueError("No parameters given")
+    elif len(set(parameters)) != len(parameters):
+        raise ValueError("Parameters must be unique")
+    for name in parameters:
+        value = configuration[name]
+        if isinstance(value, bool) or (not isinstance(value, Real)):
+            raise TypeError(f"{name} is not a real-valued parameter")
+
+    if isinstance(steps, Real):
+        steps = [steps] * len(parameters)
+    steps = np.array(steps, dtype=float)
+    if steps.shape != (len(parameters),):
+        raise ValueError("One step size required per parameter")
+    elif not np.all(steps > 0.0):
+        raise ValueError("Step sizes must be positive")
+
+    if grid is not None:
+        grid = np.asarray(grid, dtype=float)
+        if (grid.ndim != 1) or (len(grid) == 0) or \
+                (not np.all(np.diff(grid) > 0.0)):
+            raise ValueError("Grid must be a strictly increasing 1D array")
+
+    # ----- RUN ALL SIMULATIONS
+    signs = [1] if method == FINITE_DIFFERENCE_FORWARD else [1, -1]
+    path = Path(path).resolve()
+
+    points = [(None, None, None)]
+    for j in range(len(parameters)):
+        for k in range(n_refinements):
+            for sign in signs:
+                points.append((j, k, sign))
+
+    configurations = []
+    filenames = []
+    for j, k, sign in points:
+        config = copy.deepcopy(configuration)
+        if j is None:
+            folder = "base"
+        else:
+            name = parameters[j]
+            h = steps[j] * _REFINEMENT_FACTOR**k
+            config[name] = float(configuration[name] + sign * h)
+            label = "plus" if sign > 0 else "minus"
+            folder = f"parameter_{j:03d}_step_{k:02d}_{label}"
+        configurations.append(config)
+        filenames.append(path.joinpath(folder, BATCH_OUTPUT_NAME))
+
+    results = sorted(run(configurations, filenames),
+                     key=lambda result: result.point)
+    failed = [each for each in results if each.status != RUN_SUCCEEDED]
+    if failed:
+        msg = "{} of {} simulations failed (First error - {})"
+        raise RuntimeError(msg.format(len(failed), len(points),
+                                      failed[0].error))
+
+    # ----- ASSEMBLE JACOBIAN
+    grid, values = evaluate_observable(observable, filenames[0], grid)
+    evaluated = {point: evaluate_observable(observable, fname, grid)[1]
+                 for point, fname in zip(points[1:], filenames[1:])}
+
+    jacobian = np.empty((len(grid), len(parameters)))
+    used = np.empty(len(parameters))
+    for j in range(len(parameters)):
+        estimates = []
+        for k in range(n_refinements):
+            h = steps[j] * _REFINEMENT_FACTOR**k
+            if method == FINITE_DIFFERENCE_FORWARD:
+                estimates.append((evaluated[(j, k, 1)] - values) / h)
+            else:
+                estimates.append(
+                    (evaluated[(j, k, 1)] - evaluated[(j, k, -1)]) / (2.0 * h)
+                )
+        best = _select_step(estimates)
+        jacobian[:, j] = estimates[best]
+        used[j] = steps[j] * _REFINEMENT_FACTOR**best
+
+    return Jacobian(parameters, grid, values, jacobian, used)
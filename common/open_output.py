@@ -0,0 +1,76 @@
+import io
+import os
+import gzip
+import shutil
+
+import subprocess as sbp
+
+from pathlib import Path
+
+# Leading bytes that identify the format of compressed files
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class _ProcessTextStream(io.TextIOWrapper):
+    """
+    Text stream that reads the standard output of a decompression program and
+    that checks that the program finished successfully when closed.
+    """
+    def __init__(self, process):
+        super().__init__(process.stdout, encoding="utf-8")
+        self.__process = process
+
+    def close(self):
+        if self.closed:
+            return
+        # Closing the pipe before the program has written all of its output
+        # can cause it to fail with SIGPIPE, which is not an error here.
+        finished = (self.buffer.peek(1) == b"")
+        super().close()
+        returncode = self.__process.wait()
+        if finished and (returncode != 0):
+            cmd = " ".join(self.__process.args)
+            msg = "Unable to decompress with {} (Return code {})"
+            raise RuntimeError(msg.format(cmd, returncode))
+
+
+def open_output(filename):
+    """
+    Open a |frescox| output file for reading as text regardless of whether it
+    was written uncompressed or compressed with gzip or zstd.  The format is
+    determined from the contents of the file rather than its name.
+
+    Reading zstd-compressed files requires either the ``compression.zstd``
+    module of the Python standard library (Python 3.14 and later) or that the
+    ``zstd`` program be in the ``PATH``.
+
+    :param filename: Filename including path of output file to open
+    :return: Text-mode file object that should be closed by the caller, ideally
+        by using it as a context manager
+    """
+    fname = Path(filename).resolve()
+    if not fname.is_file():
+        raise ValueError(f"{fname} does not exist or is not a file")
+
+    with open(fname, "rb") as fptr:
+        magic = fptr.read(4)
+
+    if magic.startswith(_GZIP_MAGIC):
+        return gzip.open(fname, "rt", encoding="utf-8")
+    elif magic == _ZSTD_MAGIC:
+        try:
+            from compression import zstd
+            return zstd.open(fname, "rt", encoding="utf-8")
+        except ImportError:
+            pass
+
+        exe = shutil.which("zstd", mode=(os.F_OK | os.X_OK))
+        if exe is None:
+            msg = "zstd program needed to read {} not found"
+            raise RuntimeError(msg.format(fname))
+        process = sbp.Popen([exe, "-d", "-c", "-q", str(fname)],
+                            stdin=sbp.DEVNULL, stdout=sbp.PIPE)
+        return _ProcessTextStream(process)
+
+    return open(fname, "r", encoding="utf-8")
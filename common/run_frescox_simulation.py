@@ -1,14 +1,27 @@
 import os
+import sys
+import time
+import shutil
+import signal
+import resource
+import selectors
+import contextlib
 
 import subprocess as sbp
 
 from pathlib import Path
 from numbers import Integral
+from collections import namedtuple
 
-from .Configuration import Configuration
+from .Configuration import Configuration, OUTPUTS
+from .Monitor import Monitor, RunAborted
+from .CpuLayout import CpuLayout
 
 # Keys for Frescox executable configuration dictionary
 FRESCOX_EXE = "frescox_exe"
+# Optional folder of shared libraries to load before those of the system
+# (e.g., for installations staged to node-local storage)
+FRESCOX_LIBRARY_PATH = "library_path"
 # These should match the keys in build_info.template that the Frescox build
 # system uses to write its configuration values to file.
 FRESCOX_MPI_SUPPORT = "supports_mpi"
@@ -19,8 +32,667 @@ FRESCOX_COREX_SUPPORT = "supports_corex"
 # MPI setup keys
 MPI_N_PROCESSES = "n_processes"
 
+# Supported methods for compressing results as they are written.  These should
+# match the methods that open_output() can read.
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+# Levels used if the caller does not specify one.  These favor throughput over
+# ratio since the compressor must keep up with Frescox.
+DEFAULT_COMPRESSION_LEVELS = {
+    COMPRESSION_GZIP: 6,
+    COMPRESSION_ZSTD: 3
+}
+# Range of valid levels for each compression method
+_COMPRESSION_LEVELS = {
+    COMPRESSION_GZIP: range(1, 10),
+    COMPRESSION_ZSTD: range(1, 20)
+}
 
-def run_frescox_simulation(frescox, config, mpi_setup, filename, overwrite):
+# Keys of resource limits applied to Frescox processes.  Values are in bytes.
+LIMIT_STACK = "stack"
+LIMIT_ADDRESS_SPACE = "address_space"
+# Shell ulimit flags for each resource limit, which take values in KiB
+_ULIMIT_FLAGS = {
+    LIMIT_STACK: ("-s", resource.RLIMIT_STACK),
+    LIMIT_ADDRESS_SPACE: ("-v", resource.RLIMIT_AS)
+}
+
+# Seconds that a stopped simulation is given to exit after SIGTERM before it
+# is killed
+_ABORT_GRACE = 5.0
+# Seconds between checks of whether a stopped simulation has ended
+_POLL_INTERVAL = 0.1
+# Largest number of bytes of output copied at once by a monitor
+_CHUNK_SIZE = 64 * 1024
+
+
+class RunStatistics(namedtuple("RunStatistics", ["wall_time",
+                                                 "peak_memory"])):
+    """
+    Resources used by a single |frescox| simulation.  ``wall_time`` is in
+    seconds and ``peak_memory`` is the peak resident set size in bytes of the
+    largest |frescox| process or ``None`` if it could not be measured.
+    """
+    __slots__ = ()
+
+
+def compressor_command(compression, level=None):
+    """
+    Construct the command line of an external program that compresses its
+    standard input to its standard output using the given method and level.
+
+    :param compression: Name of compression method
+    :param level: Compression level to use.  If ``None``, then the method's
+        default level is used.
+    :return: Command as a ``list`` of ``str`` ready for use with
+        ``subprocess``
+    """
+    if compression not in _COMPRESSION_LEVELS:
+        raise ValueError(f"Unknown compression method ({compression})")
+
+    if level is None:
+        level = DEFAULT_COMPRESSION_LEVELS[compression]
+    elif not isinstance(level, Integral):
+        raise TypeError("Compression level must be an integer")
+    elif level not in _COMPRESSION_LEVELS[compression]:
+        msg = "Invalid {} compression level ({})"
+        raise ValueError(msg.format(compression, level))
+
+    exe = shutil.which(compression, mode=(os.F_OK | os.X_OK))
+    if exe is None:
+        msg = "Unable to find {} program for compressing results"
+        raise RuntimeError(msg.format(compression))
+
+    if compression == COMPRESSION_ZSTD:
+        return [exe, "-c", "-q", f"-{level}"]
+    return [exe, "-c", f"-{level}"]
+
+
+def limited_command(cmd, limits):
+    """
+    Wrap a command so that the resource limits of the process it starts are
+    set before it executes.  Limits are applied by a shell that then replaces
+    itself with the command so that the limits apply to no other process and
+    so that processes can be started without a Python-level hook between fork
+    and exec.  Limits larger than the hard limit of this process are reduced
+    to the hard limit.
+
+    :param cmd: Command as a ``list`` of ``str``
+    :param limits: ``dict`` that maps resource limit keys (|eg|
+        ``LIMIT_STACK``) to limits in bytes or to ``None`` for no limit
+    :return: Command as a ``list`` of ``str`` ready for use with
+        ``subprocess``
+    """
+    settings = []
+    for key, value in limits.items():
+        if key not in _ULIMIT_FLAGS:
+            raise ValueError(f"Unknown resource limit ({key})")
+        flag, rlimit = _ULIMIT_FLAGS[key]
+        if value is None:
+            value = resource.RLIM_INFINITY
+        elif (not isinstance(value, Integral)) or (value <= 0):
+            raise ValueError(f"Invalid {key} limit ({value})")
+
+        hard = resource.getrlimit(rlimit)[1]
+        if hard != resource.RLIM_INFINITY:
+            if value == resource.RLIM_INFINITY:
+                value = hard
+            value = min(value, hard)
+
+        if value == resource.RLIM_INFINITY:
+            settings.append(f"ulimit -S {flag} unlimited")
+        else:
+            settings.append(f"ulimit -S {flag} {value // 1024}")
+
+    if not settings:
+        return list(cmd)
+    script = " && ".join(settings + ['exec "$0" "$@"'])
+    return ["/bin/sh", "-c", script] + list(cmd)
+
+
+def in_folder_command(cmd, folder):
+    """
+    Wrap a command so that the process it starts runs in the given folder.
+    As with :py:func:`limited_command`, a shell changes folder and then
+    replaces itself with the command since ``posix_spawn`` cannot set the
+    working directory of a new process.
+
+    :param cmd: Command as a ``list`` of ``str``
+    :param folder: Path to existing folder in which to run the command
+    :return: Command as a ``list`` of ``str`` ready for use with
+        ``subprocess``
+    """
+    return ["/bin/sh", "-c", 'cd "$0" && exec "$@"', str(folder)] + list(cmd)
+
+
+def _spawn(cmd, env, fd_stdin, fd_stdout, fd_stderr):
+    """
+    Start a process with ``posix_spawn`` so that, unlike ``subprocess``, no
+    Python code runs between starting and executing the process and the
+    operating system can use its cheapest mechanism (|eg| vfork).
+
+    :param cmd: Command as a ``list`` of ``str`` whose first element is the
+        absolute path of the program
+    :param env: ``dict`` of environment variables of the new process
+    :param fd_stdin: File descriptor to use as standard input; ``None`` to
+        inherit this process' standard input
+    :param fd_stdout: File descriptor to use as standard output
+    :param fd_stderr: File descriptor to use as standard error; ``None`` to
+        inherit this process' standard error
+    :return: Process ID of the new process
+    """
+    actions = [(os.POSIX_SPAWN_DUP2, fd_stdout, 1)]
+    if fd_stdin is not None:
+        actions.append((os.POSIX_SPAWN_DUP2, fd_stdin, 0))
+    if fd_stderr is not None:
+        actions.append((os.POSIX_SPAWN_DUP2, fd_stderr, 2))
+    return os.posix_spawn(cmd[0], cmd, env, file_actions=actions)
+
+
+@contextlib.contextmanager
+def _pinned(cpus):
+    """
+    Restrict the calling thread to the given CPUs for the duration of the
+    ``with`` block so that processes that it starts inherit the restriction.
+    Other threads are not affected.
+
+    :param cpus: Iterable of CPU IDs; ``None`` to leave the affinity as is
+    """
+    if cpus is None:
+        yield
+        return
+
+    previous = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+def _wait(pid):
+    """
+    Wait for a process to finish and measure its peak memory usage.
+
+    :param pid: Process ID of the process
+    :return: ``(returncode, peak_memory)`` where ``peak_memory`` is the peak
+        resident set size in bytes of the process or of the largest of its
+        descendants
+    """
+    _, status, usage = os.wait4(pid, 0)
+    # ru_maxrss is in KiB on Linux but in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return os.waitstatus_to_exitcode(status), usage.ru_maxrss * scale
+
+
+def _write_all(fd, data):
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def _signal(pid, signum):
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def _exited(pid):
+    """
+    :return: True if the process has ended, which leaves it to be reaped
+    """
+    flags = os.WEXITED | os.WNOHANG | os.WNOWAIT
+    return os.waitid(os.P_PID, pid, flags) is not None
+
+
+def _pump(pid, fd_read, fd_sink, watch):
+    """
+    Copy the output of a running process to its destination and pass it to a
+    monitor as it is produced.  If the monitor requests it, then the process
+    is stopped and its remaining output is copied without monitoring.
+
+    :param pid: Process ID of the process
+    :param fd_read: File descriptor from which to read the process' output
+    :param fd_sink: File descriptor to which to write the output
+    :param watch: Object returned by :py:meth:`Monitor.watch`
+    :return: Reason for which the process was stopped or ``None`` if it ran to
+        completion
+    """
+    reason = None
+    # Time at which a process that was asked to stop is killed
+    deadline = None
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd_read, selectors.EVENT_READ)
+        while True:
+            if reason is None:
+                timeout = watch.remaining()
+            else:
+                # Programs started by a stopped process can keep its output
+                # open after it ends so that its end is found by polling
+                timeout = _POLL_INTERVAL
+                if deadline is not None:
+                    timeout = min(timeout, deadline - time.perf_counter())
+            if timeout is not None:
+                timeout = max(0.0, timeout)
+
+            if selector.select(timeout):
+                data = os.read(fd_read, _CHUNK_SIZE)
+                if not data:
+                    break
+                _write_all(fd_sink, data)
+                if reason is None:
+                    reason = watch.feed(data)
+                    if reason is not None:
+                        _signal(pid, signal.SIGTERM)
+                        deadline = time.perf_counter() + _ABORT_GRACE
+            elif reason is None:
+                reason = watch.expired()
+                if reason is not None:
+                    _signal(pid, signal.SIGTERM)
+                    deadline = time.perf_counter() + _ABORT_GRACE
+            elif _exited(pid):
+                break
+            elif (deadline is not None) and \
+                    (time.perf_counter() >= deadline):
+                _signal(pid, signal.SIGKILL)
+                deadline = None
+                reason = f"{reason}; killed after {_ABORT_GRACE} s"
+
+    return reason
+
+
+class Runner(object):
+    def __init__(self, frescox, mpi_setup=None, compression=None,
+                 compression_level=None, index=None, limits=None,
+                 monitor=None, layout=None, environment=None,
+                 isolated=False, outputs=None):
+        """
+        Prepare to run many |frescox| simulations with the same installation
+        and setup.  All arguments are checked and the command line is built
+        once so that each call to :py:meth:`run` does little more than write
+        the input file and start |frescox|.  Processes are started with
+        ``posix_spawn``.
+
+        Since the setup is fixed when the object is created, changes to the
+        environment (|eg| ``OMP_NUM_THREADS`` or ``BFRESCOX_RUN_INDEX``) made
+        afterwards are neither checked nor passed to |frescox|.  A runner can
+        be used by several threads concurrently.
+
+        :param frescox: ``dict`` that fully characterizes a |frescox|
+            installation.  If it names a ``FRESCOX_LIBRARY_PATH``, then the
+            folder is prepended to ``LD_LIBRARY_PATH`` for each process.
+        :param mpi_setup: ``dict`` that provides MPI setup values if given
+            |frescox| installation built with MPI; ``None``, otherwise.
+        :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use
+            to compress results as they are written; ``None`` to write results
+            uncompressed.  Filenames are used as given and no suffix is added.
+        :param compression_level: Level of compression to use; ``None`` to use
+            the method's default level.  Ignored if no compression is
+            requested.
+        :param index: :py:class:`RunIndex` object or filename of index
+            database in which to record all runs.  If ``None``, then runs are
+            recorded in the index named by the ``BFRESCOX_RUN_INDEX``
+            environment variable if it is set.
+        :param limits: ``dict`` that maps resource limit keys (``"stack"`` or
+            ``"address_space"``) to the limit in bytes, or ``None`` for no
+            limit, to apply to each |frescox| process; ``None`` to use the
+            limits of this process
+        :param monitor: :py:class:`Monitor` that watches the output of each
+            simulation as it is written and that can stop it early; ``None``
+            to write output directly to file without monitoring
+        :param layout: :py:class:`CpuLayout` whose slots partition the CPUs
+            of the node among concurrent simulations.  Each simulation waits
+            for a free slot and runs restricted to its CPUs with OpenMP
+            threads bound to them so that ``OMP_NUM_THREADS`` need not be set.
+            ``None`` to let the operating system place all processes.
+        :param environment: ``dict`` of environment variables to set for each
+            |frescox| process in addition to those of this process; ``None``
+            to pass only the environment of this process
+        :param isolated: If True, then each simulation runs in the folder of
+            its results file so that the auxiliary files that |frescox| writes
+            (|eg| ``fort.16``) are kept with its results.  Otherwise, all
+            simulations run in the current working directory, where
+            concurrent simulations overwrite each other's auxiliary files.  A
+            runner used by several threads at once must therefore be
+            isolated.
+        :param outputs: Names of the only results that |frescox| should write
+            (|eg| ``OUTPUT_CROSS_SECTIONS``).  The print controls of each
+            configuration are set as by :py:meth:`Configuration.with_outputs`
+            before its input file is written and recorded.  ``None`` to use
+            the print controls of each configuration as given.
+        """
+        super().__init__()
+
+        # ----- ERROR CHECK ARGUMENTS
+        if not isinstance(frescox, dict):
+            raise TypeError(f"Invalid frescox specification ({frescox})")
+
+        frescox_exe = Path(frescox[FRESCOX_EXE]).resolve()
+        use_mpi = frescox[FRESCOX_MPI_SUPPORT]
+        use_omp = frescox[FRESCOX_OPENMP_SUPPORT]
+        if not frescox_exe.is_file():
+            msg = "Frescox executable does not exist or is not a file ({})"
+            raise TypeError(msg.format(frescox_exe))
+        elif not isinstance(use_mpi, bool):
+            raise TypeError("MPI support specification is not a boolean")
+        elif not isinstance(use_omp, bool):
+            raise TypeError("OpenMP support specification is not a boolean")
+        elif (layout is not None) and (not isinstance(layout, CpuLayout)):
+            raise TypeError("Layout is not a CpuLayout object")
+        elif (environment is not None) and \
+                (not isinstance(environment, dict)):
+            raise TypeError("Environment not given as a dictionary")
+        elif not isinstance(isolated, bool):
+            raise TypeError("Given isolated argument is not a boolean")
+        if outputs is not None:
+            if isinstance(outputs, str):
+                msg = "Outputs must be given as a sequence of names"
+                raise TypeError(msg)
+            outputs = tuple(outputs)
+            for output in outputs:
+                if output not in OUTPUTS:
+                    raise ValueError(f"Unknown output ({output})")
+
+        env = dict(os.environ)
+        if environment is not None:
+            env.update({str(key): str(value)
+                        for key, value in environment.items()})
+        if frescox.get(FRESCOX_LIBRARY_PATH) is not None:
+            paths = [str(frescox[FRESCOX_LIBRARY_PATH])]
+            if env.get("LD_LIBRARY_PATH", "") != "":
+                paths.append(env["LD_LIBRARY_PATH"])
+            env["LD_LIBRARY_PATH"] = os.pathsep.join(paths)
+        if use_omp and (layout is None) and ("OMP_NUM_THREADS" not in env):
+            msg = (
+                "OMP_NUM_THREADS environment variable is not set "
+                "for use with OpenMP-enabled Frescox installation"
+            )
+            raise RuntimeError(msg)
+
+        n_mpi_procs = None
+        if (not use_mpi) and (mpi_setup is not None):
+            msg = "MPI specification provided for non-MPI Frescox installation"
+            raise ValueError(msg)
+        elif use_mpi:
+            if not isinstance(mpi_setup, dict):
+                raise TypeError("MPI setup information is not a dictionary")
+            elif MPI_N_PROCESSES not in mpi_setup:
+                msg = f"{MPI_N_PROCESSES} not provided in MPI setup"
+                raise ValueError(msg)
+
+            n_mpi_procs = mpi_setup[MPI_N_PROCESSES]
+            if not isinstance(n_mpi_procs, Integral):
+                raise TypeError("Number of MPI processes must be an integer")
+            elif n_mpi_procs < 1:
+                msg = "Number of MPI processes ({}) must be positive integer"
+                raise ValueError(msg.format(n_mpi_procs))
+
+        if (limits is not None) and (not isinstance(limits, dict)):
+            raise TypeError("Resource limits not given as a dictionary")
+        elif (monitor is not None) and (not isinstance(monitor, Monitor)):
+            raise TypeError("Monitor is not a Monitor object")
+
+        # ----- BUILD COMMANDS
+        # The input filename is appended for each run with MPI.  Otherwise, the
+        # input is given through standard input.
+        if use_mpi:
+            mpirun = shutil.which("mpirun")
+            if mpirun is None:
+                raise RuntimeError("Unable to find mpirun program")
+            cmd = [mpirun, "-np", str(n_mpi_procs), str(frescox_exe)]
+        else:
+            cmd = [str(frescox_exe)]
+        if limits is not None:
+            cmd = limited_command(cmd, limits)
+
+        cmd_zip = None
+        if compression is not None:
+            cmd_zip = compressor_command(compression, compression_level)
+
+        # Avoid circular imports since the index needs this module's keys
+        from .RunIndex import open_run_index
+
+        self.__frescox = dict(frescox)
+        # Copying the environment for each process is a significant part of
+        # the cost of starting it
+        self.__env = env
+        self.__layout = layout
+        # Environment of the processes run in each slot of the layout
+        self.__slot_env = {}
+        if layout is not None:
+            for slot in layout.slots:
+                self.__slot_env[slot.index] = dict(self.__env)
+                self.__slot_env[slot.index].update(layout.environment(slot))
+        self.__use_mpi = use_mpi
+        self.__isolated = isolated
+        self.__outputs = outputs
+        self.__cmd = cmd
+        self.__cmd_zip = cmd_zip
+        self.__monitor = monitor
+        self.__index, self.__owned = open_run_index(index)
+
+    @property
+    def command(self):
+        """
+        Command line used to start |frescox| as a ``list`` of ``str``.  With
+        MPI, the name of the input file is appended for each run.
+        """
+        return list(self.__cmd)
+
+    def close(self):
+        """
+        Close the run index if it was opened by the runner.
+        """
+        if self.__owned:
+            self.__index.close()
+            self.__owned = False
+        self.__index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __simulate(self, cmd, fd_in, fd_sink, watch, env, cpus):
+        """
+        Run the given command with all of its output written to the given file
+        descriptor.  If a watch is given, then the output is passed through
+        the monitor on its way.
+
+        :param env: ``dict`` of environment variables of the process
+        :param cpus: CPUs to which the process is restricted; ``None`` for no
+            restriction
+        :return: ``(returncode, peak_memory, reason)`` where ``reason`` is the
+            reason for which the monitor stopped the simulation or ``None``
+        """
+        if watch is None:
+            with _pinned(cpus):
+                pid = _spawn(cmd, env, fd_in, fd_sink, fd_sink)
+            return _wait(pid) + (None,)
+
+        fd_read, fd_write = os.pipe()
+        try:
+            try:
+                with _pinned(cpus):
+                    pid = _spawn(cmd, env, fd_in, fd_write, fd_write)
+            finally:
+                os.close(fd_write)
+            try:
+                reason = _pump(pid, fd_read, fd_sink, watch)
+            except BaseException:
+                # Never leave a simulation running unwatched
+                _signal(pid, signal.SIGKILL)
+                _wait(pid)
+                raise
+        finally:
+            os.close(fd_read)
+
+        return _wait(pid) + (reason,)
+
+    def __execute(self, cmd, fname_in, fname_out):
+        """
+        Run the given command and write all of its output to the given file.
+        If the runner has a layout, then the command is run in the first free
+        slot.
+
+        :return: Peak resident set size in bytes of the |frescox| process
+        """
+        if self.__layout is None:
+            return self.__execute_on(cmd, fname_in, fname_out, self.__env,
+                                     None)
+
+        with self.__layout.acquire() as slot:
+            return self.__execute_on(cmd, fname_in, fname_out,
+                                     self.__slot_env[slot.index], slot.cpus)
+
+    def __execute_on(self, cmd, fname_in, fname_out, env, cpus):
+        """
+        Run the given command with the given environment and CPUs and write
+        all of its output to the given file.  If compression was requested,
+        then output is streamed through the compressor as it is produced so
+        that an uncompressed version of the output is never written to disk.
+
+        :return: Peak resident set size in bytes of the |frescox| process
+        """
+        FLAGS_OUT = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC
+
+        watch = None
+        if self.__monitor is not None:
+            watch = self.__monitor.watch(fname_out)
+
+        fd_in = None
+        fd_out = os.open(fname_out, FLAGS_OUT, 0o666)
+        try:
+            if not self.__use_mpi:
+                fd_in = os.open(fname_in, os.O_RDONLY | os.O_CLOEXEC)
+
+            if self.__cmd_zip is None:
+                returncode, peak_memory, reason = \
+                    self.__simulate(cmd, fd_in, fd_out, watch, env, cpus)
+                returncode_zip = 0
+            else:
+                fd_read, fd_write = os.pipe()
+                try:
+                    pid_zip = _spawn(self.__cmd_zip, self.__env,
+                                     fd_read, fd_out, None)
+                except BaseException:
+                    os.close(fd_write)
+                    raise
+                finally:
+                    os.close(fd_read)
+                try:
+                    try:
+                        returncode, peak_memory, reason = \
+                            self.__simulate(cmd, fd_in, fd_write, watch,
+                                            env, cpus)
+                    finally:
+                        # The simulation holds its own copy of the pipe.
+                        # Closing ours ensures that the compressor sees EOF
+                        # when the simulation ends or if it cannot start.
+                        os.close(fd_write)
+                finally:
+                    _, status = os.waitpid(pid_zip, 0)
+                returncode_zip = os.waitstatus_to_exitcode(status)
+        finally:
+            if fd_in is not None:
+                os.close(fd_in)
+            os.close(fd_out)
+
+        if reason is not None:
+            raise RunAborted(reason)
+        elif returncode != 0:
+            raise sbp.CalledProcessError(returncode, cmd)
+        elif returncode_zip != 0:
+            raise sbp.CalledProcessError(returncode_zip, self.__cmd_zip)
+
+        return peak_memory
+
+    def run(self, config, filename, overwrite=False):
+        """
+        Run a single |frescox| simulation.  The |frescox| Fortran namelist
+        configuration file generated from the configuration object is written
+        alongside the results file.
+
+        :param config: :py:class:`Configuration` object that specifies the
+            simulation to execute
+        :param filename: Filename including path of file to write outputs to
+        :param overwrite: If False, then an error is raised if either the input
+            or output files exist
+        :return: :py:class:`RunStatistics` of the simulation.  If the
+            runner's monitor stops the simulation, then the output written so
+            far is kept and :py:class:`RunAborted` is raised instead.
+        """
+        # ----- HARCODED VALUES
+        FRESCOX_INPUT_NAME = "frescox.in"
+
+        # ----- CHECK STATE OF FILES & WRITE INPUT
+        if self.__outputs is not None:
+            config = config.with_outputs(self.__outputs)
+        fname_out = os.path.abspath(filename)
+        if os.path.lexists(fname_out):
+            if not overwrite:
+                msg = f"Output file ({fname_out}) already exists"
+                raise RuntimeError(msg)
+            os.remove(fname_out)
+
+        fname_in = os.path.join(os.path.dirname(fname_out),
+                                FRESCOX_INPUT_NAME)
+        try:
+            with open(fname_in, "w" if overwrite else "x") as fptr:
+                fptr.write(config.to_NML_string())
+        except FileExistsError:
+            raise RuntimeError(f"Input file ({fname_in}) already exists")
+
+        # ----- RUN SIMULATION
+        cmd = self.__cmd + [fname_in] if self.__use_mpi else self.__cmd
+        if self.__isolated:
+            cmd = in_folder_command(cmd, os.path.dirname(fname_out))
+
+        # Avoid circular imports since the index needs this module's keys
+        from .RunIndex import RUN_SUCCEEDED, RUN_FAILED, RUN_ABORTED
+
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            peak_memory = self.__execute(cmd, fname_in, fname_out)
+        except RunAborted:
+            self.__record(config, fname_out, started,
+                          time.perf_counter() - start, RUN_ABORTED, None)
+            raise
+        except sbp.CalledProcessError as err:
+            self.__record(config, fname_out, started,
+                          time.perf_counter() - start, RUN_FAILED, None)
+            print()
+            msg = "Unable to run command (Return code {})"
+            print(msg.format(err.returncode))
+            print(" ".join(err.cmd))
+            raise
+        except OSError as err:
+            self.__record(config, fname_out, started,
+                          time.perf_counter() - start, RUN_FAILED, None)
+            print()
+            print(f"Unable to start command ({err})")
+            print(" ".join(cmd))
+            raise
+        statistics = RunStatistics(time.perf_counter() - start, peak_memory)
+        self.__record(config, fname_out, started, statistics.wall_time,
+                      RUN_SUCCEEDED, peak_memory)
+
+        return statistics
+
+    def __record(self, config, fname_out, started, wall_time, status,
+                 peak_memory):
+        if self.__index is not None:
+            self.__index.record(config, fname_out, frescox=self.__frescox,
+                                started=started, wall_time=wall_time,
+                                status=status, peak_memory=peak_memory)
+
+
+def run_frescox_simulation(frescox, config, mpi_setup, filename, overwrite,
+                           compression=None, compression_level=None,
+                           index=None, limits=None, monitor=None,
+                           layout=None, isolated=False, outputs=None):
     """
     Run a |frescox| simulation using the given |frescox| installation,
     simulation configuration, and MPI setup.  Results are written to disk using
@@ -32,7 +704,8 @@ def run_frescox_simulation(frescox, config, mpi_setup, filename, overwrite):
     packages, we assume that some users might call it directly.  Therefore, this
     function performs its own error checking of arguments.  A nice side effect
     of this is that the wrapper functions in the packages likely don't need to
-    perform any error checking.
+    perform any error checking.  Use a :py:class:`Runner` to run many
+    simulations with the same setup without repeating the checks.
 
     .. todo::
         * Allow for the case that a user is required to use a system's own
@@ -49,104 +722,47 @@ def run_frescox_simulation(frescox, config, mpi_setup, filename, overwrite):
     :param filename: Filename including path of file to write outputs to
     :param overwrite: If False, then an error is raised if either the input or
         output files exist
+    :param compression: Name of method (``"gzip"`` or ``"zstd"``) to use to
+        compress results as they are written; ``None`` to write results
+        uncompressed.  The filename is used as given and no suffix is added.
+    :param compression_level: Level of compression to use; ``None`` to use the
+        method's default level.  Ignored if no compression is requested.
+    :param index: :py:class:`RunIndex` object or filename of index database
+        in which to record the run.  If ``None``, then the run is recorded in
+        the index named by the ``BFRESCOX_RUN_INDEX`` environment variable if
+        it is set.
+    :param limits: ``dict`` that maps resource limit keys (``"stack"`` or
+        ``"address_space"``) to the limit in bytes, or ``None`` for no limit,
+        to apply to each |frescox| process; ``None`` to use the limits of this
+        process
+    :param monitor: :py:class:`Monitor` that watches the output as it is
+        written and that can stop the simulation early; ``None`` for no
+        monitoring
+    :param layout: :py:class:`CpuLayout` in one of whose slots to run the
+        simulation; ``None`` to let the operating system place the processes
+    :param isolated: If True, then the simulation runs in the folder of its
+        results file so that the auxiliary files that |frescox| writes (|eg|
+        ``fort.16``) are kept with its results.  Otherwise, it runs in the
+        current working directory, where concurrent simulations overwrite
+        each other's auxiliary files.
+    :param outputs: Names of the only results that |frescox| should write,
+        whose print controls are set in the input file written for the
+        simulation; ``None`` to use the print controls of the configuration
+    :return: :py:class:`RunStatistics` of the simulation
     """
-    # ----- HARCODED VALUES
-    FRESCOX_INPUT_NAME = "frescox.in"
-
     # ----- ERROR CHECK ARGUMENTS
-    if not isinstance(frescox, dict):
-        raise TypeError(f"Invalid frescox specification ({frescox})")
-
-    frescox_exe = Path(frescox[FRESCOX_EXE]).resolve()
-    use_mpi = frescox[FRESCOX_MPI_SUPPORT]
-    use_omp = frescox[FRESCOX_OPENMP_SUPPORT]
-    if not frescox_exe.is_file():
-        msg = "Frescox executable does not exist or is not a file ({})"
-        raise TypeError(msg.format(frescox_exe))
-    elif not isinstance(use_mpi, bool):
-        raise TypeError("MPI support specification is not a boolean")
-    elif not isinstance(use_omp, bool):
-        raise TypeError("OpenMP support specification is not a boolean")
-    elif use_omp and ("OMP_NUM_THREADS" not in os.environ):
-        msg = (
-            "OMP_NUM_THREADS environment variable is not set "
-            "for use with OpenMP-enabled Frescox installation"
-        )
-        raise RuntimeError(msg)
-
     if not isinstance(config, Configuration):
         msg = "Configuration information not given as a Configuration object"
         raise TypeError(msg)
-
-    n_mpi_procs = None
-    if (not use_mpi) and (mpi_setup is not None):
-        msg = "MPI specification provided for non-MPI Frescox installation"
-        raise ValueError(msg)
-    elif use_mpi:
-        if not isinstance(mpi_setup, dict):
-            raise TypeError("MPI setup information is not a dictionary")
-        elif MPI_N_PROCESSES not in mpi_setup:
-            raise ValueError(f"{MPI_N_PROCESSES} not provided in MPI setup")
-
-        n_mpi_procs = mpi_setup[MPI_N_PROCESSES]
-        if not isinstance(n_mpi_procs, Integral):
-            raise TypeError("Number of MPI processes must be an integer")
-        elif n_mpi_procs < 1:
-            msg = "Number of MPI processes ({}) must be positive integer"
-            raise ValueError(msg.format(n_mpi_procs))
-
-    if not isinstance(filename, (str, Path)):
+    elif not isinstance(filename, (str, Path)):
         raise TypeError(f"Invalid output filename ({filename})")
-
-    if not isinstance(overwrite, bool):
+    elif not isinstance(overwrite, bool):
         raise TypeError("Given overwrite argument is not a boolean")
 
-    # ----- CHECK STATE OF FILES & WRITE INPUT
-    fname_out = Path(filename).resolve()
-    if fname_out.exists():
-        if overwrite:
-            os.remove(fname_out)
-        else:
-            raise RuntimeError(f"Output file ({fname_out}) already exists")
-
-    fname_in = fname_out.parent.joinpath(FRESCOX_INPUT_NAME)
-    config.write_to_nml(fname_in, overwrite)
-
-    # ----- RUN SIMULATION
-    if use_mpi:
-        cmd = ["mpirun",
-               "-np", str(n_mpi_procs),
-               str(frescox_exe),
-               str(fname_in)]
-
-        try:
-            with open(fname_out, "w") as fptr_stdout:
-                results = sbp.run(cmd,
-                                  stdout=fptr_stdout,
-                                  stderr=sbp.STDOUT,
-                                  check=True)
-            assert results.returncode == 0
-        except sbp.CalledProcessError as err:
-            print()
-            msg = "Unable to run command (Return code {})"
-            print(msg.format(err.returncode))
-            print(" ".join(err.cmd))
-            raise
-    else:
-        cmd = [str(frescox_exe)]
-
-        try:
-            with open(fname_out, "w") as fptr_stdout:
-                with open(fname_in, "r") as fptr_stdin:
-                    results = sbp.run(cmd,
-                                      stdin=fptr_stdin,
-                                      stdout=fptr_stdout,
-                                      stderr=sbp.STDOUT,
-                                      check=True)
-            assert results.returncode == 0
-        except sbp.CalledProcessError as err:
-            print()
-            msg = "Unable to run command (Return code {})"
-            print(msg.format(err.returncode))
-            print(" ".join(err.cmd))
-            raise
+    with Runner(frescox, mpi_setup,
+                compression=compression,
+                compression_level=compression_level,
+                index=index, limits=limits, monitor=monitor,
+                layout=layout, isolated=isolated,
+                outputs=outputs) as runner:
+        return runner.run(config, filename, overwrite)
@@ -0,0 +1,238 @@
+import copy
+
+import numpy as np
+
+from pathlib import Path
+from numbers import Real, Integral
+from collections import namedtuple
+
+# TODO: This assumes in a package
+from .Configuration import Configuration
+from .RunIndex import RUN_SUCCEEDED
+from ._batch import batch_filenames
+
+# Names of the subfolders in which results of each fidelity are written
+LOW_FIDELITY_FOLDER = "low"
+HIGH_FIDELITY_FOLDER = "high"
+
+
+class ScreeningResult(namedtuple("ScreeningResult", ["low_scores",
+                                                     "high_scores",
+                                                     "escalated",
+                                                     "calibration",
+                                                     "discrepancies",
+                                                     "margin", "threshold",
+                                                     "low_time", "high_time",
+                                                     "time_saved"])):
+    """
+    Outcome of screening points with cheap low-fidelity simulations before
+    running promising points at full fidelity.  ``low_scores[i]`` and
+    ``high_scores[i]`` are the scores of point ``i`` at each fidelity and are
+    NaN if the simulation failed or was not run.  ``escalated[i]`` is True if
+    point ``i`` was run at full fidelity.
+
+    ``calibration`` holds the points that were run at both fidelities
+    regardless of their low-fidelity score and ``discrepancies`` holds the
+    difference of their high- and low-fidelity scores.  A point was escalated
+    if its low-fidelity simulation failed or if its low-fidelity score plus
+    ``margin`` was at least ``threshold``.
+
+    ``low_time`` and ``high_time`` are the total run times in seconds of all
+    simulations of each fidelity.  ``time_saved`` is the estimated run time
+    that was saved relative to running every point at full fidelity only and
+    is ``None`` if no full-fidelity simulation succeeded.
+    """
+    __slots__ = ()
+
+    @property
+    def accepted(self):
+        """
+        Boolean array that is True for each point whose full-fidelity score is
+        at least the threshold
+        """
+        with np.errstate(invalid="ignore"):
+            return self.high_scores >= self.threshold
+
+    def print_report(self):
+        """
+        Print the number of points at each step of the screening, the
+        discrepancy between fidelities, and the compute saved
+        """
+        n_points = len(self.low_scores)
+        n_failed = int(np.sum(np.isnan(self.low_scores)))
+
+        print()
+        print(f"Points                         {n_points:>10}")
+        print(f"Failed at low fidelity         {n_failed:>10}")
+        print(f"Calibration points             {len(self.calibration):>10}")
+        print(f"Escalated to full fidelity     "
+              f"{int(np.sum(self.escalated)):>10}")
+        print(f"Accepted                       "
+              f"{int(np.sum(self.accepted)):>10}")
+        print()
+        good = self.discrepancies[~np.isnan(self.discrepancies)]
+        if len(good) > 0:
+            print("Discrepancy (high - low score)")
+            print(f"    Mean                       {np.mean(good):>10.4g}")
+            print(f"    Standard deviation         {np.std(good):>10.4g}")
+            print(f"    Range                      "
+                  f"[{np.min(good):.4g}, {np.max(good):.4g}]")
+        print(f"Margin                         {self.margin:>10.4g}")
+        print()
+        print(f"Low-fidelity run time (s)      {self.low_time:>10.3f}")
+        print(f"Full-fidelity run time (s)     {self.high_time:>10.3f}")
+        if self.time_saved is None:
+            print("Estimated time saved           unknown")
+        else:
+            total = self.low_time + self.high_time + self.time_saved
+            percent = 100.0 * self.time_saved / total if total > 0.0 else 0.0
+            print(f"Estimated time saved (s)       {self.time_saved:>10.3f} "
+                  f"({percent:.1f}%)")
+        print()
+
+
+def _scores(results, filenames, score):
+    """
+    :return: Array of the score of each successful simulation and NaN for
+        each failed simulation, and total run time of all simulations
+    """
+    scores = np.full(len(filenames), np.nan)
+    total = 0.0
+    for result in results:
+        total += result.wall_time
+        if result.status == RUN_SUCCEEDED:
+            value = score(filenames[result.point])
+            if isinstance(value, bool) or (not isinstance(value, Real)):
+                msg = f"Score of {filenames[result.point]} is not a real value"
+                raise TypeError(msg)
+            scores[result.point] = float(value)
+    return scores, total
+
+
+def run_screening(run, configurations, low_fidelity, score, threshold,
+                  path, n_calibration=4, margin=None):
+    """
+    Run every point with a cheap, low-fidelity version of its configuration
+    and run at full fidelity only the points that might pass the acceptance
+    threshold.
+
+    All low-fidelity simulations are run as a single batch.  A few
+    calibration points spread evenly over the range of low-fidelity scores
+    are then run at full fidelity to measure the discrepancy between the two
+    fidelities.  Unless given, the margin is the largest amount by which a
+    calibration point's full-fidelity score exceeded its low-fidelity score
+    so that points that low fidelity underrates are still escalated.  All
+    remaining points whose low-fidelity score plus margin reaches the
+    threshold, or whose low-fidelity simulation failed, are then run at full
+    fidelity as a single batch.
+
+    :param run: Function that is called with a ``list`` of configurations and
+        a ``list`` of filenames and that returns an iterable of
+        :py:class:`BatchResult`
+    :param configurations: Sequence of :py:class:`Configuration` objects of
+        the points at full fidelity
+    :param low_fidelity: Function that is called with a copy of a point's
+        configuration and that returns the :py:class:`Configuration` of its
+        low-fidelity version (|eg| with fewer partial waves or a coarser
+        step)
+    :param score: Function that is called with the filename of a
+        simulation's results and that returns a real value that is larger for
+        better points (|eg| a log-likelihood)
+    :param threshold: Score that a point must reach to be accepted
+    :param path: Path to folder in which to write the results of each
+        fidelity to its own subfolder
+    :param n_calibration: Number of points to run at both fidelities to
+        measure their discrepancy
+    :param margin: Non-negative amount added to each low-fidelity score
+        before comparing it to the threshold; ``None`` to calibrate the margin
+        from the calibration points or to use zero if there are none
+    :return: :py:class:`ScreeningResult`
+    """
+    # ----- ERROR CHECK ARGUMENTS
+    configurations = list(configurations)
+    for config in configurations:
+        if not isinstance(config, Configuration):
+            msg = "Configuration information not given as a Configuration "
+            msg += "object"
+            raise TypeError(msg)
+    if not callable(low_fidelity):
+        raise TypeError("Low-fidelity transformation is not callable")
+    elif not callable(score):
+        raise TypeError("Score is not callable")
+    elif isinstance(threshold, bool) or (not isinstance(threshold, Real)):
+        raise TypeError("Threshold must be a real value")
+    elif (not isinstance(n_calibration, Integral)) or (n_calibration < 0):
+        raise ValueError("Number of calibration points must be non-negative")
+    elif (margin is not None) and \
+            ((not isinstance(margin, Real)) or (margin < 0.0)):
+        raise ValueError("Margin must be a non-negative real value")
+    elif not configurations:
+        raise ValueError("No points to screen")
+
+    low_configs = []
+    for config in configurations:
+        low = low_fidelity(copy.deepcopy(config))
+        if not isinstance(low, Configuration):
+            msg = "Low-fidelity transformation did not return a "
+            msg += "Configuration object"
+            raise TypeError(msg)
+        low_configs.append(low)
+
+    path = Path(path).resolve()
+    n_points = len(configurations)
+    low_fnames = batch_filenames(path.joinpath(LOW_FIDELITY_FOLDER), n_points)
+    high_fnames = batch_filenames(path.joinpath(HIGH_FIDELITY_FOLDER),
+                                  n_points)
+
+    # ----- SCREEN AT LOW FIDELITY
+    low_scores, low_time = _scores(run(low_configs, low_fnames), low_fnames,
+                                   score)
+
+    # ----- CALIBRATE
+    ranked = np.argsort(low_scores)
+    ranked = ranked[~np.isnan(low_scores[ranked])]
+    calibration = np.array([], dtype=int)
+    if min(n_calibration, len(ranked)) > 0:
+        picks = np.linspace(0, len(ranked) - 1, min(n_calibration, len(ranked)))
+        calibration = np.unique(ranked[np.round(picks).astype(int)])
+
+    high_scores = np.full(n_points, np.nan)
+    high_times = []
+
+    def run_high(points):
+        points = [int(i) for i in points]
+        if not points:
+            return
+        results = list(run([configurations[i] for i in points],
+                           [high_fnames[i] for i in points]))
+        scores, _ = _scores(results, [high_fnames[i] for i in points], score)
+        high_scores[points] = scores
+        for result in results:
+            high_times.append((result.wall_time,
+                               result.status == RUN_SUCCEEDED))
+
+    run_high(calibration)
+    discrepancies = high_scores[calibration] - low_scores[calibration]
+
+    if margin is None:
+        good = discrepancies[~np.isnan(discrepancies)]
+        margin = max(0.0, float(np.max(good))) if len(good) > 0 else 0.0
+
+    # ----- ESCALATE
+    escalated = np.isnan(low_scores)
+    with np.errstate(invalid="ignore"):
+        escalated |= (low_scores + margin >= threshold)
+    escalated[calibration] = True
+    calibrated = set(calibration)
+    run_high([i for i in np.flatnonzero(escalated) if i not in calibrated])
+
+    # ----- ESTIMATE SAVINGS
+    high_time = sum(wall_time for wall_time, _ in high_times)
+    good = [wall_time for wall_time, succeeded in high_times if succeeded]
+    time_saved = None
+    if good:
+        time_saved = n_points * float(np.mean(good)) - low_time - high_time
+
+    return ScreeningResult(low_scores, high_scores, escalated, calibration,
+                           discrepancies, float(margin), float(threshold),
+                           low_time, high_time, time_saved)
@@ -0,0 +1,187 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+import subprocess as sbp
+
+from pathlib import Path
+
+# TODO: This assumes in a package
+from ._fingerprint import file_hash
+from ._run_frescox_simulation import FRESCOX_EXE, FRESCOX_LIBRARY_PATH
+
+# Environment variable that names the node-local folder (e.g., /dev/shm) to
+# which the Frescox installation is staged by information() if it is set
+STAGE_PATH_ENV = "BFRESCOX_STAGE_PATH"
+
+# Shared libraries in these folders are provided by the OS on every node and
+# are never staged
+_SYSTEM_LIBRARY_PATHS = ("/lib", "/lib32", "/lib64", "/usr/lib", "/usr/lib32",
+                         "/usr/lib64")
+
+_MANIFEST_NAME = "manifest.json"
+
+
+def _shared_libraries(frescox_exe):
+    """
+    :return: ``dict`` that maps the name by which the executable loads each of
+        its shared libraries that is not provided by the OS to the library's
+        path.  Empty if ``ldd`` is not available or if the executable is not
+        dynamically linked.
+    """
+    if shutil.which("ldd", mode=(os.F_OK | os.X_OK)) is None:
+        return {}
+    reply = sbp.run(["ldd", str(frescox_exe)],
+                    stdin=sbp.DEVNULL, capture_output=True, text=True)
+    if reply.returncode != 0:
+        return {}
+
+    libraries = {}
+    for line in reply.stdout.splitlines():
+        # Lines are "libname.so.1 => /path/to/libname.so.1 (0x...)"
+        name, arrow, rest = line.strip().partition(" => ")
+        if (not arrow) or (not rest.startswith("/")):
+            continue
+        path = Path(rest.split(" (")[0]).resolve()
+        if not str(path).startswith(_SYSTEM_LIBRARY_PATHS):
+            libraries[name] = path
+
+    return libraries
+
+
+def _stage_key(frescox_exe):
+    """
+    :return: Name of the staged copy of the executable, which changes if the
+        executable is rebuilt.  Only the executable is inspected so that
+        finding a copy staged by another process costs a single ``stat`` of
+        the shared filesystem rather than an ``ldd`` of the executable and a
+        ``stat`` of each library.  The name therefore does not change if only
+        the shared libraries are rebuilt.
+    """
+    stat = frescox_exe.stat()
+    sha = hashlib.sha256()
+    sha.update(f"{frescox_exe};{stat.st_size};{stat.st_mtime_ns}".encode())
+    return "frescox-" + sha.hexdigest()[:16]
+
+
+def _verify(folder):
+    """
+    :return: True if every file listed in the folder's manifest exists and has
+        the hash recorded for it
+    """
+    try:
+        with open(folder.joinpath(_MANIFEST_NAME), "r") as fptr:
+            manifest = json.load(fptr)
+        return all(file_hash(folder.joinpath(name)) == sha
+                   for name, sha in manifest["files"].items())
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def _copy(source, folder, name):
+    """
+    Copy the file to the folder and confirm that the copy is intact.
+
+    :return: Hash of the file
+    """
+    copy = folder.joinpath(name)
+    copy.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source, copy)
+    sha = file_hash(source)
+    if file_hash(copy) != sha:
+        raise RuntimeError(f"Staged copy of {source} is corrupt")
+    return sha
+
+
+def stage_installation(frescox, path):
+    """
+    Copy a |frescox| executable and the shared libraries that it loads, other
+    than those provided by the OS, to node-local storage (|eg| ``/dev/shm``)
+    and return the information of the staged installation.  When thousands of
+    processes start |frescox| at once from a shared filesystem, its metadata
+    server can stall startup for minutes.  Starting the staged copy touches
+    only local storage.
+
+    The installation is staged once per node.  Other processes, including
+    those of other Python programs, that stage the same executable to the same
+    folder reuse the copy, which is verified against the SHA-256 hashes of the
+    originals that were recorded when it was staged.  A copy is staged again
+    if the executable is rebuilt.  Only the size and modification time of the
+    executable are tracked, so a copy is not staged again if only its shared
+    libraries are rebuilt.  Remove the staged copy, or stage to a new folder,
+    after rebuilding them.  Libraries are found with ``ldd`` so that only the
+    executable is staged on systems other than Linux.
+
+    Setting the ``BFRESCOX_STAGE_PATH`` environment variable stages the
+    installation returned by ``information()`` so that all simulations and
+    workers started with that environment use the staged copy.  Since MPI
+    launchers start processes on other nodes with the path of the executable
+    on this node, each node must be staged before a multi-node launch.
+
+    :param frescox: ``dict`` that fully characterizes a |frescox|
+        installation
+    :param path: Path to node-local folder in which to stage the installation.
+        It is created if it does not exist.
+    :return: ``dict`` identical to the given one except for the path of the
+        executable and with ``FRESCOX_LIBRARY_PATH`` set to the folder of the
+        staged libraries, which is prepended to ``LD_LIBRARY_PATH`` for each
+        |frescox| process
+    """
+    if not isinstance(frescox, dict):
+        raise TypeError(f"Invalid frescox specification ({frescox})")
+    elif not frescox:
+        return {}
+
+    frescox_exe = Path(frescox[FRESCOX_EXE]).resolve()
+    if not frescox_exe.is_file():
+        msg = "Frescox executable does not exist or is not a file ({})"
+        raise TypeError(msg.format(frescox_exe))
+
+    path = Path(path).resolve()
+    path.mkdir(parents=True, exist_ok=True)
+    folder = path.joinpath(_stage_key(frescox_exe))
+
+    if not folder.exists():
+        # Stage privately and publish atomically so that concurrent processes
+        # never see a partial copy.  The first process to publish wins.
+        tmp = Path(tempfile.mkdtemp(prefix=f".{folder.name}-", dir=path))
+        try:
+            files = {"bin/frescox": _copy(frescox_exe, tmp, "bin/frescox")}
+            for name, library in _shared_libraries(frescox_exe).items():
+                files[f"lib/{name}"] = _copy(library, tmp, f"lib/{name}")
+            tmp.joinpath("lib").mkdir(exist_ok=True)
+            with open(tmp.joinpath(_MANIFEST_NAME), "w") as fptr:
+                json.dump({"source": str(frescox_exe), "files": files}, fptr,
+                          indent=2)
+            tmp.chmod(0o755)
+            try:
+                os.rename(tmp, folder)
+            except OSError:
+                if not folder.exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    if not _verify(folder):
+        msg = "Staged Frescox installation {} is corrupt.  Please remove it."
+        raise RuntimeError(msg.format(folder))
+
+    staged = dict(frescox)
+    staged[FRESCOX_EXE] = folder.joinpath("bin", "frescox")
+    staged[FRESCOX_LIBRARY_PATH] = folder.joinpath("lib")
+
+    return staged
+
+
+def staged_information(frescox):
+    """
+    :return: Information of the given installation staged to the folder named
+        by the ``BFRESCOX_STAGE_PATH`` environment variable or the given
+        information if the variable is not set
+    """
+    path = os.environ.get(STAGE_PATH_ENV, "").strip()
+    if path == "":
+        return frescox
+    return stage_installation(frescox, path)